@@ -0,0 +1,29 @@
+"""
+Benchmarks for the 1D coadding routines.
+"""
+from pypeit.core import coadd
+
+from . import synthetic
+
+
+class ComputeStack:
+    """
+    Stack a set of 1D spectra onto a common wavelength grid.
+    """
+    params = [5, 50]
+    param_names = ['nexp']
+    timeout = 120
+
+    def setup(self, nexp):
+        self.waves, self.fluxes, self.ivars, self.gpms, self.weights, self.wave_grid \
+                = synthetic.spectra_stack(nexp=nexp)
+
+    def _run(self):
+        return coadd.compute_stack(self.wave_grid, self.waves, self.fluxes, self.ivars,
+                                   self.gpms, self.weights)
+
+    def time_compute_stack(self, nexp):
+        self._run()
+
+    def peakmem_compute_stack(self, nexp):
+        self._run()
@@ -0,0 +1,34 @@
+"""
+Benchmarks for the datacube construction routines.
+"""
+from pypeit.core import datacube
+
+from . import synthetic
+
+
+class Subpixellate:
+    """
+    Resample a slicer-IFU exposure onto a datacube.
+    """
+    params = [1, 3]
+    param_names = ['subpixel']
+    timeout = 600
+
+    def setup(self, subpixel):
+        # NOTE: The calculation of the subpixel weights is very expensive, so
+        # limit the spectral extent of the exposure
+        self.exp = synthetic.ifu_exposure(nspec=256)
+
+    def _run(self, subpixel):
+        e = self.exp
+        return datacube.subpixellate(e['output_wcs'], e['bins'], e['sciimg'], e['ivar'],
+                                     e['waveimg'], e['slitid_img_gpm'], e['wghtimg'], e['wcs'],
+                                     e['tilts'], e['slits'], e['alignment'], e['dar'], 0., 0.,
+                                     spec_subpixel=subpixel, spat_subpixel=subpixel,
+                                     slice_subpixel=subpixel)
+
+    def time_subpixellate(self, subpixel):
+        self._run(subpixel)
+
+    def peakmem_subpixellate(self, subpixel):
+        self._run(subpixel)
@@ -0,0 +1,41 @@
+"""
+Benchmarks for the core fitting routines.
+"""
+import numpy as np
+
+from pypeit.core import fitting
+
+from . import synthetic
+
+
+class BsplineProfile:
+    """
+    B-spline fit with rejection to the sky spectrum in a single slit, as done
+    by :func:`~pypeit.core.skysub.global_skysub`.
+    """
+    params = [512, 2048]
+    param_names = ['nspec']
+    timeout = 120
+
+    def setup(self, nspec):
+        frame = synthetic.slit_frame(nspec=nspec, nslits=1)
+        indx = frame['slitmask'] == 1
+        srt = np.argsort(frame['tilts'][indx])
+        self.x = frame['tilts'][indx][srt]
+        self.y = frame['sciimg'][indx][srt]
+        self.ivar = frame['ivar'][indx][srt]
+        # Breakpoint spacing of roughly a pixel along the spectral direction
+        self.bkspace = 1/(nspec-1)
+
+    def _fit(self):
+        return fitting.bspline_profile(self.x, self.y, self.ivar, np.ones_like(self.x),
+                                       nord=4, upper=3., lower=3., maxiter=10,
+                                       kwargs_bspline={'bkspace': self.bkspace},
+                                       kwargs_reject={'groupbadpix': True, 'maxrej': 10},
+                                       quiet=True)
+
+    def time_bspline_profile(self, nspec):
+        self._fit()
+
+    def peakmem_bspline_profile(self, nspec):
+        self._fit()
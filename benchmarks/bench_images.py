@@ -0,0 +1,80 @@
+"""
+Benchmarks for the image processing routines.
+"""
+import shutil
+import tempfile
+
+from pypeit.spectrographs.util import load_spectrograph
+from pypeit.images import buildimage
+from pypeit.images import combineimage
+from pypeit.core import procimg
+
+from . import synthetic
+
+
+class CombineImage:
+    """
+    Process and combine a set of raw frames.
+    """
+    params = [3, 8]
+    param_names = ['nframes']
+    timeout = 300
+
+    def setup(self, nframes):
+        self.tmpdir = tempfile.mkdtemp()
+        self.files = synthetic.raw_kast_frames(self.tmpdir, nframes=nframes)
+        self.spectrograph = load_spectrograph('shane_kast_blue')
+        self.frame_par = self.spectrograph.default_pypeit_par()['scienceframe']
+        self.frame_par['process']['use_biasimage'] = False
+        self.frame_par['process']['use_pixelflat'] = False
+        self.frame_par['process']['use_illumflat'] = False
+        self.frame_par['process']['use_specillum'] = False
+        self.frame_par['process']['combine'] = 'mean'
+        self.frame_par['process']['clip'] = True
+        # Pre-process the frames for the benchmarks of the combination only
+        self.processed = [buildimage.process_raw_file(f, spectrograph=self.spectrograph,
+                                                      det=1, par=self.frame_par['process'])
+                          for f in self.files]
+
+    def teardown(self, nframes):
+        shutil.rmtree(self.tmpdir)
+
+    def _combine(self):
+        return combineimage.CombineImage(self.processed, self.frame_par['process']).run()
+
+    def _process_and_combine(self):
+        return buildimage.buildimage_fromlist(self.spectrograph, 1, self.frame_par, self.files)
+
+    def time_combine(self, nframes):
+        self._combine()
+
+    def peakmem_combine(self, nframes):
+        self._combine()
+
+    def time_process_and_combine(self, nframes):
+        self._process_and_combine()
+
+    def peakmem_process_and_combine(self, nframes):
+        self._process_and_combine()
+
+
+class LACosmic:
+    """
+    Identify cosmic rays in a single frame.
+    """
+    params = [1, 4]
+    param_names = ['maxiter']
+    timeout = 300
+
+    def setup(self, maxiter):
+        self.img, self.var, _ = synthetic.cosmic_ray_frame(nspec=2048, nspat=512)
+
+    def _run(self, maxiter):
+        return procimg.lacosmic(self.img, saturation=65535., varframe=self.var,
+                                maxiter=maxiter)
+
+    def time_lacosmic(self, maxiter):
+        self._run(maxiter)
+
+    def peakmem_lacosmic(self, maxiter):
+        self._run(maxiter)
@@ -0,0 +1,59 @@
+"""
+Benchmarks for the sky subtraction and extraction routines.
+"""
+from pypeit.core import skysub
+
+from . import synthetic
+
+
+class GlobalSkySub:
+    """
+    Global sky subtraction of a single slit.
+    """
+    params = [512, 2048]
+    param_names = ['nspec']
+    timeout = 300
+
+    def setup(self, nspec):
+        self.frame = synthetic.slit_frame(nspec=nspec, nslits=1)
+        self.thismask = self.frame['slitmask'] == 1
+
+    def _fit(self):
+        f = self.frame
+        return skysub.global_skysub(f['sciimg'], f['ivar'], f['tilts'], self.thismask,
+                                    f['left'][:,0], f['right'][:,0], inmask=self.thismask,
+                                    pos_mask=False)
+
+    def time_global_skysub(self, nspec):
+        self._fit()
+
+    def peakmem_global_skysub(self, nspec):
+        self._fit()
+
+
+class LocalSkySubExtract:
+    """
+    Local sky subtraction and optimal extraction of a single object.
+    """
+    params = [512, 2048]
+    param_names = ['nspec']
+    timeout = 300
+
+    def setup(self, nspec):
+        self.frame = synthetic.slit_frame(nspec=nspec, nslits=1)
+        self.thismask = self.frame['slitmask'] == 1
+
+    def _fit(self):
+        f = self.frame
+        # NOTE: The objects are altered in place, so always use a copy
+        return skysub.local_skysub_extract(f['sciimg'], f['ivar'], f['tilts'], f['waveimg'],
+                                           f['sky'], self.thismask, f['left'][:,0],
+                                           f['right'][:,0], f['sobjs'].copy(),
+                                           ingpm=self.thismask, base_var=f['base_var'],
+                                           niter=2)
+
+    def time_local_skysub_extract(self, nspec):
+        self._fit()
+
+    def peakmem_local_skysub_extract(self, nspec):
+        self._fit()
@@ -0,0 +1,39 @@
+"""
+Benchmarks for the start-up time of the PypeIt scripts.
+
+Each benchmark is executed by asv in a fresh python process, such that the
+timings include the import of pypeit and all of its dependencies.
+"""
+
+# Scripts are selected by their module in pypeit.scripts and the name of the
+# ScriptBase subclass they define.
+scripts = {'run_pypeit': 'RunPypeIt',
+           'setup': 'Setup',
+           'chk_for_calibs': 'ChkForCalibs',
+           'parse_slits': 'ParseSlits',
+           'print_bpm': 'PrintBPM',
+           'show_2dspec': 'Show2DSpec',
+           'view_fits': 'ViewFits'}
+
+
+def timeraw_script_parser(script):
+    """
+    Time importing a script and constructing its command-line parser; i.e.,
+    the time spent before ``main`` is called.
+    """
+    return f'from pypeit.scripts.{script} import {scripts[script]}\n' \
+           f'{scripts[script]}.get_parser()'
+
+timeraw_script_parser.params = list(scripts.keys())
+timeraw_script_parser.param_names = ['script']
+
+
+def timeraw_load_spectrograph(spec):
+    """
+    Time instantiating a single spectrograph.
+    """
+    return 'from pypeit.spectrographs.util import load_spectrograph\n' \
+           f'load_spectrograph("{spec}")'
+
+timeraw_load_spectrograph.params = ['shane_kast_blue', 'keck_deimos']
+timeraw_load_spectrograph.param_names = ['spectrograph']
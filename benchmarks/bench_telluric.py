@@ -0,0 +1,31 @@
+"""
+Benchmarks for the telluric fitting routines.
+"""
+from pypeit.core import telluric
+
+from . import synthetic
+
+
+class TellFit:
+    """
+    Joint fit of an object and telluric model to a single spectrum.
+    """
+    params = [2, 4]
+    param_names = ['tell_npca']
+    timeout = 600
+    # Each fit takes several seconds, so limit the number of samples
+    number = 1
+    repeat = 3
+    rounds = 1
+
+    def setup(self, tell_npca):
+        self.flux, self.gpm, self.arg_dict = synthetic.telluric_model(tell_npca=tell_npca)
+
+    def _fit(self):
+        return telluric.tellfit(self.flux, self.gpm, self.arg_dict)
+
+    def time_tellfit(self, tell_npca):
+        self._fit()
+
+    def peakmem_tellfit(self, tell_npca):
+        self._fit()
@@ -0,0 +1,29 @@
+"""
+Benchmarks for the tracing routines.
+"""
+from pypeit.core import trace
+
+from . import synthetic
+
+
+class FollowCentroid:
+    """
+    Follow the centroids of a set of features along the spectral direction.
+    """
+    params = [256, 1024]
+    param_names = ['nspec']
+    timeout = 120
+
+    def setup(self, nspec):
+        self.img, self.ivar, self.start_row, self.start_cen, _ \
+                = synthetic.trace_image(nspec=nspec)
+
+    def _follow(self):
+        return trace.follow_centroid(self.img, self.start_row, self.start_cen, ivar=self.ivar,
+                                     width=3.0)
+
+    def time_follow_centroid(self, nspec):
+        self._follow()
+
+    def peakmem_follow_centroid(self, nspec):
+        self._follow()
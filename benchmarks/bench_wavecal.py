@@ -0,0 +1,39 @@
+"""
+Benchmarks for the wavelength calibration routines.
+"""
+import numpy as np
+
+from pypeit.par import pypeitpar
+from pypeit.core.wavecal import autoid
+
+from . import synthetic
+
+
+class HolyGrail:
+    """
+    Automated identification of the arc lines in a set of arc spectra.
+    """
+    params = [1, 2]
+    param_names = ['nslits']
+    timeout = 600
+    # Each fit takes tens of seconds, so limit the number of samples
+    number = 1
+    repeat = 3
+    rounds = 1
+
+    def setup(self, nslits):
+        self.lamps = ['ArI', 'NeI']
+        self.spec, _ = synthetic.arc_spectra(lamps=self.lamps, nslits=nslits)
+        self.par = pypeitpar.WavelengthSolutionPar(lamps=self.lamps)
+        # Line FWHM used by the generator
+        self.fwhm = np.full(nslits, 3.5)
+
+    def _run(self):
+        return autoid.HolyGrail(self.spec, self.lamps, par=self.par,
+                                 measured_fwhms=self.fwhm, nonlinear_counts=1e10).get_results()
+
+    def time_holy_grail(self, nslits):
+        self._run()
+
+    def peakmem_holy_grail(self, nslits):
+        self._run()
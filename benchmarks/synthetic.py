@@ -0,0 +1,429 @@
+"""
+Deterministic generators of the synthetic data used by the benchmarks.
+
+All generators are seeded, such that every benchmark run (and every commit
+being compared) operates on identical data, and they only use data that are
+distributed with PypeIt, such that the benchmarks can be run offline.
+"""
+from pathlib import Path
+
+import numpy as np
+
+from astropy.io import fits
+from astropy import wcs
+
+from pypeit import specobj
+from pypeit import specobjs
+from pypeit import slittrace
+from pypeit import alignframe
+from pypeit.coadd3d import DARcorrection
+from pypeit.core import datacube
+from pypeit.core import telluric
+from pypeit.core.wavecal import waveio
+from pypeit.core.wavecal import wvutils
+
+
+def arc_spectra(lamps=('ArI', 'NeI', 'KrI', 'XeI'), nspec=2048, nslits=3,
+                wave_range=(5500., 9500.), fwhm=3.5, seed=1):
+    """
+    Construct a set of arc-lamp spectra using the bundled line lists.
+
+    Each slit has a slightly different, mildly non-linear wavelength solution.
+
+    Args:
+        lamps (:obj:`tuple`, optional):
+            The arc lamps (line lists) used to construct the spectra.
+        nspec (:obj:`int`, optional):
+            Number of spectral pixels.
+        nslits (:obj:`int`, optional):
+            Number of spectra (slits).
+        wave_range (:obj:`tuple`, optional):
+            Approximate wavelength range of the spectra.
+        fwhm (:obj:`float`, optional):
+            FWHM of the lines in pixels.
+        seed (:obj:`int`, optional):
+            Seed for the random number generator.
+
+    Returns:
+        :obj:`tuple`: The arc spectra and the wavelength of each pixel, both
+        with shape ``(nspec, nslits)``.
+    """
+    rng = np.random.default_rng(seed)
+    line_list = waveio.load_line_lists(list(lamps))[1]
+    line_wave = np.asarray(line_list['wave'], dtype=float)
+    # Compress the large range of the tabulated amplitudes and add some scatter
+    line_amp = np.sqrt(np.asarray(line_list['amplitude'], dtype=float)) \
+                    * rng.lognormal(sigma=0.3, size=line_wave.size)
+    pix = np.arange(nspec, dtype=float)
+    x = 2*pix/(nspec-1) - 1
+    sig = fwhm / 2.3548
+    spec = np.empty((nspec, nslits), dtype=float)
+    wave = np.empty((nspec, nslits), dtype=float)
+    for i in range(nslits):
+        shift = rng.uniform(-0.05, 0.05) * (wave_range[1] - wave_range[0])
+        wave[:,i] = np.mean(wave_range) + shift + 0.5*(wave_range[1] - wave_range[0])*x \
+                        + rng.uniform(5., 15.)*x**2
+        indx = (line_wave > wave[0,i]) & (line_wave < wave[-1,i])
+        line_pix = np.interp(line_wave[indx], wave[:,i], pix)
+        spec[:,i] = np.sum(line_amp[indx,None]
+                           * np.exp(-0.5*((pix[None,:] - line_pix[:,None])/sig)**2), axis=0)
+    spec += 10.
+    spec += rng.normal(size=spec.shape) * np.sqrt(spec)
+    return spec, wave
+
+
+def slit_frame(nspec=1024, nspat=256, nslits=2, seed=3):
+    """
+    Construct a synthetic sky-dominated, multi-slit science frame with one
+    object in each slit.
+
+    Args:
+        nspec (:obj:`int`, optional):
+            Number of spectral pixels.
+        nspat (:obj:`int`, optional):
+            Number of spatial pixels.
+        nslits (:obj:`int`, optional):
+            Number of slits.  The slits evenly divide the spatial extent of the
+            image.
+        seed (:obj:`int`, optional):
+            Seed for the random number generator.
+
+    Returns:
+        :obj:`dict`: Dictionary with the science image (``sciimg``), its
+        inverse variance (``ivar``) and base variance (``base_var``), the
+        tilts (``tilts``) and wavelength (``waveimg``) images, the noiseless
+        sky image (``sky``), the slit ID image (``slitmask``; -1 off slit,
+        1-indexed slit number otherwise), the left and right slit edges
+        (``left``, ``right``; shape ``(nspec, nslits)``), and the objects
+        (``sobjs``; :class:`~pypeit.specobjs.SpecObjs`).
+    """
+    rng = np.random.default_rng(seed)
+    spec = np.arange(nspec)
+    spat = np.arange(nspat)[None,:]
+    width = nspat / nslits
+    left = np.column_stack([5 + i*width + 0.01*spec for i in range(nslits)])
+    right = left + width - 10
+    slitmask = np.full((nspec, nspat), -1, dtype=int)
+    for i in range(nslits):
+        slitmask[(spat > left[:,i,None]) & (spat < right[:,i,None])] = i+1
+    tilts = (spec[:,None] + 0.02*(spat - nspat/2))/(nspec-1)
+    waveimg = 3500 + 2000*tilts
+    sky = 100 + 500*np.exp(-0.5*((tilts*(nspec-1) % 50 - 25)/1.5)**2)
+    sobjs = specobjs.SpecObjs()
+    img = sky.copy()
+    for i in range(nslits):
+        x = (left[0,i] + right[0,i])/2 + rng.uniform(-width/10, width/10)
+        s = specobj.SpecObj('MultiSlit', 'DET01', SLITID=i+1)
+        s.TRACE_SPAT = x + 0.005*spec
+        s.SPAT_PIXPOS = x
+        s.maskwidth = 12.
+        s.BOX_RADIUS = 4.
+        s.FWHM = 5.
+        s.OBJID = 1
+        s.trace_spec = spec
+        sobjs.add_sobj(s)
+        img += 200*np.exp(-0.5*((spat - s.TRACE_SPAT[:,None])/2.)**2)
+    base_var = np.full(img.shape, 25.)
+    var = base_var + img
+    img += rng.normal(size=img.shape)*np.sqrt(var)
+    return dict(sciimg=img, ivar=1/var, base_var=base_var, tilts=tilts, waveimg=waveimg,
+                sky=sky, slitmask=slitmask, left=left, right=right, sobjs=sobjs)
+
+
+def cosmic_ray_frame(nspec=1024, nspat=256, ncr=300, seed=4):
+    """
+    Add cosmic rays to a :func:`slit_frame`.
+
+    Args:
+        nspec (:obj:`int`, optional):
+            Number of spectral pixels.
+        nspat (:obj:`int`, optional):
+            Number of spatial pixels.
+        ncr (:obj:`int`, optional):
+            Number of cosmic-ray hits.  Each hit is a short, randomly oriented
+            track of 1-5 pixels.
+        seed (:obj:`int`, optional):
+            Seed for the random number generator.
+
+    Returns:
+        :obj:`tuple`: The science image with the cosmic rays, its variance
+        (excluding the cosmic rays), and a boolean image selecting the pixels
+        hit by a cosmic ray.
+    """
+    frame = slit_frame(nspec=nspec, nspat=nspat, seed=seed)
+    rng = np.random.default_rng(seed)
+    img = frame['sciimg'].copy()
+    crmask = np.zeros(img.shape, dtype=bool)
+    for _ in range(ncr):
+        i, j = rng.integers(0, nspec), rng.integers(0, nspat)
+        di, dj = rng.integers(-1, 2, size=2)
+        for k in range(rng.integers(1, 6)):
+            _i, _j = np.clip(i + k*di, 0, nspec-1), np.clip(j + k*dj, 0, nspat-1)
+            img[_i,_j] += rng.uniform(500., 5000.)
+            crmask[_i,_j] = True
+    return img, 1/frame['ivar'], crmask
+
+
+def trace_image(nspec=2048, nspat=1024, ntrace=40, seed=5):
+    """
+    Construct an image with a set of curved, Gaussian features to follow
+    along the spectral direction.
+
+    Args:
+        nspec (:obj:`int`, optional):
+            Number of spectral pixels.
+        nspat (:obj:`int`, optional):
+            Number of spatial pixels.
+        ntrace (:obj:`int`, optional):
+            Number of features.
+        seed (:obj:`int`, optional):
+            Seed for the random number generator.
+
+    Returns:
+        :obj:`tuple`: The image, its inverse variance, the row at which to
+        start following the features, the approximate feature centers in that
+        row, and the true feature centers (shape ``(nspec, ntrace)``).
+    """
+    rng = np.random.default_rng(seed)
+    spec = np.arange(nspec)
+    spat = np.arange(nspat)
+    x = 2*spec/(nspec-1) - 1
+    cen0 = np.linspace(10, nspat-10, ntrace) + rng.uniform(-2, 2, size=ntrace)
+    cen = cen0[None,:] + 3*x[:,None] + rng.uniform(-5, 5, size=ntrace)[None,:]*x[:,None]**2
+    img = np.zeros((nspec, nspat), dtype=float)
+    for i in range(ntrace):
+        img += 100*np.exp(-0.5*((spat[None,:] - cen[:,i,None])/1.5)**2)
+    var = 4. + img
+    img += rng.normal(size=img.shape)*np.sqrt(var)
+    start_row = nspec//2
+    return img, 1/var, start_row, cen[start_row] + rng.uniform(-0.5, 0.5, size=ntrace), cen
+
+
+def spectra_stack(nexp=10, nspec=4000, seed=6):
+    """
+    Construct a set of 1D spectra of the same source with different
+    wavelength sampling.
+
+    Args:
+        nexp (:obj:`int`, optional):
+            Number of spectra.
+        nspec (:obj:`int`, optional):
+            Number of pixels in each spectrum.
+        seed (:obj:`int`, optional):
+            Seed for the random number generator.
+
+    Returns:
+        :obj:`tuple`: Lists with the wavelengths, fluxes, inverse variances,
+        good-pixel masks, and weights of each spectrum, and the wavelength grid
+        (bin edges) for the stack.
+    """
+    rng = np.random.default_rng(seed)
+    waves, fluxes, ivars, gpms, weights = [], [], [], [], []
+    for i in range(nexp):
+        wave = np.linspace(4000., 9000., nspec) + rng.uniform(-2, 2)
+        flux = 10 + 5*np.sin(wave/200.) \
+                + 20*np.exp(-0.5*((wave - 6563.)/3.)**2)
+        sig = np.full(nspec, 1. + rng.uniform())
+        waves += [wave]
+        fluxes += [flux + rng.normal(size=nspec)*sig]
+        ivars += [1/sig**2]
+        gpms += [rng.uniform(size=nspec) > 0.01]
+        weights += [np.full(nspec, 1/sig[0]**2)]
+    wave_grid = wvutils.get_wave_grid(waves=waves, gpms=gpms, wave_method='linear')[0]
+    return waves, fluxes, ivars, gpms, weights, wave_grid
+
+
+def ifu_exposure(nslices=24, nspec=1024, slice_width=40, seed=7):
+    """
+    Construct a synthetic slicer-IFU exposure of a point source on a flat
+    sky background.
+
+    Args:
+        nslices (:obj:`int`, optional):
+            Number of IFU slices.
+        nspec (:obj:`int`, optional):
+            Number of spectral pixels.
+        slice_width (:obj:`int`, optional):
+            Spatial extent of each slice on the detector in pixels.
+        seed (:obj:`int`, optional):
+            Seed for the random number generator.
+
+    Returns:
+        :obj:`dict`: Dictionary with the science image (``sciimg``), its
+        inverse variance (``ivar``), the wavelength (``waveimg``), tilts
+        (``tilts``), slit ID (``slitid_img_gpm``), and weights (``wghtimg``)
+        images, the slits (``slits``;
+        :class:`~pypeit.slittrace.SlitTraceSet`), the alignment transform
+        (``alignment``; :class:`~pypeit.alignframe.AlignmentSplines`), the
+        DAR correction (``dar``; :class:`~pypeit.coadd3d.DARcorrection`), the
+        exposure WCS (``wcs``), and the WCS (``output_wcs``) and voxel edges
+        (``bins``) of the output datacube.
+    """
+    rng = np.random.default_rng(seed)
+    nspat = nslices * slice_width
+    spec = np.arange(nspec)
+    left = np.column_stack([2 + i*slice_width + 0.002*spec for i in range(nslices)])
+    right = left + slice_width - 4
+    slits = slittrace.SlitTraceSet(left, right, 'SlicerIFU', nspat=nspat, PYP_SPEC='dummy')
+    slitid_img_gpm = slits.slit_img(pad=0)
+    slitid_img_gpm[slitid_img_gpm < 0] = 0
+    spat = np.arange(nspat)[None,:]
+    tilts = (spec[:,None] + 0.01*(spat % slice_width - slice_width/2))/(nspec-1)
+    waveimg = np.where(slitid_img_gpm > 0, 3500 + 2000*tilts, 0.)
+    alignment = alignframe.AlignmentSplines(np.stack([left, right], axis=1), np.array([0, 1]),
+                                            tilts)
+    dar = DARcorrection(1.2, 0.3, 615., 2., 20., np.cos(np.radians(20.)))
+
+    # Exposure WCS; see, e.g., keck_kcwi.get_wcs
+    pxscl, slscl = 0.15/3600., 0.7/3600.
+    exp_wcs = wcs.WCS(naxis=3)
+    exp_wcs.wcs.equinox = 2000.
+    exp_wcs.wcs.radesys = 'FK5'
+    exp_wcs.wcs.lonpole = 180.0
+    exp_wcs.wcs.latpole = 0.0
+    exp_wcs.wcs.cname = ['RA', 'DEC', 'Wavelength']
+    exp_wcs.wcs.cunit = ['deg', 'deg', 'Angstrom']
+    exp_wcs.wcs.ctype = ['RA---TAN', 'DEC--TAN', 'WAVE']
+    exp_wcs.wcs.crval = [150., 20., 3500.]
+    exp_wcs.wcs.crpix = [nslices/2, slice_width/2, 1.]
+    exp_wcs.wcs.cd = [[-slscl, 0., 0.], [0., pxscl, 0.], [0., 0., 2000./(nspec-1)]]
+
+    # Point source on a flat sky
+    raimg, decimg, _ = slits.get_radec_image(exp_wcs, alignment, tilts)
+    dra = (raimg - 150.)*np.cos(np.radians(20.))*3600.
+    ddec = (decimg - 20.)*3600.
+    img = np.where(slitid_img_gpm > 0, 100. + 1000.*np.exp(-0.5*(dra**2 + ddec**2)/0.5**2), 0.)
+    var = 25. + img
+    img += rng.normal(size=img.shape)*np.sqrt(var)
+    ivar = np.where(slitid_img_gpm > 0, 1/var, 0.)
+
+    output_wcs, bins, _ = datacube.create_wcs(raimg, decimg, waveimg, slitid_img_gpm,
+                                              0.3/3600., 2.0)
+    return dict(sciimg=img, ivar=ivar, waveimg=waveimg, tilts=tilts,
+                slitid_img_gpm=slitid_img_gpm, wghtimg=np.ones_like(img), slits=slits,
+                alignment=alignment, dar=dar, wcs=exp_wcs, output_wcs=output_wcs, bins=bins)
+
+
+def telluric_model(nspec=3000, tell_npca=4, wave_range=(6000., 9500.), seed=8):
+    """
+    Construct a synthetic telluric PCA model and a telluric-absorbed spectrum
+    of a smooth source, as needed by :func:`~pypeit.core.telluric.tellfit`.
+
+    The PCA model mimics the output of
+    :func:`~pypeit.core.telluric.read_telluric_pca`; the first component is
+    the mean arcsinh optical depth, which has a set of absorption bands, and
+    the remaining components modulate the strength of each band.
+
+    Args:
+        nspec (:obj:`int`, optional):
+            Number of pixels in the spectrum.
+        tell_npca (:obj:`int`, optional):
+            Number of PCA components to fit.
+        wave_range (:obj:`tuple`, optional):
+            Wavelength range of the spectrum.
+        seed (:obj:`int`, optional):
+            Seed for the random number generator.
+
+    Returns:
+        :obj:`tuple`: The flux, its good-pixel mask, and the dictionary of
+        arguments for :func:`~pypeit.core.telluric.tellfit`.
+    """
+    rng = np.random.default_rng(seed)
+    # Telluric grid with 10% padding
+    nspec_tell = int(nspec*np.log(1.1*wave_range[1]/0.9/wave_range[0])
+                        / np.log(wave_range[1]/wave_range[0]))
+    wave_grid = np.geomspace(0.9*wave_range[0], 1.1*wave_range[1], nspec_tell)
+    dwave, dloglam, resln_guess, pix_per_sigma = wvutils.get_sampling(wave_grid)
+    bands = [6870., 7600., 8200., 9300.]
+    ncomp = tell_npca + 1
+    tell_pca = np.zeros((ncomp, wave_grid.size), dtype=float)
+    for i, band in enumerate(bands):
+        lines = band + np.cumsum(rng.uniform(1., 4., size=60))
+        profile = np.sum(rng.uniform(0.05, 0.5, size=(lines.size, 1))
+                         * np.exp(-0.5*((wave_grid[None,:] - lines[:,None])/0.3)**2), axis=0)
+        tell_pca[0] += profile
+        tell_pca[1 + i % tell_npca] += 0.3*profile
+    bounds_tell_pca = np.array([[0.] + [-1.]*tell_npca, [0.] + [1.]*tell_npca])
+    tell_dict = dict(wave_grid=wave_grid, dloglam=dloglam,
+                     tell_pad_pix=int(np.ceil(10.0 * pix_per_sigma)), ncomp_tell_pca=ncomp,
+                     tell_pca=tell_pca, bounds_tell_pca=bounds_tell_pca, coefs_tell_pca=None,
+                     teltype='pca')
+
+    # Observed spectrum, sampled by the telluric grid
+    ind_lower = np.searchsorted(wave_grid, wave_range[0])
+    ind_upper = np.searchsorted(wave_grid, wave_range[1]) - 1
+    wave = wave_grid[ind_lower:ind_upper+1]
+    theta_tell = np.zeros(tell_npca + 3, dtype=float)
+    theta_tell[0] = 0.5
+    theta_tell[-3:] = [resln_guess, 0., 1.]
+    transmission = telluric.eval_telluric(theta_tell, tell_dict, ind_lower=ind_lower,
+                                          ind_upper=ind_upper)
+    obj = 100. * (1 + 0.2*((wave - wave.mean())/np.ptp(wave)))
+    sig = np.full(wave.size, 2.)
+    flux = obj*transmission + rng.normal(size=wave.size)*sig
+    gpm = np.ones(wave.size, dtype=bool)
+
+    # Linear object model; see telluric.init_poly_model
+    obj_dict = dict(wave=wave, wave_min=wave.min(), wave_max=wave.max(), func='legendre',
+                    model='exp', polyorder=2)
+    bounds = [(np.log(50.), np.log(200.)), (-1., 1.), (-1., 1.)] \
+                + [tuple(b) for b in bounds_tell_pca[:,1:].T] \
+                + [(0.6*resln_guess, 1.4*resln_guess), (-5., 5.), (0.9, 1.1)]
+    arg_dict = dict(ivar=1/sig**2, tell_dict=tell_dict, ind_lower=ind_lower, ind_upper=ind_upper,
+                    tell_npca=tell_npca, obj_model_func=telluric.eval_poly_model, obj_dict=obj_dict,
+                    ballsize=5e-4, bounds=bounds, rng=np.random.default_rng(seed),
+                    diff_evol_maxiter=100, tol=1e-3, popsize=30, recombination=0.7,
+                    polish=True, disp=False, debug=False)
+    return flux, gpm, arg_dict
+
+
+def raw_kast_frames(path, nframes=5, nrows=350, seed=9):
+    """
+    Write a set of synthetic Shane/Kast blue raw science frames.
+
+    The frames include an overscan region, bias level, a set of slit
+    illuminated rows with sky lines, and cosmic rays.
+
+    Args:
+        path (:obj:`str`, :obj:`pathlib.Path`):
+            Directory for the files.
+        nframes (:obj:`int`, optional):
+            Number of frames to write.
+        nrows (:obj:`int`, optional):
+            Number of (spatial) rows in the raw frames.
+        seed (:obj:`int`, optional):
+            Seed for the random number generator.
+
+    Returns:
+        :obj:`list`: The full paths to the written files.
+    """
+    rng = np.random.default_rng(seed)
+    path = Path(path).absolute()
+    ncols = 2112
+    col = np.arange(2048)
+    row = np.arange(nrows)[:,None]
+    slit = (row > 0.2*nrows) & (row < 0.8*nrows)
+    sky = 50. + 500.*np.exp(-0.5*((col % 80 - 40)/1.5)**2)
+    files = []
+    for i in range(nframes):
+        img = np.full((nrows, ncols), 1000., dtype=float)
+        img[:,:2048] += slit * sky[None,:] * 1.2
+        img += rng.normal(size=img.shape)*np.sqrt(3.7**2*1.2**2 + np.absolute(img - 1000.))
+        ncr = 200
+        img[rng.integers(0, nrows, ncr), rng.integers(0, 2048, ncr)] += rng.uniform(500, 5000, ncr)
+        hdr = fits.Header()
+        hdr['OBJECT'] = 'synthetic'
+        hdr['EXPTIME'] = 300.
+        hdr['DATE'] = '2025-01-01T00:00:00'
+        hdr['DATE-OBS'] = '2025-01-01T00:00:00'
+        hdr['RA'] = '10:00:00.0'
+        hdr['DEC'] = '+20:00:00.0'
+        hdr['AIRMASS'] = 1.2
+        hdr['SLIT_N'] = '2.0 arcsec'
+        hdr['GRISM_N'] = '600/4310'
+        hdr['BSPLIT_N'] = 'D55'
+        hdr['VERSION'] = 'kastb'
+        files += [str(path / f'b{i+1:04d}.fits')]
+        fits.PrimaryHDU(data=np.round(img).astype(np.uint16), header=hdr).writeto(files[-1],
+                                                                                overwrite=True)
+    return files
@@ -6,7 +6,7 @@ Module for generating an Alignment image to map constant spatial locations
 """
 import inspect
 import numpy as np
-from IPython import embed
+from pypeit.lazyimport import embed
 from scipy.interpolate import interp1d, RegularGridInterpolator
 
 from pypeit.display import display
@@ -12,7 +12,7 @@ Class usage examples
 .. include:: ../include/links.rst
 
 """
-from IPython import embed
+from pypeit.lazyimport import embed
 import numpy
 import os
 import textwrap
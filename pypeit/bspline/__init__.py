@@ -1,3 +1,3 @@
 
-from pypeit.bspline.bspline import bspline
+from pypeit.bspline.bspline import bspline, workit_batch
 
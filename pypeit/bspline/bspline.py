@@ -12,7 +12,7 @@ Implements the bspline class
 import copy
 import warnings
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
@@ -22,12 +22,12 @@ from pypeit import msgs
 
 try:
     from pypeit.bspline.utilc import cholesky_band, cholesky_solve, solution_arrays, intrv, \
-                                     bspline_model
+                                     bspline_model, solve_batch
 except:
     warnings.warn('Unable to load bspline C extension.  Try rebuilding pypeit.  In the '
                   'meantime, falling back to pure python code.')
     from pypeit.bspline.utilpy import cholesky_band, cholesky_solve, solution_arrays, intrv, \
-                                        bspline_model
+                                        bspline_model, solve_batch
 
 # TODO: Used for testing.  Keep around for now.
 #from pypeit.bspline.utilpy import bspline_model
@@ -664,6 +664,23 @@ class bspline(datamodel.DataContainer):
         # NOTE: cholesky_solve ALWAYS returns err == -1; don't even catch it.
         sol = cholesky_solve(a, beta)[1]
 
+        self._set_solution(a, sol)
+        return 0, self.value(xdata, x2=xdata, action=action, upper=upper, lower=lower)[0]
+
+    def _set_solution(self, a, sol):
+        """
+        Set the coefficients of the good break points using the solution
+        of the linear system.
+
+        Args:
+            a (`numpy.ndarray`_):
+                Cholesky decomposition of the solution matrix.
+            sol (`numpy.ndarray`_):
+                Solution vector.
+        """
+        goodbk = self.mask[self.nord:]
+        nn = goodbk.sum()
+        nfull = nn * self.npoly
         if self.coeff.ndim == 2:
             self.icoeff[:,goodbk] = np.array(a[0,:nfull].T.reshape(self.npoly, nn, order='F'), dtype=a.dtype)
             self.coeff[:,goodbk] = np.array(sol[:nfull].T.reshape(self.npoly, nn, order='F'), dtype=sol.dtype)
@@ -671,7 +688,74 @@ class bspline(datamodel.DataContainer):
             self.icoeff[goodbk] = np.array(a[0,:nfull], dtype=a.dtype)
             self.coeff[goodbk] = np.array(sol[:nfull], dtype=sol.dtype)
 
-        return 0, self.value(xdata, x2=xdata, action=action, upper=upper, lower=lower)[0]
+
+def workit_batch(ssets, xdata, ydata, invvar, action, lower, upper, n_proc=1):
+    """
+    Solve many independent bspline fits at once.
+
+    This is the batched version of :func:`bspline.workit`.  The linear
+    systems for all the fits are constructed and solved by a single call
+    to :func:`~pypeit.bspline.utilc.solve_batch`, which distributes the
+    fits among ``n_proc`` threads.  The results are identical to calling
+    :func:`bspline.workit` for each fit.
+
+    All the bsplines must have the same order and number of polynomials
+    per order.
+
+    Args:
+        ssets (:obj:`list`):
+            The :class:`bspline` objects to fit.  The coefficients of
+            each object are updated.
+        xdata (:obj:`list`):
+            Independent variable for each fit.
+        ydata (:obj:`list`):
+            Dependent variable for each fit.
+        invvar (:obj:`list`):
+            Inverse variance of ``ydata`` for each fit.
+        action (:obj:`list`):
+            Banded correlation matrix for each fit.
+        lower (:obj:`list`):
+            For each fit, a list of pixel positions, each corresponding
+            to the first occurence of position greater than breakpoint
+            indx.
+        upper (:obj:`list`):
+            Same as lower, but denotes the upper pixel positions.
+        n_proc (:obj:`int`, optional):
+            Number of threads to use.
+
+    Returns:
+        :obj:`list`: The result for each fit; see :func:`bspline.workit`.
+    """
+    if len(ssets) == 0:
+        return []
+    nord = ssets[0].nord
+    npoly = ssets[0].npoly
+    if any(s.nord != nord or s.npoly != npoly for s in ssets):
+        raise ValueError('All bsplines in a batch must have the same nord and npoly.')
+
+    result = [None]*len(ssets)
+    nn = np.array([s.mask[nord:].sum() for s in ssets])
+    for i in np.where(nn < nord)[0]:
+        warnings.warn('Fewer good break points than order of b-spline. Returning...')
+        result[i] = (-2, np.zeros(ydata[i].shape, dtype=float))
+
+    fit = np.where(nn >= nord)[0]
+    if fit.size > 0:
+        mininf = [1.0e-10 * invvar[i].sum() / (nn[i] * npoly) for i in fit]
+        solved = solve_batch(nn[fit], npoly, nord, [ydata[i] for i in fit],
+                             [action[i] for i in fit], [invvar[i] for i in fit],
+                             [upper[i] for i in fit], [lower[i] for i in fit], mininf,
+                             n_proc=n_proc)
+        for i, (err, a, sol) in zip(fit, solved):
+            sset = ssets[i]
+            if isinstance(err, int) and err == -1:
+                sset._set_solution(a, sol)
+                err = 0
+            else:
+                err = sset.maskpoints(err)
+            result[i] = (err, sset.value(xdata[i], x2=xdata[i], action=action[i], upper=upper[i],
+                                         lower=lower[i])[0])
+    return result
 
 # TODO: I don't think we need to make this reproducible with the IDL version anymore, and can opt for speed instead.
 # TODO: Move this somewhere for more common access?
@@ -20,7 +20,7 @@ def get_extensions():
                           extra_compile_args=extra_compile_args, language='c',                      
                           export_symbols=['bspline_model', 'solution_arrays',
                                           'cholesky_band', 'cholesky_solve',
-                                          'intrv'])
+                                          'intrv', 'reject_badness', 'solve_batch'])
     
     # extension_helpers will check for opnmp support by trying to build
     # some test code with the appropriate flag. openmp provides a big performance boost, but some
@@ -7,6 +7,7 @@ Support algorithms for bspline.
 #include <stdio.h>
 #include <stdbool.h>
 #include <math.h>
+#include <string.h>
 
 #include "bspline.h"
 
@@ -366,3 +367,192 @@ void cholesky_solve(double *a, int32_t ar, int32_t ac, double *b, int32_t bn) {
     }
 }
 
+
+
+bool is_finite(double x) {
+    /*
+    Check if a value is finite using its bit pattern.
+
+    Because the extension is compiled with -ffast-math, the compiler is
+    allowed to assume that NaN and inf are never encountered, which
+    means that the standard isfinite/isnan calls may be optimized away.
+    Testing the exponent bits directly is immune to this.
+
+    Args:
+        x:
+            Value to test.
+
+    Returns:
+        True if the value is neither NaN nor inf.
+    */
+    uint64_t bits;
+    memcpy(&bits, &x, sizeof(bits));
+    return (bits & 0x7ff0000000000000ULL) != 0x7ff0000000000000ULL;
+}
+
+
+int64_t reject_badness(double *data, double *model, double *invvar, int32_t ninvvar,
+                       bool *inmask, bool *outmask, bool use_lower, double lower, bool use_upper,
+                       double upper, int64_t nd, double *badness) {
+    /*
+    Compute the rejection "badness" of each datum given a model in a
+    single pass.
+
+    The badness is 0 for good points and the number of sigma by which
+    the datum is below (lower) or above (upper) the model for points
+    that should be rejected.  Points that are masked by inmask or
+    outmask are never rejected.
+
+    Args:
+        data:
+            The data.
+        model:
+            The model.
+        invvar:
+            The inverse variance in the data.
+        ninvvar:
+            Number of elements in invvar.  If 1, the single value is
+            used for all data.
+        inmask:
+            Input mask; points with a false value are not rejected.  Can
+            be NULL.
+        outmask:
+            Output mask from a previous iteration; points with a false
+            value are not rejected.  Can be NULL.
+        use_lower:
+            Reject points more than lower sigma below the model.
+        lower:
+            Lower rejection threshold in units of sigma.
+        use_upper:
+            Reject points more than upper sigma above the model.
+        upper:
+            Upper rejection threshold in units of sigma.
+        nd:
+            Number of data points.
+        badness:
+            Replaced on output: the badness of each datum.
+
+    Returns:
+        The number of points with a non-zero badness, or -1 if any of
+        the chi values is not finite.  In the latter case, the badness
+        values are undefined.
+    */
+    int64_t i;
+    int64_t nbad = 0;
+    double chi;
+    double b;
+    for (i = 0; i < nd; ++i) {
+        chi = (data[i] - model[i]) * sqrt(invvar[ninvvar == 1 ? 0 : i]);
+        if (!is_finite(chi))
+            return -1;
+        b = 0.0;
+        if (use_lower && chi < -lower)
+            b += fmax(-chi, 0.0);
+        if (use_upper && chi > upper)
+            b += fmax(chi, 0.0);
+        if ((inmask != NULL && !inmask[i]) || (outmask != NULL && !outmask[i]))
+            b = 0.0;
+        badness[i] = b;
+        if (b != 0.0)
+            nbad += 1;
+    }
+    return nbad;
+}
+
+
+void solve_batch(int32_t nfit, int32_t npoly, int32_t nord, int32_t *nn, int64_t *doff,
+                 double *ydata, double *ivar, double *action, int64_t *koff, int64_t *upper,
+                 int64_t *lower, double *mininf, int64_t *boff, double *alpha, double *beta,
+                 int32_t *err, int32_t nthreads) {
+    /*
+    Construct and solve the linear systems for many independent bspline
+    fits.
+
+    For each fit, this performs the same operations as calling
+    solution_arrays, cholesky_band, and cholesky_solve in sequence.
+    The fits are distributed among nthreads threads, if the extension
+    was compiled with OpenMP support.
+
+    The data for all fits are concatenated, and the offsets of the data
+    for each fit are provided by the offset arrays, each with nfit+1
+    elements.
+
+    Args:
+        nfit:
+            Number of fits.
+        npoly:
+            Polynomial per fit order; must be the same for all fits.
+        nord:
+            Fit order; must be the same for all fits.
+        nn:
+            Number of good break points for each fit.
+        doff:
+            Offsets of the data for each fit in ydata, ivar, and the
+            first axis of action.
+        ydata:
+            Concatenated data to fit.
+        ivar:
+            Concatenated inverse variance in the data to fit.
+        action:
+            Concatenated action matrices.  Each action matrix has shape
+            nd by npoly*nord, where nd is the number of data points in
+            the fit.
+        koff:
+            Offsets of the vectors for each fit in upper and lower.
+        upper:
+            Concatenated vectors with the (inclusive) ending indices
+            along the second axis of action used to construct the model.
+            The indices are relative to the data for each fit.
+        lower:
+            Concatenated vectors with the starting indices along the
+            second axis of action used to construct the model.
+        mininf:
+            For each fit, entries on the diagonal of the solution matrix
+            are considered negative if they are less than this value.
+        boff:
+            Offsets of the solution vector for each fit in beta.  The
+            length of each vector, bn, is nn*npoly + npoly*nord.  The
+            solution matrix for each fit has npoly*nord rows and bn
+            columns, and starts at element boff*npoly*nord of alpha.
+        alpha:
+            Concatenated solution matrices, initialized to 0.  Replaced
+            on output by the Cholesky decomposition of each matrix.
+        beta:
+            Concatenated solution vectors, initialized to 0.  Replaced
+            on output by the solution of each fit.
+        err:
+            Replaced on output by the status of each fit: -1 if the fit
+            was successful, -2 if any diagonal element of the solution
+            matrix is less than mininf or not finite (the matrix is not
+            decomposed), or the index of the column of the matrix that
+            caused the Cholesky decomposition to fail.
+        nthreads:
+            Number of threads to use.
+    */
+    int32_t bw = npoly * nord;
+    int32_t i, j, n, bn;
+    double *a;
+    double *b;
+
+    #pragma omp parallel for private(i,j,n,bn,a,b) num_threads(nthreads) schedule(dynamic)
+    for (i = 0; i < nfit; ++i) {
+        bn = (int32_t) (boff[i+1] - boff[i]);
+        a = alpha + boff[i]*bw;
+        b = beta + boff[i];
+        solution_arrays(nn[i], npoly, nord, (int32_t) (doff[i+1] - doff[i]), ydata + doff[i],
+                        ivar + doff[i], action + doff[i]*bw, upper + koff[i], lower + koff[i], a,
+                        bw, b, bn);
+        n = bn - bw;
+        err[i] = -1;
+        for (j = 0; j < n; ++j)
+            if (!(a[j] > mininf[i]) || !is_finite(a[j])) {
+                err[i] = -2;
+                break;
+            }
+        if (err[i] == -2)
+            continue;
+        err[i] = cholesky_band(a, bw, bn);
+        if (err[i] == -1)
+            cholesky_solve(a, bw, bn, b, bn);
+    }
+}
@@ -16,6 +16,14 @@ void solution_arrays(int32_t nn, int32_t npoly, int32_t nord, int32_t nd, double
                      double *alpha, int32_t ar, double *beta, int32_t bn);
 void cholesky_solve(double *a, int32_t ar, int32_t ac, double *b, int32_t bn);
 int cholesky_band(double *lower, int32_t lr, int32_t lc);
+bool is_finite(double x);
+int64_t reject_badness(double *data, double *model, double *invvar, int32_t ninvvar,
+                       bool *inmask, bool *outmask, bool use_lower, double lower, bool use_upper,
+                       double upper, int64_t nd, double *badness);
+void solve_batch(int32_t nfit, int32_t npoly, int32_t nord, int32_t *nn, int64_t *doff,
+                 double *ydata, double *ivar, double *action, int64_t *koff, int64_t *upper,
+                 int64_t *lower, double *mininf, int64_t *boff, double *alpha, double *beta,
+                 int32_t *err, int32_t nthreads);
 
 #endif // _BSPLINE_H_
 
@@ -11,10 +11,12 @@ import os
 import warnings
 import ctypes
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
+from pypeit.bspline import utilpy
+
 # Mimics astropy convention
 LIBRARY_PATH = os.path.dirname(__file__)
 try:
@@ -256,3 +258,180 @@ def cholesky_solve(a, bb):
     cholesky_solve_c(a, a.shape[0], a.shape[1], b, b.shape[0])
     return -1, b
 #-----------------------------------------------------------------------
+
+
+#-----------------------------------------------------------------------
+reject_badness_c = _bspline.reject_badness
+reject_badness_c.restype = ctypes.c_int64
+reject_badness_c.argtypes = [np.ctypeslib.ndpointer(ctypes.c_double, flags="C_CONTIGUOUS"),
+                             np.ctypeslib.ndpointer(ctypes.c_double, flags="C_CONTIGUOUS"),
+                             np.ctypeslib.ndpointer(ctypes.c_double, flags="C_CONTIGUOUS"),
+                             ctypes.c_int32, ctypes.c_void_p, ctypes.c_void_p,
+                             ctypes.c_bool, ctypes.c_double, ctypes.c_bool, ctypes.c_double,
+                             ctypes.c_int64,
+                             np.ctypeslib.ndpointer(ctypes.c_double, flags="C_CONTIGUOUS")]
+
+def reject_badness(data, model, invvar, lower=None, upper=None, inmask=None, outmask=None):
+    """
+    Compute the rejection "badness" of each datum given a model.
+
+    The calculation of the residuals, their significance, the rejection
+    thresholds, and the masking are all performed in a single pass.  If
+    the inputs are not double-precision or any of the residuals are not
+    finite, this falls back to
+    :func:`pypeit.bspline.utilpy.reject_badness`, which returns
+    identical results.
+
+    This method wraps a C function.
+
+    Args:
+        data (`numpy.ndarray`_):
+            The data.
+        model (`numpy.ndarray`_):
+            The model; must have the same shape as ``data``.
+        invvar (:obj:`float`, `numpy.ndarray`_):
+            Inverse variance in the data, either a single value for all
+            data or an array with the same shape as ``data``.
+        lower (:obj:`float`, optional):
+            If set, reject points with ``data < model - lower*sigma``.
+        upper (:obj:`float`, optional):
+            If set, reject points with ``data > model + upper*sigma``.
+        inmask (`numpy.ndarray`_, optional):
+            Boolean mask; points that are False are never rejected.
+        outmask (`numpy.ndarray`_, optional):
+            Boolean mask; points that are False are never rejected.
+
+    Returns:
+        :obj:`tuple`: The badness of each datum, with the same shape as
+        ``data`` and set to 0 for good points, and the number of points
+        with non-zero badness.
+    """
+    _invvar = np.asarray(invvar)
+    if data.dtype != np.float64 or model.dtype != np.float64 or _invvar.dtype != np.float64 \
+            or _invvar.size not in [1, data.size]:
+        return utilpy.reject_badness(data, model, invvar, lower=lower, upper=upper,
+                                     inmask=inmask, outmask=outmask)
+    _data = np.ascontiguousarray(data)
+    _model = np.ascontiguousarray(model)
+    _invvar = np.ascontiguousarray(_invvar)
+    _inmask = None if inmask is None else np.ascontiguousarray(inmask, dtype=bool)
+    _outmask = None if outmask is None else np.ascontiguousarray(outmask, dtype=bool)
+    badness = np.empty(data.shape, dtype=float)
+    nbad = reject_badness_c(_data, _model, _invvar, _invvar.size,
+                            None if _inmask is None else _inmask.ctypes.data,
+                            None if _outmask is None else _outmask.ctypes.data,
+                            lower is not None, 0. if lower is None else lower,
+                            upper is not None, 0. if upper is None else upper,
+                            data.size, badness)
+    if nbad < 0:
+        # Non-finite residuals; let numpy deal with them
+        return utilpy.reject_badness(data, model, invvar, lower=lower, upper=upper,
+                                     inmask=inmask, outmask=outmask)
+    return badness, int(nbad)
+#-----------------------------------------------------------------------
+
+
+#-----------------------------------------------------------------------
+solve_batch_c = _bspline.solve_batch
+solve_batch_c.restype = None
+solve_batch_c.argtypes = [ctypes.c_int32, ctypes.c_int32, ctypes.c_int32,
+                          np.ctypeslib.ndpointer(ctypes.c_int32, flags="C_CONTIGUOUS"),
+                          np.ctypeslib.ndpointer(ctypes.c_int64, flags="C_CONTIGUOUS"),
+                          np.ctypeslib.ndpointer(ctypes.c_double, flags="C_CONTIGUOUS"),
+                          np.ctypeslib.ndpointer(ctypes.c_double, flags="C_CONTIGUOUS"),
+                          np.ctypeslib.ndpointer(ctypes.c_double, flags="C_CONTIGUOUS"),
+                          np.ctypeslib.ndpointer(ctypes.c_int64, flags="C_CONTIGUOUS"),
+                          np.ctypeslib.ndpointer(ctypes.c_int64, flags="C_CONTIGUOUS"),
+                          np.ctypeslib.ndpointer(ctypes.c_int64, flags="C_CONTIGUOUS"),
+                          np.ctypeslib.ndpointer(ctypes.c_double, flags="C_CONTIGUOUS"),
+                          np.ctypeslib.ndpointer(ctypes.c_int64, flags="C_CONTIGUOUS"),
+                          np.ctypeslib.ndpointer(ctypes.c_double, flags="C_CONTIGUOUS"),
+                          np.ctypeslib.ndpointer(ctypes.c_double, flags="C_CONTIGUOUS"),
+                          np.ctypeslib.ndpointer(ctypes.c_int32, flags="C_CONTIGUOUS"),
+                          ctypes.c_int32]
+
+def solve_batch(nn, npoly, nord, ydata, action, ivar, upper, lower, mininf, n_proc=1):
+    """
+    Construct and solve the linear systems for many independent bspline
+    fits in a single call.
+
+    For each fit, this is equivalent to calling :func:`solution_arrays`,
+    :func:`cholesky_band`, and :func:`cholesky_solve` in sequence.  The
+    data for all fits are concatenated and passed to the C function,
+    which distributes the fits among ``n_proc`` threads (if the extension
+    was compiled with OpenMP support).  The GIL is released during the
+    call.
+
+    This method wraps a C function.
+
+    Args:
+        nn (array-like):
+            Number of good break points for each fit.
+        npoly (:obj:`int`):
+            Polynomial per fit order; must be the same for all fits.
+        nord (:obj:`int`):
+            Fit order; must be the same for all fits.
+        ydata (:obj:`list`):
+            The data to fit for each fit.
+        action (:obj:`list`):
+            The action matrix for each fit.  See
+            :func:`pypeit.bspline.bspline.bspline.action`.  The shape of
+            each array is expected to be ``nd`` by ``npoly*nord``.
+        ivar (:obj:`list`):
+            The inverse variance in the data for each fit.
+        upper (:obj:`list`):
+            For each fit, the vector with the (inclusive) ending indices
+            along the second axis of action used to construct the model.
+        lower (:obj:`list`):
+            For each fit, the vector with the starting indices along the
+            second axis of action used to construct the model.
+        mininf (array-like):
+            For each fit, entries in the solution matrix are considered
+            negative if they are less than this value; see
+            :func:`cholesky_band`.
+        n_proc (:obj:`int`, optional):
+            Number of threads to use.
+
+    Returns:
+        :obj:`list`: A tuple for each fit with (1) the error flag,
+        which is -1 for a successful fit and otherwise follows the
+        convention of :func:`cholesky_band`, (2) the Cholesky
+        decomposition of the solution matrix (None if the fit failed),
+        and (3) the solution vector (None if the fit failed).
+    """
+    nfit = len(ydata)
+    bw = npoly * nord
+    _nn = np.asarray(nn, dtype=np.int32)
+    doff = np.append(0, np.cumsum([y.size for y in ydata])).astype(np.int64)
+    koff = np.append(0, np.cumsum([len(u) for u in upper])).astype(np.int64)
+    boff = np.append(0, np.cumsum(_nn * npoly + bw)).astype(np.int64)
+    # Avoid copying the data if there is only one fit
+    concat = (lambda arr: arr[0]) if nfit == 1 else np.concatenate
+    _ydata = np.ascontiguousarray(concat(ydata), dtype=float)
+    _ivar = np.ascontiguousarray(concat(ivar), dtype=float)
+    # NOTE: Each action matrix must be stored in row-major contiguous format
+    _action = np.ascontiguousarray(concat(action), dtype=float)
+    _upper = np.ascontiguousarray(concat(upper), dtype=np.int64)
+    _lower = np.ascontiguousarray(concat(lower), dtype=np.int64)
+    _mininf = np.asarray(mininf, dtype=float)
+    alpha = np.zeros(boff[-1]*bw, dtype=float)
+    beta = np.zeros(boff[-1], dtype=float)
+    err = np.zeros(nfit, dtype=np.int32)
+
+    solve_batch_c(nfit, npoly, nord, _nn, doff, _ydata, _ivar, _action, koff, _upper, _lower,
+                  _mininf, boff, alpha, beta, err, max(n_proc, 1))
+
+    result = []
+    for i in range(nfit):
+        a = alpha[boff[i]*bw:boff[i+1]*bw].reshape(bw, -1)
+        if err[i] == -2:
+            # Report all the problematic diagonal elements, as in cholesky_band
+            n = a.shape[1] - bw
+            negative = (a[0,:n] <= _mininf[i]) | np.invert(np.isfinite(a[0,:n]))
+            result += [(negative.nonzero()[0], None, None)]
+        elif err[i] != -1:
+            result += [(int(err[i]), None, None)]
+        else:
+            result += [(-1, a, beta[boff[i]:boff[i+1]])]
+    return result
+#-----------------------------------------------------------------------
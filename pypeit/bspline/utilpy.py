@@ -10,7 +10,7 @@ Implements pure python support methods for
 """
 import warnings
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
@@ -248,3 +248,105 @@ def cholesky_solve(a, bb):
         b[j] = (b[j] - np.sum(a[spot,j] * b[j+spot]))/a[0,j]
     return -1, b
 
+
+
+def reject_badness(data, model, invvar, lower=None, upper=None, inmask=None, outmask=None):
+    """
+    Compute the rejection "badness" of each datum given a model.
+
+    The badness is 0 for good points and the number of sigma by which the
+    datum is below (``lower``) or above (``upper``) the model for points that
+    should be rejected.
+
+    This function is pure python.
+
+    Args:
+        data (`numpy.ndarray`_):
+            The data.
+        model (`numpy.ndarray`_):
+            The model; must have the same shape as ``data``.
+        invvar (:obj:`float`, `numpy.ndarray`_):
+            Inverse variance in the data, either a single value for all
+            data or an array with the same shape as ``data``.
+        lower (:obj:`float`, optional):
+            If set, reject points with ``data < model - lower*sigma``.
+        upper (:obj:`float`, optional):
+            If set, reject points with ``data > model + upper*sigma``.
+        inmask (`numpy.ndarray`_, optional):
+            Boolean mask; points that are False are never rejected.
+        outmask (`numpy.ndarray`_, optional):
+            Boolean mask; points that are False are never rejected.
+
+    Returns:
+        :obj:`tuple`: The badness of each datum, with the same shape as
+        ``data`` and set to 0 for good points, and the number of points
+        with non-zero badness.
+    """
+    chi = (data - model) * np.sqrt(invvar)
+    badness = np.zeros(data.shape, dtype=data.dtype)
+    if lower is not None:
+        badness += np.fmax(-chi, 0.0) * (chi < -lower)
+    if upper is not None:
+        badness += np.fmax(chi, 0.0) * (chi > upper)
+    if inmask is not None:
+        badness *= inmask
+    if outmask is not None:
+        badness *= outmask
+    return badness, np.count_nonzero(badness)
+
+
+def solve_batch(nn, npoly, nord, ydata, action, ivar, upper, lower, mininf, n_proc=1):
+    """
+    Construct and solve the linear systems for many independent bspline
+    fits.
+
+    For each fit, this calls :func:`solution_arrays`,
+    :func:`cholesky_band`, and :func:`cholesky_solve` in sequence.
+
+    This function is pure python.
+
+    Args:
+        nn (array-like):
+            Number of good break points for each fit.
+        npoly (:obj:`int`):
+            Polynomial per fit order; must be the same for all fits.
+        nord (:obj:`int`):
+            Fit order; must be the same for all fits.
+        ydata (:obj:`list`):
+            The data to fit for each fit.
+        action (:obj:`list`):
+            The action matrix for each fit.  See
+            :func:`pypeit.bspline.bspline.bspline.action`.  The shape of
+            each array is expected to be ``nd`` by ``npoly*nord``.
+        ivar (:obj:`list`):
+            The inverse variance in the data for each fit.
+        upper (:obj:`list`):
+            For each fit, the vector with the (inclusive) ending indices
+            along the second axis of action used to construct the model.
+        lower (:obj:`list`):
+            For each fit, the vector with the starting indices along the
+            second axis of action used to construct the model.
+        mininf (array-like):
+            For each fit, entries in the solution matrix are considered
+            negative if they are less than this value; see
+            :func:`cholesky_band`.
+        n_proc (:obj:`int`, optional):
+            Ignored; the fits are always performed serially.
+
+    Returns:
+        :obj:`list`: A tuple for each fit with (1) the error flag,
+        which is -1 for a successful fit and otherwise follows the
+        convention of :func:`cholesky_band`, (2) the Cholesky
+        decomposition of the solution matrix (None if the fit failed),
+        and (3) the solution vector (None if the fit failed).
+    """
+    result = []
+    for i in range(len(ydata)):
+        alpha, beta = solution_arrays(nn[i], npoly, nord, ydata[i], action[i], ivar[i],
+                                      upper[i], lower[i])
+        err, a = cholesky_band(alpha, mininf=mininf[i])
+        if not isinstance(err, int) or err != -1:
+            result += [(err, None, None)]
+            continue
+        result += [(-1, a, cholesky_solve(a, beta)[1])]
+    return result
@@ -22,24 +22,36 @@ can run:
     If the hostname URL for the telluric atmospheric grids on S3 changes, the
     only place that needs to change is the file ``pypeit/data/s3_url.txt``.
 
+This module also provides a process-wide cache for products read or derived
+from immutable reference files (e.g., line lists and archived spectra); see
+:func:`cached_product`.
+
 .. include:: ../include/links.rst
 """
+from collections import OrderedDict
+from copy import deepcopy
 from functools import reduce
+import hashlib
 from importlib import resources
+import os
 import pathlib
+import pickle
 import urllib.error
 from urllib.parse import urljoin, urlparse
 from datetime import datetime
 
 import packaging
 
-from IPython import embed
+from pypeit.lazyimport import embed, lazy_import
 
 import numpy as np
 
+import astropy.config.paths
 import astropy.utils.data
-import github
-import requests
+
+# NOTE: github and requests are only needed when accessing remote files
+github = lazy_import('github')
+requests = lazy_import('requests')
 
 # NOTE: pygit2 is only used for testing purposes.  It is not a requirement for a
 # general user.  Hence the try block below.
@@ -512,3 +524,131 @@ def _get_s3_hostname() -> str:
     with open(filepath, "r", encoding="utf-8") as fileobj:
         return fileobj.read().strip()
 
+
+
+# ----------------------------------------------------------------------------
+# In-memory (and optionally on-disk) cache of products read or derived from
+# reference files (line lists, arxiv spectra, archival sky spectra, etc.)
+
+product_cache_size = 256
+"""
+Maximum number of products held in the process-wide product cache; see
+:func:`cached_product`.
+"""
+
+persist_products = True
+"""
+If True, products requested with ``persist=True`` in :func:`cached_product`
+are also written to (and read from) companion files in
+:func:`product_cache_dir`, such that they are quickly available to new
+processes.
+"""
+
+_product_cache = OrderedDict()
+
+
+def product_cache_dir():
+    """
+    Return the directory used for the on-disk companions of cached products.
+
+    The directory is a subdirectory of the PypeIt cache and is created if it
+    does not exist.
+
+    Returns:
+        `Path`_: Directory with the companion files.
+    """
+    path = pathlib.Path(astropy.config.paths.get_cache_dir('pypeit')) / 'products'
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def file_key(path):
+    """
+    Construct the key used to identify a product read or derived from a file.
+
+    The key includes the modification time and size of the file so that any
+    cached product is invalidated when the file changes.
+
+    Args:
+        path (:obj:`str`, `Path`_):
+            Path to the file.
+
+    Returns:
+        :obj:`tuple`: The resolved path, modification time (in ns), and size
+        of the file.
+    """
+    _path = pathlib.Path(path).resolve()
+    stat = _path.stat()
+    return (str(_path), stat.st_mtime_ns, stat.st_size)
+
+
+def clear_product_cache():
+    """
+    Empty the in-memory product cache.  On-disk companions are not removed.
+    """
+    _product_cache.clear()
+
+
+def cached_product(key, func, persist=False):
+    """
+    Return a product read or derived from immutable reference data, computing
+    it only once per process.
+
+    Products are held in a process-wide, in-memory cache of at most
+    :attr:`product_cache_size` items, with the least recently used product
+    removed first.  Products derived from a file should include the output
+    of :func:`file_key` in their ``key`` (e.g., ``file_key(path) +
+    ('line_list',)``), so that they are invalidated when the file changes.  A
+    copy of the cached product is returned, such that alterations made to the
+    returned object do not propagate to the cache.
+
+    Args:
+        key (:obj:`tuple`):
+            Hashable key that uniquely identifies the product.
+        func (callable):
+            Function without arguments that computes the product when it is
+            not cached.
+        persist (:obj:`bool`, optional):
+            Also write the product to (or read it from) a companion file in
+            :func:`product_cache_dir`, if :attr:`persist_products` is True.
+            The product must be serializable (picklable).
+
+    Returns:
+        object: A copy of the product.
+    """
+    if key in _product_cache:
+        _product_cache.move_to_end(key)
+        return deepcopy(_product_cache[key])
+
+    companion = None
+    if persist and persist_products:
+        # Include the version so that companions are rebuilt when the code
+        # that computes them may have changed
+        name = hashlib.sha256(repr(key + (__version__,)).encode()).hexdigest()
+        companion = product_cache_dir() / f'{name}.pkl'
+
+    product = None
+    if companion is not None and companion.is_file():
+        try:
+            with open(companion, 'rb') as f:
+                product = pickle.load(f)
+        except Exception:
+            msgs.warn(f'Could not read cached product {companion}; recomputing it.')
+    if product is None:
+        product = func()
+        if companion is not None:
+            # Write to a temporary file first so that other processes never
+            # read an incomplete file.
+            tmp = companion.with_suffix(f'.{os.getpid()}.tmp')
+            try:
+                with open(tmp, 'wb') as f:
+                    pickle.dump(product, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, companion)
+            except Exception:
+                msgs.warn(f'Could not write cached product {companion}.')
+                tmp.unlink(missing_ok=True)
+
+    _product_cache[key] = product
+    while len(_product_cache) > product_cache_size:
+        _product_cache.popitem(last=False)
+    return deepcopy(product)
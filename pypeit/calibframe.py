@@ -7,7 +7,7 @@ Implements the calibration frame base class.
 """
 from pathlib import Path
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
@@ -522,3 +522,65 @@ class CalibFrame(datamodel.DataContainer):
         # Return the applicable calibrations
         return files[keep].tolist() if any(keep) else None
 
+
+
+class ImageCache:
+    """
+    Mixin for calibration frames that cache the images constructed from their
+    data.
+
+    The images are held by the ``_img_cache`` attribute, which the derived
+    class must include in its :attr:`~pypeit.datamodel.DataContainer.internals`.
+    The cache holds at most :attr:`img_cache_size` images; when it is full,
+    the oldest image is removed.  The cache is emptied whenever the value
+    returned by :func:`cache_checksum` changes, such that cached images are
+    never used after the data used to construct them have changed (including
+    changes made in place).
+    """
+
+    img_cache_size = 2
+    """
+    Maximum number of images kept in memory.
+    """
+
+    def cache_checksum(self):
+        """
+        Compute a checksum of the data used to construct the cached images.
+
+        This must be defined by the derived class.
+        """
+        raise NotImplementedError(f'cache_checksum not defined for {self.__class__.__name__}.')
+
+    def _get_img_cache(self):
+        """
+        Return the cache of images.
+
+        The cache is emptied if the value returned by :func:`cache_checksum`
+        has changed since the images were cached.
+
+        Returns:
+            :obj:`dict`: The cached images.
+        """
+        checksum = self.cache_checksum()
+        if self._img_cache is None or self._img_cache.get('checksum') != checksum:
+            self._img_cache = {'checksum': checksum, 'images': {}}
+        return self._img_cache['images']
+
+    def _cache_img(self, key, img):
+        """
+        Add an image to the cache.
+
+        If the cache is full, the oldest image is removed.
+
+        Args:
+            key (:obj:`tuple`):
+                The parameters used to construct the image.
+            img (`numpy.ndarray`_):
+                The image to cache.
+        """
+        if self.img_cache_size < 1:
+            return
+        images = self._get_img_cache()
+        while len(images) >= self.img_cache_size:
+            images.pop(next(iter(images)))
+        images[key] = img
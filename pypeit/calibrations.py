@@ -9,7 +9,7 @@ from pathlib import Path
 from datetime import datetime
 from copy import deepcopy
 from abc import ABCMeta
-from collections import Counter
+from collections import Counter, OrderedDict
 import yaml
 
 # TODO: datetime.UTC is not defined in python 3.10.  Remove this when we decide
@@ -20,12 +20,14 @@ except AttributeError as e:
     from datetime import timezone
     __UTC__ = timezone.utc
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
 from pypeit import __version__
 from pypeit import msgs
+from pypeit import perf
+from pypeit import utils
 from pypeit import alignframe
 from pypeit import flatfield
 from pypeit import edgetrace
@@ -95,6 +97,10 @@ class Calibrations:
             Path for the QA diagnostics.
         reuse_calibs (:obj:`bool`):
             See instantiation arguments.
+        reuse_files (:obj:`set`):
+            The paths to processed calibration files that are reused even if
+            :attr:`reuse_calibs` is False, because they were just written for
+            this detector (e.g., by :func:`trace_slits`).
         show (:obj:`bool`):
             See instantiation arguments.
         user_slits (:obj:`dict`):
@@ -139,6 +145,94 @@ class Calibrations:
     """
     __metaclass__ = ABCMeta
 
+    calib_cache = None
+    """
+    Process-wide, in-memory cache of processed calibration frames read from
+    disk.  Caching is disabled when this is None (the default).  Long-lived
+    processes (e.g., ``pypeit_ql_watch``) can enable it using
+    :func:`enable_calib_cache`.  The cached objects are keyed by the absolute
+    path of their file, and an object is read again if the modification time
+    or size of its file has changed.  At most :attr:`calib_cache_size`
+    objects are kept, with the least recently used object removed first.  A
+    copy of the cached object is returned by :func:`_read_calib`, such that
+    alterations made to the returned objects do not propagate to the cache.
+    """
+
+    calib_cache_size = 32
+    """
+    Maximum number of processed calibration frames held in
+    :attr:`calib_cache`.
+    """
+
+    @classmethod
+    def enable_calib_cache(cls, enable=True):
+        """
+        Enable (or disable) the in-memory cache of processed calibration
+        frames; see :attr:`calib_cache`.
+
+        Enabling the cache when it is already enabled, or disabling it,
+        empties the cache.
+
+        Args:
+            enable (:obj:`bool`, optional):
+                Flag to enable the cache.
+        """
+        Calibrations.calib_cache = OrderedDict() if enable else None
+
+    def _read_calib(self, calib_class, cal_file):
+        """
+        Read a processed calibration frame.
+
+        If the in-memory cache is enabled (see :attr:`calib_cache`), the frame
+        is only read from disk if it has not been read before or if the file
+        has been modified since it was read.
+
+        Args:
+            calib_class (:obj:`type`):
+                The class of the calibration frame, which must provide a
+                ``from_file`` method.
+            cal_file (`Path`_):
+                The processed calibration file.
+
+        Returns:
+            object: The calibration frame object.
+        """
+        if Calibrations.calib_cache is None:
+            return calib_class.from_file(cal_file, chk_version=self.chk_version)
+        _cal_file = Path(cal_file).absolute()
+        key = str(_cal_file)
+        stat = _cal_file.stat()
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if key in Calibrations.calib_cache and Calibrations.calib_cache[key][0] == stamp:
+            msgs.info(f'Using in-memory copy of {_cal_file.name}')
+            Calibrations.calib_cache.move_to_end(key)
+        else:
+            # Not cached or the file has changed; replace any stale entry
+            Calibrations.calib_cache.pop(key, None)
+            Calibrations.calib_cache[key] \
+                    = (stamp, calib_class.from_file(_cal_file, chk_version=self.chk_version))
+            while len(Calibrations.calib_cache) > Calibrations.calib_cache_size:
+                Calibrations.calib_cache.popitem(last=False)
+        return deepcopy(Calibrations.calib_cache[key][1])
+
+    def _reuse_calib(self, cal_file):
+        """
+        Check if an existing processed calibration file should be reused.
+
+        Files are reused if they exist and either :attr:`reuse_calibs` is True
+        or the file is one of the :attr:`reuse_files` (e.g., files written by
+        :func:`trace_slits` for this detector).
+
+        Args:
+            cal_file (`Path`_):
+                The processed calibration file.
+
+        Returns:
+            :obj:`bool`: Flag that the file should be reused.
+        """
+        return cal_file.exists() \
+                and (self.reuse_calibs or Path(cal_file).absolute() in self.reuse_files)
+
     @staticmethod
     def get_instance(fitstbl, par, spectrograph, caldir, **kwargs):
         """
@@ -170,6 +264,7 @@ class Calibrations:
 
         # Calibrations
         self.reuse_calibs = reuse_calibs
+        self.reuse_files = set()
         self.chk_version = chk_version
         self.calib_dir = Path(caldir).absolute()
         if not self.calib_dir.exists():
@@ -371,8 +466,8 @@ class Calibrations:
 
         # If a processed calibration frame exists and we want to reuse it, do
         # so:
-        if cal_file.exists() and self.reuse_calibs:
-            self.msarc = frame['class'].from_file(cal_file, chk_version=self.chk_version)
+        if self._reuse_calib(cal_file):
+            self.msarc = self._read_calib(frame['class'], cal_file)
             return self.msarc
 
         # Reset the BPM
@@ -417,8 +512,8 @@ class Calibrations:
 
         # If a processed calibration frame exists and we want to reuse it, do
         # so:
-        if cal_file.exists() and self.reuse_calibs:
-            self.mstilt = frame['class'].from_file(cal_file, chk_version=self.chk_version)
+        if self._reuse_calib(cal_file):
+            self.mstilt = self._read_calib(frame['class'], cal_file)
             return self.mstilt
 
         # Reset the BPM
@@ -468,8 +563,8 @@ class Calibrations:
 
         # If a processed calibration frame exists and we want to reuse it, do
         # so:
-        if cal_file.exists() and self.reuse_calibs:
-            self.alignments = frame['class'].from_file(cal_file, chk_version=self.chk_version)
+        if self._reuse_calib(cal_file):
+            self.alignments = self._read_calib(frame['class'], cal_file)
             self.alignments.is_synced(self.slits)
             return self.alignments
 
@@ -522,8 +617,8 @@ class Calibrations:
 
         # If a processed calibration frame exists and we want to reuse it, do
         # so:
-        if cal_file.exists() and self.reuse_calibs:
-            self.msbias = frame['class'].from_file(cal_file, chk_version=self.chk_version)
+        if self._reuse_calib(cal_file):
+            self.msbias = self._read_calib(frame['class'], cal_file)
             return self.msbias
 
         # Perform a check on the files
@@ -564,8 +659,8 @@ class Calibrations:
 
         # If a processed calibration frame exists and we want to reuse it, do
         # so:
-        if cal_file.exists() and self.reuse_calibs:
-            self.msdark = frame['class'].from_file(cal_file, chk_version=self.chk_version)
+        if self._reuse_calib(cal_file):
+            self.msdark = self._read_calib(frame['class'], cal_file)
             return self.msdark
 
         # TODO: If a bias has been constructed and it will be subtracted from
@@ -643,8 +738,8 @@ class Calibrations:
 
         # If a processed calibration frame exists and we want to reuse it, do
         # so:
-        if cal_file.exists() and self.reuse_calibs:
-            self.msscattlight = frame['class'].from_file(cal_file, chk_version=self.chk_version)
+        if self._reuse_calib(cal_file):
+            self.msscattlight = self._read_calib(frame['class'], cal_file)
             return self.msscattlight
 
         # Scattered light model does not exist or we're not reusing it.
@@ -793,9 +888,8 @@ class Calibrations:
         calib_key = illum_calib_key if pixel_calib_key is None else pixel_calib_key
         setup = illum_setup if pixel_setup is None else pixel_setup
         calib_id = illum_calib_id if pixel_calib_id is None else pixel_calib_id
-        if cal_file.exists() and self.reuse_calibs:
-            self.flatimages = flatfield.FlatImages.from_file(cal_file,
-                                                             chk_version=self.chk_version)
+        if self._reuse_calib(cal_file):
+            self.flatimages = self._read_calib(flatfield.FlatImages, cal_file)
             self.flatimages.is_synced(self.slits)
             # Load user defined files
             if self.par['flatfield']['pixelflat_file'] is not None:
@@ -940,6 +1034,10 @@ class Calibrations:
         """
         Load or generate the definition of the slit boundaries.
 
+        If :attr:`slits` has already been set to the slits for the relevant
+        detector and calibration group (e.g., by :func:`trace_slits`), these
+        are used directly.
+
         Returns:
             :class:`~pypeit.slittrace.SlitTraceSet`: Traces of the
             slit edges; also kept internally as :attr:`slits`.
@@ -957,6 +1055,11 @@ class Calibrations:
                 = self.find_calibrations(frame['type'], frame['class'])
         raw_lampoff_files = self.fitstbl.find_frame_files('lampoffflats', calib_ID=self.calib_ID)
 
+        # Use the slits that have already been traced
+        if self.slits is not None and self.slits.calib_key == calib_key:
+            msgs.info(f'Using the slits already traced for {calib_key}.')
+            return self.slits
+
         if len(raw_trace_files) == 0 and cal_file is None:
             msgs.warn(f'No raw {frame["type"]} frames found and unable to identify a relevant '
                       'processed calibration frame.  Continuing...')
@@ -965,8 +1068,8 @@ class Calibrations:
 
         # If a processed calibration frame exists and we want to reuse it, do
         # so:
-        if cal_file.exists() and self.reuse_calibs:
-            self.slits = frame['class'].from_file(cal_file, chk_version=self.chk_version)
+        if self._reuse_calib(cal_file):
+            self.slits = self._read_calib(frame['class'], cal_file)
             self.slits.mask = self.slits.mask_init.copy()
             if self.user_slits is not None:
                 self.slits.user_mask(detname, self.user_slits)
@@ -1087,9 +1190,9 @@ class Calibrations:
 
         # If a processed calibration frame exists and 
         # we want to reuse it, do so (or just load it):
-        if cal_file.exists() and self.reuse_calibs: 
+        if self._reuse_calib(cal_file):
             # Load the file
-            self.wv_calib = wavecalib.WaveCalib.from_file(cal_file, chk_version=self.chk_version)
+            self.wv_calib = self._read_calib(wavecalib.WaveCalib, cal_file)
             self.wv_calib.chk_synced(self.slits)
             self.slits.mask_wvcalib(self.wv_calib)
             if self.par['wavelengths']['method'] == 'echelle':
@@ -1166,8 +1269,8 @@ class Calibrations:
 
         # If a processed calibration frame exists and we want to reuse it, do
         # so:
-        if cal_file.exists() and self.reuse_calibs:
-            self.wavetilts = wavetilts.WaveTilts.from_file(cal_file, chk_version=self.chk_version)
+        if self._reuse_calib(cal_file):
+            self.wavetilts = self._read_calib(wavetilts.WaveTilts, cal_file)
             self.wavetilts.is_synced(self.slits)
             self.slits.mask_wavetilts(self.wavetilts)
             return self.wavetilts
@@ -1195,8 +1298,10 @@ class Calibrations:
         Run full the full recipe of calibration steps.
         """
         self.success = True
+        detname = None if self.det is None else self.spectrograph.get_det_name(self.det)
         for step in self.steps:
-            getattr(self, f'get_{step}')()
+            with perf.step(f'get_{step}', det=detname, calib_group=self.calib_ID):
+                getattr(self, f'get_{step}')()
             if not self.success:
                 self.failed_step = f'get_{step}'
                 return
@@ -1516,6 +1621,96 @@ class IFUCalibrations(Calibrations):
                 'scattlight', 'flats']
 
 
+def trace_slits(fitstbl, par, spectrograph, caldir, frame, detectors, n_proc=1, **kwargs):
+    """
+    Trace the slit edges of multiple detectors, optionally in parallel.
+
+    The slit edges of each detector (or mosaic) are traced independently, so
+    they can be traced by separate processes; see
+    :func:`~pypeit.utils.parallel_map`.  For each detector, the calibration
+    steps up to and including the slit tracing are executed as they would be
+    by :func:`Calibrations.run_the_steps`, including writing the processed
+    calibration files as soon as each detector is finished.  The returned
+    slits and processed calibration files can be assigned to the
+    :attr:`Calibrations.slits` and :attr:`Calibrations.reuse_files`
+    attributes of the object used to perform the full set of calibrations for
+    each detector, such that the slits are not traced again and the
+    calibrations needed to trace them (e.g., the bias) are read instead of
+    reprocessed; see :func:`Calibrations.get_slits`.
+    Detectors with slits that can be read from an existing processed
+    calibration file are skipped.
+
+    Args:
+        fitstbl (:class:`~pypeit.metadata.PypeItMetaData`):
+            The class holding the metadata for all the frames in this PypeIt
+            run.
+        par (:class:`~pypeit.par.pypeitpar.CalibrationsPar`):
+            Parameters used by the calibration procedures.
+        spectrograph (:class:`~pypeit.spectrographs.spectrograph.Spectrograph`):
+            Spectrograph object
+        caldir (:obj:`str`, `Path`_):
+            Path for the processed calibration files.
+        frame (:obj:`int`):
+            The row index in ``fitstbl`` with the frame to calibrate; see
+            :func:`Calibrations.set_config`.
+        detectors (:obj:`list`):
+            The detectors or mosaics to process.
+        n_proc (:obj:`int`, optional):
+            Number of processes used to trace the detectors.
+        **kwargs:
+            Passed directly to :func:`Calibrations.get_instance`.
+
+    Returns:
+        :obj:`dict`: For each traced detector, a tuple with the
+        :class:`~pypeit.slittrace.SlitTraceSet` and the :obj:`list` of paths
+        to the processed calibration files written (or read) while tracing
+        them.  The slits are None for detectors where the calibrations failed.
+    """
+    if kwargs.get('reuse_calibs', False):
+        # Skip the detectors with existing slits
+        caliBrate = Calibrations.get_instance(fitstbl, par, spectrograph, caldir, **kwargs)
+        _detectors = []
+        for det in detectors:
+            caliBrate.set_config(frame, det, par)
+            cal_file = caliBrate.find_calibrations('trace', slittrace.SlitTraceSet)[1]
+            if cal_file is None or not cal_file.exists():
+                _detectors.append(det)
+        detectors = _detectors
+    if len(detectors) == 0:
+        return {}
+
+    shared = dict(fitstbl=fitstbl, par=par, spectrograph=spectrograph, caldir=caldir,
+                  frame=frame, **kwargs)
+    n_proc = min(n_proc, len(detectors))
+    msgs.info(f'Tracing the slits of {len(detectors)} detector(s) using {n_proc} process(es).')
+    slits = {}
+    for det, traced in zip(detectors, utils.parallel_map(_trace_slits_one, detectors,
+                                                         n_proc=n_proc, shared=shared)):
+        if traced[0] is None:
+            msgs.warn(f'Slit tracing for detector {det} was unsuccessful!')
+        slits[det] = traced
+    return slits
+
+
+def _trace_slits_one(det, fitstbl=None, par=None, spectrograph=None, caldir=None, frame=None,
+                     **kwargs):
+    """
+    Perform the calibration steps up to and including the slit tracing for one
+    detector; see :func:`trace_slits`.
+    """
+    caliBrate = Calibrations.get_instance(fitstbl, par, spectrograph, caldir, **kwargs)
+    caliBrate.set_config(frame, det, par)
+    caliBrate.steps = caliBrate.steps[:caliBrate.steps.index('slits')+1]
+    caliBrate.run_the_steps()
+    # Collect the processed calibration files so that they are not processed
+    # again
+    calib_files = [Path(calib.get_path()).absolute()
+                   for calib in [caliBrate.msbias, caliBrate.msdark, caliBrate.msarc,
+                                 caliBrate.mstilt]
+                   if calib is not None and Path(calib.get_path()).exists()]
+    return (caliBrate.slits if caliBrate.success else None), calib_files
+
+
 def check_for_calibs(par, fitstbl, raise_error=True, cut_cfg=None):
     """
     Perform a somewhat quick and dirty check to see if the user
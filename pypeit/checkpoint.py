@@ -0,0 +1,189 @@
+"""
+Module for saving and restoring the intermediate products of a reduction.
+
+Checkpoints allow an interrupted reduction to be restarted without repeating
+the stages that were already completed.  Each checkpoint is a pickled
+dictionary with the products of a stage, written to a file whose name includes
+a key constructed from everything that determines those products (the raw
+frames, the processed calibrations, the parameters, etc.).  A checkpoint is
+therefore only restored if none of these have changed; see
+:func:`checkpoint_key`.
+
+.. include common links, assuming primary doc root is up one directory
+.. include:: ../include/links.rst
+"""
+import hashlib
+import os
+from pathlib import Path
+import pickle
+
+from pypeit.lazyimport import embed
+
+import numpy as np
+
+from pypeit import __version__
+from pypeit import msgs
+from pypeit.cache import file_key
+
+
+def checkpoint_key(*items):
+    """
+    Construct the key that identifies a checkpoint.
+
+    Args:
+        *items:
+            Objects that determine the products saved in the checkpoint.  Their
+            representation (``repr``) must be deterministic and must change
+            whenever the products would change.  Files should be included
+            using :func:`~pypeit.cache.file_key` so that the key changes when
+            the file changes.  The PypeIt version is always included.
+
+    Returns:
+        :obj:`str`: The hexadecimal key.
+    """
+    return hashlib.sha256(repr(items + (__version__,)).encode()).hexdigest()[:20]
+
+
+def files_key(files):
+    """
+    Construct the part of a checkpoint key for a set of files.
+
+    Args:
+        files (:obj:`list`):
+            The files.  Files that do not exist are included by name only.
+
+    Returns:
+        :obj:`tuple`: The keys for each file; see
+        :func:`~pypeit.cache.file_key`.
+    """
+    return tuple(file_key(f) if Path(f).is_file() else (str(f),) for f in files)
+
+
+def data_key(data):
+    """
+    Construct the part of a checkpoint key for a set of data.
+
+    Use this instead of :func:`files_key` for products that are read from a
+    file that can be rewritten with identical content; e.g., the trace of a
+    standard star read from a spec1d file that is written each time the
+    standard is reduced.
+
+    Args:
+        data (`numpy.ndarray`_, `astropy.table.Table`_):
+            The data.  Can be None.
+
+    Returns:
+        :obj:`str`: The hexadecimal SHA-256 hash of the data, including the
+        column names, shapes and data types, or None if ``data`` is None.
+    """
+    if data is None:
+        return None
+    arrays = [(None, data)] if isinstance(data, np.ndarray) \
+                else [(name, np.asarray(data[name])) for name in data.colnames]
+    sha = hashlib.sha256()
+    for name, arr in arrays:
+        sha.update(repr((name, arr.shape, arr.dtype.str)).encode())
+        sha.update(np.ascontiguousarray(arr).tobytes())
+    return sha.hexdigest()
+
+
+def checkpoint_file(path, stage, name, key):
+    """
+    Construct the name of a checkpoint file.
+
+    Args:
+        path (:obj:`str`, `Path`_):
+            Directory with the checkpoints.
+        stage (:obj:`str`):
+            Name of the stage; e.g., ``'objfind'``.
+        name (:obj:`str`):
+            A human-readable identifier for the checkpoint; e.g., the exposure
+            and detector names.
+        key (:obj:`str`):
+            The key of the checkpoint; see :func:`checkpoint_key`.
+
+    Returns:
+        `Path`_: The checkpoint file.
+    """
+    return Path(path) / f'{stage}_{name}_{key}.pkl'
+
+
+def write_checkpoint(ofile, **products):
+    """
+    Write a checkpoint.
+
+    The file is first written to a temporary file that is then renamed, such
+    that an interrupted write never leaves an incomplete checkpoint.  Any
+    other checkpoints for the same stage and name (i.e., with a different
+    key) are removed.
+
+    Args:
+        ofile (:obj:`str`, `Path`_):
+            The checkpoint file; see :func:`checkpoint_file`.
+        **products:
+            The products to save.  These must be picklable.
+    """
+    _ofile = Path(ofile)
+    _ofile.parent.mkdir(parents=True, exist_ok=True)
+    tmp = _ofile.with_suffix(f'.{os.getpid()}.tmp')
+    try:
+        with open(tmp, 'wb') as f:
+            pickle.dump(products, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, _ofile)
+    except Exception as e:
+        msgs.warn(f'Could not write checkpoint {_ofile}: {e}')
+        tmp.unlink(missing_ok=True)
+        return
+    # Remove outdated checkpoints
+    root = _ofile.name[:_ofile.name.rfind('_')+1]
+    for f in _ofile.parent.glob(f'{root}*.pkl'):
+        if f != _ofile and len(f.name) == len(_ofile.name):
+            f.unlink(missing_ok=True)
+    msgs.info(f'Wrote checkpoint {_ofile.name}')
+
+
+def read_checkpoint(ifile):
+    """
+    Read a checkpoint.
+
+    Args:
+        ifile (:obj:`str`, `Path`_):
+            The checkpoint file; see :func:`checkpoint_file`.
+
+    Returns:
+        :obj:`dict`: The products saved in the checkpoint, or None if the file
+        does not exist or cannot be read.
+    """
+    _ifile = Path(ifile)
+    if not _ifile.is_file():
+        return None
+    try:
+        with open(_ifile, 'rb') as f:
+            products = pickle.load(f)
+    except Exception as e:
+        msgs.warn(f'Could not read checkpoint {_ifile}: {e}  Ignoring it.')
+        return None
+    msgs.info(f'Restored checkpoint {_ifile.name}')
+    return products
+
+
+def remove_checkpoints(path, name):
+    """
+    Remove all the checkpoints with the provided name.
+
+    Args:
+        path (:obj:`str`, `Path`_):
+            Directory with the checkpoints.
+        name (:obj:`str`):
+            The identifier used in the checkpoint file names; see
+            :func:`checkpoint_file`.  All checkpoints with names that start
+            with this identifier followed by an underscore (e.g., all the
+            detectors of an exposure) are removed.
+    """
+    _path = Path(path)
+    if not _path.is_dir():
+        return
+    for f in _path.glob(f'*_{name}_*.pkl'):
+        f.unlink(missing_ok=True)
+    if not any(_path.iterdir()):
+        _path.rmdir()
@@ -7,7 +7,7 @@ Coadding module.
 """
 import inspect
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
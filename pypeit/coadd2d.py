@@ -7,8 +7,9 @@ Module for performing two-dimensional coaddition of spectra.
 from pathlib import Path
 import os
 import copy
+from collections import OrderedDict
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 from scipy import ndimage
@@ -32,6 +33,222 @@ from pypeit import spec2dobj
 from pypeit.core.moment import moment1d
 from pypeit.manual_extract import ManualExtractionObj
 
+
+class Spec2DImageStack:
+    """
+    Provide access to the images in a set of spec2d outputs that are being
+    coadded.
+
+    Instead of holding the full images of every exposure in memory, images are
+    read on demand, typically limited to the columns that cover the slit
+    currently being coadded (see :func:`slit_cutouts`).  Images are read from
+    memory-mapped spec2d files, such that only the requested pixels are loaded
+    into memory.  At most ``max_resident`` files are held open at any one time;
+    when this limit is reached, the least recently used file is closed.  All
+    files are closed by :func:`close`, or when the object is used as a context
+    manager; closed files are reopened if more images are read.
+
+    Args:
+        spec2d (:obj:`list`):
+            List of spec2d files or a list of
+            :class:`~pypeit.spec2dobj.Spec2DObj` objects.  If the latter, the
+            images are taken from the objects.
+        detname (:obj:`str`):
+            The string identifier for the detector or mosaic to read.
+        slits_list (:obj:`list`):
+            The :class:`~pypeit.slittrace.SlitTraceSet` objects for each
+            exposure.
+        spat_flexure_list (:obj:`list`):
+            The spatial flexure of each exposure.
+        exp_scale (:obj:`list`, optional):
+            Scale factor for each exposure, used to rescale the science image,
+            sky model, and inverse variance to a common exposure time.  An
+            element of None means the exposure is not scaled.  If None, no
+            exposures are scaled.
+        max_resident (:obj:`int`, optional):
+            Maximum number of spec2d files to keep open.  If None, files are
+            never closed.
+    """
+
+    image_keys = dict(sciimg='sciimg', sciivar='ivarmodel', skymodel='skymodel',
+                      mask='bpmmask', waveimg='waveimg')
+    """
+    The datamodel element of :class:`~pypeit.spec2dobj.Spec2DObj` providing
+    each image.
+    """
+
+    def __init__(self, spec2d, detname, slits_list, spat_flexure_list, exp_scale=None,
+                 max_resident=None):
+        self.spec2d = spec2d
+        self.detname = detname
+        self.slits_list = slits_list
+        self.spat_flexure_list = spat_flexure_list
+        self.exp_scale = [None]*len(spec2d) if exp_scale is None else exp_scale
+        self.max_resident = max_resident
+        self._hdul = OrderedDict()
+
+    def __len__(self):
+        return len(self.spec2d)
+
+    def _open(self, iexp):
+        """
+        Return the (memory-mapped) HDUList of a spec2d file.
+
+        Args:
+            iexp (:obj:`int`):
+                Exposure index.
+
+        Returns:
+            `astropy.io.fits.HDUList`_: The open file.
+        """
+        if iexp in self._hdul:
+            self._hdul.move_to_end(iexp)
+            return self._hdul[iexp]
+        if self.max_resident is not None:
+            while len(self._hdul) >= self.max_resident:
+                self._hdul.popitem(last=False)[1].close()
+        self._hdul[iexp] = io.fits_open(self.spec2d[iexp], memmap=True)
+        return self._hdul[iexp]
+
+    def close(self):
+        """
+        Close all open files.
+        """
+        while len(self._hdul) > 0:
+            self._hdul.popitem()[1].close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def image(self, iexp, key, spat=None):
+        """
+        Read an image.
+
+        Args:
+            iexp (:obj:`int`):
+                Exposure index.
+            key (:obj:`str`):
+                The image to read.  Must be one of the keys in
+                :attr:`image_keys`.
+            spat (:obj:`slice`, optional):
+                The range of columns to read.  If None, the full image is read.
+
+        Returns:
+            `numpy.ndarray`_: The requested image, rescaled by the exposure
+            scale factor, if relevant.  Unless the image is rescaled, images
+            taken from :class:`~pypeit.spec2dobj.Spec2DObj` objects are views
+            of the object arrays and should not be altered.
+        """
+        _spat = slice(None) if spat is None else spat
+        dmkey = self.image_keys[key]
+        scale = self.exp_scale[iexp]
+        if isinstance(self.spec2d[iexp], spec2dobj.Spec2DObj):
+            img = self.spec2d[iexp][dmkey]
+            img = (img.mask if key == 'mask' else img)[:,_spat]
+            if scale is not None:
+                img = img.copy()
+        else:
+            data = self._open(iexp)[spec2dobj.Spec2DObj.image_hdu_name(self.detname, dmkey)].data
+            # NOTE: This also forces native byte ordering
+            img = data[:,_spat].astype(data.dtype.type)
+
+        if scale is not None and key in ['sciimg', 'skymodel']:
+            img *= scale
+        elif scale is not None and key == 'sciivar':
+            img /= scale**2
+        return img
+
+    def slit_window(self, iexp, spat_id, spat_toler):
+        """
+        Find the pixels of a slit in one exposure.
+
+        Args:
+            iexp (:obj:`int`):
+                Exposure index.
+            spat_id (:obj:`int`):
+                Spatial ID of the slit.
+            spat_toler (:obj:`int`):
+                Tolerance used to match the slit IDs in different exposures.
+
+        Returns:
+            :obj:`tuple`: The range of columns that includes all the pixels of
+            the slit and the boolean image selecting the slit pixels within
+            those columns.  The latter is identical to selecting the slit in
+            the full slit image and cutting out the same columns.
+        """
+        slits = self.slits_list[iexp]
+        flexure = self.spat_flexure_list[iexp]
+        # Same selection as slits.slit_img
+        gpm = np.logical_not(slits.bitmask.flagged(slits.mask))
+        slitidx = np.where(gpm & (np.abs(slits.spat_id - spat_id) <= spat_toler))[0]
+        if slitidx.size == 0:
+            spat = slice(0, 0)
+        else:
+            bboxes = slits.slit_bboxes(slitidx=slitidx, flexure=flexure)
+            spat = slice(min([bbox[1].start for bbox in bboxes]),
+                         max([bbox[1].stop for bbox in bboxes]))
+        slitmask = slits.slit_img(flexure=flexure, bbox=np.s_[:,spat])
+        return spat, np.abs(slitmask - spat_id) <= spat_toler
+
+    def slit_cutouts(self, spat_id, spat_toler):
+        """
+        Read the images covering one slit in all exposures.
+
+        Args:
+            spat_id (:obj:`int`):
+                Spatial ID of the slit.
+            spat_toler (:obj:`int`):
+                Tolerance used to match the slit IDs in different exposures.
+
+        Returns:
+            :obj:`dict`: Dictionary with the lists of the image cutouts of
+            every exposure (``sciimg_stack``, ``sciivar_stack``,
+            ``skymodel_stack``, ``mask_stack``, and ``waveimg_stack``), the
+            slit selection within each cutout (``thismask_stack``), and the
+            first column of each cutout (``spat_start``).  If the slit is not
+            found in one or more exposures, None is returned.
+        """
+        windows = [self.slit_window(iexp, spat_id, spat_toler) for iexp in range(len(self))]
+        if not np.all([np.any(thismask) for _, thismask in windows]):
+            return None
+        cutouts = dict(spat_start=[spat.start for spat, _ in windows],
+                       thismask_stack=[thismask for _, thismask in windows])
+        for key in self.image_keys.keys():
+            cutouts[f'{key}_stack'] = [self.image(iexp, key, spat=spat)
+                                       for iexp, (spat, _) in enumerate(windows)]
+        return cutouts
+
+
+def _coadd_slit(item, wave_grid=None, spat_samp_fact=1.0, interp_dspat=True):
+    """
+    Coadd a single slit; see :func:`CoAdd2D.coadd`.
+
+    Args:
+        item (:obj:`dict`):
+            The keyword arguments for :func:`~pypeit.core.coadd.compute_coadd2d`
+            specific to this slit; see :func:`CoAdd2D.slit_coadd_inputs`.
+        wave_grid (`numpy.ndarray`_):
+            Wavelength grid onto which the images are rectified.
+        spat_samp_fact (:obj:`float`, optional):
+            Spatial sampling factor.
+        interp_dspat (:obj:`bool`, optional):
+            Interpolate the spatial coordinate image.
+
+    Returns:
+        :obj:`dict`: The coadd of the slit returned by
+        :func:`~pypeit.core.coadd.compute_coadd2d`.
+    """
+    return coadd.compute_coadd2d(item['ref_trace_stack'], item['sciimg_stack'],
+                                 item['sciivar_stack'], item['skymodel_stack'],
+                                 item['inmask_stack'], item['thismask_stack'],
+                                 item['waveimg_stack'], wave_grid, spat_samp_fact=spat_samp_fact,
+                                 maskdef_dict=item['maskdef_dict'], weights=item['weights'],
+                                 interp_dspat=interp_dspat, spat_start=item['spat_start'])
+
+
 #TODO We should decide which parameters go in through the parset 
 # and which parameters are passed in to the method as arguments
 class CoAdd2D:
@@ -564,7 +781,9 @@ class CoAdd2D:
         Construct a 2d co-add of a stack of PypeIt spec2d reduction outputs.
         This method calls loops over slits/orders and performs the 2d-coadd by
         calling coadd.compute.coadd2d, which 'rectifies' images by coadding them
-        about the reference_trace_stack.
+        about the reference_trace_stack.  The slits are coadded in parallel
+        if ``n_proc`` in :class:`~pypeit.par.pypeitpar.Coadd2DPar` is larger
+        than 1.
 
         Parameters
         ----------
@@ -581,16 +800,46 @@ class CoAdd2D:
 
         """
 
-        coadd_list = []
+        n_proc = min(self.par['coadd2d']['n_proc'], self.nslits_coadded)
+        if n_proc > 1:
+            msgs.info(f'Performing 2D coadd of {self.nslits_coadded} slits using {n_proc} processes.')
+        # The images of each slit are read in the calling process and the
+        # slits are coadded by the workers.  Only a few slits are read ahead of
+        # the coadds being completed.
+        # The spec2d files are closed once all the slits have been read
+        with self.stack_dict['images']:
+            coadd_list = list(utils.parallel_map(_coadd_slit, self.slit_coadd_inputs(),
+                                                 n_proc=n_proc,
+                                                 shared=dict(wave_grid=self.wave_grid,
+                                                             spat_samp_fact=self.spat_samp_fact,
+                                                             interp_dspat=interp_dspat)))
+
+        if len(coadd_list) == 0:
+            msgs.error("All the slits were missing in one or more exposures. 2D coadd cannot be performed")
+
+        return coadd_list
+
+    def slit_coadd_inputs(self):
+        """
+        Generator that collects the data needed to coadd each slit.
+
+        Slits that are not found in every exposure are skipped.
+
+        Yields:
+            :obj:`dict`: The keyword arguments for
+            :func:`~pypeit.core.coadd.compute_coadd2d` specific to each slit
+            (i.e., excluding the wavelength grid, spatial sampling factor, and
+            ``interp_dspat``).
+        """
         for slit_idx in self.good_slits:
             msgs.info(f'Performing 2D coadd for slit {self.spat_ids[slit_idx]} ({slit_idx + 1}/{self.nslits_single})')
 
-            # mask identifying the current slit in each exposure
-            thismask_stack = [np.abs(slitmask - self.spat_ids[slit_idx]) <= self.par['coadd2d']['spat_toler']
-                              for slitmask in self.stack_dict['slitmask_stack']]
+            # Read the images of the current slit in each exposure
+            cutouts = self.stack_dict['images'].slit_cutouts(self.spat_ids[slit_idx],
+                                                             self.par['coadd2d']['spat_toler'])
 
             # check if the slit is found in every exposure
-            if not np.all([np.any(thismask) for thismask in thismask_stack]):
+            if cutouts is None:
                 msgs.warn(f'Slit {self.spat_ids[slit_idx]} was not found in every exposures. '
                           f'2D coadd cannot be performed on this slit. Try increasing the parameter spat_toler')
                 continue
@@ -607,25 +856,15 @@ class CoAdd2D:
             _weights = self.use_weights[slit_idx] if self.pypeline == 'Echelle' and self.weights == 'auto' else self.use_weights
             # TODO: Create a method here in the child clases? It is not great to do pypeline specific things in the parent
 
-            # Perform the 2d coadd
             # NOTE: mask_stack is a gpm, and this is called inmask_stack in
             # compute_coadd2d, and outmask in coadd_dict is also a gpm
-            mask_stack = [mask == 0 for mask in self.stack_dict['mask_stack']]
-            coadd_dict = coadd.compute_coadd2d(ref_trace_stack, self.stack_dict['sciimg_stack'],
-                                               self.stack_dict['sciivar_stack'],
-                                               self.stack_dict['skymodel_stack'],
-                                               mask_stack,
-                                               thismask_stack,
-                                               self.stack_dict['waveimg_stack'],
-                                               self.wave_grid, self.spat_samp_fact,
-                                               maskdef_dict=maskdef_dict,
-                                               weights=_weights, interp_dspat=interp_dspat)
-            coadd_list.append(coadd_dict)
-
-        if len(coadd_list) == 0:
-            msgs.error("All the slits were missing in one or more exposures. 2D coadd cannot be performed")
-
-        return coadd_list
+            yield dict(ref_trace_stack=ref_trace_stack, sciimg_stack=cutouts['sciimg_stack'],
+                       sciivar_stack=cutouts['sciivar_stack'],
+                       skymodel_stack=cutouts['skymodel_stack'],
+                       inmask_stack=[mask == 0 for mask in cutouts['mask_stack']],
+                       thismask_stack=cutouts['thismask_stack'],
+                       waveimg_stack=cutouts['waveimg_stack'], maskdef_dict=maskdef_dict,
+                       weights=_weights, spat_start=cutouts['spat_start'])
 
     def create_pseudo_image(self, coadd_list):
         """
@@ -950,9 +1189,11 @@ class CoAdd2D:
             box_radius = 3.
             #indx = 0
             # Loop on the exposures
-            for iexp, (waveimg, slitmask, slits) in enumerate(zip(self.stack_dict['waveimg_stack'],
-                                                self.stack_dict['slitmask_stack'],
-                                                self.stack_dict['slits_list'])):
+            for iexp, (slits, flexure) in enumerate(zip(self.stack_dict['slits_list'],
+                                                        self.stack_dict['spat_flexure_list'])):
+                # Only one full image is read at a time
+                waveimg = self.stack_dict['images'].image(iexp, 'waveimg')
+                slitmask = slits.slit_img(flexure=flexure)
                 slits_left, slits_righ, _ = slits.select_edges()
                 row = np.arange(slits_left.shape[0])
                 # Loop on the slits
@@ -989,6 +1230,11 @@ class CoAdd2D:
         """
         Routine to read in required images for 2d coadds given a list of spec2d files.
 
+        Only the slits, detectors, and other metadata are read here.  The
+        images are accessed on demand using the
+        :class:`Spec2DImageStack` object provided by the ``images`` key of
+        the returned dictionary.
+
         Args:
             spec2d_files: list
                List of spec2d filenames
@@ -1004,13 +1250,6 @@ class CoAdd2D:
         # Grab the files
         #head2d_list = []
 
-        # Image stacks
-        sciimg_stack = []
-        waveimg_stack = []
-        skymodel_stack = []
-        sciivar_stack = []
-        mask_stack = []
-        slitmask_stack = []
         exptime_stack = []
         #tilts_stack = []
         # Object stacks
@@ -1026,45 +1265,37 @@ class CoAdd2D:
                 s2dobj = f
             else:
                 # If spec2d is a list of files, option to also use spec1ds
-                s2dobj = spec2dobj.Spec2DObj.from_file(f, self.detname, chk_version=chk_version)
+                s2dobj = spec2dobj.Spec2DObj.from_file(f, self.detname, chk_version=chk_version,
+                                                       load_images=False)
                 spec1d_file = f.replace('spec2d', 'spec1d')
                 if os.path.isfile(spec1d_file):
-                    sobjs = specobjs.SpecObjs.from_fitsfile(spec1d_file, chk_version=chk_version)
-                    this_det = sobjs.DET == self.detname
-                    specobjs_list.append(sobjs[this_det])
+                    specobjs_list.append(specobjs.SpecObjs.from_fitsfile(
+                                            spec1d_file, det=self.detname, chk_version=chk_version))
             # TODO the code should run without a spec1d file, but we need to implement that
             slits_list.append(s2dobj.slits)
             detectors_list.append(s2dobj.detector)
             maskdef_designtab_list.append(s2dobj.maskdef_designtab)
             spat_flexure_list.append(s2dobj.sci_spat_flexure)
 
-            sciimg_stack.append(s2dobj.sciimg)
             exptime_stack.append(s2dobj.head0['EXPTIME'])
-            waveimg_stack.append(s2dobj.waveimg)
-            skymodel_stack.append(s2dobj.skymodel)
-            sciivar_stack.append(s2dobj.ivarmodel)
-            mask_stack.append(s2dobj.bpmmask.mask)
-            slitmask_stack.append(s2dobj.slits.slit_img(flexure=s2dobj.sci_spat_flexure))
 
         # check if exptime is consistent for all images
         exptime_coadd = np.percentile(exptime_stack, 50., method='higher')
         isclose_exptime = np.isclose(exptime_stack, exptime_coadd, atol=1.)
+        exp_scale = [None]*nfiles
         if not np.all(isclose_exptime):
             msgs.warn('Exposure time is not consistent (within 1 sec) for all frames being coadded! '
                       f'Scaling each image by the median exposure time ({exptime_coadd} s) before coadding.')
-            exp_scale = exptime_coadd / exptime_stack
-            for iexp in range(nfiles):
-                if not isclose_exptime[iexp]:
-                    sciimg_stack[iexp] *= exp_scale[iexp]
-                    skymodel_stack[iexp] *= exp_scale[iexp]
-                    sciivar_stack[iexp] /= exp_scale[iexp]**2
+            exp_scale = [None if isclose else scale for isclose, scale
+                            in zip(isclose_exptime, exptime_coadd / np.asarray(exptime_stack))]
+
+        # The images are read when needed
+        images = Spec2DImageStack(spec2d, self.detname, slits_list, spat_flexure_list,
+                                  exp_scale=exp_scale,
+                                  max_resident=self.par['coadd2d']['max_resident'])
 
         return dict(specobjs_list=specobjs_list, slits_list=slits_list,
-                    slitmask_stack=slitmask_stack,
-                    sciimg_stack=sciimg_stack,
-                    sciivar_stack=sciivar_stack,
-                    skymodel_stack=skymodel_stack, mask_stack=mask_stack,
-                    waveimg_stack=waveimg_stack,
+                    images=images,
                     exptime_stack=exptime_stack,
                     exptime_coadd=exptime_coadd,
                     redux_path=redux_path,
@@ -1381,7 +1612,12 @@ class MultiSlitCoAdd2D(CoAdd2D):
                 offsets_method = 'brightest object found on slit: {:d} with avg SNR={:5.2f}'.format(self.spatid_bri,np.mean(self.snr_bar_bri))
 
             msgs.info(f'Determining offsets using {offsets_method}')
-            thismask_stack = [np.abs(slitmask - self.spatid_bri) <= self.par['coadd2d']['spat_toler'] for slitmask in self.stack_dict['slitmask_stack']]
+            cutouts = self.stack_dict['images'].slit_cutouts(self.spatid_bri,
+                                                             self.par['coadd2d']['spat_toler'])
+            if cutouts is None:
+                msgs.error(f'Slit {self.spatid_bri} used to determine the offsets was not found in '
+                           'every exposure.  Try increasing the parameter spat_toler')
+            thismask_stack = cutouts['thismask_stack']
 
             # TODO Need to think abbout whether we have multiple tslits_dict for each exposure or a single one
             trace_stack_bri = [slits.center[:, self.slitidx_bri]
@@ -1393,16 +1629,17 @@ class MultiSlitCoAdd2D(CoAdd2D):
 
             ## TODO: Should the spatial and spectral samp_facts here match those of the final coadded data, or she would
             ## compute offsets at full resolution??
-            wave_bins = coadd.get_wave_bins(thismask_stack, self.stack_dict['waveimg_stack'], self.wave_grid)
-            dspat_bins, dspat_stack = coadd.get_spat_bins(thismask_stack, trace_stack_bri)
+            wave_bins = coadd.get_wave_bins(thismask_stack, cutouts['waveimg_stack'], self.wave_grid)
+            dspat_bins, dspat_stack = coadd.get_spat_bins(thismask_stack, trace_stack_bri,
+                                                          spat_start=cutouts['spat_start'])
 
-            sci_list = [[sciimg - skymodel for sciimg, skymodel in zip(self.stack_dict['sciimg_stack'], self.stack_dict['skymodel_stack'])]]
-            var_list = [[utils.inverse(sciivar) for sciivar in self.stack_dict['sciivar_stack']]]
+            sci_list = [[sciimg - skymodel for sciimg, skymodel in zip(cutouts['sciimg_stack'], cutouts['skymodel_stack'])]]
+            var_list = [[utils.inverse(sciivar) for sciivar in cutouts['sciivar_stack']]]
 
             msgs.info('Rebinning Images')
-            mask_stack = [mask == 0 for mask in self.stack_dict['mask_stack']]
+            mask_stack = [mask == 0 for mask in cutouts['mask_stack']]
             sci_list_rebin, var_list_rebin, norm_rebin_stack, nsmp_rebin_stack = coadd.rebin2d(
-                wave_bins, dspat_bins, self.stack_dict['waveimg_stack'], dspat_stack, thismask_stack, mask_stack, sci_list, var_list)
+                wave_bins, dspat_bins, cutouts['waveimg_stack'], dspat_stack, thismask_stack, mask_stack, sci_list, var_list)
             thismask = np.ones_like(sci_list_rebin[0][0,:,:],dtype=bool)
             nspec_pseudo, nspat_pseudo = thismask.shape
             slit_left = np.full(nspec_pseudo, 0.0)
@@ -20,7 +20,7 @@ from pypeit.core.flexure import calculate_image_phase
 from pypeit.core import datacube, extract, flux_calib, parse
 from pypeit.spectrographs.util import load_spectrograph
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 
 class DataCube(datamodel.DataContainer):
@@ -19,7 +19,7 @@ from astropy import stats
 from pypeit import msgs
 from pypeit import utils
 from pypeit.core import fitting
-from IPython import embed
+from pypeit.lazyimport import embed
 
 
 def fit2darc(all_wv,all_pix,all_orders,nspec, nspec_coeff=4,norder_coeff=4,sigrej=3.0, func2d='legendre2d', debug=False):
@@ -7,7 +7,7 @@ Module implements a set of basis functions for fitting.
 .. include:: ../include/links.rst
 
 """
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 from scipy import special
@@ -6,12 +6,13 @@ Coadding module.
 
 """
 
+import itertools
 import os
 import sys
 import copy
 import string
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 import scipy
@@ -2162,7 +2163,7 @@ def combspec(waves, fluxes, ivars, gpms, sn_smooth_npix,
     #debug=True
     #show=True
 
-    #from IPython import embed
+    #from pypeit.lazyimport import embed
     #embed()
     # We cast to float64 because of a bug in np.histogram
     _waves = [np.float64(wave) for wave in waves]
@@ -2937,7 +2938,7 @@ def get_wave_bins(thismask_stack, waveimg_stack, wave_grid):
     return wave_grid[ind_lower:ind_upper + 1]
 
 
-def get_spat_bins(thismask_stack, trace_stack, spat_samp_fact=1.0):
+def get_spat_bins(thismask_stack, trace_stack, spat_samp_fact=1.0, spat_start=None):
     """
     Determine the spatial bins for a 2d coadd and relative pixel coordinate
     images. This routine loops over all the images being coadded and creates an
@@ -2973,6 +2974,11 @@ def get_spat_bins(thismask_stack, trace_stack, spat_samp_fact=1.0):
         Spatial sampling for 2d coadd spatial bins in pixels. A value > 1.0
         (i.e. bigger pixels) will downsample the images spatially, whereas < 1.0
         will oversample. Default = 1.0
+    spat_start : list, optional
+        If the images are cutouts of the full images, this provides the
+        spatial pixel (column) in the full image of the first column of each
+        cutout.  The reference traces are always relative to the full image.
+        If None, the images are assumed to be the full images.
 
     Returns
     -------
@@ -2989,9 +2995,11 @@ def get_spat_bins(thismask_stack, trace_stack, spat_samp_fact=1.0):
     dspat_stack = []
     spat_min = np.inf
     spat_max = -np.inf
-    for thismask, trace in zip(thismask_stack, trace_stack):
+    _spat_start = [0]*nimgs if spat_start is None else spat_start
+    for thismask, trace, spat0 in zip(thismask_stack, trace_stack, _spat_start):
         nspec, nspat = thismask.shape
-        dspat_iexp = (np.arange(nspat)[np.newaxis, :] - trace[:, np.newaxis]) / spat_samp_fact
+        dspat_iexp = (np.arange(spat0, spat0+nspat)[np.newaxis, :] - trace[:, np.newaxis]) \
+                        / spat_samp_fact
         dspat_stack.append(dspat_iexp)
         spat_min = min(spat_min, np.amin(dspat_iexp[thismask]))
         spat_max = max(spat_max, np.amax(dspat_iexp[thismask]))
@@ -3010,7 +3018,7 @@ def get_spat_bins(thismask_stack, trace_stack, spat_samp_fact=1.0):
 def compute_coadd2d(ref_trace_stack, sciimg_stack, sciivar_stack, skymodel_stack,
                     inmask_stack, thismask_stack, waveimg_stack,
                     wave_grid, spat_samp_fact=1.0, maskdef_dict=None,
-                    weights=None, interp_dspat=True):
+                    weights=None, interp_dspat=True, spat_start=None):
     """
     Construct a 2d co-add of a stack of PypeIt spec2d reduction outputs.
 
@@ -3084,6 +3092,12 @@ def compute_coadd2d(ref_trace_stack, sciimg_stack, sciivar_stack, skymodel_stack
         interp_dspat (bool, optional):
            Interpolate in the spatial coordinate image to faciliate running
            through core.extract.local_skysub_extract. This can be slow.   Default=True.
+        spat_start (list, optional):
+            If the images are cutouts around the slit in question, this
+            provides the column in the full image of the first column of each
+            cutout; the reference traces are always relative to the full
+            images.  If None, the images are the full images.  See
+            :func:`get_spat_bins`.
 
 
 
@@ -3139,7 +3153,8 @@ def compute_coadd2d(ref_trace_stack, sciimg_stack, sciivar_stack, skymodel_stack
 
     # Determine the wavelength grid that we will use for the current slit/order
     wave_bins = get_wave_bins(thismask_stack, waveimg_stack, wave_grid)
-    dspat_bins, dspat_stack = get_spat_bins(thismask_stack, ref_trace_stack, spat_samp_fact=spat_samp_fact)
+    dspat_bins, dspat_stack = get_spat_bins(thismask_stack, ref_trace_stack,
+                                            spat_samp_fact=spat_samp_fact, spat_start=spat_start)
 
     skysub_stack = [sciimg - skymodel for sciimg, skymodel in zip(sciimg_stack, skymodel_stack)]
     #sci_list = [weights_stack, sciimg_stack, skysub_stack, tilts_stack,
@@ -3234,12 +3249,95 @@ def compute_coadd2d(ref_trace_stack, sciimg_stack, sciivar_stack, skymodel_stack
 
 
 
+def rebin2d_index(spec_bins, spat_bins, spec_pos, spat_pos):
+    """
+    Compute the flattened index of the nearest-grid-point bin for a set of
+    samples.
+
+    The bin edges follow the convention of `numpy.histogram2d`_: all bins are
+    half-open, ``[lo, hi)``, except the last bin in each dimension, which also
+    includes its upper edge.  Samples outside the grid (or with NaN positions)
+    are assigned an index of -1.
+
+    Args:
+        spec_bins (`numpy.ndarray`_):
+            Monotonically increasing spectral bin edges, shape
+            ``(nspec_rebin+1,)``.
+        spat_bins (`numpy.ndarray`_):
+            Monotonically increasing spatial bin edges, shape
+            ``(nspat_rebin+1,)``.
+        spec_pos (`numpy.ndarray`_):
+            Spectral coordinate of each sample.
+        spat_pos (`numpy.ndarray`_):
+            Spatial coordinate of each sample; must have the same shape as
+            ``spec_pos``.
+
+    Returns:
+        `numpy.ndarray`_: Integer array with the same shape as ``spec_pos``
+        providing the index of each sample in the flattened ``(nspec_rebin,
+        nspat_rebin)`` grid, or -1 for samples that fall off the grid.
+    """
+    nspec_rebin = spec_bins.size - 1
+    nspat_rebin = spat_bins.size - 1
+    ispec = np.searchsorted(spec_bins, spec_pos, side='right') - 1
+    ispat = np.searchsorted(spat_bins, spat_pos, side='right') - 1
+    # Include the upper edge in the last bin
+    ispec[spec_pos == spec_bins[-1]] = nspec_rebin - 1
+    ispat[spat_pos == spat_bins[-1]] = nspat_rebin - 1
+    indx = ispec*nspat_rebin + ispat
+    indx[(ispec < 0) | (ispec >= nspec_rebin) | (ispat < 0) | (ispat >= nspat_rebin)] = -1
+    return indx
+
+
+def _rebin2d_exposures(spec_bins, spat_bins, waveimg_stack, spatimg_stack, thismask_stack,
+                       inmask_stack, sci_list, var_list):
+    """
+    Generator that rebins one image at a time onto the output grid.
+
+    See :func:`rebin2d` for the description of the arguments.  The image
+    stacks and the nested lists of images in ``sci_list`` and ``var_list`` are
+    only iterated over, such that only one image is needed at a time.
+
+    Yields:
+        :obj:`tuple`: For each image, the lists of *summed* (i.e., not
+        normalized) science and variance images, the number of good pixels
+        landing in each bin, and the number of on-slit pixels landing in each
+        bin, all with shape ``(nspec_rebin, nspat_rebin)``.
+    """
+    shape = (spec_bins.size - 1, spat_bins.size - 1)
+    nbin = shape[0]*shape[1]
+    # Iterate over the images, not the image types
+    sci_iter = zip(*sci_list) if len(sci_list) > 0 else itertools.repeat(())
+    var_iter = zip(*var_list) if len(var_list) > 0 else itertools.repeat(())
+    for waveimg, spatimg, thismask, inmask, sci, var \
+            in zip(waveimg_stack, spatimg_stack, thismask_stack, inmask_stack, sci_iter, var_iter):
+        # Compute the output bin of each on-slit pixel only once
+        pix = np.flatnonzero(thismask)
+        indx = rebin2d_index(spec_bins, spat_bins, np.take(waveimg, pix), np.take(spatimg, pix))
+        ongrid = indx > -1
+        # This first image is purely for bookkeeping purposes to determine the
+        # number of times each pixel could have been sampled
+        nsmp = np.bincount(indx[ongrid], minlength=nbin).reshape(shape)
+
+        gpm = ongrid & np.take(inmask, pix)
+        pix = pix[gpm]
+        indx = indx[gpm]
+        norm = np.bincount(indx, minlength=nbin).reshape(shape)
+        sci_sum = [np.bincount(indx, weights=np.take(img, pix), minlength=nbin).reshape(shape)
+                   for img in sci]
+        var_sum = [np.bincount(indx, weights=np.take(img, pix), minlength=nbin).reshape(shape)
+                   for img in var]
+        yield sci_sum, var_sum, norm, nsmp
+
+
 def rebin2d(spec_bins, spat_bins, waveimg_stack, spatimg_stack,
             thismask_stack, inmask_stack, sci_list, var_list):
     """
     Rebin a set of images and propagate variance onto a new spectral and spatial grid. This routine effectively
-    "recitifies" images using np.histogram2d which is extremely fast and effectively performs
-    nearest grid point interpolation.
+    "recitifies" images using nearest grid point interpolation.  The output bin of each
+    pixel is computed once per image (see :func:`rebin2d_index`) and all of the science and
+    variance images are then accumulated with `numpy.bincount`_; the result is identical to
+    calling `numpy.histogram2d`_ for every image, but much faster.
 
     Parameters
     ----------
@@ -3298,49 +3396,23 @@ def rebin2d(spec_bins, spat_bins, waveimg_stack, spatimg_stack,
 
     # allocate the output mages
     nimgs = len(sci_list[0])
-    nspec_rebin = spec_bins.size - 1
-    nspat_rebin = spat_bins.size - 1
-    shape_out = (nimgs, nspec_rebin, nspat_rebin)
-    nsmp_rebin_stack = np.zeros(shape_out)
-    norm_rebin_stack = np.zeros(shape_out)
-    sci_list_out = []
-    for ii in range(len(sci_list)):
-        sci_list_out.append(np.zeros(shape_out))
-    var_list_out = []
-    for jj in range(len(var_list)):
-        var_list_out.append(np.zeros(shape_out))
-
-    for img, (waveimg, spatimg, thismask, inmask) in enumerate(zip(waveimg_stack, spatimg_stack, thismask_stack, inmask_stack)):
-
-        spec_rebin_this = waveimg[thismask]
-        spat_rebin_this = spatimg[thismask]
-
-        # This first image is purely for bookkeeping purposes to determine the number of times each pixel
-        # could have been sampled
-        nsmp_rebin_stack[img, :, :], spec_edges, spat_edges = np.histogram2d(spec_rebin_this, spat_rebin_this,
-                                                               bins=[spec_bins, spat_bins], density=False)
-
-        finmask = thismask & inmask
-        spec_rebin = waveimg[finmask]
-        spat_rebin = spatimg[finmask]
-        norm_img, spec_edges, spat_edges = np.histogram2d(spec_rebin, spat_rebin,
-                                                          bins=[spec_bins, spat_bins], density=False)
-        norm_rebin_stack[img, :, :] = norm_img
-
-        # Rebin the science images
-        for indx, sci in enumerate(sci_list):
-            weigh_sci, spec_edges, spat_edges = np.histogram2d(spec_rebin, spat_rebin,
-                                                               bins=[spec_bins, spat_bins], density=False,
-                                                               weights=sci[img][finmask])
-            sci_list_out[indx][img, :, :] = (norm_img > 0.0) * weigh_sci/(norm_img + (norm_img == 0.0))
-
-        # Rebin the variance images, note the norm_img**2 factor for correct error propagation
-        for indx, var in enumerate(var_list):
-            weigh_var, spec_edges, spat_edges = np.histogram2d(spec_rebin, spat_rebin,
-                                                               bins=[spec_bins, spat_bins], density=False,
-                                                               weights=var[img][finmask])
-            var_list_out[indx][img, :, :] = (norm_img > 0.0)*weigh_var/(norm_img + (norm_img == 0.0))**2
-
-    return sci_list_out, var_list_out, norm_rebin_stack.astype(int), nsmp_rebin_stack.astype(int)
-
-
+    shape_out = (nimgs, spec_bins.size - 1, spat_bins.size - 1)
+    nsmp_rebin_stack = np.zeros(shape_out, dtype=int)
+    norm_rebin_stack = np.zeros(shape_out, dtype=int)
+    sci_list_out = [np.zeros(shape_out) for _ in sci_list]
+    var_list_out = [np.zeros(shape_out) for _ in var_list]
+
+    for img, (sci_sum, var_sum, norm_img, nsmp_img) \
+            in enumerate(_rebin2d_exposures(spec_bins, spat_bins, waveimg_stack, spatimg_stack,
+                                            thismask_stack, inmask_stack, sci_list, var_list)):
+        nsmp_rebin_stack[img] = nsmp_img
+        norm_rebin_stack[img] = norm_img
+        # Normalize the science images
+        for indx, weigh_sci in enumerate(sci_sum):
+            sci_list_out[indx][img] = (norm_img > 0) * weigh_sci/(norm_img + (norm_img == 0))
+        # Normalize the variance images, note the norm_img**2 factor for correct
+        # error propagation
+        for indx, weigh_var in enumerate(var_sum):
+            var_list_out[indx][img] = (norm_img > 0)*weigh_var/(norm_img + (norm_img == 0))**2
+
+    return sci_list_out, var_list_out, norm_rebin_stack, nsmp_rebin_stack
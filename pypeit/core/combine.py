@@ -9,7 +9,7 @@ from astropy import stats
 from pypeit import msgs
 from pypeit import utils
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 
 # TODO make weights optional and do uniform weighting without.
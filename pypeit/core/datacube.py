@@ -20,7 +20,7 @@ from pypeit.core import coadd, extract, flux_calib
 # Use a fast histogram for speed!
 from fast_histogram import histogramdd
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 
 def gaussian2D(tup, intflux, xo, yo, sigma_x, sigma_y, theta, offset):
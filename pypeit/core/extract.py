@@ -12,7 +12,7 @@ import scipy.interpolate
 import scipy.ndimage
 import scipy.special
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 from pypeit import msgs
 from pypeit import utils
@@ -25,7 +25,7 @@ from pypeit.core.moment import moment1d
 
 def extract_optimal(imgminsky, ivar, mask, waveimg, skyimg, thismask, oprof,
                     spec, min_frac_use=0.05, fwhmimg=None, flatimg=None,
-                    base_var=None, count_scale=None, noise_floor=None):
+                    base_var=None, count_scale=None, noise_floor=None, spat_start=0):
 
     r"""
     Perform optimal extraction `(Horne 1986)
@@ -76,8 +76,10 @@ def extract_optimal(imgminsky, ivar, mask, waveimg, skyimg, thismask, oprof,
         Must have the same shape as ``sciimg``, :math:`(N_{\rm spec}, N_{\rm spat})`.
     oprof : `numpy.ndarray`_
          Floating-point image containing the profile of the object that is
-         going to be extracted. Must have the same shape as ``sciimg``,
-         :math:`(N_{\rm spec}, N_{\rm spat})`.
+         going to be extracted. Must have the same number of spectral pixels
+         as ``sciimg``, :math:`N_{\rm spec}`.  The profile can be provided
+         for only a subset of the spatial pixels (columns) in the image; see
+         ``spat_start``.
     spec : :class:`~pypeit.specobj.SpecObj`
         Container that holds object, trace, and extraction
         information for the object in question. **This object is altered in place!**
@@ -114,6 +116,11 @@ def extract_optimal(imgminsky, ivar, mask, waveimg, skyimg, thismask, oprof,
         ensuring that the S/N is never greater than ``1/noise_floor``; see
         :func:`~pypeit.core.procimg.variance_model`.  If None, no noise floor is
         added.
+    spat_start : :obj:`int`, optional
+        The spatial pixel (column) in the image that corresponds to the first
+        column of ``oprof``.  I.e., ``oprof`` provides the object profile for
+        the image columns ``spat_start:spat_start+oprof.shape[1]`` and is
+        assumed to be zero elsewhere.
     """
     # Setup
     # imgminsky = sciimg - skyimg
@@ -123,11 +130,6 @@ def extract_optimal(imgminsky, ivar, mask, waveimg, skyimg, thismask, oprof,
     spec_vec = np.arange(nspec)
     spat_vec = np.arange(nspat)
 
-    # TODO This makes no sense for difference imaging? Not sure we need NIVAR anyway
-    var_no = None if base_var is None \
-                else procimg.variance_model(base_var, counts=skyimg, count_scale=count_scale,
-                                            noise_floor=noise_floor)
-
     ispec, ispat = np.where(oprof > 0.0)
 
     # Exit gracefully if we have no positive object profiles, since that means something was wrong with object fitting
@@ -135,20 +137,28 @@ def extract_optimal(imgminsky, ivar, mask, waveimg, skyimg, thismask, oprof,
         msgs.warn('Object profile is zero everywhere. This aperture is junk.')
         return
 
-    mincol = np.min(ispat)
-    maxcol = np.max(ispat) + 1
+    mincol = np.min(ispat) + spat_start
+    maxcol = np.max(ispat) + 1 + spat_start
     nsub = maxcol - mincol
 
     mask_sub = mask[:,mincol:maxcol]
     thismask_sub = thismask[:, mincol:maxcol]
     wave_sub = waveimg[:,mincol:maxcol]
     ivar_sub = np.fmax(ivar[:,mincol:maxcol],0.0) # enforce positivity since these are used as weights
-    vno_sub = None if var_no is None else np.fmax(var_no[:,mincol:maxcol],0.0)
 
     base_sub = None if base_var is None else base_var[:,mincol:maxcol]
     img_sub = imgminsky[:,mincol:maxcol]
     sky_sub = skyimg[:,mincol:maxcol]
-    oprof_sub = oprof[:,mincol:maxcol]
+    oprof_sub = oprof[:,mincol-spat_start:maxcol-spat_start]
+
+    # TODO This makes no sense for difference imaging? Not sure we need NIVAR anyway
+    # NOTE: Only the variance of the extracted columns is needed
+    vno_sub = None if base_var is None \
+                else np.fmax(procimg.variance_model(base_sub, counts=sky_sub,
+                                                    count_scale=count_scale[:,mincol:maxcol]
+                                                        if isinstance(count_scale, np.ndarray)
+                                                        else count_scale,
+                                                    noise_floor=noise_floor), 0.0)
     if fwhmimg is not None:
         fwhmimg_sub = fwhmimg[:,mincol:maxcol]
     if flatimg is not None:
@@ -323,6 +333,66 @@ def extract_asym_boxcar(sciimg, left_trace, righ_trace, gpm=None, ivar=None):
         return flux_out, gpm_box, box_npix, ivar_out
 
 
+def aperture_columns(trace, radius, nspat):
+    """
+    Determine the range of image columns used by a boxcar extraction.
+
+    The range includes all columns used by
+    :func:`~pypeit.core.moment.moment1d` to compute the boxcar sum within
+    ``radius`` pixels of the provided trace, including the zero-weight pixels
+    at either end of its integration window.  Boxcar extractions performed
+    using only these columns (after offsetting the trace by the first column)
+    are therefore identical to those performed using the full image.
+
+    Args:
+        trace (`numpy.ndarray`_):
+            Spatial position of the aperture center along the spectral
+            direction.
+        radius (:obj:`float`):
+            Radius of the boxcar aperture in pixels.
+        nspat (:obj:`int`):
+            Number of spatial pixels in the image.
+
+    Returns:
+        :obj:`tuple`: The first and last (exclusive) column of the image used
+        by the extraction.  If the trace is not finite everywhere, the full
+        range of columns is returned.
+    """
+    if not np.all(np.isfinite(trace)):
+        return 0, nspat
+    spat_s = int(np.clip(np.floor(np.amin(trace) - radius + 0.5) - 2, 0, nspat-1))
+    spat_e = int(np.clip(np.floor(np.amax(trace) + radius + 0.5) + 4, spat_s+1, nspat))
+    return spat_s, spat_e
+
+
+def aperture_mask(gpm, trace, radius):
+    """
+    Select the good pixels within a fixed distance of a trace.
+
+    The calculation is limited to the image columns near the trace; see
+    :func:`aperture_columns`.
+
+    Args:
+        gpm (`numpy.ndarray`_):
+            Boolean good-pixel mask with shape :math:`(N_{\rm spec}, N_{\rm
+            spat})`.
+        trace (`numpy.ndarray`_):
+            Spatial position of the trace along the spectral direction.
+        radius (:obj:`float`):
+            Maximum distance in pixels from the trace.
+
+    Returns:
+        `numpy.ndarray`_: Boolean image that is True for pixels that are good
+        in ``gpm`` and within ``radius`` pixels of the trace.
+    """
+    spat_s, spat_e = aperture_columns(trace, radius, gpm.shape[1])
+    spat = np.arange(spat_s, spat_e)[None,:]
+    mask = np.zeros(gpm.shape, dtype=bool)
+    mask[:,spat_s:spat_e] = gpm[:,spat_s:spat_e] & (spat >= trace[:,None] - radius) \
+                                & (spat <= trace[:,None] + radius)
+    return mask
+
+
 def extract_boxcar(imgminsky, ivar, mask, waveimg, skyimg, spec, fwhmimg=None, flatimg=None, base_var=None,
                    count_scale=None, noise_floor=None):
     r"""
@@ -412,45 +482,55 @@ def extract_boxcar(imgminsky, ivar, mask, waveimg, skyimg, spec, fwhmimg=None, f
     # get boxcar_radius
     box_radius = spec.BOX_RADIUS
 
+    # Only the image columns that overlap the boxcar aperture are used, so
+    # limit all the calculations below to those columns.
+    spat_s, spat_e = aperture_columns(spec.TRACE_SPAT, box_radius, nspat)
+    trace = spec.TRACE_SPAT - spat_s
+    imgminsky, ivar, mask, waveimg, skyimg, fwhmimg, flatimg, base_var \
+            = [None if img is None else img[:,spat_s:spat_e]
+                for img in [imgminsky, ivar, mask, waveimg, skyimg, fwhmimg, flatimg, base_var]]
+    if isinstance(count_scale, np.ndarray):
+        count_scale = count_scale[:,spat_s:spat_e]
+
     # TODO This makes no sense for difference imaging? Not sure we need NIVAR anyway
     var_no = None if base_var is None \
                 else procimg.variance_model(base_var, counts=skyimg, count_scale=count_scale,
                                             noise_floor=noise_floor)
 
     # Fill in the boxcar extraction tags
-    flux_box = moment1d(imgminsky*mask, spec.TRACE_SPAT, 2*box_radius, row=spec.trace_spec)[0]
+    flux_box = moment1d(imgminsky*mask, trace, 2*box_radius, row=spec.trace_spec)[0]
     # Denom is computed in case the trace goes off the edge of the image
-    box_denom = moment1d(waveimg*mask > 0.0, spec.TRACE_SPAT, 2*box_radius,
+    box_denom = moment1d(waveimg*mask > 0.0, trace, 2*box_radius,
                          row=spec.trace_spec)[0]
-    wave_box = moment1d(waveimg*mask, spec.TRACE_SPAT, 2*box_radius,
+    wave_box = moment1d(waveimg*mask, trace, 2*box_radius,
                         row=spec.trace_spec)[0] / (box_denom + (box_denom == 0.0))
     fwhm_box = None
     if fwhmimg is not None:
-        fwhm_box = moment1d(fwhmimg*mask, spec.TRACE_SPAT, 2*box_radius, row=spec.trace_spec)[0]
+        fwhm_box = moment1d(fwhmimg*mask, trace, 2*box_radius, row=spec.trace_spec)[0]
     blaze_box = None
     if flatimg is not None:
-        blaze_box = moment1d(flatimg*mask, spec.TRACE_SPAT, 2*box_radius, row=spec.trace_spec)[0]
+        blaze_box = moment1d(flatimg*mask, trace, 2*box_radius, row=spec.trace_spec)[0]
     varimg = 1.0/(ivar + (ivar == 0.0))
-    var_box = moment1d(varimg*mask, spec.TRACE_SPAT, 2*box_radius, row=spec.trace_spec)[0]
+    var_box = moment1d(varimg*mask, trace, 2*box_radius, row=spec.trace_spec)[0]
     nvar_box = None if var_no is None \
-                else moment1d(var_no*mask, spec.TRACE_SPAT, 2*box_radius, row=spec.trace_spec)[0]
-    sky_box = moment1d(skyimg*mask, spec.TRACE_SPAT, 2*box_radius, row=spec.trace_spec)[0]
+                else moment1d(var_no*mask, trace, 2*box_radius, row=spec.trace_spec)[0]
+    sky_box = moment1d(skyimg*mask, trace, 2*box_radius, row=spec.trace_spec)[0]
     if base_var is None:
         base_box = None
     else:
-        _base_box = moment1d(base_var*mask, spec.TRACE_SPAT, 2*box_radius, row=spec.trace_spec)[0]
+        _base_box = moment1d(base_var*mask, trace, 2*box_radius, row=spec.trace_spec)[0]
         base_posind = (_base_box > 0.0)
         base_box = np.zeros(_base_box.shape, dtype=float)
         base_box[base_posind] = np.sqrt(_base_box[base_posind])
-    pixtot = moment1d(ivar*0 + 1.0, spec.TRACE_SPAT, 2*box_radius, row=spec.trace_spec)[0]
-    pixmsk = moment1d(ivar*mask == 0.0, spec.TRACE_SPAT, 2*box_radius, row=spec.trace_spec)[0]
+    pixtot = moment1d(ivar*0 + 1.0, trace, 2*box_radius, row=spec.trace_spec)[0]
+    pixmsk = moment1d(ivar*mask == 0.0, trace, 2*box_radius, row=spec.trace_spec)[0]
     # If every pixel is masked then mask the boxcar extraction
     mask_box = (pixmsk != pixtot) & np.isfinite(wave_box) & (wave_box > 0.0)
     bad_box = (wave_box <= 0.0) | np.invert(np.isfinite(wave_box)) | (box_denom == 0.0)
     # interpolate bad wavelengths over masked pixels
     if bad_box.any():
-        box_denom_no_mask = moment1d(waveimg > 0.0, spec.TRACE_SPAT, 2 * box_radius, row=spec.trace_spec)[0]
-        wave_no_mask = moment1d(waveimg, spec.TRACE_SPAT, 2 * box_radius, row=spec.trace_spec)[0] / (box_denom_no_mask + (box_denom_no_mask == 0.0))
+        box_denom_no_mask = moment1d(waveimg > 0.0, trace, 2 * box_radius, row=spec.trace_spec)[0]
+        wave_no_mask = moment1d(waveimg, trace, 2 * box_radius, row=spec.trace_spec)[0] / (box_denom_no_mask + (box_denom_no_mask == 0.0))
         wave_box[bad_box] = wave_no_mask[bad_box]
         #f_wave = scipy.interpolate.RectBivariateSpline(spec_vec, spat_vec, waveimg)
         #wave_box[bad_box] = f_wave(spec.trace_spec[bad_box], spec.TRACE_SPAT[bad_box], grid=False)
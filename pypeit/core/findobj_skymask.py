@@ -27,7 +27,7 @@ from pypeit.display import display
 from pypeit.core import pixels
 from pypeit.core import extract
 from pypeit.utils import fast_running_median
-from IPython import embed
+from pypeit.lazyimport import embed
 
 
 def create_skymask(sobjs, thismask, slit_left, slit_righ, box_rad_pix=None, trim_edg=(5,5),
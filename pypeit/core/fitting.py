@@ -11,6 +11,7 @@ import inspect
 from matplotlib import pyplot as plt
 
 
+from scipy import linalg
 from scipy.optimize import curve_fit
 
 from pypeit.core import pydl
@@ -18,7 +19,7 @@ from pypeit import bspline
 from pypeit import msgs
 from pypeit.datamodel import DataContainer
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 
 class PypeItFit(DataContainer):
@@ -302,6 +303,47 @@ def evaluate_fit(fitc, func, x, x2=None, minx=None,
                    "Please choose from 'polynomial', 'legendre', 'chebyshev', 'polynomial2d', 'legendre2d', 'chebyshev2d'")
 
 
+def evaluate_fit_grid(fitc, func, x, x2, minx=None, maxx=None, minx2=None, maxx2=None):
+    """
+    Return a 2D fit evaluated on the grid of x and x2 locations.
+
+    This is equivalent to evaluating the fit using :func:`evaluate_fit` with
+    the coordinates of all the grid points (e.g., as constructed by
+    `numpy.meshgrid`_), but it is much faster for large grids because the
+    polynomials are evaluated separately along each axis.
+
+    Args:
+        fitc (`numpy.ndarray`_):
+            Fit coefficients
+        func (str):
+            Name of the 2D functional form; must be 'polynomial2d',
+            'legendre2d', or 'chebyshev2d'.
+        x (`numpy.ndarray`_):
+            1D array with the x locations of the grid
+        x2 (`numpy.ndarray`_):
+            1D array with the x2 locations of the grid
+        minx (float, optional):
+            Minimum x value for the fit used to normalise the x values
+        maxx (float, optional):
+            Maximum x value for the fit used to normalise the x values
+        minx2 (float, optional):
+            Minimum x value for the fit used to normalise the x2 values
+        maxx2 (float, optional):
+            Maximum x value for the fit used to normalise the x2 values
+
+    Returns:
+        `numpy.ndarray`_: Evaluated fit with shape ``(x.size, x2.size)``.
+    """
+    if func == 'polynomial2d':
+        return np.polynomial.polynomial.polygrid2d(x, x2, fitc)
+    if func not in ['legendre2d', 'chebyshev2d']:
+        msgs.error("Function {0:s} has not yet been implemented for 2d fits".format(func))
+    xv, _, _ = scale_minmax(x, minx=minx, maxx=maxx)
+    x2v, _, _ = scale_minmax(x2, minx=minx2, maxx=maxx2)
+    return np.polynomial.legendre.leggrid2d(xv, x2v, fitc) if func == 'legendre2d' \
+                else np.polynomial.chebyshev.chebgrid2d(xv, x2v, fitc)
+
+
 def robust_fit(xarray, yarray, order, x2=None, function='polynomial',
                minx=None, maxx=None, minx2=None, maxx2=None,
                maxiter=10, in_gpm=None, weights=None, invvar=None,
@@ -419,6 +461,20 @@ def robust_fit(xarray, yarray, order, x2=None, function='polynomial',
         else:
             weights = np.ones(xarray.size, dtype=float)
 
+    # For 2D fits with a fixed normalization, the fit basis is the same for all
+    # iterations.  Build it once and only update the solution for the points
+    # that are rejected or restored in each iteration.
+    solver = None
+    if x2 is not None and '2d' in function \
+            and (function == 'polynomial2d' or None not in [minx, maxx, minx2, maxx2]):
+        solver = _CachedBasisLSQ(vander2d(np.asarray(xarray, dtype=float),
+                                          np.asarray(x2, dtype=float), np.atleast_1d(order),
+                                          function=function[:-2], minx=minx, maxx=maxx,
+                                          miny=minx2, maxy=maxx2)[0],
+                                 yarray, weights, in_gpm)
+        if not solver.valid:
+            solver = None
+
     # Iterate, and mask out new values on each iteration
     iIter = 0
     qdone = False
@@ -430,16 +486,19 @@ def robust_fit(xarray, yarray, order, x2=None, function='polynomial',
             msgs.warn("More parameters than data points - fit might be undesirable")
         if not np.any(this_gpm):
             msgs.warn("All points were masked. Returning current fit and masking all points. Fit is likely undesirable")
-        pypeitFit = PypeItFit(xval=xarray.astype(float), yval=yarray.astype(float),
-                              func=function, order=np.atleast_1d(order),
-                              x2=x2.astype(float) if x2 is not None else x2,
-                              weights=weights.astype(float), gpm=this_gpm.astype(int),
-                              minx=float(minx) if minx is not None else minx,
-                              maxx=float(maxx) if maxx is not None else maxx,
-                              minx2=float(minx2) if minx2 is not None else minx2,
-                              maxx2=float(maxx2) if maxx2 is not None else maxx2)
-        pypeitFit.fit()
-        ymodel = pypeitFit.eval(xarray, x2=x2)
+        if solver is not None:
+            ymodel = solver.model(solver.solve(this_gpm))
+        else:
+            pypeitFit = PypeItFit(xval=xarray.astype(float), yval=yarray.astype(float),
+                                  func=function, order=np.atleast_1d(order),
+                                  x2=x2.astype(float) if x2 is not None else x2,
+                                  weights=weights.astype(float), gpm=this_gpm.astype(int),
+                                  minx=float(minx) if minx is not None else minx,
+                                  maxx=float(maxx) if maxx is not None else maxx,
+                                  minx2=float(minx2) if minx2 is not None else minx2,
+                                  maxx2=float(maxx2) if maxx2 is not None else maxx2)
+            pypeitFit.fit()
+            ymodel = pypeitFit.eval(xarray, x2=x2)
         # TODO Add nrej and nrej_tot as in robust_optimize below?
         this_gpm, qdone = pydl.djs_reject(yarray, ymodel, outmask=this_gpm, inmask=in_gpm, invvar=invvar,
                                           lower=lower, upper=upper, maxdev=maxdev, maxrej=maxrej,
@@ -459,12 +518,155 @@ def robust_fit(xarray, yarray, order, x2=None, function='polynomial',
                           maxx=float(maxx) if maxx is not None else maxx,
                           minx2=float(minx2) if minx2 is not None else minx2,
                           maxx2=float(maxx2) if maxx2 is not None else maxx2)
-    pypeitFit.fit()
+    if solver is not None and np.any(this_gpm):
+        pypeitFit.fitc = solver.solve(this_gpm).reshape(np.atleast_1d(order) + 1)
+        pypeitFit.success = 1
+    else:
+        pypeitFit.fit()
 
     # Return
     return pypeitFit
 
 
+class _CachedBasisLSQ:
+    """
+    Solve a weighted linear least-squares problem for different subsets of the
+    data, as needed by the rejection iterations of :func:`robust_fit`.
+
+    The fit basis is only constructed and decomposed once, for all the points
+    that can be included in the fit.  The weighted basis for these points is
+    decomposed into an orthonormal basis :math:`Q` and a transformation
+    :math:`T` to the coefficients of the fit.  The solution for a subset of the
+    points is then found by solving the (small) normal equations in the
+    orthonormal basis, which are updated by removing the contribution of the
+    excluded points.  The decomposition is first attempted using a (fast)
+    Cholesky QR factorization; if the basis is too poorly conditioned for this
+    to be accurate, a singular-value decomposition is used instead, for which
+    singular values below machine precision are ignored, as for
+    `numpy.linalg.lstsq`_.  As for :func:`polyfit2d_general`, the rows of the
+    basis are multiplied by the weights (not their square root).
+
+    Args:
+        basis (`numpy.ndarray`_):
+            The fit basis (i.e., the pseudo-Vandermonde matrix) for all the
+            points, with shape ``(npoints, ncoeff)``.
+        y (`numpy.ndarray`_):
+            The data to fit.
+        weights (`numpy.ndarray`_):
+            The fit weights.
+        gpm (`numpy.ndarray`_):
+            The points that can be included in the fit.  The subsets provided to
+            :func:`solve` must be subsets of these points.
+    """
+    def __init__(self, basis, y, weights, gpm):
+        self.basis = basis.reshape(-1, basis.shape[-1])
+        self.gpm = np.asarray(gpm, dtype=bool).ravel()
+        self.indx = np.flatnonzero(self.gpm)
+        # Position of each point in the decomposed basis
+        self.pos = np.full(self.gpm.size, -1, dtype=int)
+        self.pos[self.indx] = np.arange(self.indx.size)
+        w = np.asarray(weights, dtype=float).ravel()[self.indx]
+        self.zw = np.asarray(y, dtype=float).ravel()[self.indx] * w
+        vw = self.basis[self.indx] * w[:,None]
+        # Only use the cached basis if the fit is well defined; otherwise
+        # robust_fit falls back to fitting each iteration from scratch
+        self.valid = self.indx.size > 0 and np.all(np.isfinite(vw)) \
+                        and np.all(np.isfinite(self.zw))
+        if not self.valid:
+            return
+        try:
+            self.q, self.t = self._cholesky_qr(vw)
+        except np.linalg.LinAlgError:
+            u, s, vt = np.linalg.svd(vw, full_matrices=False)
+            keep = s > np.finfo(float).eps * max(vw.shape) * s[0]
+            self.q = u[:,keep]
+            self.t = vt[keep].T / s[keep][None,:]
+        self.qz = self.q.T @ self.zw
+
+    @staticmethod
+    def _cholesky_qr(a):
+        """
+        Decompose a matrix using the shifted CholeskyQR3 algorithm, after
+        normalizing its columns.
+
+        Args:
+            a (`numpy.ndarray`_):
+                The matrix to decompose, with shape ``(n,m)``.
+
+        Returns:
+            :obj:`tuple`: The matrix :math:`Q` with orthonormal columns and
+            shape ``(n,m)`` and the matrix :math:`T` with shape ``(m,m)`` such
+            that ``a @ T = Q``.
+
+        Raises:
+            `numpy.linalg.LinAlgError`_:
+                Raised if the matrix is too poorly conditioned for the
+                decomposition to be accurate.
+        """
+        n, m = a.shape
+        norm = np.sqrt(np.sum(a**2, axis=0))
+        norm[norm == 0] = 1.
+        q = a / norm[None,:]
+        r = np.identity(m)
+        # The first pass uses a shift to ensure the Cholesky decomposition
+        # succeeds for poorly conditioned matrices (shifted CholeskyQR3); the
+        # norm of the normalized matrix is at most sqrt(m).
+        shift = 11 * (n * m + m * (m + 1)) * np.finfo(float).eps * m
+        for i in range(3):
+            g = q.T @ q
+            if i == 0:
+                g[np.diag_indices(m)] += shift
+            ri = linalg.cholesky(g, lower=False, check_finite=False)
+            q = q @ linalg.solve_triangular(ri, np.identity(m), lower=False, check_finite=False)
+            r = ri @ r
+        # Require the same precision as numpy.linalg.lstsq, which would ignore
+        # singular values below eps * max(n,m) relative to the largest one
+        if np.linalg.cond(r) * np.finfo(float).eps * max(n, m) > 1e-2 \
+                or not np.allclose(q.T @ q, np.identity(m), rtol=0., atol=1e-10):
+            raise np.linalg.LinAlgError('Cholesky QR decomposition is inaccurate.')
+        t = linalg.solve_triangular(r, np.identity(m), lower=False, check_finite=False)
+        return q, t / norm[:,None]
+
+    def solve(self, gpm):
+        """
+        Solve for the fit coefficients using a subset of the points.
+
+        Args:
+            gpm (`numpy.ndarray`_):
+                The points to include in the fit.
+
+        Returns:
+            `numpy.ndarray`_: The (flattened) fit coefficients.
+        """
+        _gpm = np.asarray(gpm, dtype=bool).ravel() & self.gpm
+        rej = self.pos[self.gpm & np.logical_not(_gpm)]
+        if rej.size < self.indx.size // 2:
+            # Remove the rejected points
+            qr = self.q[rej]
+            a = np.identity(self.q.shape[1]) - qr.T @ qr
+            b = self.qz - qr.T @ self.zw[rej]
+        else:
+            # Most points are rejected, so just use the remaining ones
+            use = self.pos[_gpm]
+            qg = self.q[use]
+            a = qg.T @ qg
+            b = qg.T @ self.zw[use]
+        return self.t @ np.linalg.lstsq(a, b, rcond=None)[0]
+
+    def model(self, coeff):
+        """
+        Evaluate the fit for all the points.
+
+        Args:
+            coeff (`numpy.ndarray`_):
+                The (flattened) fit coefficients.
+
+        Returns:
+            `numpy.ndarray`_: The model for all points.
+        """
+        return self.basis @ coeff
+
+
 def robust_optimize(ydata, fitfunc, arg_dict, maxiter=10, inmask=None, invvar=None,
                     lower=None, upper=None, maxdev=None, maxrej=None, groupdim=None,
                     groupsize=None, groupbadpix=False, grow=0, sticky=True, use_mad=False,
@@ -812,15 +1014,8 @@ def polyfit2d_general(x, y, z, deg, w=None, function='polynomial',
     z = np.asarray(z)
     deg = np.asarray(deg)
     # Vander
-    if function == 'polynomial':
-        vander = np.polynomial.polynomial.polyvander2d(x, y, deg)
-    elif function == 'legendre' or function == 'chebyshev':
-        xv, minx, maxx = scale_minmax(x, minx=minx, maxx=maxx)
-        yv, miny, maxy = scale_minmax(y, minx=miny, maxx=maxy)
-        vander = np.polynomial.legendre.legvander2d(xv, yv, deg) if function == 'legendre' \
-            else np.polynomial.chebyshev.chebvander2d(xv, yv, deg)
-    else:
-        msgs.error("Not ready for this type of {:s}".format(function))
+    vander, minx, maxx, miny, maxy = vander2d(x, y, deg, function=function, minx=minx,
+                                              maxx=maxx, miny=miny, maxy=maxy)
     # Weights
     if w is not None:
         w = np.asarray(w) + 0.0
@@ -837,6 +1032,43 @@ def polyfit2d_general(x, y, z, deg, w=None, function='polynomial',
     return c.reshape(deg+1), minx, maxx, miny, maxy
 
 
+def vander2d(x, y, deg, function='polynomial', minx=None, maxx=None, miny=None, maxy=None):
+    """
+    Construct the pseudo-Vandermonde matrix of a 2D polynomial fit.
+
+    Args:
+        x (`numpy.ndarray`_): x-values
+        y (`numpy.ndarray`_): y-values
+        deg (tuple): degree of polynomial fit in the form [nx,ny]
+        function (str, optional):
+            2D function to fit.  Options are 'polynomial', 'chebyshev' or 'legendre'
+        minx (float, optional):
+            Minimum x value for the fit used to normalise the x values
+        maxx (float, optional):
+            Maximum x value for the fit used to normalise the x values
+        miny (float, optional):
+            Minimum value for the fit used to normalise the y values
+        maxy (float, optional):
+            Maximum value for the fit used to normalise the y values
+
+    Returns:
+        tuple:
+            - The matrix as a `numpy.ndarray`_ with shape ``x.shape +
+              ((nx+1)*(ny+1),)``.  The columns are ordered such that the matrix
+              product with the flattened coefficients evaluates the fit.
+            - minx, maxx, miny, maxy: min and max values for the fit as :obj:`float`
+    """
+    if function == 'polynomial':
+        return np.polynomial.polynomial.polyvander2d(x, y, deg), minx, maxx, miny, maxy
+    if function not in ['legendre', 'chebyshev']:
+        msgs.error("Not ready for this type of {:s}".format(function))
+    xv, minx, maxx = scale_minmax(x, minx=minx, maxx=maxx)
+    yv, miny, maxy = scale_minmax(y, minx=miny, maxx=maxy)
+    vander = np.polynomial.legendre.legvander2d(xv, yv, deg) if function == 'legendre' \
+        else np.polynomial.chebyshev.chebvander2d(xv, yv, deg)
+    return vander, minx, maxx, miny, maxy
+
+
 def twoD_Gaussian(tup, amplitude, xo, yo, sigma_x, sigma_y, theta, offset):
     """
     A 2D Gaussian to be used to fit the cross-correlation
@@ -1111,130 +1343,302 @@ def bspline_profile(xdata, ydata, invvar, profile_basis, ingpm=None, upper=5, lo
             - 4 = Number of good data points fewer than nord
 
     """
-    # Checks
-    nx = xdata.size
-    if ydata.size != nx:
-        msgs.error('Dimensions of xdata and ydata do not agree.')
-
-    # TODO: invvar and profile_basis should be optional
-
-    # ToDO at the moment invvar is a required variable input
-    #    if invvar is not None:
-    #        if invvar.size != nx:
-    #            raise ValueError('Dimensions of xdata and invvar do not agree.')
-    #        else:
-    #            #
-    #            # This correction to the variance makes it the same
-    #            # as IDL's variance()
-    #            #
-    #            var = ydata.var()*(float(nx)/float(nx-1))
-    #            if var == 0:
-    #                var = 1.0
-    #            invvar = np.ones(ydata.shape, dtype=ydata.dtype)/var
-
-    npoly = int(profile_basis.size / nx)
-    if profile_basis.size != nx * npoly:
-        msgs.error('Profile basis is not a multiple of the number of data points.')
-
-    # Init
-    yfit = np.zeros(ydata.shape)
-    reduced_chi = 0.
-
-    # TODO: Instantiating these place-holder arrays can be expensive.  Can we avoid doing this?
-    outmask = True if invvar.size == 1 else np.ones(invvar.shape, dtype=bool)
-
-    if ingpm is None:
-        ingpm = invvar > 0
-
-    if not quiet:
-        termwidth = 80 - 13
-        msgs.info('B-spline fit:')
-        msgs.info('    npoly = {0} profile basis functions'.format(npoly))
-        msgs.info('    ngood = {0}/{1} measurements'.format(np.sum(ingpm), ingpm.size))
-        msgs.info(' {0:>4}  {1:>8}  {2:>7}  {3:>6} '.format(
-            'Iter', 'Chi^2', 'N Rej', 'R. Fac').center(termwidth, '*'))
-        hlinestr = ' {0}  {1}  {2}  {3} '.format('-' * 4, '-' * 8, '-' * 7, '-' * 6)
-        nullval = '  {0:>8}  {1:>7}  {2:>6} '.format('-' * 2, '-' * 2, '-' * 2)
-        msgs.info(hlinestr.center(termwidth))
-
-    maskwork = outmask & ingpm & (invvar > 0)
-    if not maskwork.any():
-        msgs.error('No valid data points in bspline_profile!.')
-
-    # Init bspline class
-    sset = bspline.bspline(xdata[maskwork], nord=nord, npoly=npoly, bkpt=bkpt, fullbkpt=fullbkpt,
-                   funcname='Bspline longslit special', **kwargs_bspline)
-    if maskwork.sum() < sset.nord:
+    return bspline_profile_batch([xdata], [ydata], [invvar], [profile_basis],
+                                 ingpm=None if ingpm is None else [ingpm], upper=upper,
+                                 lower=lower, maxiter=maxiter, nord=nord,
+                                 bkpt=None if bkpt is None else [bkpt],
+                                 fullbkpt=None if fullbkpt is None else [fullbkpt],
+                                 relative=None if relative is None else [relative],
+                                 kwargs_bspline=kwargs_bspline, kwargs_reject=kwargs_reject,
+                                 quiet=quiet)[0]
+
+
+def bspline_profile_batch(xdata, ydata, invvar, profile_basis, ingpm=None, upper=5, lower=5,
+                          maxiter=25, nord=4, bkpt=None, fullbkpt=None, relative=None,
+                          kwargs_bspline={}, kwargs_reject={}, quiet=False, n_proc=1):
+    """
+    Perform many independent B-spline fits with rejection.
+
+    Each fit is identical to a call to :func:`bspline_profile`; see that
+    function for a full description of the arguments and returned
+    objects.  However, the fits are iterated in lock step such that, in
+    each iteration, the linear systems for all the fits still being
+    iterated are solved by a single call to
+    :func:`~pypeit.bspline.bspline.workit_batch`.  With the bspline C
+    extension, the fits are distributed among ``n_proc`` threads.
+
+    All fits must use the same number of profile basis functions.
+
+    Args:
+        xdata (:obj:`list`):
+            Independent variable for each fit.
+        ydata (:obj:`list`):
+            Dependent variable for each fit.
+        invvar (:obj:`list`):
+            Inverse variance of ``ydata`` for each fit.
+        profile_basis (:obj:`list`):
+            Model profiles for each fit.
+        ingpm (:obj:`list`, optional):
+            Input good-pixel mask for each fit.  Can be None or include
+            None for some fits.
+        upper (:obj:`int`, :obj:`float`, optional):
+            Upper rejection threshold in units of sigma.
+        lower (:obj:`int`, :obj:`float`, optional):
+            Lower rejection threshold in units of sigma.
+        maxiter (:obj:`int`, optional):
+            Maximum number of rejection iterations.
+        nord (:obj:`int`, optional):
+            Order of B-spline fit.
+        bkpt (:obj:`list`, optional):
+            Breakpoints for each fit.  Can be None or include None for
+            some fits.
+        fullbkpt (:obj:`list`, optional):
+            Full array of breakpoints for each fit.  Can be None or
+            include None for some fits.
+        relative (:obj:`list`, optional):
+            Indices used to compute the reduced chi-square for each fit.
+            Can be None or include None for some fits.
+        kwargs_bspline (:obj:`dict`, optional):
+            Keyword arguments used to instantiate
+            :class:`pypeit.bspline.bspline`
+        kwargs_reject (:obj:`dict`, optional):
+            Keyword arguments passed to :func:`pypeit.core.pydl.djs_reject`
+        quiet (:obj:`bool`, optional):
+            Suppress output to the screen.
+        n_proc (:obj:`int`, optional):
+            Number of threads used to solve the fits.
+
+    Returns:
+        :obj:`list`: The result of each fit; i.e., a tuple with the
+        bspline, the output good-pixel mask, the best-fitting model, the
+        reduced chi-square, and the exit status.  See
+        :func:`bspline_profile`.
+    """
+    nfit = len(xdata)
+    fits = [_BsplineProfileFit(xdata[i], ydata[i], invvar[i], profile_basis[i],
+                               ingpm=None if ingpm is None else ingpm[i], upper=upper,
+                               lower=lower, maxiter=maxiter, nord=nord,
+                               bkpt=None if bkpt is None else bkpt[i],
+                               fullbkpt=None if fullbkpt is None else fullbkpt[i],
+                               relative=None if relative is None else relative[i],
+                               kwargs_bspline=kwargs_bspline, kwargs_reject=kwargs_reject,
+                               quiet=quiet)
+            for i in range(nfit)]
+
+    active = [f for f in fits if f.iterating]
+    while len(active) > 0:
+        # Set up the linear systems to solve
+        systems = [f.setup_iteration() for f in active]
+        solve = [i for i in range(len(active)) if systems[i] is not None]
+        results = [None]*len(active)
+        if len(solve) > 0:
+            solved = bspline.workit_batch(*[[systems[i][j] for i in solve] for j in range(7)],
+                                          n_proc=n_proc)
+            for i, r in zip(solve, solved):
+                results[i] = r
+        # Reject and check convergence
+        for f, r in zip(active, results):
+            f.finish_iteration(*(f.last_fit if r is None else r))
+        active = [f for f in active if f.iterating]
+
+    return [f.finish() for f in fits]
+
+
+class _BsplineProfileFit:
+    """
+    Track the state of a single rejection-iterated B-spline fit performed by
+    :func:`bspline_profile_batch`.
+
+    Instantiation performs all the checks and setup done by
+    :func:`bspline_profile` before the iterations.  Each iteration is then
+    split between :func:`setup_iteration`, which provides the system to
+    solve, and :func:`finish_iteration`, which performs the rejection.
+    """
+    def __init__(self, xdata, ydata, invvar, profile_basis, ingpm=None, upper=5, lower=5,
+                 maxiter=25, nord=4, bkpt=None, fullbkpt=None, relative=None, kwargs_bspline={},
+                 kwargs_reject={}, quiet=False):
+        # Checks
+        nx = xdata.size
+        if ydata.size != nx:
+            msgs.error('Dimensions of xdata and ydata do not agree.')
+
+        # TODO: invvar and profile_basis should be optional
+
+        # ToDO at the moment invvar is a required variable input
+        #    if invvar is not None:
+        #        if invvar.size != nx:
+        #            raise ValueError('Dimensions of xdata and invvar do not agree.')
+        #        else:
+        #            #
+        #            # This correction to the variance makes it the same
+        #            # as IDL's variance()
+        #            #
+        #            var = ydata.var()*(float(nx)/float(nx-1))
+        #            if var == 0:
+        #                var = 1.0
+        #            invvar = np.ones(ydata.shape, dtype=ydata.dtype)/var
+
+        npoly = int(profile_basis.size / nx)
+        if profile_basis.size != nx * npoly:
+            msgs.error('Profile basis is not a multiple of the number of data points.')
+
+        self.xdata = xdata
+        self.ydata = ydata
+        self.invvar = invvar
+        self.upper = upper
+        self.lower = lower
+        self.maxiter = maxiter
+        self.nord = nord
+        self.npoly = npoly
+        self.relative = relative
+        self.kwargs_reject = kwargs_reject
+        self.quiet = quiet
+        # The final result; set when the fit is complete
+        self.result = None
+
+        # Init
+        self.yfit = np.zeros(ydata.shape)
+        self.reduced_chi = 0.
+
+        # TODO: Instantiating these place-holder arrays can be expensive.  Can we avoid doing this?
+        outmask = True if invvar.size == 1 else np.ones(invvar.shape, dtype=bool)
+
+        if ingpm is None:
+            ingpm = invvar > 0
+
         if not quiet:
-            msgs.warn('Number of good data points fewer than nord.')
-        # TODO: Why isn't maskwork returned?
-        return sset, outmask, yfit, reduced_chi, 4
-
-    # This was checked in detail against IDL for identical inputs
-    # KBW: Tried a few things and this was about as fast as you can get.
-    outer = np.outer(np.ones(nord, dtype=float), profile_basis.flatten('F')).T
-    action_multiple = outer.reshape((nx, npoly * nord), order='F')
-    # --------------------
-    # Iterate spline fit
-    iiter = 0
-    error = -1  # Indicates that the fit should be done
-    qdone = False  # True if rejection iterations are done
-    exit_status = 0
-    relative_factor = 1.0
-    nrel = 0 if relative is None else len(relative)
-    # TODO: Why do we need both maskwork and tempin?
-    tempin = np.copy(ingpm)
-    while (error != 0 or qdone is False) and iiter <= maxiter and exit_status == 0:
-        ngood = maskwork.sum()
-        goodbk = sset.mask.nonzero()[0]
-        if ngood <= 1 or not sset.mask.any():
-            sset.coeff[:] = 0.
-            exit_status = 2  # This will end iterations
-        else:
-            # Do the fit. Return values from workit for error are as follows:
-            #    0 if fit is good
-            #   -1 if some breakpoints are masked, so try the fit again
-            #   -2 if everything is screwed
-
-            # we'll do the fit right here..............
-            if error != 0:
-                bf1, laction, uaction = sset.action(xdata)
-                if np.any(bf1 == -2) or bf1.size != nx * nord:
-                    msgs.error("BSPLINE_ACTION failed!")
-                action = np.copy(action_multiple)
-                for ipoly in range(npoly):
-                    action[:, np.arange(nord) * npoly + ipoly] *= bf1
-                del bf1  # Clear the memory
-
-            if np.any(np.logical_not(np.isfinite(action))):
-                msgs.error('Infinities in action matrix.  B-spline fit faults.')
-
-            error, yfit = sset.workit(xdata, ydata, invvar * maskwork, action, laction, uaction)
+            self.termwidth = 80 - 13
+            msgs.info('B-spline fit:')
+            msgs.info('    npoly = {0} profile basis functions'.format(npoly))
+            msgs.info('    ngood = {0}/{1} measurements'.format(np.sum(ingpm), ingpm.size))
+            msgs.info(' {0:>4}  {1:>8}  {2:>7}  {3:>6} '.format(
+                'Iter', 'Chi^2', 'N Rej', 'R. Fac').center(self.termwidth))
+            hlinestr = ' {0}  {1}  {2}  {3} '.format('-' * 4, '-' * 8, '-' * 7, '-' * 6)
+            self.nullval = '  {0:>8}  {1:>7}  {2:>6} '.format('-' * 2, '-' * 2, '-' * 2)
+            msgs.info(hlinestr.center(self.termwidth))
+
+        self.maskwork = outmask & ingpm & (invvar > 0)
+        if not self.maskwork.any():
+            msgs.error('No valid data points in bspline_profile!.')
+
+        # Init bspline class
+        self.sset = bspline.bspline(xdata[self.maskwork], nord=nord, npoly=npoly, bkpt=bkpt,
+                                    fullbkpt=fullbkpt, funcname='Bspline longslit special',
+                                    **kwargs_bspline)
+        if self.maskwork.sum() < self.sset.nord:
+            if not quiet:
+                msgs.warn('Number of good data points fewer than nord.')
+            # TODO: Why isn't maskwork returned?
+            self.result = (self.sset, outmask, self.yfit, self.reduced_chi, 4)
+            return
+
+        # This was checked in detail against IDL for identical inputs
+        # KBW: Tried a few things and this was about as fast as you can get.
+        outer = np.outer(np.ones(nord, dtype=float), profile_basis.flatten('F')).T
+        self.action_multiple = outer.reshape((nx, npoly * nord), order='F')
+        # --------------------
+        # Iterate spline fit
+        self.iiter = 0
+        self.error = -1  # Indicates that the fit should be done
+        self.qdone = False  # True if rejection iterations are done
+        self.exit_status = 0
+        self.relative_factor = 1.0
+        self.nrel = 0 if relative is None else len(relative)
+        # TODO: Why do we need both maskwork and tempin?
+        self.tempin = np.copy(ingpm)
 
-        iiter += 1
+    @property
+    def iterating(self):
+        """
+        Flag that the fit requires another iteration.
+        """
+        return self.result is None and (self.error != 0 or self.qdone is False) \
+                    and self.iiter <= self.maxiter and self.exit_status == 0
+
+    @property
+    def last_fit(self):
+        """
+        The result of the last fit, to use if no fit is performed in an
+        iteration.
+        """
+        return self.error, self.yfit
+
+    def setup_iteration(self):
+        """
+        Set up the next fit iteration.
+
+        Returns:
+            :obj:`tuple`: The arguments for
+            :func:`~pypeit.bspline.bspline.bspline.workit`, including the
+            bspline object itself, or None if no fit is performed.
+        """
+        self.ngood = self.maskwork.sum()
+        self.goodbk = self.sset.mask.nonzero()[0]
+        if self.ngood <= 1 or not self.sset.mask.any():
+            self.sset.coeff[:] = 0.
+            self.exit_status = 2  # This will end iterations
+            return None
+
+        # Do the fit. Return values from workit for error are as follows:
+        #    0 if fit is good
+        #   -1 if some breakpoints are masked, so try the fit again
+        #   -2 if everything is screwed
+
+        # we'll do the fit right here..............
+        if self.error != 0:
+            bf1, self.laction, self.uaction = self.sset.action(self.xdata)
+            if np.any(bf1 == -2) or bf1.size != self.xdata.size * self.nord:
+                msgs.error("BSPLINE_ACTION failed!")
+            self.action = np.copy(self.action_multiple)
+            for ipoly in range(self.npoly):
+                self.action[:, np.arange(self.nord) * self.npoly + ipoly] *= bf1
+            del bf1  # Clear the memory
+
+        if np.any(np.logical_not(np.isfinite(self.action))):
+            msgs.error('Infinities in action matrix.  B-spline fit faults.')
+
+        return self.sset, self.xdata, self.ydata, self.invvar * self.maskwork, self.action, \
+                    self.laction, self.uaction
+
+    def finish_iteration(self, error, yfit):
+        """
+        Finish the fit iteration by rejecting outliers.
+
+        Args:
+            error (:obj:`int`):
+                Error code returned by the fit; see
+                :func:`~pypeit.bspline.bspline.bspline.workit`.
+            yfit (`numpy.ndarray`_):
+                The best-fitting model.
+        """
+        self.error = error
+        self.yfit = yfit
+        self.iiter += 1
 
         if error == -2:
-            if not quiet:
+            if not self.quiet:
                 msgs.warn('All break points lost!!  Bspline fit failed.')
-            exit_status = 3
-            return sset, np.zeros(xdata.shape, dtype=bool), np.zeros(xdata.shape), reduced_chi, \
-                   exit_status
+            self.exit_status = 3
+            self.result = (self.sset, np.zeros(self.xdata.shape, dtype=bool),
+                           np.zeros(self.xdata.shape), self.reduced_chi, self.exit_status)
+            return
 
         if error != 0:
-            if not quiet:
-                msgs.info((' {0:4d}'.format(iiter) + nullval).center(termwidth))
-            continue
+            if not self.quiet:
+                msgs.info((' {0:4d}'.format(self.iiter) + self.nullval).center(self.termwidth))
+            return
 
         # Iterate the fit -- next rejection iteration
-        chi_array = (ydata - yfit) * np.sqrt(invvar * maskwork)
-        reduced_chi = np.sum(np.square(chi_array)) / (ngood - npoly * (len(goodbk) + nord) - 1)
+        chi_array = (self.ydata - yfit) * np.sqrt(self.invvar * self.maskwork)
+        self.reduced_chi = np.sum(np.square(chi_array)) \
+                / (self.ngood - self.npoly * (len(self.goodbk) + self.nord) - 1)
 
-        relative_factor = 1.0
-        if relative is not None:
-            this_chi2 = reduced_chi if nrel == 1 \
-                else np.sum(np.square(chi_array[relative])) \
-                     / (nrel - (len(goodbk) + nord) - 1)
-            relative_factor = max(np.sqrt(this_chi2), 1.0)
+        self.relative_factor = 1.0
+        if self.relative is not None:
+            this_chi2 = self.reduced_chi if self.nrel == 1 \
+                else np.sum(np.square(chi_array[self.relative])) \
+                     / (self.nrel - (len(self.goodbk) + self.nord) - 1)
+            self.relative_factor = max(np.sqrt(this_chi2), 1.0)
 
         # Rejection
 
@@ -1244,36 +1648,49 @@ def bspline_profile(xdata, ydata, invvar, profile_basis, ingpm=None, upper=5, lo
         #  the IDL version, but this may require further consideration.
         #  I think requiring sticky to be set is the more transparent
         #  behavior.
-        maskwork, qdone = pydl.djs_reject(ydata, yfit, invvar=invvar, inmask=tempin,
-                                          outmask=maskwork, upper=upper * relative_factor,
-                                          lower=lower * relative_factor, **kwargs_reject)
-        tempin = np.copy(maskwork)
-        if not quiet:
-            msgs.info(' {0:4d}  {1:8.3f}  {2:7d}  {3:6.2f} '.format(iiter,
-                                                                    reduced_chi, np.sum(maskwork == 0),
-                                                                    relative_factor).center(termwidth))
-
-    if iiter == (maxiter + 1):
-        exit_status = 1
-
-    # Exit status:
-    #    0 = fit exited cleanly
-    #    1 = maximum iterations were reached
-    #    2 = all points were masked
-    #    3 = all break points were dropped
-    #    4 = Number of good data points fewer than nord
-
-    if not quiet:
-        msgs.info(' {0:>4}  {1:8.3f}  {2:7d}  {3:6.2f} '.format('DONE',
-                                                                reduced_chi, np.sum(maskwork == 0),
-                                                                relative_factor).center(termwidth))
-        msgs.info('*' * termwidth)
-
-    # Finish
-    # TODO: Why not return maskwork directly
-    outmask = np.copy(maskwork)
-    # Return
-    return sset, outmask, yfit, reduced_chi, exit_status
+        self.maskwork, self.qdone = pydl.djs_reject(self.ydata, yfit, invvar=self.invvar,
+                                                    inmask=self.tempin, outmask=self.maskwork,
+                                                    upper=self.upper * self.relative_factor,
+                                                    lower=self.lower * self.relative_factor,
+                                                    **self.kwargs_reject)
+        self.tempin = np.copy(self.maskwork)
+        if not self.quiet:
+            msgs.info(' {0:4d}  {1:8.3f}  {2:7d}  {3:6.2f} '.format(self.iiter,
+                            self.reduced_chi, np.sum(self.maskwork == 0),
+                            self.relative_factor).center(self.termwidth))
+
+    def finish(self):
+        """
+        Finish the fit.
+
+        Returns:
+            :obj:`tuple`: The result of the fit; see
+            :func:`bspline_profile`.
+        """
+        if self.result is not None:
+            return self.result
+
+        if self.iiter == (self.maxiter + 1):
+            self.exit_status = 1
+
+        # Exit status:
+        #    0 = fit exited cleanly
+        #    1 = maximum iterations were reached
+        #    2 = all points were masked
+        #    3 = all break points were dropped
+        #    4 = Number of good data points fewer than nord
+
+        if not self.quiet:
+            msgs.info(' {0:>4}  {1:8.3f}  {2:7d}  {3:6.2f} '.format('DONE',
+                            self.reduced_chi, np.sum(self.maskwork == 0),
+                            self.relative_factor).center(self.termwidth))
+            msgs.info('*' * self.termwidth)
+
+        # Finish
+        # TODO: Why not return maskwork directly
+        self.result = (self.sset, np.copy(self.maskwork), self.yfit, self.reduced_chi,
+                       self.exit_status)
+        return self.result
 
 
 def bspline_qa(xdata, ydata, sset, gpm, yfit, xlabel=None, ylabel=None, title=None, show=True):
@@ -13,7 +13,7 @@ import scipy.interpolate
 import scipy.ndimage
 import matplotlib.pyplot as plt
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 from pypeit import msgs
 from pypeit.core import coadd
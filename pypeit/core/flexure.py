@@ -26,6 +26,7 @@ from linetools.spectra import xspectrum1d
 
 from pypeit import msgs
 from pypeit import dataPaths
+from pypeit import cache
 from pypeit import io
 from pypeit import utils
 from pypeit.display import display
@@ -40,7 +41,7 @@ from pypeit.images.mosaic import Mosaic
 from pypeit import specobj, specobjs
 from pypeit import wavemodel
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 
 def spat_flexure_shift(sciimg, slits, debug=False, maxlag = 20):
@@ -909,8 +910,13 @@ def get_archive_spectrum(sky_file, obj_skyspec=None, spec_fwhm_pix=None):
         # Load Archive. Save the fwhm to avoid the performance hit from calling it on the archive sky spectrum
         # multiple times
         sky_spectrum = io.load_sky_spectrum(sky_file)
-        # get arxiv sky spectrum resolution (FWHM in pixels)
-        arx_fwhm_pix = autoid.measure_fwhm(sky_spectrum.flux.value, sigdetect=4., fwhm=4.)
+        # get arxiv sky spectrum resolution (FWHM in pixels).  This is slow for
+        # large archive spectra, so it is only measured once and also cached
+        # on disk.
+        arx_fwhm_pix = cache.cached_product(
+                cache.file_key(dataPaths.sky_spec.get_file_path(sky_file)) + ('fwhm',),
+                lambda: autoid.measure_fwhm(sky_spectrum.flux.value, sigdetect=4., fwhm=4.),
+                persist=True)
         if arx_fwhm_pix is None:
             msgs.error('Failed to measure the spectral FWHM of the archived sky spectrum. '
                        'Not enough sky lines detected.')
@@ -5,7 +5,7 @@
 
 """
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
@@ -22,6 +22,7 @@ from astropy import stats
 
 from pypeit import msgs
 from pypeit import utils
+from pypeit import cache
 from pypeit import bspline
 from pypeit import io
 from pypeit.wavemodel import conv2res
@@ -495,7 +496,9 @@ def load_extinction_data(longitude, latitude, extinctfilepar,
         obs_coord = coordinates.SkyCoord(longitude, latitude, frame='gcrs', unit=units.deg)
         # Read list
         extinct_summ = dataPaths.extinction.get_file_path('extinction_curves.txt')
-        extinct_files = table.Table.read(extinct_summ, comment='#', format='ascii')
+        extinct_files = cache.cached_product(
+                            cache.file_key(extinct_summ) + ('extinction_curves',),
+                            lambda: table.Table.read(extinct_summ, comment='#', format='ascii'))
         # Coords
         ext_coord = coordinates.SkyCoord(extinct_files['Lon'], extinct_files['Lat'], frame='gcrs',
                                         unit=units.deg)
@@ -523,12 +526,31 @@ def load_extinction_data(longitude, latitude, extinctfilepar,
     else:
         extinct_file = extinctfilepar
 
-    # Read
-    extinct = table.Table.read(dataPaths.extinction.get_file_path(extinct_file),
-                               comment='#', format='ascii', names=('iwave', 'mag_ext'))
+    # Read; the parsed file is cached because it is used for every flux
+    # calibrated spectrum
+    extinct_path = dataPaths.extinction.get_file_path(extinct_file)
+    return cache.cached_product(cache.file_key(extinct_path) + ('extinction',),
+                                lambda: read_extinction_file(extinct_path))
+
+
+def read_extinction_file(extinct_path):
+    """
+    Read an extinction file.
+
+    Parameters
+    ----------
+    extinct_path : str, `Path`_
+        Path to the extinction file.
+
+    Returns
+    -------
+    extinct : `astropy.table.Table`_
+        astropy Table containing the 'wavelength', 'extinct' data for AM=1.
+    """
+    extinct = table.Table.read(extinct_path, comment='#', format='ascii',
+                               names=('iwave', 'mag_ext'))
     wave = table.Column(np.array(extinct['iwave']) * units.AA, name='wave')
     extinct.add_column(wave)
-    # Return
     return extinct[['wave', 'mag_ext']]
 
 
@@ -794,34 +816,98 @@ def get_sensfunc_factor(wave, wave_zp, zeropoint, exptime, tellmodel=None, delta
         This quantity is defined to be sensfunc_interp/exptime/delta_wave. shape = (nspec,)
 
     """
-    # Initialise some variables
-    zeropoint_obs = np.zeros_like(wave)
-    wave_mask = wave > 1.0  # filter out masked regions or bad wavelengths
     if delta_wave is not None:
         # Check that the delta_wave is the same size as the wave vector
-        if isinstance(delta_wave, float):
-            _delta_wave = delta_wave
-        elif isinstance(delta_wave, np.ndarray):
+        if isinstance(delta_wave, np.ndarray):
             if wave.size != delta_wave.size:
                 msgs.error('The wavelength vector and delta_wave vector must be the same size')
-            _delta_wave = delta_wave
-        else:
+        elif not isinstance(delta_wave, float):
             msgs.warn('Invalid type for delta_wave - using a default value')
-            _delta_wave = wvutils.get_delta_wave(wave, wave_mask)
-    else:
-        # If delta_wave is not passed in, then we will use the native wavelength sampling of the spectrum
-        _delta_wave = wvutils.get_delta_wave(wave, wave_mask)
+            delta_wave = None
 
-#    print(f'get_sensfunc_factor: {np.amin(wave_zp):.1f}, {np.amax(wave_zp):.1f}, '
-#          f'{np.amin(wave[wave_mask]):.1f}, {np.amax(wave[wave_mask]):.1f}')
+    sensfunc_factor = get_sensfunc_factors([wave], wave_zp, zeropoint, exptime,
+                                           delta_waves=[delta_wave],
+                                           extinct_correct=extinct_correct, airmass=airmass,
+                                           longitude=longitude, latitude=latitude,
+                                           extinctfilepar=extinctfilepar,
+                                           extrap_sens=extrap_sens)[0]
+
+    # TODO Telluric corrections via this method are deprecated
+    # Did the user request a telluric correction?
+    if tellmodel is not None:
+        # This assumes there is a separate telluric key in this dict.
+        msgs.warn("Telluric corrections via this method are deprecated")
+        msgs.info('Applying telluric correction')
+        sensfunc_factor = sensfunc_factor * (tellmodel > 1e-10) / (tellmodel + (tellmodel < 1e-10))
+
+    return sensfunc_factor
+
+
+def get_sensfunc_factors(waves, wave_zp, zeropoint, exptime, delta_waves=None,
+                         extinct_correct=False, airmass=None, longitude=None, latitude=None,
+                         extinctfilepar=None, extinct=None, extrap_sens=False):
+    """
+    Get the sensitivity function factors for many spectra calibrated by the
+    same sensitivity function.
+
+    This is the batched equivalent of :func:`get_sensfunc_factor`.  The
+    sensitivity function is interpolated onto the wavelengths of all the
+    spectra at once, and the extinction curve is only loaded once.
+
+    Args:
+        waves (:obj:`list`):
+            List of `numpy.ndarray`_ objects with the wavelength vectors of
+            the spectra to be flux calibrated.  The vectors can have different
+            lengths.
+        wave_zp (float `numpy.ndarray`_):
+            Zeropoint wavelength vector shape = (nsens,)
+        zeropoint (float `numpy.ndarray`_): shape = (nsens,)
+            Zeropoint, i.e. sensitivity function
+        exptime (float):
+            Exposure time in seconds
+        delta_waves (:obj:`list`, optional):
+            The wavelength sampling of each spectrum; see the ``delta_wave``
+            argument of :func:`get_sensfunc_factor`.  If None, or for elements
+            that are None, the native wavelength sampling of the spectrum is
+            used.
+        extinct_correct (bool, optional)
+            If True perform an extinction correction. Default = False
+        airmass (float, optional):
+            Airmass used if extinct_correct=True. This is required if extinct_correct=True
+        longitude (float, optional):
+            longitude in degree for observatory
+            Required for extinction correction, if ``extinct`` is not provided.
+        latitude:
+            latitude in degree for observatory
+            Required for extinction correction, if ``extinct`` is not provided.
+        extinctfilepar (str):
+            [sensfunc][UVIS][extinct_file] parameter
+            Used for extinction correction, if ``extinct`` is not provided.
+        extinct (`astropy.table.Table`_, optional):
+            The extinction curve; see :func:`load_extinction_data`.  If None
+            and ``extinct_correct`` is True, the curve is loaded.
+        extrap_sens (bool, optional):
+            Extrapolate the sensitivity function (instead of crashing out)
 
+    Returns:
+        :obj:`list`: The sensitivity function factors for each spectrum; see
+        :func:`get_sensfunc_factor`.
+    """
+    if len(waves) == 0:
+        return []
+    wave_masks = [wave > 1.0 for wave in waves]  # filter out masked regions or bad wavelengths
+    _waves = np.concatenate(waves)
+    _wave_mask = np.concatenate(wave_masks)
+
+    # Interpolate the sensitivity function onto all the wavelengths at once
+    zeropoint_obs = np.zeros_like(_waves)
     try:
-        zeropoint_obs[wave_mask] \
-                = interpolate.interp1d(wave_zp, zeropoint, bounds_error=True)(wave[wave_mask])
+        zeropoint_obs[_wave_mask] \
+                = interpolate.interp1d(wave_zp, zeropoint, bounds_error=True)(_waves[_wave_mask])
     except ValueError:
         if extrap_sens:
-            zeropoint_obs[wave_mask] \
-                    = interpolate.interp1d(wave_zp, zeropoint, bounds_error=False)(wave[wave_mask])
+            zeropoint_obs[_wave_mask] \
+                    = interpolate.interp1d(wave_zp, zeropoint, bounds_error=False)(_waves[_wave_mask])
             msgs.warn("Your data extends beyond the bounds of your sensfunc. You should be "
                       "adjusting the par['sensfunc']['extrap_blu'] and/or "
                       "par['sensfunc']['extrap_red'] to extrapolate further and recreate your "
@@ -834,32 +920,31 @@ def get_sensfunc_factor(wave, wave_zp, zeropoint, exptime, tellmodel=None, delta
 
     # This is the S_lam factor required to convert N_lam = counts/sec/Ang to
     # F_lam = 1e-17 erg/s/cm^2/Ang, i.e.  F_lam = S_lam*N_lam
-    sensfunc_obs = Nlam_to_Flam(wave, zeropoint_obs)
-
-    # TODO Telluric corrections via this method are deprecated
-    # Did the user request a telluric correction?
-    if tellmodel is not None:
-        # This assumes there is a separate telluric key in this dict.
-        msgs.warn("Telluric corrections via this method are deprecated")
-        msgs.info('Applying telluric correction')
-        sensfunc_obs = sensfunc_obs * (tellmodel > 1e-10) / (tellmodel + (tellmodel < 1e-10))
+    sensfunc_obs = np.split(Nlam_to_Flam(_waves, zeropoint_obs),
+                            np.cumsum([wave.size for wave in waves])[:-1])
 
     if extinct_correct:
-        if longitude is None or latitude is None:
-            msgs.error('You must specify longitude and latitude if we are extinction correcting')
-        # Apply Extinction if optical bands
+        if extinct is None:
+            if longitude is None or latitude is None:
+                msgs.error('You must specify longitude and latitude if we are extinction '
+                           'correcting')
+            extinct = load_extinction_data(longitude, latitude, extinctfilepar)
         msgs.info("Applying extinction correction")
         msgs.warn("Extinction correction applied only if the spectra covers <10000Ang.")
-        extinct = load_extinction_data(longitude, latitude, extinctfilepar)
-        ext_corr = extinction_correction(wave * units.AA, airmass, extinct)
-        senstot = sensfunc_obs * ext_corr
-    else:
-        senstot = sensfunc_obs.copy()
-
 
-    # senstot is the conversion from N_lam to F_lam, and the division by exptime and delta_wave are to convert
-    # the spectrum in counts/pixel into units of N_lam = counts/sec/angstrom
-    return senstot/exptime/_delta_wave
+    _delta_waves = [None]*len(waves) if delta_waves is None else delta_waves
+    factors = [None]*len(waves)
+    for i, (wave, wave_mask, delta_wave) in enumerate(zip(waves, wave_masks, _delta_waves)):
+        # NOTE: The extinction correction extrapolates the extinction curve
+        # to the limits of each spectrum, so it cannot be batched.
+        senstot = sensfunc_obs[i] * extinction_correction(wave * units.AA, airmass, extinct) \
+                    if extinct_correct else sensfunc_obs[i]
+        # senstot is the conversion from N_lam to F_lam, and the division by
+        # exptime and delta_wave are to convert the spectrum in counts/pixel
+        # into units of N_lam = counts/sec/angstrom
+        factors[i] = senstot/exptime/(wvutils.get_delta_wave(wave, wave_mask)
+                                      if delta_wave is None else delta_wave)
+    return factors
 
 
 def counts2Nlam(wave, counts, counts_ivar, counts_mask, exptime, airmass, longitude, latitude, extinctfilepar):
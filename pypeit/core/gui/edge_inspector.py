@@ -4,7 +4,7 @@ Implements a matplotlib GUI to inspect and interact with the slit edge tracing.
 .. include:: ../include/links.rst
 """
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 from matplotlib import pyplot, widgets
@@ -12,7 +12,7 @@ import numpy as np
 
 from astropy import units, coordinates
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 
 def convert_radec(ra, dec):
@@ -5,7 +5,7 @@ Provide basic mosaicing functions.
 .. include:: ../include/links.rst
 """
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 from scipy import ndimage
@@ -341,3 +341,161 @@ def build_image_mosaic(imgs, tforms, ivar=None, bpm=None, mosaic_shape=None, cva
     return mosaic_data, mosaic_ivar, mosaic_npix, _tforms
 
 
+
+
+def build_mosaic_map(shape, tforms, mosaic_shape=None, order=0):
+    r"""
+    Construct the map used to resample images onto a mosaic.
+
+    The map encapsulates everything in :func:`build_image_mosaic` that only
+    depends on the mosaic geometry, such that it can be constructed once and
+    then applied to any number of images using :func:`apply_mosaic_map`.
+
+    For nearest grid-point interpolation (``order=0``), the map provides the
+    index of the input pixel used for each filled mosaic pixel, such that the
+    mosaic is constructed using a single gather operation.  For higher order
+    interpolations, the map provides the region of the mosaic covered by each
+    image and the transformations to that region, such that the
+    interpolation is restricted to the pixels covered by each image (instead
+    of the full mosaic).
+
+    Args:
+        shape (:obj:`tuple`):
+            A two-tuple with the shape of the images to mosaic.  The shape is
+            assumed to be the same for all images.
+        tforms (:obj:`list` of `numpy.ndarray`_):
+            List of `numpy.ndarray`_ objects with the transformation matrices
+            necessary to convert between image and mosaic coordinates.  See
+            :func:`build_image_mosaic`.
+        mosaic_shape (:obj:`tuple`, optional):
+            Shape for the output image.  If None, the shape is determined by
+            :func:`prepare_mosaic`.
+        order (:obj:`int`, optional):
+            The order of the spline interpolation of each input image onto the
+            mosaic grid.  See :func:`build_image_mosaic`.
+
+    Returns:
+        :obj:`dict`: The map used to construct the mosaic.  The dictionary
+        provides the image and mosaic shapes (``shape``, ``mosaic_shape``), the
+        interpolation ``order``, the transforms adjusted to the mosaic frame
+        (``tforms``), and an integer array with the number of input pixels in
+        each output pixel (``npix``).  For ``order=0``, it also provides, for
+        each image, the flattened indices of the mosaic pixels it fills
+        (``dst``) and of the input pixel used for each (``src``).  Otherwise,
+        it provides the slices of the mosaic that bound each image (``boxes``)
+        and boolean arrays selecting the filled pixels in each box
+        (``filled``).
+    """
+    nimg = len(tforms)
+    if mosaic_shape is None:
+        mosaic_shape, _tforms = prepare_mosaic(shape, tforms)
+    else:
+        _tforms = tforms
+    mosaic_shape = tuple(mosaic_shape)
+
+    msgs.info(f'Constructing the resampling map for an image mosaic with {nimg} images and '
+              f'output shape {mosaic_shape}.')
+
+    mosaic_map = dict(shape=tuple(shape), mosaic_shape=mosaic_shape, order=order,
+                      tforms=np.array(_tforms))
+    mosaic_npix = np.zeros(mosaic_shape, dtype=int)
+    if order == 0:
+        # Transform an image with the flattened index of each pixel to get the
+        # input pixel used for each mosaic pixel.  The indices are exactly
+        # represented by 64-bit floats.
+        npix = np.prod(shape)
+        ndx = np.arange(npix, dtype=float).reshape(shape)
+        dtype = np.int32 if max(npix, np.prod(mosaic_shape)) < np.iinfo(np.int32).max else int
+        src = [None]*nimg
+        dst = [None]*nimg
+        for i in range(nimg):
+            _src = ndimage.affine_transform(ndx, np.linalg.inv(_tforms[i]),
+                                            output_shape=mosaic_shape, cval=-1., order=0)
+            filled = _src > -1
+            mosaic_npix[filled] += 1
+            dst[i] = np.flatnonzero(filled).astype(dtype)
+            src[i] = _src[filled].astype(dtype)
+        mosaic_map['src'] = src
+        mosaic_map['dst'] = dst
+    else:
+        # Find the mosaic pixels filled by each image
+        boxes = [None]*nimg
+        filled = [None]*nimg
+        ones = np.ones(shape, dtype=float)
+        for i in range(nimg):
+            _filled = ndimage.affine_transform(ones, np.linalg.inv(_tforms[i]),
+                                               output_shape=mosaic_shape, cval=-1e20,
+                                               order=order) > -1e20
+            mosaic_npix[_filled] += 1
+            rows = np.where(np.any(_filled, axis=1))[0]
+            cols = np.where(np.any(_filled, axis=0))[0]
+            if rows.size == 0:
+                boxes[i] = (slice(0,0), slice(0,0))
+                filled[i] = np.zeros((0,0), dtype=bool)
+                continue
+            boxes[i] = (slice(rows[0], rows[-1]+1), slice(cols[0], cols[-1]+1))
+            filled[i] = _filled[boxes[i]]
+        mosaic_map['boxes'] = boxes
+        mosaic_map['filled'] = filled
+    mosaic_map['npix'] = mosaic_npix
+    return mosaic_map
+
+
+def apply_mosaic_map(mosaic_map, imgs, cval=0.):
+    """
+    Use a resampling map to construct an image mosaic.
+
+    This is equivalent to calling :func:`build_image_mosaic` without the
+    inverse variance and bad-pixel masks, but the resampling map only needs to
+    be constructed once for a given mosaic geometry.  See the warnings in the
+    documentation of that function for interpolations with ``order > 0``.
+
+    Args:
+        mosaic_map (:obj:`dict`):
+            The resampling map; see :func:`build_mosaic_map`.
+        imgs (:obj:`list`, `numpy.ndarray`_):
+            The images to include in the mosaic, one per transform used to
+            construct the map.  All images must have the shape used to
+            construct the map.
+        cval (:obj:`float`, optional):
+            The value used to fill empty pixels in the mosaic.
+
+    Returns:
+        `numpy.ndarray`_: The mosaic image.
+    """
+    nimg = len(mosaic_map['tforms'])
+    if len(imgs) != nimg:
+        msgs.error('Number of images does not match number of images in the mosaic map.')
+    if any([img.shape != mosaic_map['shape'] for img in imgs]):
+        msgs.error('Shape of the images does not match the shape used to build the mosaic map.')
+
+    mosaic_npix = mosaic_map['npix']
+    mosaic_data = np.zeros(mosaic_npix.shape, dtype=float)
+    if mosaic_map['order'] == 0:
+        # NOTE: Each mosaic pixel is filled by at most one pixel of each image
+        _mosaic_data = mosaic_data.reshape(-1)
+        for i in range(nimg):
+            _mosaic_data[mosaic_map['dst'][i]] += np.ravel(imgs[i])[mosaic_map['src'][i]]
+    else:
+        for i in range(nimg):
+            box = mosaic_map['boxes'][i]
+            if mosaic_map['filled'][i].size == 0:
+                continue
+            # Offset the transform to the corner of the box
+            offset = np.identity(3)
+            offset[:2,2] = [box[0].start, box[1].start]
+            img = imgs[i] if np.issubdtype(imgs[i].dtype, np.floating) \
+                        else imgs[i].astype(float)
+            _tform_img = ndimage.affine_transform(
+                            img, np.linalg.inv(mosaic_map['tforms'][i]) @ offset,
+                            output_shape=mosaic_map['filled'][i].shape, cval=0.,
+                            order=mosaic_map['order'])
+            mosaic_data[box][mosaic_map['filled'][i]] += _tform_img[mosaic_map['filled'][i]]
+
+    if cval != 0:
+        mosaic_data[mosaic_npix == 0] = cval
+    # Average the overlapping pixels
+    overlap = mosaic_npix > 1
+    if np.any(overlap):
+        np.divide(mosaic_data, mosaic_npix, out=mosaic_data, where=overlap)
+    return mosaic_data
@@ -7,7 +7,7 @@ parse module.
 """
 import inspect
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
@@ -4,7 +4,7 @@ Implement principle-component-analysis tools.
 .. include common links, assuming primary doc root is up one directory
 .. include:: ../include/links.rst
 """
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
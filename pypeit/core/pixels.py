@@ -4,7 +4,7 @@
 .. include:: ../include/links.rst
 
 """
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
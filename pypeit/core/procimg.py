@@ -3,7 +3,7 @@
 .. include common links, assuming primary doc root is up one directory
 .. include:: ../include/links.rst
 """
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import warnings
 
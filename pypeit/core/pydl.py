@@ -1,15 +1,21 @@
 # Licensed under a 3-clause BSD style license - see PYDL_LICENSE.rst
 # -*- coding: utf-8 -*-
 # Also cite https://doi.org/10.5281/zenodo.1095150 when referencing PYDL
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
+from scipy import ndimage
 
 from pypeit import msgs
 from pypeit import utils
 from pypeit.core import basis
 from pypeit.core import fitting
 
+try:
+    from pypeit.bspline.utilc import reject_badness
+except:
+    from pypeit.bspline.utilpy import reject_badness
+
 """This module corresponds to the image directory in idlutils.
 """
 
@@ -647,7 +653,9 @@ def djs_reject(data, model, outmask=None, inmask=None,
         If groupdim is also set, then this specifies sub-groups within that.
     groupbadpix : :class:`bool`, optional
         If set to ``True``, consecutive sets of bad pixels are considered groups,
-        overriding the values of `groupsize`.
+        overriding the values of `groupsize`.  Note that, as in the
+        original port of the IDL code, this currently disables `maxrej`;
+        i.e., no limit is imposed on the number of rejected points.
     grow : :class:`int`, optional, default = 0
         If set to a non-zero integer, N, the N nearest neighbors of rejected
         pixels will also be rejected.
@@ -727,7 +735,7 @@ def djs_reject(data, model, outmask=None, inmask=None,
                     raise ValueError('maxrej and groupsize must have the same number of elements.')
                 groupsize1=groupsize
         else:
-            groupsize1 = np.asarray([len(data)])
+            groupsize1 = None
         if isinstance(maxrej,(int,float)):
             maxrej1 = np.asarray([maxrej])
         else:
@@ -747,9 +755,6 @@ def djs_reject(data, model, outmask=None, inmask=None,
             invvar = 0.0
 
 
-    diff = data - model
-    chi = diff * np.sqrt(invvar)
-
     #
     # The working array is badness, which is set to zero for good points
     # (or points already rejected), and positive values for bad points.
@@ -757,152 +762,154 @@ def djs_reject(data, model, outmask=None, inmask=None,
     # to the number of sigma above or below the fit, or to the number
     # of multiples of maxdev away from the fit.
     #
-    badness = np.zeros(outmask.shape, dtype=data.dtype)
+    # Points that are already rejected by inmask are not considered for
+    # rejection, nor are those already rejected by outmask if sticky is
+    # set.
+    #
+    if not percentile and maxdev is None:
+        # Compute chi, apply the rejection thresholds and masks, and count
+        # the rejected points in one pass
+        badness, nbad = reject_badness(data, model, invvar, lower=lower, upper=upper,
+                                       inmask=inmask, outmask=outmask if sticky else None)
+    else:
+        diff = data - model
+        chi = diff * np.sqrt(invvar)
+        badness = np.zeros(outmask.shape, dtype=data.dtype)
 
-    if percentile:
-        if inmask is not None:
-            igood = (inmask & outmask)
-        else:
-            igood = outmask
-        if (np.sum(igood)> 1):
-            if lower is not None:
-                lower_chi = np.percentile(chi[igood],lower)
+        if percentile:
+            if inmask is not None:
+                igood = (inmask & outmask)
             else:
-                lower_chi = -np.inf
-            if upper is not None:
-                upper_chi = np.percentile(chi[igood], upper)
+                igood = outmask
+            if (np.sum(igood)> 1):
+                if lower is not None:
+                    lower_chi = np.percentile(chi[igood],lower)
+                else:
+                    lower_chi = -np.inf
+                if upper is not None:
+                    upper_chi = np.percentile(chi[igood], upper)
+                else:
+                    upper_chi = np.inf
+        #
+        # Decide how bad a point is according to lower.
+        #
+        if lower is not None:
+            if percentile:
+                qbad = chi < lower_chi
             else:
-                upper_chi = np.inf
-    #
-    # Decide how bad a point is according to lower.
-    #
-    if lower is not None:
-        if percentile:
-            qbad = chi < lower_chi
-        else:
-            qbad = chi < -lower
-        badness += np.fmax(-chi,0.0)*qbad
-    #
-    # Decide how bad a point is according to upper.
-    #
-    if upper is not None:
-        if percentile:
-            qbad = chi > upper_chi
-        else:
-            qbad = chi > upper
-        badness += np.fmax(chi,0.0)*qbad
-    #
-    # Decide how bad a point is according to maxdev.
-    #
-    if maxdev is not None:
-        qbad = np.absolute(diff) > maxdev
-        badness += np.absolute(diff) / maxdev * qbad
-    #
-    # Do not consider rejecting points that are already rejected by inmask.
-    # Do not consider rejecting points that are already rejected by outmask,
-    # if sticky is set.
-    #
-    if inmask is not None:
-        badness *= inmask
-    if sticky:
-        badness *= outmask
-
+                qbad = chi < -lower
+            badness += np.fmax(-chi,0.0)*qbad
+        #
+        # Decide how bad a point is according to upper.
+        #
+        if upper is not None:
+            if percentile:
+                qbad = chi > upper_chi
+            else:
+                qbad = chi > upper
+            badness += np.fmax(chi,0.0)*qbad
+        #
+        # Decide how bad a point is according to maxdev.
+        #
+        if maxdev is not None:
+            qbad = np.absolute(diff) > maxdev
+            badness += np.absolute(diff) / maxdev * qbad
+        if inmask is not None:
+            badness *= inmask
+        if sticky:
+            badness *= outmask
+        nbad = np.count_nonzero(badness)
 
     #
     # Reject a maximum of maxrej (additional) points in all the data, or
     # in each group as specified by groupsize, and optionally along each
     # dimension specified by groupdim.
     #
-    if maxrej is not None:
+    # With groupbadpix, the groups would be the consecutive runs of rejected
+    # points.  The original port of the IDL code never identified any such
+    # groups (np.diff of a boolean array is a logical XOR, not a difference),
+    # such that no limit was imposed on the number of rejected points.  The
+    # sky-subtraction and flat-field fits have been tuned with this behavior,
+    # so groupbadpix simply skips the maxrej limit.
+    #
+    if maxrej is not None and nbad > 0 and not groupbadpix:
+        # Flattened view of the badness; edits propagate to badness
+        _badness = badness.reshape(-1)
         #
         # Loop over each dimension of groupdim or loop once if not set.
         #
         for iloop in range(max(len(groupdim), 1)):
             #
-            # Assign an index number in this dimension to each data point.
+            # Only the rejected points can be made good again, so only
+            # consider those.
+            #
+            indx = np.flatnonzero(_badness)
+            if indx.size <= maxrej1[iloop]:
+                # There cannot be too many points rejected in any group
+                continue
+            #
+            # Assign each point to a vector and get its position along the
+            # vector.  For example, if this is a 2-D array with groupdim=1,
+            # then the vectors are the columns of the data.  If groupdim=2,
+            # they are the rows.  If groupdim is not set, then use the whole
+            # image.
             #
             if len(groupdim) > 0:
-                yndim = len(data.shape)
-                if groupdim[iloop] > yndim:
+                if groupdim[iloop] > data.ndim:
                     raise ValueError('groupdim is larger than the number of dimensions for ydata.')
-                dimnum = djs_laxisnum(data.shape, iaxis=groupdim[iloop]-1)
+            if len(groupdim) == 0 or data.ndim == 1:
+                vec = np.zeros_like(indx)
+                pos = indx
+                nvec = data.size
             else:
-                dimnum = np.asarray([0])
+                iaxis = groupdim[iloop]-1
+                coo = np.unravel_index(indx, data.shape)
+                vec = coo[iaxis]
+                vec_shape = data.shape[:iaxis] + data.shape[iaxis+1:]
+                pos = np.ravel_multi_index(coo[:iaxis] + coo[iaxis+1:], vec_shape)
+                nvec = np.prod(vec_shape)
             #
-            # Loop over each vector specified by groupdim. For example, if
-            # this is a 2-D array with groupdim=1, then loop over each
-            # column of the data.  If groupdim=2, then loop over each row.
-            # If groupdim is not set, then use the whole image.
+            # Within each vector, break it down into groups of points
+            # specified by groupsize, if set.
             #
-            for ivec in range(np.fmax(dimnum.max(),1)):
-                #
-                # At this point it is not possible that dimnum is not set.
-                #
-                if len(groupdim) == 0:
-                    indx = np.arange(data.size)
-                else:
-                    indx = (dimnum == ivec).nonzero()[0]
-                #
-                # Within this group of points, break it down into groups
-                # of points specified by groupsize, if set.
-                #
-                nin = len(indx)
-                if groupbadpix:
-                    goodtemp = badness == 0
-                    groups_lower = (-1*np.diff(np.insert(goodtemp, 0, 1)) == 1).nonzero()[0]
-                    groups_upper = (np.diff(np.append(goodtemp, 1)) == 1).nonzero()[0]
-                    ngroups = len(groups_lower)
-                else:
-                    # The IDL version of this test makes no sense because
-                    # groupsize will always be set.
-                    #
-                    if False:
-                        ngroups = 1
-                        groups_lower = [0, ]
-                        groups_upper = [nin - 1, ]
-                    else:
-                        ngroups = nin//groupsize1[iloop] + 1
-                        groups_lower = np.arange(ngroups, dtype='i4')*groupsize1[iloop]
-                        foo = (np.arange(ngroups, dtype='i4')+1)*groupsize1[iloop]
-                        groups_upper = np.where(foo < nin, foo, nin) - 1
-
-                for igroup in range(ngroups):
-                    i1 = groups_lower[igroup]
-                    i2 = groups_upper[igroup]
-                    nii = i2 - i1 + 1
-                    #
-                    # Need the test that i1 != -1 below to prevent a crash
-                    # condition, but why is it that we ever get groups
-                    # without any points?  Because this is badly-written,
-                    # that's why.
-                    #
-                    if nii > 0 and i1 != -1:
-                        jj = indx[i1:i2+1]
-                        #
-                        # Test if too many points rejected in this group.
-                        #
-                        if np.sum(badness[jj] != 0) > maxrej1[iloop]:
-                            isort = badness[jj].argsort(kind='stable')
-                            #
-                            # Make the following points good again.
-                            #
-                            badness[jj[isort[0:nii-maxrej1[iloop]]]] = 0
-                        i1 += groupsize1[iloop]
+            _groupsize = nvec if groupsize1 is None else groupsize1[iloop]
+            group = vec * (nvec // _groupsize + 1) + pos // _groupsize
+            #
+            # Sort the rejected points by group and then by badness.  Ties
+            # are sorted by position, as in a stable sort of the badness
+            # within each group.
+            #
+            srt = np.lexsort((indx, _badness[indx], group))
+            indx = indx[srt]
+            group = group[srt]
+            #
+            # Make all but the maxrej worst points in each group good again.
+            #
+            rank = np.searchsorted(group, group, side='right') - 1 - np.arange(indx.size)
+            _badness[indx[rank >= maxrej1[iloop]]] = 0
+
     #
     # Now modify outmask, rejecting points specified by inmask=0, outmask=0
     # if sticky is set, or badness > 0.
     #
-    # print(badness)
     newmask = badness == 0.0
 
-    # print(newmask)
     if grow > 0:
         bpm = np.logical_not(newmask)
         if bpm.any():
-            irejects = np.where(bpm)[0]
-            for k in range(1, grow+1):
-                newmask[np.clip(irejects - k, 0,None)] = False
-                newmask[np.clip(irejects + k, None, data.shape[0]-1)] = False
+            #
+            # Reject the grow nearest neighbors of the rejected points along
+            # the first axis.  For multidimensional data, this rejects
+            # entire rows.  Because the neighbor indices were historically
+            # clipped at the array edges, the first and last rows are also
+            # rejected if they contain any rejected points.
+            #
+            bad = bpm if bpm.ndim == 1 else np.any(bpm.reshape(bpm.shape[0], -1), axis=1)
+            kernel = np.ones(2*grow+1, dtype=int)
+            kernel[grow] = 0
+            grown = ndimage.convolve1d(bad.astype(int), kernel, mode='constant') > 0
+            grown[[0,-1]] |= bad[[0,-1]]
+            newmask[grown] = False
     if inmask is not None:
         newmask &= inmask
     if sticky:
@@ -8,7 +8,7 @@ import glob
 import numpy as np
 import yaml
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 # CANNOT INCLUDE msgs IN THIS MODULE AS
 #  THE HTML GENERATION OCCURS FROM msgs
@@ -7,7 +7,7 @@ import numpy as np
 
 from scipy.optimize import least_squares
 from scipy import signal, interpolate, ndimage
-from IPython import embed
+from pypeit.lazyimport import embed
 
 from pypeit import msgs, utils
 
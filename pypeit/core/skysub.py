@@ -11,12 +11,12 @@ from scipy.interpolate import RegularGridInterpolator
 
 import matplotlib.pyplot as plt
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 from pypeit.core import basis, pixels, extract
 from pypeit.core import fitting
 from pypeit.core import procimg
-from pypeit import msgs, utils, bspline, slittrace
+from pypeit import msgs, utils, bspline, slittrace, specobjs
 from pypeit.display import display
 
 def skysub_npoly(thismask):
@@ -209,10 +209,8 @@ def global_skysub(image, ivar, tilts, thismask, slit_left, slit_righ, inmask=Non
                                         kwargs_bspline={'bkspace': bsp},
                                         kwargs_reject={'groupbadpix': False, 'maxrej': 10})
 
-    sky_frame = np.zeros_like(image)
     ythis = np.zeros_like(yfit)
     ythis[isrt] = yfit
-    sky_frame[thismask] = ythis
 
 
     #skyset.funcname ='legendre'
@@ -248,6 +246,168 @@ def global_skysub(image, ivar, tilts, thismask, slit_left, slit_righ, inmask=Non
     return ythis
 
 
+def _slit_global_skysub(item, image=None, ivar=None, tilts=None, slitmask=None, gpm=None,
+                        **kwargs):
+    """
+    Run :func:`global_skysub` for a single slit.
+
+    This is the worker function used by :func:`global_skysub_slits`.  The item
+    is a tuple with the slit ID and the left and right edges of the slit.
+    Returns None if there are no good pixels in the slit.
+    """
+    slitid, slit_left, slit_righ = item
+    thismask = slitmask == slitid
+    inmask = gpm & thismask
+    if not np.any(inmask):
+        return None
+    return global_skysub(image, ivar, tilts, thismask, slit_left, slit_righ, inmask=inmask,
+                         **kwargs)
+
+
+def global_skysub_slits(image, ivar, tilts, slitmask, gpm, slitids, slit_left, slit_righ,
+                        n_proc=1, **kwargs):
+    """
+    Perform global sky subtraction for a set of slits, optionally distributing
+    the slits among a pool of worker processes.
+
+    Each slit is independently fit using :func:`global_skysub`.  When ``n_proc
+    > 1``, the images are shared with (not sent to) each worker when it is
+    started, and only the sky model for the pixels in each slit is returned.
+
+    Args:
+        image (`numpy.ndarray`_):
+            Frame to be sky subtracted.
+        ivar (`numpy.ndarray`_):
+            Inverse variance image.
+        tilts (`numpy.ndarray`_):
+            Spectral tilts.
+        slitmask (`numpy.ndarray`_):
+            Image identifying the slit associated with each pixel; see
+            :func:`~pypeit.slittrace.SlitTraceSet.slit_img`.
+        gpm (`numpy.ndarray`_):
+            Good-pixel mask for the full image, including any masking of
+            objects.  The mask used for the fit to each slit is ``gpm &
+            (slitmask == slitid)``.
+        slitids (array-like):
+            The IDs of the slits to fit.
+        slit_left (`numpy.ndarray`_):
+            Left edges of the slits, with shape ``(nspec, len(slitids))``.
+        slit_righ (`numpy.ndarray`_):
+            Right edges of the slits, with shape ``(nspec, len(slitids))``.
+        n_proc (:obj:`int`, optional):
+            Number of processes to use.  Ignored (set to 1) if ``show_fit``
+            is True.
+        **kwargs:
+            Passed directly to :func:`global_skysub`.
+
+    Yields:
+        `numpy.ndarray`_: For each slit, in the order of ``slitids``, the
+        model sky at the pixels in the slit, or None if the slit has no good
+        pixels.
+    """
+    if n_proc > 1 and kwargs.get('show_fit', False):
+        msgs.warn('Cannot show sky fits when fitting slits in parallel; using one process.')
+        n_proc = 1
+    items = [(slitid, slit_left[:,i], slit_righ[:,i]) for i, slitid in enumerate(slitids)]
+    if n_proc > 1:
+        msgs.info(f'Global sky subtraction for {len(items)} slits using {n_proc} processes.')
+    shared = dict(image=image, ivar=ivar, tilts=tilts, slitmask=slitmask, gpm=gpm, **kwargs)
+    yield from utils.parallel_map(_slit_global_skysub, items, n_proc=min(n_proc, len(items)),
+                                  shared=shared)
+
+
+def _chunk_global_skysub(item, image=None, ivar=None, tilts=None, thismask=None,
+                         slit_left=None, slit_righ=None, inmask=None, **kwargs):
+    """
+    Fit the global sky model in one spectral chunk of the data.
+
+    This is the worker function used by :func:`global_skysub_chunked`.  The
+    item is a tuple with the lower and upper limits of the chunk in spectral
+    pixels and the margin added to both ends of the chunk for the fit.  The
+    model sky is returned only for the pixels within the chunk limits.
+    """
+    lo, hi, margin = item
+    piximg = tilts * (image.shape[0]-1)
+    fitmask = thismask & (piximg >= lo - margin) & (piximg < hi + margin)
+    if not np.any(fitmask):
+        return np.zeros(0, dtype=image.dtype)
+    sky = global_skysub(image, ivar, tilts, fitmask, slit_left, slit_righ, inmask=inmask,
+                        **kwargs)
+    pix = piximg[fitmask]
+    return sky[(pix >= lo) & (pix < hi)]
+
+
+def global_skysub_chunked(image, ivar, tilts, thismask, slit_left, slit_righ, nchunk=1,
+                          overlap=50, n_proc=1, **kwargs):
+    """
+    Perform a global sky subtraction in overlapping spectral chunks.
+
+    The b-spline sky model is fit separately in ``nchunk`` spectral ranges of
+    equal size using :func:`global_skysub`, such that only the pixels in one
+    chunk (plus its margins) are used in each fit.  This limits the memory
+    required by fits with very many pixels, such as the joint fit to all the
+    slits of an IFU, and allows the chunks to be fit in parallel.  The fit for
+    each chunk extends by ``overlap`` break points beyond both ends of the
+    chunk, but the model is only kept within the chunk.  Because the
+    b-spline solution is local, the result is nearly identical to a single
+    fit; however, the pixel rejection is performed independently for each
+    chunk.
+
+    Args:
+        image (`numpy.ndarray`_):
+            Frame to be sky subtracted.
+        ivar (`numpy.ndarray`_):
+            Inverse variance image.
+        tilts (`numpy.ndarray`_):
+            Tilts (or scaled wavelengths) used as the spectral coordinate.
+        thismask (`numpy.ndarray`_):
+            Boolean image selecting the pixels to fit.
+        slit_left (`numpy.ndarray`_):
+            Left slit boundaries; see :func:`global_skysub`.
+        slit_righ (`numpy.ndarray`_):
+            Right slit boundaries; see :func:`global_skysub`.
+        nchunk (:obj:`int`, optional):
+            Number of spectral chunks.  If less than 2, this simply calls
+            :func:`global_skysub`.
+        overlap (:obj:`int`, optional):
+            Number of break points by which the fit for each chunk extends
+            beyond its limits.
+        n_proc (:obj:`int`, optional):
+            Number of processes used to fit the chunks.  Ignored (set to 1)
+            if ``show_fit`` is True.
+        **kwargs:
+            Passed directly to :func:`global_skysub`.
+
+    Returns:
+        `numpy.ndarray`_: The model sky at the pixels where ``thismask`` is
+        True.
+    """
+    if nchunk < 2:
+        return global_skysub(image, ivar, tilts, thismask, slit_left, slit_righ, **kwargs)
+
+    if n_proc > 1 and kwargs.get('show_fit', False):
+        msgs.warn('Cannot show sky fits when fitting chunks in parallel; using one process.')
+        n_proc = 1
+    # Use the same polynomial order for all chunks
+    if not kwargs.get('no_poly', False) and kwargs.get('npoly') is None:
+        kwargs['npoly'] = skysub_npoly(thismask)
+
+    piximg = tilts[thismask] * (image.shape[0]-1)
+    edges = np.linspace(piximg.min(), piximg.max(), nchunk+1)
+    edges[0], edges[-1] = -np.inf, np.inf
+    margin = overlap * kwargs.get('bsp', 0.6)
+    items = [(lo, hi, margin) for lo, hi in zip(edges[:-1], edges[1:])]
+    msgs.info(f'Fitting global sky in {nchunk} spectral chunks.')
+
+    sky = np.zeros(piximg.size, dtype=image.dtype)
+    shared = dict(image=image, ivar=ivar, tilts=tilts, thismask=thismask, slit_left=slit_left,
+                  slit_righ=slit_righ, **kwargs)
+    for (lo, hi, _), chunk_sky in zip(items, utils.parallel_map(_chunk_global_skysub, items,
+                                                                n_proc=n_proc, shared=shared)):
+        sky[(piximg >= lo) & (piximg < hi)] = chunk_sky
+    return sky
+
+
 def skyoptimal(piximg, data, ivar, oprof, sigrej=3.0, npoly=1, spatial_img=None, fullbkpt=None):
     """
     Utility routine used by local_skysub_extract that performs the joint b-spline fit for sky-background
@@ -788,14 +948,19 @@ def local_skysub_extract(sciimg, sciivar, tilts, waveimg, global_sky, thismask,
     outmask = np.copy(inmask)  # True is good
 
     # TODO Add a line of code here that updates the modelivar using the global sky if nobj = 0 and simply returns
-    spat_img = np.outer(np.ones(nspec), np.arange(nspat))
     if spat_pix is None:
-        spat_pix = spat_img
+        spat_pix = np.outer(np.ones(nspec), np.arange(nspat))
 
     xsize = slit_righ - slit_left
-    # TODO Can this be simply replaced with spat_img above (but not spat_pix since that could have holes)
+    # TODO Can this be simply replaced with an image of the pixel column (but not spat_pix since that could have holes)
     spatial_img = thismask * ximg * (np.outer(xsize, np.ones(nspat)))
 
+    # Spatial extent of the slit
+    scope = np.sum(thismask, axis=0)
+    iscp, = np.where(scope)
+    imin = iscp.min()
+    imax = iscp.max()
+
     # First, we find all groups of objects to local skysubtract together
     groups = sobjs.get_extraction_groups(model_full_slit=model_full_slit)
 
@@ -813,28 +978,31 @@ def local_skysub_extract(sciimg, sciivar, tilts, waveimg, global_sky, thismask,
             min_spat1 = np.maximum(np.amin(left_edges, axis=0), slit_left)
             max_spat1 = np.minimum(np.amax(righ_edges, axis=0), slit_righ)
 
-        # Create the local mask which defines the pixels that will be updated by local sky subtraction
-        min_spat_img = min_spat1[:, None]
-        max_spat_img = max_spat1[:, None]
-        localmask = (spat_img > min_spat_img) & (spat_img < max_spat_img) & thismask
-        if np.sum(localmask) == 0:
-            msgs.error('There are no pixels on the localmask for group={}. '
-                       'Something is very wrong with either your slit edges or your object traces'.format(group))
-        npoly = skysub_npoly(localmask)
-
-        # Some bookeeping to define the sub-image and make sure it does not land off the mask
+        # Some bookeeping to define the sub-image and make sure it does not land off the mask.  All
+        # of the sky and object modeling for this group is performed within this sub-image.
         objwork = len(group)
-        scope = np.sum(thismask, axis=0)
-        iscp, = np.where(scope)
-        imin = iscp.min()
-        imax = iscp.max()
         min_spat = np.fmax(np.floor(min(min_spat1)), imin)
         max_spat = np.fmin(np.ceil(max(max_spat1)), imax)
         nc = int(max_spat - min_spat + 1)
         spec_vec = np.arange(nspec, dtype=int) #np.intp)
         spat_vec = np.arange(min_spat, min_spat + nc, dtype=int) #np.intp)
         ipix = np.ix_(spec_vec, spat_vec)
-        obj_profiles = np.zeros((nspec, nspat, objwork), dtype=float)
+        sub = np.s_[:,int(min_spat):int(min_spat)+max(nc,0)]
+
+        # Create the local mask which defines the pixels that will be updated by local sky
+        # subtraction.  The local mask is always within the sub-image.
+        localmask = (spat_vec[None,:] > min_spat1[:,None]) & (spat_vec[None,:] < max_spat1[:,None]) \
+                        & thismask[sub]
+        if np.sum(localmask) == 0:
+            msgs.error('There are no pixels on the localmask for group={}. '
+                       'Something is very wrong with either your slit edges or your object traces'.format(group))
+        npoly = skysub_npoly(localmask)
+        # Image coordinates of the pixels in the local mask
+        ispec, ispat = np.where(localmask)
+        isub = (ispec, ispat + int(min_spat))
+
+        # The object profiles are only non-zero within the sub-image
+        obj_profiles = np.zeros((nspec, nc, objwork), dtype=float)
         sigrej_eff = sigrej
         for iiter in range(1, niter + 1):
             msgs.info('--------------------------REDUCING: Iteration # ' + '{:2d}'.format(iiter) + ' of ' +
@@ -851,7 +1019,7 @@ def local_skysub_extract(sciimg, sciivar, tilts, waveimg, global_sky, thismask,
                     msgs.info("------------------------------------------------------------------------------------------------------------")
 
                     # TODO -- Use extract_specobj_boxcar to avoid code duplication
-                    extract.extract_boxcar(sciimg-skyimage, modelivar, outmask, waveimg, skyimage,
+                    extract.extract_boxcar(img_minsky, modelivar, outmask, waveimg, skyimage,
                                            sobjs[iobj], fwhmimg=fwhmimg, base_var=base_var, count_scale=count_scale,
                                            noise_floor=adderr)
                     flux = sobjs[iobj].BOX_COUNTS
@@ -860,17 +1028,16 @@ def local_skysub_extract(sciimg, sciivar, tilts, waveimg, global_sky, thismask,
                 else:
                     # For later iterations, profile fitting is based on an optimal extraction
                     last_profile = obj_profiles[:, :, ii]
-                    trace = sobjs[iobj].TRACE_SPAT[:, None]
-                    objmask = ((spat_img >= (trace - 2.0 * sobjs[iobj].BOX_RADIUS)) & (spat_img <= (trace + 2.0 * sobjs[iobj].BOX_RADIUS)))
+                    objmask = extract.aperture_mask(outmask, sobjs[iobj].TRACE_SPAT, 2.0 * sobjs[iobj].BOX_RADIUS)
                     # Boxcar
-                    extract.extract_boxcar(sciimg-skyimage, modelivar, (outmask & objmask), waveimg,
+                    extract.extract_boxcar(img_minsky, modelivar, objmask, waveimg,
                                            skyimage, sobjs[iobj], fwhmimg=fwhmimg, flatimg=flatimg, base_var=base_var,
                                            count_scale=count_scale, noise_floor=adderr)
                     # Optimal
-                    extract.extract_optimal(sciimg-skyimage, modelivar, (outmask & objmask), waveimg,
+                    extract.extract_optimal(img_minsky, modelivar, objmask, waveimg,
                                             skyimage, thismask, last_profile, sobjs[iobj],
                                             fwhmimg=fwhmimg, flatimg=flatimg, base_var=base_var, count_scale=count_scale,
-                                            noise_floor=adderr)
+                                            noise_floor=adderr, spat_start=int(min_spat))
                     # If the extraction is bad do not update
                     if sobjs[iobj].OPT_MASK is not None:
                         # if there is only one good pixel `extract.fit_profile` fails
@@ -884,12 +1051,12 @@ def local_skysub_extract(sciimg, sciivar, tilts, waveimg, global_sky, thismask,
                     sign = sobjs[iobj].sign
                     # TODO This is "sticky" masking. Do we want it to be?
                     profile_model, trace_new, fwhmfit, med_sn2 = extract.fit_profile(
-                        sign*img_minsky[ipix], (modelivar * outmask)[ipix],waveimg[ipix], thismask[ipix], spat_pix[ipix], sobjs[iobj].TRACE_SPAT,
+                        sign*img_minsky[ipix], modelivar[ipix] * outmask[ipix], waveimg[ipix], thismask[ipix], spat_pix[ipix], sobjs[iobj].TRACE_SPAT,
                         wave, sign*flux, fluxivar, inmask = outmask[ipix],
                         thisfwhm=sobjs[iobj].FWHM, prof_nsigma=sobjs[iobj].prof_nsigma, sn_gauss=sn_gauss, gauss=force_gauss, obj_string=obj_string,
                         show_profile=show_profile)
                     # Update the object profile and the fwhm and mask parameters
-                    obj_profiles[ipix[0], ipix[1], ii] = profile_model
+                    obj_profiles[:, :, ii] = profile_model
                     sobjs[iobj].TRACE_SPAT = trace_new
                     sobjs[iobj].FWHMFIT = fwhmfit
                     sobjs[iobj].FWHM = np.median(fwhmfit)
@@ -910,17 +1077,15 @@ def local_skysub_extract(sciimg, sciivar, tilts, waveimg, global_sky, thismask,
             iterbsp = 0
             while (not sky_bmodel.any()) & (iterbsp <= 4) & (not no_local_sky):
                 bsp_now = (1.2 ** iterbsp) * bsp
-                fullbkpt = optimal_bkpts(bkpts_optimal, bsp_now, piximg, localmask, debug=(debug_bkpts & (iiter == niter)),
-                                         skyimage=skyimage, min_spat=min_spat, max_spat=max_spat)
+                fullbkpt = optimal_bkpts(bkpts_optimal, bsp_now, piximg[sub], localmask, debug=(debug_bkpts & (iiter == niter)),
+                                         skyimage=skyimage[sub], min_spat=min_spat, max_spat=max_spat)
                 # check to see if only a subset of the image is used.
                 # if so truncate input pixels since this can result in singular matrices
-                isub, = np.where(localmask.flatten())
                 #sortpix = (piximg.flat[isub]).argsort()
-                obj_profiles_flat = obj_profiles.reshape(nspec * nspat, objwork)
-                skymask = outmask & np.logical_not(edgmask)
+                skymask = outmask[sub] & np.logical_not(edgmask[sub])
                 sky_bmodel, obj_bmodel, outmask_opt = skyoptimal(
-                        piximg.flat[isub], sciimg.flat[isub], (modelivar * skymask).flat[isub],
-                        obj_profiles_flat[isub, :], spatial_img=spatial_img.flat[isub],
+                        piximg[isub], sciimg[isub], modelivar[isub] * skymask[localmask],
+                        obj_profiles[localmask], spatial_img=spatial_img[isub],
                         fullbkpt=fullbkpt, sigrej=sigrej_eff, npoly=npoly)
                 iterbsp = iterbsp + 1
                 if (not sky_bmodel.any()) & (iterbsp <= 3):
@@ -932,25 +1097,27 @@ def local_skysub_extract(sciimg, sciivar, tilts, waveimg, global_sky, thismask,
                     msgs.warn('***************************************')
 
             if sky_bmodel.any():
-                skyimage.flat[isub] = sky_bmodel
-                objimage.flat[isub] = obj_bmodel
-                img_minsky.flat[isub] = sciimg.flat[isub] - sky_bmodel
-                igood1 = skymask.flat[isub]
+                skyimage[isub] = sky_bmodel
+                objimage[isub] = obj_bmodel
+                img_minsky[isub] = sciimg[isub] - sky_bmodel
+                igood1 = skymask[localmask]
+                isub_good1 = (isub[0][igood1], isub[1][igood1])
                 #  update the outmask for only those pixels that were fit. This prevents masking of slit edges in outmask
-                outmask.flat[isub[igood1]] = outmask_opt[igood1]
+                outmask[isub_good1] = outmask_opt[igood1]
                 #  For weighted co-adds, the variance of the image is no longer equal to the image, and so the modelivar
                 #  eqn. below is not valid. However, co-adds already have the model noise propagated correctly in sciivar,
                 #  so no need to re-model the variance.
                 if model_noise:
-                    _base_var = None if base_var is None else base_var.flat[isub]
-                    _count_scale = None if count_scale is None else count_scale.flat[isub]
+                    _base_var = None if base_var is None else base_var[isub]
+                    _count_scale = count_scale[isub] if isinstance(count_scale, np.ndarray) \
+                                        else count_scale
                     # NOTE: darkcurr must be a float for the call below to work.
                     var = procimg.variance_model(_base_var, counts=sky_bmodel+obj_bmodel,
                                                  count_scale=_count_scale, noise_floor=adderr)
-                    modelivar.flat[isub] = utils.inverse(var)
+                    modelivar[isub] = utils.inverse(var)
                 # Now do some masking based on this round of model fits
-                chi2 = (img_minsky.flat[isub] - obj_bmodel) ** 2 * modelivar.flat[isub]
-                igood = (skymask.flat[isub]) & (chi2 <= chi2_sigrej ** 2)
+                chi2 = (img_minsky[isub] - obj_bmodel) ** 2 * modelivar[isub]
+                igood = igood1 & (chi2 <= chi2_sigrej ** 2)
                 ngd = np.sum(igood)
                 if ngd > 0:
                     chi2_good = chi2[igood]
@@ -965,9 +1132,9 @@ def local_skysub_extract(sciimg, sciivar, tilts, waveimg, global_sky, thismask,
                               ', use threshold sigrej_eff = {:5.2f}'.format(sigrej_eff))
                     # Explicitly mask > sigrej outliers using the distribution of chi2 but only in the region that was actually fit.
                     # This prevents e.g. excessive masking of slit edges
-                    outmask.flat[isub[igood1]] = outmask.flat[isub[igood1]] & (chi2[igood1] < chi2_sigrej) & (
-                                sciivar.flat[isub[igood1]] > 0.0)
-                    nrej = outmask.flat[isub[igood1]].sum()
+                    outmask[isub_good1] = outmask[isub_good1] & (chi2[igood1] < chi2_sigrej) & (
+                                sciivar[isub_good1] > 0.0)
+                    nrej = outmask[isub_good1].sum()
                     msgs.info(
                         'Iteration = {:d}'.format(iiter) + ', rejected {:d}'.format(nrej) + ' of ' + '{:d}'.format(
                             igood1.sum()) + ' fit pixels')
@@ -977,9 +1144,8 @@ def local_skysub_extract(sciimg, sciivar, tilts, waveimg, global_sky, thismask,
                 msgs.warn('ERROR: Bspline sky subtraction failed after 4 iterations of bkpt spacing')
                 msgs.warn('       Moving on......')
                 # obj_profiles = np.zeros_like(obj_profiles)
-                isub, = np.where(localmask.flatten())
                 # Just replace with the global sky
-                skyimage.flat[isub] = global_sky.flat[isub]
+                skyimage[isub] = global_sky[isub]
                 if iiter == niter:
                     msgs.warn('WARNING: LOCAL SKY SUBTRACTION NOT PERFORMED')
 
@@ -990,6 +1156,8 @@ def local_skysub_extract(sciimg, sciivar, tilts, waveimg, global_sky, thismask,
 
         # get the global sky model for the extraction
         extract_sky = skyimage if bkg_redux_skyimage is None else bkg_redux_skyimage
+        img_minsky = sciimg - skyimage
+        ivar_extract = modelivar * thismask
 
         for ii in range(objwork):
             iobj = group[ii]
@@ -997,22 +1165,19 @@ def local_skysub_extract(sciimg, sciivar, tilts, waveimg, global_sky, thismask,
                       ' with objid = {:d}'.format(sobjs[iobj].OBJID) + ' on slit # {:d}'.format(sobjs[iobj].slit_order) +
                       ' at x = {:5.2f}'.format(sobjs[iobj].SPAT_PIXPOS))
             this_profile = obj_profiles[:, :, ii]
-            trace = sobjs[iobj].TRACE_SPAT[:, None]
+            objmask = extract.aperture_mask(outmask_extract, sobjs[iobj].TRACE_SPAT, 2.0 * sobjs[iobj].BOX_RADIUS)
             # Optimal
-            objmask = ((spat_img >= (trace - 2.0 * sobjs[iobj].BOX_RADIUS)) & (spat_img <= (trace + 2.0 * sobjs[iobj].BOX_RADIUS)))
-            extract.extract_optimal(sciimg-skyimage, modelivar * thismask, (outmask_extract & objmask),
-                                    waveimg, extract_sky, thismask, this_profile, sobjs[iobj],
-                                    fwhmimg=fwhmimg, flatimg=flatimg, base_var=base_var, count_scale=count_scale,
-                                    noise_floor=adderr)
+            extract.extract_optimal(img_minsky, ivar_extract, objmask, waveimg, extract_sky, thismask,
+                                    this_profile, sobjs[iobj], fwhmimg=fwhmimg, flatimg=flatimg,
+                                    base_var=base_var, count_scale=count_scale, noise_floor=adderr,
+                                    spat_start=int(min_spat))
             # Boxcar
-            extract.extract_boxcar(sciimg-skyimage, modelivar*thismask, (outmask_extract & objmask),
-                                   waveimg, extract_sky, sobjs[iobj],
+            extract.extract_boxcar(img_minsky, ivar_extract, objmask, waveimg, extract_sky, sobjs[iobj],
                                    fwhmimg=fwhmimg, flatimg=flatimg, base_var=base_var,
                                    count_scale=count_scale, noise_floor=adderr)
             sobjs[iobj].min_spat = min_spat
             sobjs[iobj].max_spat = max_spat
 
-
     # If requested display the model fits for this slit
     if show_resids:
         viewer, ch = display.show_image((sciimg - skyimage - objimage) * np.sqrt(modelivar) * thismask, chname='residuals')
@@ -1056,6 +1221,93 @@ def local_skysub_extract(sciimg, sciivar, tilts, waveimg, global_sky, thismask,
         objimage[thismask], modelivar[thismask], outmask[thismask]
 
 
+def _slit_local_skysub_extract(item, sciimg=None, sciivar=None, tilts=None, waveimg=None,
+                               global_sky=None, slitmask=None, gpm=None, **kwargs):
+    """
+    Run :func:`local_skysub_extract` for a single slit.
+
+    This is the worker function used by :func:`local_skysub_extract_slits`.
+    The item is a tuple with the slit ID, the left and right edges of the
+    slit, and the array of :class:`~pypeit.specobj.SpecObj` objects in the
+    slit.  The output of :func:`local_skysub_extract` is returned together
+    with the (updated) array of objects.
+    """
+    slitid, slit_left, slit_righ, slit_sobjs = item
+    thismask = slitmask == slitid
+    return local_skysub_extract(sciimg, sciivar, tilts, waveimg, global_sky, thismask,
+                                slit_left, slit_righ, specobjs.SpecObjs(specobjs=slit_sobjs),
+                                ingpm=gpm & thismask, **kwargs) + (slit_sobjs,)
+
+
+def local_skysub_extract_slits(sciimg, sciivar, tilts, waveimg, global_sky, slitmask, gpm,
+                               slitids, slit_left, slit_righ, sobjs, n_proc=1, **kwargs):
+    """
+    Perform local sky subtraction and extraction for a set of slits,
+    optionally distributing the slits among a pool of worker processes.
+
+    Each slit is independently processed using :func:`local_skysub_extract`.
+    When ``n_proc > 1``, the images are shared with (not sent to) each worker
+    when it is started; only the slit edges and the objects in each slit are
+    sent with each task.  Because the objects are then modified by the
+    workers and not in the calling process, the caller must copy the returned
+    objects back into its :class:`~pypeit.specobjs.SpecObjs` object.
+
+    Args:
+        sciimg (`numpy.ndarray`_):
+            Science image.
+        sciivar (`numpy.ndarray`_):
+            Inverse variance of the science image.
+        tilts (`numpy.ndarray`_):
+            Spectral tilts.
+        waveimg (`numpy.ndarray`_):
+            Wavelength image.
+        global_sky (`numpy.ndarray`_):
+            Global sky model.
+        slitmask (`numpy.ndarray`_):
+            Image identifying the slit associated with each pixel; see
+            :func:`~pypeit.slittrace.SlitTraceSet.slit_img`.
+        gpm (`numpy.ndarray`_):
+            Good-pixel mask for the full image.  The mask for each slit is
+            ``gpm & (slitmask == slitid)``.
+        slitids (array-like):
+            The IDs of the slits to process.
+        slit_left (`numpy.ndarray`_):
+            Left edges of the slits to process, with shape ``(nspec,
+            len(slitids))``.
+        slit_righ (`numpy.ndarray`_):
+            Right edges of the slits to process, with shape ``(nspec,
+            len(slitids))``.
+        sobjs (:class:`~pypeit.specobjs.SpecObjs`):
+            Objects to extract.  Objects are selected for each slit using
+            their ``SLITID``.
+        n_proc (:obj:`int`, optional):
+            Number of processes to use.  Interactive plots require the slits
+            to be processed serially, such that ``n_proc`` is ignored if
+            ``show_profile``, ``show_resids``, or ``debug_bkpts`` are True.
+        **kwargs:
+            Passed directly to :func:`local_skysub_extract`.
+
+    Yields:
+        :obj:`tuple`: For each slit, in the order of ``slitids``, the five
+        objects returned by :func:`local_skysub_extract` followed by the
+        `numpy.ndarray`_ of :class:`~pypeit.specobj.SpecObj` objects in the
+        slit with their extraction results.
+    """
+    if n_proc > 1 and any(kwargs.get(k, False)
+                          for k in ['show_profile', 'show_resids', 'debug_bkpts']):
+        msgs.warn('Cannot show plots when extracting slits in parallel; using one process.')
+        n_proc = 1
+    items = [(slitid, slit_left[:,i], slit_righ[:,i], sobjs[sobjs.SLITID == slitid].specobjs)
+                for i, slitid in enumerate(slitids)]
+    if n_proc > 1:
+        msgs.info(f'Local sky subtraction and extraction for {len(items)} slits using '
+                  f'{n_proc} processes.')
+    shared = dict(sciimg=sciimg, sciivar=sciivar, tilts=tilts, waveimg=waveimg,
+                  global_sky=global_sky, slitmask=slitmask, gpm=gpm, **kwargs)
+    yield from utils.parallel_map(_slit_local_skysub_extract, items,
+                                  n_proc=min(n_proc, len(items)), shared=shared)
+
+
 def ech_local_skysub_extract(sciimg, sciivar, fullmask, tilts, waveimg,
                              global_sky, left, right,
                              slitmask, sobjs, spat_pix=None, bkg_redux_global_sky=None,
@@ -1066,7 +1318,7 @@ def ech_local_skysub_extract(sciimg, sciivar, fullmask, tilts, waveimg,
                              force_gauss=False, sn_gauss=4.0, model_full_slit=False,
                              model_noise=True, debug_bkpts=False, show_profile=False,
                              show_resids=False, show_fwhm=False, adderr=0.01, base_var=None,
-                             count_scale=None, no_local_sky:bool=False):
+                             count_scale=None, no_local_sky:bool=False, n_proc=1):
     r"""
     Perform local sky subtraction, profile fitting, and optimal extraction slit
     by slit. Objects are sky/subtracted extracted in order of the highest
@@ -1249,6 +1501,12 @@ def ech_local_skysub_extract(sciimg, sciivar, fullmask, tilts, waveimg,
     no_local_sky : bool, default = False, optional
         If True, do not perform local sky subtraction. This is useful for
         A-B extraction where the sky has already been subtracted.
+    n_proc : int, default = 1, optional
+        Number of processes used to extract the orders.  Orders in which all
+        objects have S/N above ``min_snr`` do not depend on the FWHM measured
+        in other orders and are extracted in parallel (see
+        :func:`local_skysub_extract_slits`); the remaining orders are
+        extracted serially, in order of decreasing S/N.
 
     Returns
     -------
@@ -1348,6 +1606,30 @@ def ech_local_skysub_extract(sciimg, sciivar, fullmask, tilts, waveimg,
     msgs.info(msgs.newline() + 'Reducing orders in order of S/N of brightest object:' + msgs.newline() + dash +
               msgs.newline() + '{:<8s}{:<8s}{:>10s}'.format('slit','order','S/N') + msgs.newline() + dash +
               msgs.newline() + str_out)
+
+    gpm = fullmask.flagged(invert=True)
+    extract_kw = dict(bkg_redux_global_sky=bkg_redux_global_sky, fwhmimg=fwhmimg,
+                      flatimg=flatimg, spat_pix=spat_pix, std=std, bsp=bsp, trim_edg=trim_edg,
+                      prof_nsigma=prof_nsigma, niter=niter, sigrej=sigrej,
+                      no_local_sky=no_local_sky, use_2dmodel_mask=use_2dmodel_mask,
+                      bkpts_optimal=bkpts_optimal, force_gauss=force_gauss, sn_gauss=sn_gauss,
+                      model_full_slit=model_full_slit, model_noise=model_noise,
+                      debug_bkpts=debug_bkpts, show_resids=show_resids,
+                      show_profile=show_profile, adderr=adderr, base_var=base_var,
+                      count_scale=count_scale)
+
+    # The FWHM of objects with S/N below min_snr is set using the FWHM
+    # measured in the orders that have already been extracted.  Orders without
+    # any such objects are independent of all other orders, so extract them
+    # up front in parallel.  The results are incorporated in the loop below.
+    extracted = {}
+    if n_proc > 1:
+        indep = np.where(np.all(order_snr > min_snr, axis=1))[0]
+        if indep.size > 1:
+            extracted = dict(zip(indep, local_skysub_extract_slits(
+                sciimg, sciivar, tilts, waveimg, global_sky, slitmask, gpm, slitids[indep],
+                left[:,indep], right[:,indep], sobjs, n_proc=n_proc, **extract_kw)))
+
     # Loop over orders in order of S/N ratio (from highest to lowest) for the brightest object
     for iord in srt_order_snr:
         order = order_vec[iord]
@@ -1420,23 +1702,19 @@ def ech_local_skysub_extract(sciimg, sciivar, fullmask, tilts, waveimg,
 
         thisobj = (sobjs.SLITID == slitids[iord]) # indices of objects for this slit
         thismask = slitmask == slitids[iord] # pixels for this slit
-        # True  = Good, False = Bad for inmask
-        inmask = fullmask.flagged(invert=True) & thismask
-        # Local sky subtraction and extraction
-        skymodel[thismask], _this_bkg_redux_skymodel, objmodel[thismask], ivarmodel[thismask], extractmask[thismask] \
-            = local_skysub_extract(sciimg, sciivar, tilts, waveimg, global_sky, thismask,
-                                   left[:,iord], right[:,iord], sobjs[thisobj],
-                                   bkg_redux_global_sky=bkg_redux_global_sky,
-                                   fwhmimg=fwhmimg, flatimg=flatimg,
-                                   spat_pix=spat_pix, ingpm=inmask, std=std, bsp=bsp,
-                                   trim_edg=trim_edg, prof_nsigma=prof_nsigma, niter=niter,
-                                   sigrej=sigrej, no_local_sky=no_local_sky,
-                                   use_2dmodel_mask=use_2dmodel_mask,
-                                   bkpts_optimal=bkpts_optimal, force_gauss=force_gauss,
-                                   sn_gauss=sn_gauss, model_full_slit=model_full_slit,
-                                   model_noise=model_noise, debug_bkpts=debug_bkpts,
-                                   show_resids=show_resids, show_profile=show_profile,
-                                   adderr=adderr, base_var=base_var, count_scale=count_scale)
+        if iord in extracted:
+            # Order was already extracted; copy the objects back
+            *models, slit_sobjs = extracted.pop(iord)
+            sobjs.specobjs[thisobj] = slit_sobjs
+        else:
+            # True  = Good, False = Bad for inmask
+            inmask = gpm & thismask
+            # Local sky subtraction and extraction
+            models = local_skysub_extract(sciimg, sciivar, tilts, waveimg, global_sky, thismask,
+                                          left[:,iord], right[:,iord], sobjs[thisobj],
+                                          ingpm=inmask, **extract_kw)
+        skymodel[thismask], _this_bkg_redux_skymodel, objmodel[thismask], ivarmodel[thismask], \
+            extractmask[thismask] = models
         if bkg_redux_skymodel is not None:
             bkg_redux_skymodel[thismask] = _this_bkg_redux_skymodel
         # update the FWHM fitting vector for the brighest object
@@ -1449,7 +1727,7 @@ def ech_local_skysub_extract(sciimg, sciivar, fullmask, tilts, waveimg,
 
     # Set the bit for pixels which were masked by the extraction.
     # For extractmask, True = Good, False = Bad
-    iextract = fullmask.flagged(invert=True) & np.logical_not(extractmask)
+    iextract = gpm & np.logical_not(extractmask)
     # Undefined inverse variances
     outmask.turn_on('EXTRACT', select=iextract)
 
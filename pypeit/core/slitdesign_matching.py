@@ -11,7 +11,7 @@ These routines are taken from the DEEP2 IDL-based pipeline.
 .. include:: ../include/links.rst
 
 """
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 from scipy import optimize
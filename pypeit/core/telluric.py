@@ -4,7 +4,7 @@
 .. include:: ../include/links.rst
 """
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import matplotlib.pyplot as plt
 import numpy as np
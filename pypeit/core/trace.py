@@ -13,7 +13,7 @@ accessible by the docstring of all modules?
 """
 from collections import Counter
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 from scipy import ndimage, signal, optimize
@@ -497,28 +497,43 @@ def prepare_sobel_for_trace(sobel_sig, bpm=None, boxcar=5, side='left'):
             Boxcar smooth the detection image along rows before recentering the
             edge centers; see :func:`~pypeit.utils.boxcar_smooth_rows`. If less
             than 1, no smoothing is performed.
-        side (:obj:`str`, optional):
+        side (:obj:`str`, :obj:`list`, optional):
             The side that the image will be used to trace. In the Sobel image,
             positive values are for left traces, negative for right traces. If
             ``'left'``, the image is clipped at a minimum value of -0.1. If
             ``'right'``, the image sign is flipped and then clipped at a minimum
             of -0.1. If None, the image is not flipped or clipped, only
-            smoothed.
+            smoothed.  This can also be a list of sides, in which case the
+            images for all sides are constructed at once, smoothing the
+            bad-pixel weights only once.
 
     Returns:
-        `numpy.ndarray`_: The smoothed image.
+        `numpy.ndarray`_, :obj:`list`: The smoothed image, or a list with the
+        smoothed image for each side if ``side`` is a list.
     """
     # NOTE: This performs the operations of what was previously
     # performed on the object passed to trace_crude_init, as well as
     # the smoothing done at the beginning of that function
-    if side not in ['left', 'right', None]:
+    sides = side if isinstance(side, list) else [side]
+    if any(s not in ['left', 'right', None] for s in sides):
         raise ValueError('Side must be left, right, or None.')
     # Keep both sides if the side is undefined.
     # TODO: This 0.1 is drawn out of the ether and different from what is done in peak_trace
-    img = sobel_sig if side is None else np.maximum((1 if side == 'left' else -1)*sobel_sig, 0.1)
-    # Returned the smoothed image
-    wgt = None if bpm is None else np.logical_not(bpm).astype(float)
-    return utils.boxcar_smooth_rows(img, boxcar, wgt=wgt, replace='zero')
+    imgs = [sobel_sig if s is None else np.maximum((1 if s == 'left' else -1)*sobel_sig, 0.1)
+                for s in sides]
+    if bpm is None or boxcar <= 1:
+        smoothed = [utils.boxcar_smooth_rows(img, boxcar) for img in imgs]
+    else:
+        # Smooth the weights once for all the images.  This is identical to
+        # the weighted smoothing in utils.boxcar_smooth_rows, replacing pixels
+        # without any valid pixels in the boxcar with 0.
+        wgt = np.logical_not(bpm).astype(float)
+        norm = utils.boxcar_smooth_rows(wgt, boxcar)
+        good = norm > 0
+        smoothed = [np.divide(utils.boxcar_smooth_rows(img * wgt, boxcar), norm,
+                              out=np.zeros(img.shape, dtype=float), where=good)
+                        for img in imgs]
+    return smoothed if isinstance(side, list) else smoothed[0]
 
 
 def follow_centroid(flux, start_row, start_cen, ivar=None, bpm=None, fwgt=None, width=6.0,
@@ -10,7 +10,7 @@ from scipy import interpolate, ndimage
 from matplotlib import pyplot as plt
 from matplotlib import lines, colormaps
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 from astropy.stats import sigma_clipped_stats
 
@@ -851,9 +851,9 @@ def fit_tilts(trc_tilt_dict, thismask, slit_cen, spat_order=3, spec_order=4, max
     # msgs.info("RMS/FWHM: {}".format(rms_real/fwhm))
 
 
-def fit2tilts(shape, coeff2, func2d, spat_shift=None):
+def fit2tilts(shape, coeff2, func2d, spat_shift=None, bbox=None):
     """
-    Evaluate the wavelength tilt model over the full image.
+    Evaluate the wavelength tilt model over the full image (or a region of it).
 
     Parameters
     ----------
@@ -867,12 +867,17 @@ def fit2tilts(shape, coeff2, func2d, spat_shift=None):
         Spatial shift to be added to image pixels before evaluation
         If you are accounting for flexure, then you probably wish to
         input -1*flexure_shift into this parameter.
+    bbox : tuple, optional
+        A 2-tuple of slices selecting the (spectral, spatial) region of the
+        image in which to evaluate the model; e.g., the bounding box of a
+        slit.  If None, the model is evaluated over the full image.
 
     Returns
     -------
     tilts : `numpy.ndarray`_, float
         Image indicating how spectral pixel locations move across the
-        image. This output is used in the pipeline.
+        image. This output is used in the pipeline.  If ``bbox`` is
+        provided, the image only covers the selected region.
 
     """
     # Init
@@ -883,11 +888,14 @@ def fit2tilts(shape, coeff2, func2d, spat_shift=None):
     xnspatmin1 = float(nspat - 1)
     spec_vec = np.arange(nspec)
     spat_vec = np.arange(nspat) - _spat_shift
-    spat_img, spec_img = np.meshgrid(spat_vec, spec_vec)
-    #
-    pypeitFit = fitting.PypeItFit(fitc=coeff2, minx=0.0, maxx=1.0,
-                                  minx2=0.0, maxx2=1.0, func=func2d)
-    tilts = pypeitFit.eval(spec_img / xnspecmin1, x2=spat_img / xnspatmin1)
+    if bbox is not None:
+        spec_vec = spec_vec[bbox[0]]
+        spat_vec = spat_vec[bbox[1]]
+    # The image is a regular grid, so evaluate the fit separately along each
+    # axis
+    tilts = fitting.evaluate_fit_grid(coeff2, func2d, spec_vec / xnspecmin1,
+                                      spat_vec / xnspatmin1, minx=0.0, maxx=1.0,
+                                      minx2=0.0, maxx2=1.0)
     # Added this to ensure that tilts are never crazy values due to extrapolation of fits which can break
     # wavelength solution fitting
     return np.fmax(np.fmin(tilts, 1.2), -0.2)
@@ -20,7 +20,7 @@ conf.auto_max_age = None
 
 from pypeit import msgs
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 def geomotion_calculate(radec, time, longitude, latitude, elevation, refframe):
     """
@@ -3,6 +3,7 @@
 .. include:: ../include/links.rst
 """
 import copy
+import hashlib
 import itertools
 
 import astropy.stats
@@ -14,7 +15,7 @@ import scipy.spatial
 
 from linetools import utils as ltu
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 
 from pypeit.par import pypeitpar
@@ -28,6 +29,7 @@ from pypeit.core import fitting
 
 from pypeit.core import pca
 from pypeit import utils
+from pypeit import cache
 
 from pypeit import msgs
 
@@ -554,9 +556,18 @@ def reidentify(spec, spec_arxiv_in, wave_soln_arxiv_in, line_list,
     spec_arxiv_cont_sub = np.zeros_like(spec_arxiv)
     det_arxiv1 = {}
     for iarxiv in range(narxiv):
-        tcent_arxiv, ecent_arxiv, cut_tcent_arxiv, icut_arxiv, spec_cont_sub_now = wvutils.arc_lines_from_spec(
-            spec_arxiv[:, iarxiv], sigdetect=sigdetect, nonlinear_counts=nonlinear_counts, fwhm=fwhm,
-            debug=debug_peaks)
+        kwargs = dict(sigdetect=sigdetect, nonlinear_counts=nonlinear_counts, fwhm=fwhm)
+        if debug_peaks:
+            arxiv_lines = wvutils.arc_lines_from_spec(spec_arxiv[:, iarxiv], debug=True, **kwargs)
+        else:
+            # The same arxiv spectra are typically used for many slits, so
+            # cache the result for each spectrum
+            key = ('arc_lines_from_spec',
+                   hashlib.sha1(spec_arxiv[:, iarxiv].tobytes()).hexdigest(),
+                   spec_arxiv.dtype.str, nspec) + tuple(kwargs.values())
+            arxiv_lines = cache.cached_product(
+                    key, lambda: wvutils.arc_lines_from_spec(spec_arxiv[:, iarxiv], **kwargs))
+        tcent_arxiv, ecent_arxiv, cut_tcent_arxiv, icut_arxiv, spec_cont_sub_now = arxiv_lines
         spec_arxiv_cont_sub[:, iarxiv] = spec_cont_sub_now
         det_arxiv1[str(iarxiv)] = tcent_arxiv[icut_arxiv]
     if det_arxiv is None:
@@ -3,7 +3,7 @@ Module for echelle-specific wavelength calibration functions.
 
 .. include:: ../include/links.rst
 """
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 from scipy import interpolate
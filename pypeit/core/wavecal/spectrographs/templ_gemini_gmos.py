@@ -3,7 +3,7 @@ import os
 
 from pypeit.core.wavecal import templates
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 # ##############################
 def gemini_gmos_r400_hama(overwrite=False):  # GMOS R400 Hamamatsu
@@ -3,7 +3,7 @@ import os
 
 from pypeit.core.wavecal import templates
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 # Shane Kastb
 def shane_kastb_452(): #    if flg & (2**4):  # 452/3306
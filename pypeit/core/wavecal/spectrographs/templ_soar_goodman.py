@@ -3,7 +3,7 @@ import os
 
 from pypeit.core.wavecal import templates
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 def soar_goodman_400(overwrite=False):
     binspec = 2
@@ -13,7 +13,7 @@ import os
 import pathlib
 
 import numpy as np
-from IPython import embed
+from pypeit.lazyimport import embed
 
 from matplotlib import pyplot as plt
 
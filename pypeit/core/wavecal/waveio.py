@@ -14,7 +14,7 @@ from pypeit import dataPaths
 from pypeit import cache
 from pypeit.core.wavecal import defs
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 
 # TODO -- Move this to the WaveCalib object
@@ -84,7 +84,8 @@ def load_template(arxiv_file:str, det:int, wvrng:list=None)->tuple[np.ndarray,np
 
     """
     calibfile, fmt = dataPaths.reid_arxiv.get_file_path(arxiv_file, return_format=True)
-    tbl = astropy.table.Table.read(calibfile, format=fmt)
+    tbl = cache.cached_product(cache.file_key(calibfile) + ('template',),
+                               lambda: astropy.table.Table.read(calibfile, format=fmt))
     # Parse on detector?
     if 'det' in tbl.keys():
         idx = np.where(tbl['det'].data & 2**det)[0]
@@ -132,7 +133,24 @@ def load_reid_arxiv(arxiv_file):
     # `arxiv_file`.
 
     calibfile, arxiv_fmt = dataPaths.reid_arxiv.get_file_path(arxiv_file, return_format=True)
+    return cache.cached_product(cache.file_key(calibfile) + ('reid_arxiv',),
+                                lambda: _read_reid_arxiv(calibfile, arxiv_fmt))
 
+
+def _read_reid_arxiv(calibfile, arxiv_fmt):
+    """
+    Read a REID arxiv file; see :func:`load_reid_arxiv`.
+
+    Args:
+        calibfile (`Path`_):
+            Path to the file.
+        arxiv_fmt (:obj:`str`):
+            File format, either ``'json'`` or ``'fits'``.
+
+    Returns:
+        :obj:`tuple`: The arxiv dictionary and the parameters used to
+        construct it (None for ``'fits'`` files).
+    """
     # This is a hack as it will fail if we change the data model yet again for wavelength solutions
     if arxiv_fmt == 'json':
         wv_calib_arxiv = load_wavelength_calibration(calibfile)
@@ -181,7 +199,13 @@ def load_line_list(line_file, use_ion=False):
     """
     _line_file = f'{line_file}_lines.dat' if use_ion else line_file
     _line_file = dataPaths.linelist.get_file_path(_line_file)
-    return astropy.table.Table.read(_line_file, format='ascii.fixed_width', comment='#')
+    # Parsing the ASCII files is relatively slow, so the tables are also cached
+    # on disk
+    return cache.cached_product(cache.file_key(_line_file) + ('line_list',),
+                                lambda: astropy.table.Table.read(_line_file,
+                                                                 format='ascii.fixed_width',
+                                                                 comment='#'),
+                                persist=True)
 
 
 def load_line_lists(lamps, all=False, include_unknown:bool=False, restrict_on_instr=None):
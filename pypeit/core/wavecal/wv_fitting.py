@@ -16,7 +16,7 @@ from pypeit import msgs
 
 from pypeit import datamodel
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 
 class WaveFit(datamodel.DataContainer):
@@ -22,7 +22,7 @@ from pypeit import utils
 from pypeit.core import arc
 from pypeit.pypmsgs import PypeItError
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 def parse_param(par, key, slit):
     # Find good lines for the tilts
@@ -5,7 +5,7 @@ Module for generating Arc Line lists
 
 import pdb
 import datetime
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import astropy.table
 
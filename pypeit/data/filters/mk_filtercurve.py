@@ -7,7 +7,7 @@ from astropy.table import Table
 
 import numpy as np
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 from pypeit import io
 
@@ -459,7 +459,7 @@ With this implementation:
 """
 from pathlib import Path
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 import inspect
@@ -7,7 +7,7 @@ Module for ginga routines.  Mainly for debugging
 import os
 import numpy as np
 import time
-from IPython import embed
+from pypeit.lazyimport import embed
 import subprocess
 
 # A note from ejeschke on how to use the canvas add command in ginga: https://github.com/ejeschke/ginga/issues/720
@@ -6,7 +6,7 @@ displayed for any image.
 .. include:: ../include/links.rst
 """
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
@@ -104,10 +104,12 @@ exposure in a fits file called `trace_file`:
 """
 import os
 import inspect
+import tempfile
+import zlib
 from pathlib import Path
 from collections import OrderedDict
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
@@ -121,6 +123,7 @@ from astropy import table
 
 from pypeit import msgs
 from pypeit import utils
+from pypeit import perf
 from pypeit import sampling
 from pypeit import slittrace
 from pypeit.datamodel import DataContainer
@@ -303,13 +306,10 @@ class EdgeTraceSet(calibframe.CalibFrame):
         sobelsig (`numpy.ndarray`_)):
             Sobel-filtered image used to detect left and right edges
             of slits.
-        sobelsig_left (`numpy.ndarray`_):
-            Lazy-loaded version of `sobelsig` that clips the
-            features related to right edges. Only kept for
-            convenience.
-        sobelsig_right (`numpy.ndarray`_):
-            Lazy-loaded version of `sobelsig` that clips the
-            features related to left edges. Only kept for
+        _sobel_cache (:obj:`dict`):
+            Lazy-loaded versions of `sobelsig` prepared for tracing
+            the left edges, the right edges, or both; see
+            :func:`_side_dependent_sobel`.  Only kept for
             convenience.
         nspec (:obj:`int`):
             Number of spectral pixels (rows) in the trace image
@@ -404,13 +404,19 @@ class EdgeTraceSet(calibframe.CalibFrame):
     output_float_dtype = np.float32
     """Regardless of datamodel, output floating-point data have this fixed bit size."""
 
+    sobel_dtype = np.float32
+    """
+    Data type used to store the Sobel-filtered images prepared for tracing; see
+    :func:`_side_dependent_sobel`.
+    """
+
     internals = calibframe.CalibFrame.internals \
                  + ['spectrograph',     # Spectrograph instance
                     'par',              # EdgeTracePar instance
                     'qa_path',          # Path for the QA plots
                     'edge_img',         # Array with the spatial pixel nearest to each trace edge.
-                    'sobelsig_left',    # Sobel filtered image used to trace left edges
-                    'sobelsig_right',   # Sobel filtered image used to trace right edges
+                    '_sobel_cache',     # Sobel filtered images used to trace left and right
+                                        #   edges
                     'design',           # Table that collates slit-mask design data matched to
                                         #   the edge traces
                     'objects',          # Table that collates object information, if available
@@ -789,7 +795,8 @@ class EdgeTraceSet(calibframe.CalibFrame):
 
         """
         # Perform the initial edge detection and trace identification
-        self.initial_trace(bpm=bpm)
+        with perf.step('initial_trace'):
+            self.initial_trace(bpm=bpm)
         if show_stages:
             self.show(title='Initial identification and tracing of slit edges')
 
@@ -797,7 +804,8 @@ class EdgeTraceSet(calibframe.CalibFrame):
         if not self.is_empty:
             # Refine the locations of the trace using centroids of the
             # features in the Sobel-filtered image.
-            self.centroid_refine()
+            with perf.step('centroid_refine'):
+                self.centroid_refine()
             if show_stages:
                 self.show(title='Refinement of edge locations')
 
@@ -805,11 +813,13 @@ class EdgeTraceSet(calibframe.CalibFrame):
         # refinement could have removed all traces (via `check_traces`)
         if not self.is_empty:
             # Fit the trace locations with a polynomial
-            self.fit_refine(debug=debug)
+            with perf.step('fit_refine'):
+                self.fit_refine(debug=debug)
             # Use the fits to determine if there are any discontinous
             # trace centroid measurements that are actually components
             # of the same slit edge
-            self.merge_traces(debug=debug)
+            with perf.step('merge_traces'):
+                self.merge_traces(debug=debug)
             if show_stages:
                 self.show(title='Polynomial fit to the edge locations')
 
@@ -818,7 +828,8 @@ class EdgeTraceSet(calibframe.CalibFrame):
         if self.par['auto_pca'] and self.can_pca():
             # Use a PCA decomposition to parameterize the trace
             # functional forms
-            self.pca_refine(debug=debug)
+            with perf.step('pca_refine'):
+                self.pca_refine(debug=debug)
             if show_stages:
                 self.show(title='PCA refinement of the trace models')
 
@@ -826,7 +837,8 @@ class EdgeTraceSet(calibframe.CalibFrame):
             # detect peaks/troughs in the spectrally collapsed
             # Sobel-filtered image, then use those peaks to further
             # refine the edge traces
-            self.peak_refine(rebuild_pca=True, debug=debug)
+            with perf.step('peak_refine'):
+                self.peak_refine(rebuild_pca=True, debug=debug)
             if show_stages:
                 self.show(title='Result after re-identifying slit edges from a spectrally '
                                 'collapsed image.')
@@ -838,7 +850,8 @@ class EdgeTraceSet(calibframe.CalibFrame):
             msgs.info('-' * 50)
             msgs.info('{0:^50}'.format('Matching traces to the slit-mask design'))
             msgs.info('-' * 50)
-            self.maskdesign_matching(debug=debug)
+            with perf.step('maskdesign_matching'):
+                self.maskdesign_matching(debug=debug)
             if show_stages:
                 self.show(title='After matching to slit-mask design metadata.')
             if np.all(self.bitmask.flagged(self.edge_msk, self.bitmask.bad_flags)):
@@ -868,7 +881,8 @@ class EdgeTraceSet(calibframe.CalibFrame):
             # like a long-slit observation. At best, that will lead to a lot of
             # wasted time in the reductions; at worst, it will just cause the code
             # to fault later on.
-            self.success = self.sync()
+            with perf.step('sync'):
+                self.success = self.sync()
             if not self.success:
                 return
             if show_stages:
@@ -876,7 +890,8 @@ class EdgeTraceSet(calibframe.CalibFrame):
 
         if not self.is_empty and self.par['add_missed_orders']:
             # Refine the order traces
-            self.order_refine(debug=debug)
+            with perf.step('order_refine'):
+                self.order_refine(debug=debug)
             # Check that the edges are still synced
             if not self.is_synced:
                 msgs.error('Traces are no longer synced after adding in missed orders.')
@@ -1026,8 +1041,7 @@ class EdgeTraceSet(calibframe.CalibFrame):
                                           sobel_enhance=self.par['sobel_enhance'])
         # Empty out the images prepared for left and right tracing
         # until they're needed.
-        self.sobelsig_left = None
-        self.sobelsig_right = None
+        self._sobel_cache = None
 
         # Identify traces by following the detected edges in adjacent
         # spectral pixels.
@@ -1063,17 +1077,21 @@ class EdgeTraceSet(calibframe.CalibFrame):
         # Save the input trace edges and remove the mask for valid edge
         # coordinates
         self.edge_img = np.zeros((self.nspec, self.ntrace), dtype=int)
+        # Find the pixels with a detected edge once, instead of searching the
+        # full image for each trace
+        row, col = np.where(np.logical_not(trace_id_img.mask))
+        edge_id = trace_id_img.data[row,col]
+        edge_inserted = inserted_edge[row,col]
         for i in range(self.ntrace):
-            row, col = np.where(np.logical_not(trace_id_img.mask)
-                                    & (trace_id_img.data == self.traceid[i]))
-            self.edge_img[row,i] = col
-            self.edge_msk[row,i] = 0            # Turn-off the mask
+            indx = edge_id == self.traceid[i]
+            self.edge_img[row[indx],i] = col[indx]
+            self.edge_msk[row[indx],i] = 0            # Turn-off the mask
 
             # Flag any insert traces
-            row, col = np.where(np.logical_not(trace_id_img.mask) & inserted_edge
-                                    & (trace_id_img.data == self.traceid[i]))
-            if len(row) > 0:
-                self.edge_msk[row,i] = self.bitmask.turn_on(self.edge_msk[row,i], 'ORPHANINSERT')
+            indx &= edge_inserted
+            if np.any(indx):
+                self.edge_msk[row[indx],i] \
+                        = self.bitmask.turn_on(self.edge_msk[row[indx],i], 'ORPHANINSERT')
 
         # Instantiate objects to store the floating-point trace
         # centroids and errors.
@@ -1698,6 +1716,43 @@ class EdgeTraceSet(calibframe.CalibFrame):
                 plt.close(fig)
                 fig = plt.figure(figsize=(1.5*w,1.5*h))
 
+    def _sobel_checksum(self):
+        """
+        Compute the checksum of the attributes used to construct the
+        Sobel-filtered images prepared for tracing.
+
+        Returns:
+            :obj:`tuple`: The image shape and a CRC-32 checksum of
+            :attr:`sobelsig` and :attr:`tracebpm`.
+        """
+        crc = 0
+        for arr in [self.sobelsig, self.tracebpm]:
+            crc = zlib.crc32(b'' if arr is None else np.ascontiguousarray(arr), crc)
+        return (self.sobelsig.shape, crc)
+
+    def _store_sobel(self, img):
+        """
+        Convert a Sobel-filtered image prepared for tracing to the type kept
+        in :attr:`_sobel_cache`.
+
+        The image is converted to :attr:`sobel_dtype` and, if the
+        ``sobel_memmap`` parameter is True, moved to a memory-mapped temporary
+        file that is removed once the image is no longer referenced.
+
+        Args:
+            img (`numpy.ndarray`_):
+                Image to store.
+
+        Returns:
+            `numpy.ndarray`_: The stored image.
+        """
+        if not self.par['sobel_memmap']:
+            return img.astype(self.sobel_dtype)
+        _img = np.memmap(tempfile.TemporaryFile(), dtype=self.sobel_dtype, mode='w+',
+                         shape=img.shape)
+        _img[...] = img
+        return _img
+
     def _side_dependent_sobel(self, side):
         """
         Return the Sobel-filtered image relevant to tracing the given
@@ -1705,14 +1760,17 @@ class EdgeTraceSet(calibframe.CalibFrame):
 
         This is primarily a wrapper for
         :func:`~pypeit.core.trace.prepare_sobel_for_trace`; the
-        boxcar smoothing is always 5 pixels. Barring a instantiation
-        of the object, this calculation is only done once per side by
-        "lazy loading" :attr:`sobelsig_left` or
-        :attr:`sobelsig_right`.
+        boxcar smoothing is always 5 pixels. The images for all sides
+        are constructed together the first time any of them is
+        requested and kept in :attr:`_sobel_cache` (see
+        :func:`_store_sobel`).  The images are only reconstructed if
+        :attr:`sobelsig` or :attr:`tracebpm` change.
 
         Args:
             side (:obj:`str`):
-                The side to return; must be ``'left'`` or ``'right'``.
+                The side to return; must be ``'left'``, ``'right'``,
+                or None.  If None, the returned image is not flipped
+                or clipped, only smoothed.
     
         Returns:
             `numpy.ndarray`_: The manipulated Sobel image relevant to
@@ -1720,23 +1778,22 @@ class EdgeTraceSet(calibframe.CalibFrame):
 
         Raises:
             PypeItError:
-                Raised if ``side`` is not ``'left'`` or ``'right'``.
+                Raised if ``side`` is not ``'left'``, ``'right'``, or
+                None.
         """
-        # TODO: Add boxcar to EdgeTracePar?
-        boxcar = 5
-        if side == 'left':
-            if self.sobelsig_left is None:
-                self.sobelsig_left = trace.prepare_sobel_for_trace(self.sobelsig,
-                                                                   bpm=self.tracebpm,
-                                                                   boxcar=boxcar, side='left')
-            return self.sobelsig_left
-        if side == 'right':
-            if self.sobelsig_right is None:
-                self.sobelsig_right = trace.prepare_sobel_for_trace(self.sobelsig,
-                                                                    bpm=self.tracebpm,
-                                                                    boxcar=boxcar, side='right')
-            return self.sobelsig_right
-        msgs.error('Side must be left or right.')
+        sides = ['left', 'right', None]
+        if side not in sides:
+            msgs.error('Side must be left, right, or None.')
+        checksum = self._sobel_checksum()
+        if self._sobel_cache is None or self._sobel_cache['checksum'] != checksum:
+            # TODO: Add boxcar to EdgeTracePar?
+            boxcar = 5
+            with perf.step('prepare_sobel'):
+                images = trace.prepare_sobel_for_trace(self.sobelsig, bpm=self.tracebpm,
+                                                       boxcar=boxcar, side=sides)
+                self._sobel_cache = {'checksum': checksum,
+                                     'images': dict(zip(sides, map(self._store_sobel, images)))}
+        return self._sobel_cache['images'][side]
 
     def centroid_refine(self, follow=True, start_indx=None, continuous=False, use_fit=False):
         """
@@ -3577,7 +3634,7 @@ class EdgeTraceSet(calibframe.CalibFrame):
                     nleft = nside
         else:
             # Get the image relevant to tracing
-            _sobelsig = trace.prepare_sobel_for_trace(self.sobelsig, bpm=bpm, boxcar=5, side=None)
+            _sobelsig = self._side_dependent_sobel(None)
 
             # Find and trace both peaks and troughs in the image. The
             # input trace data (`trace` argument) is the PCA prediction
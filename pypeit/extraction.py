@@ -13,11 +13,11 @@ import os
 from astropy import stats
 from abc import ABCMeta
 
-from pypeit import msgs, utils
+from pypeit import msgs, perf, utils
 from pypeit.display import display
 from pypeit.core import skysub, extract, flexure
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 
 class Extract:
@@ -250,7 +250,8 @@ class Extract:
         # Now apply a global flexure correction to each slit provided it's not a standard star
         if self.par['flexure']['spec_method'] != 'skip' and not self.std_redux:
             # Update slitshift values
-            self.spec_flexure_correct(mode='global')
+            with perf.step('flexure'):
+                self.spec_flexure_correct(mode='global')
             # Apply?
             for iobj in range(self.sobjs_obj.nobj):
                 # Ignore negative sources
@@ -436,9 +437,12 @@ class Extract:
         # Do we have any detected objects to extract?
         if self.nsobj_to_extract > 0:
             # Extract + Return
-            self.skymodel, self.bkg_redux_skymodel, self.objmodel, self.ivarmodel, self.outmask, self.sobjs \
-                = self.extract(self.global_sky, bkg_redux_global_sky=self.bkg_redux_global_sky,
-                               model_noise=model_noise, spat_pix=spat_pix)
+            with perf.step('extraction'):
+                self.skymodel, self.bkg_redux_skymodel, self.objmodel, self.ivarmodel, \
+                    self.outmask, self.sobjs \
+                        = self.extract(self.global_sky,
+                                       bkg_redux_global_sky=self.bkg_redux_global_sky,
+                                       model_noise=model_noise, spat_pix=spat_pix)
             if self.bkg_redux:
                 # purge negative objects if not return_negative otherwise keep them
                 self.sobjs.make_neg_pos() if self.return_negative else self.sobjs.purge_neg()
@@ -446,7 +450,8 @@ class Extract:
             # Correct for local spectral flexure
             if self.par['flexure']['spec_method'] not in ['skip', 'slitcen'] and not self.std_redux:
                 # Apply a refined estimate of the flexure to objects
-                self.spec_flexure_correct(mode='local', sobjs=self.sobjs)
+                with perf.step('flexure'):
+                    self.spec_flexure_correct(mode='local', sobjs=self.sobjs)
 
         else:  # No objects, pass back what we have
             # Could have negative objects but no positive objects so purge them if not return_negative
@@ -745,55 +750,53 @@ class MultiSlitExtract(Extract):
 
         base_gpm = self.sciImg.select_flag(invert=True)
 
-        # Loop on slits
-        for slit_idx in gdslits:
-            slit_spat = self.slits.spat_id[slit_idx]
-            msgs.info("Local sky subtraction and extraction for slit: {:d}".format(slit_spat))
-            thisobj = self.sobjs.SLITID == slit_spat    # indices of objects for this slit
-            if not np.any(thisobj):
-                continue
-            # Setup to run local skysub
+        # Only process slits with objects
+        gdslits = [slit_idx for slit_idx in gdslits
+                    if np.any(self.sobjs.SLITID == self.slits.spat_id[slit_idx])]
+
+        # TODO: skysub.local_skysub_extract() accepts a `prof_nsigma` parameter, but none
+        #       is provided here.  Additionally, the ExtractionPar keyword std_prof_nsigma
+        #       is not used anywhere in the code.  Should it be be used here, in conjunction
+        #       with whether this object IS_STANDARD?
+        # prof_nsigma = self.par['reduce']['extraction']['std_prof_nsigma'] if IS_STANDARD else None
+
+        # Local sky subtraction and extraction; the slits are independent and
+        # can be processed in parallel.
+        slitids = self.slits.spat_id[gdslits]
+        results = skysub.local_skysub_extract_slits(
+                        self.sciImg.image, self.sciImg.ivar, self.tilts, self.waveimg,
+                        self.global_sky, self.slitmask, base_gpm, slitids,
+                        self.slits_left[:,gdslits], self.slits_right[:,gdslits], self.sobjs,
+                        n_proc=self.par['reduce']['extraction']['n_proc'],
+                        bkg_redux_global_sky=bkg_redux_global_sky,
+                        fwhmimg=self.fwhmimg, flatimg=self.flatimg, spat_pix=spat_pix,
+                        model_full_slit=self.par['reduce']['extraction']['model_full_slit'],
+                        sigrej=self.par['reduce']['skysub']['sky_sigrej'],
+                        model_noise=model_noise, std=self.std_redux,
+                        bsp=self.par['reduce']['skysub']['bspline_spacing'],
+                        force_gauss=self.par['reduce']['extraction']['use_user_fwhm'],
+                        sn_gauss=self.par['reduce']['extraction']['sn_gauss'],
+                        show_profile=show_profile,
+                        # prof_nsigma=prof_nsigma,
+                        use_2dmodel_mask=self.par['reduce']['extraction']['use_2dmodel_mask'],
+                        no_local_sky=self.par['reduce']['skysub']['no_local_sky'],
+                        base_var=self.sciImg.base_var, count_scale=self.sciImg.img_scale,
+                        adderr=self.sciImg.noise_floor)
+
+        # Collect the results
+        for slit_spat, (skymodel, bkg_redux_skymodel, objmodel, ivarmodel, extractmask,
+                        slit_sobjs) in zip(slitids, results):
+            msgs.info("Finished local sky subtraction and extraction for slit: "
+                      "{:d}".format(slit_spat))
             thismask = self.slitmask == slit_spat   # pixels for this slit
-            # True  = Good, False = Bad for inmask
-            ingpm = base_gpm & thismask
-
-            # ... Just for readability
-            model_full_slit = self.par['reduce']['extraction']['model_full_slit']
-            sigrej = self.par['reduce']['skysub']['sky_sigrej']
-            bsp = self.par['reduce']['skysub']['bspline_spacing']
-            force_gauss = self.par['reduce']['extraction']['use_user_fwhm']
-            sn_gauss = self.par['reduce']['extraction']['sn_gauss']
-            use_2dmodel_mask = self.par['reduce']['extraction']['use_2dmodel_mask']
-            no_local_sky = self.par['reduce']['skysub']['no_local_sky']
-
-            # TODO: skysub.local_skysub_extract() accepts a `prof_nsigma` parameter, but none
-            #       is provided here.  Additionally, the ExtractionPar keyword std_prof_nsigma
-            #       is not used anywhere in the code.  Should it be be used here, in conjunction
-            #       with whether this object IS_STANDARD?
-            # prof_nsigma = self.par['reduce']['extraction']['std_prof_nsigma'] if IS_STANDARD else None
-
-            # Local sky subtraction and extraction
-            self.skymodel[thismask], _this_bkg_redux_skymodel, self.objmodel[thismask], self.ivarmodel[thismask], self.extractmask[thismask] \
-                = skysub.local_skysub_extract(self.sciImg.image, self.sciImg.ivar,
-                                              self.tilts, self.waveimg, self.global_sky,
-                                              thismask, self.slits_left[:,slit_idx],
-                                              self.slits_right[:, slit_idx],
-                                              self.sobjs[thisobj], ingpm=ingpm,
-                                              bkg_redux_global_sky=bkg_redux_global_sky,
-                                              fwhmimg=self.fwhmimg, flatimg=self.flatimg, spat_pix=spat_pix,
-                                              model_full_slit=model_full_slit,
-                                              sigrej=sigrej, model_noise=model_noise,
-                                              std=self.std_redux, bsp=bsp,
-                                              force_gauss=force_gauss, sn_gauss=sn_gauss,
-                                              show_profile=show_profile,
-                                              # prof_nsigma=prof_nsigma,
-                                              use_2dmodel_mask=use_2dmodel_mask,
-                                              no_local_sky=no_local_sky,
-                                              base_var=self.sciImg.base_var,
-                                              count_scale=self.sciImg.img_scale,
-                                              adderr=self.sciImg.noise_floor)
+            self.skymodel[thismask] = skymodel
+            self.objmodel[thismask] = objmodel
+            self.ivarmodel[thismask] = ivarmodel
+            self.extractmask[thismask] = extractmask
             if self.bkg_redux_skymodel is not None:
-                self.bkg_redux_skymodel[thismask] = _this_bkg_redux_skymodel
+                self.bkg_redux_skymodel[thismask] = bkg_redux_skymodel
+            # Objects are updated by the worker processes, not in place
+            self.sobjs.specobjs[self.sobjs.SLITID == slit_spat] = slit_sobjs
 
         # Set the bit for pixels which were masked by the extraction.
         # For extractmask, True = Good, False = Bad
@@ -904,7 +907,8 @@ class EchelleExtract(Extract):
                                               no_local_sky=no_local_sky,
                                               base_var=self.sciImg.base_var,
                                               count_scale=self.sciImg.img_scale,
-                                              adderr=self.sciImg.noise_floor)
+                                              adderr=self.sciImg.noise_floor,
+                                              n_proc=self.par['reduce']['extraction']['n_proc'])
         # Step
         self.steps.append(inspect.stack()[0][3])
 
@@ -14,13 +14,13 @@ from astropy import stats
 from abc import ABCMeta
 
 from pypeit import specobjs
-from pypeit import msgs, utils
+from pypeit import msgs, perf, utils
 from pypeit.display import display
 from pypeit.core import skysub, qa, parse, flat, flexure
 from pypeit.core import procimg
 from pypeit.core import findobj_skymask
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 
 class FindObjects:
@@ -348,9 +348,11 @@ class FindObjects:
         # If the skip_skysub is set (i.e. image is already sky-subtracted), simply find objects
         if self.par['reduce']['findobj']['skip_skysub']:
             msgs.info("Skipping global sky sub as per user request")
-            sobjs_obj, self.nobj = self.find_objects(self.sciImg.image, self.sciImg.ivar,
-                                                     std_trace=std_trace, show=self.findobj_show,
-                                                     show_peaks=show_peaks)
+            with perf.step('find_objects'):
+                sobjs_obj, self.nobj = self.find_objects(self.sciImg.image, self.sciImg.ivar,
+                                                         std_trace=std_trace,
+                                                         show=self.findobj_show,
+                                                         show_peaks=show_peaks)
             return np.zeros_like(self.sciImg.image), sobjs_obj
 
         # Perform a first pass sky-subtraction.  The mask is either empty or
@@ -358,12 +360,15 @@ class FindObjects:
 
         # TODO: Should we make this no_poly=True to have fewer degrees of freedom in
         # the with with-object global sky fits??
-        initial_sky0 = self.global_skysub(skymask=self.initial_skymask, update_crmask=False,
-                                          objs_not_masked=True, show_fit=show_skysub_fit)
+        with perf.step('global_sky'):
+            initial_sky0 = self.global_skysub(skymask=self.initial_skymask, update_crmask=False,
+                                              objs_not_masked=True, show_fit=show_skysub_fit)
         # First pass object finding
-        sobjs_obj, self.nobj = \
-            self.find_objects(self.sciImg.image-initial_sky0, self.sciImg.ivar, std_trace=std_trace,
-                              show_peaks=show_peaks, show=self.findobj_show and not self.std_redux)
+        with perf.step('find_objects'):
+            sobjs_obj, self.nobj = \
+                self.find_objects(self.sciImg.image-initial_sky0, self.sciImg.ivar,
+                                  std_trace=std_trace, show_peaks=show_peaks,
+                                  show=self.findobj_show and not self.std_redux)
 
         if self.nobj == 0 or self.initial_skymask is not None:
             # Either no objects were found, or the initial sky mask was provided by the user.
@@ -376,14 +381,17 @@ class FindObjects:
         # were identified, sobjs_obj
         skymask_init = self.create_skymask(sobjs_obj)
         # Global sky subtract now using the skymask defined by object positions
-        initial_sky = self.global_skysub(skymask=skymask_init, show_fit=show_skysub_fit)
+        with perf.step('global_sky'):
+            initial_sky = self.global_skysub(skymask=skymask_init, show_fit=show_skysub_fit)
 
         # Second pass object finding on sky-subtracted image with updated sky
         # created after masking objects
         if not self.std_redux and not self.par['reduce']['findobj']['skip_second_find']:
-            sobjs_obj, self.nobj = self.find_objects(self.sciImg.image - initial_sky,
-                                                     self.sciImg.ivar, std_trace=std_trace,
-                                                     show=self.findobj_show, show_peaks=show_peaks)
+            with perf.step('find_objects'):
+                sobjs_obj, self.nobj = self.find_objects(self.sciImg.image - initial_sky,
+                                                         self.sciImg.ivar, std_trace=std_trace,
+                                                         show=self.findobj_show,
+                                                         show_peaks=show_peaks)
         else:
             msgs.info("Skipping 2nd run of finding objects")
         # TODO I think the final global should go here as well from the pypeit.py class lines 837
@@ -575,33 +583,36 @@ class FindObjects:
         else:
             skysub_ivar = self.sciImg.ivar if bkg_redux_sciimg is None else bkg_redux_sciimg.ivar
 
-        # Loop on slits
-        for slit_idx in gdslits:
+        # Fit the sky in each slit; the slits are independent and can be fit
+        # in parallel.
+        _image = self.sciImg.image if bkg_redux_sciimg is None else bkg_redux_sciimg.image
+        gpm = self.sciImg.select_flag(invert=True) & skymask_now
+        slit_skies = skysub.global_skysub_slits(
+                        _image, skysub_ivar, self.tilts, self.slitmask, gpm,
+                        self.slits.spat_id[gdslits], self.slits_left[:,gdslits],
+                        self.slits_right[:,gdslits],
+                        n_proc=self.par['reduce']['skysub']['n_proc'], sigrej=sigrej,
+                        bsp=self.par['reduce']['skysub']['bspline_spacing'],
+                        trim_edg=tuple(self.par['reduce']['trim_edge']),
+                        no_poly=self.par['reduce']['skysub']['no_poly'],
+                        pos_mask=not self.bkg_redux and not objs_not_masked,
+                        max_mask_frac=self.par['reduce']['skysub']['max_mask_frac'],
+                        show_fit=show_fit)
+
+        # Collect the results
+        for slit_idx, slit_sky in zip(gdslits, slit_skies):
             slit_spat = self.slits.spat_id[slit_idx]
             msgs.info("Global sky subtraction for slit: {:d}".format(slit_spat))
-            thismask = self.slitmask == slit_spat
-            inmask = self.sciImg.select_flag(invert=True) & thismask & skymask_now
             # All masked?
-            if not np.any(inmask):
+            if slit_sky is None:
                 msgs.warn("No pixels for fitting sky.  If you are using mask_by_boxcar=True, your radius may be too large.")
                 self.reduce_bpm[slit_idx] = True
                 continue
 
-            # Find sky
-            _image = self.sciImg.image if bkg_redux_sciimg is None else bkg_redux_sciimg.image
-            global_sky[thismask] = skysub.global_skysub(
-                _image, skysub_ivar, self.tilts, thismask,
-                self.slits_left[:,slit_idx], self.slits_right[:,slit_idx],
-                inmask=inmask, sigrej=sigrej,
-                bsp=self.par['reduce']['skysub']['bspline_spacing'],
-                trim_edg=tuple(self.par['reduce']['trim_edge']),
-                no_poly=self.par['reduce']['skysub']['no_poly'],
-                pos_mask=not self.bkg_redux and not objs_not_masked,
-                max_mask_frac=self.par['reduce']['skysub']['max_mask_frac'],
-                show_fit=show_fit)
+            global_sky[self.slitmask == slit_spat] = slit_sky
 
             # Mask if something went wrong
-            if np.sum(global_sky[thismask]) == 0.:
+            if np.sum(slit_sky) == 0.:
                 msgs.warn("Bad fit to sky.  Rejecting slit: {:d}".format(slit_spat))
                 self.reduce_bpm[slit_idx] = True
 
@@ -1083,11 +1094,16 @@ class SlicerIFUFindObjects(MultiSlitFindObjects):
         # Prepare the slitmasks for the relative spectral illumination
         slitmask = self.slits.slit_img(pad=0, flexure=self.spat_flexure_shift)
         slitmask_trim = self.slits.slit_img(pad=-3, flexure=self.spat_flexure_shift)
+        # The joint fit can be split into spectral chunks to limit the memory
+        # use; see skysub.global_skysub_chunked
+        nchunk = self.par['reduce']['skysub']['joint_fit_nchunk']
+        n_proc = self.par['reduce']['skysub']['n_proc']
         for nn in range(numiter):
             msgs.info("Performing iterative joint sky subtraction - ITERATION {0:d}/{1:d}".format(nn+1, numiter))
             # TODO trim_edg is in the parset so it should be passed in here via trim_edg=tuple(self.par['reduce']['trim_edge']),
-            _global_sky[thismask] = skysub.global_skysub(sciimg, model_ivar, tilt_wave,
+            _global_sky[thismask] = skysub.global_skysub_chunked(sciimg, model_ivar, tilt_wave,
                                                          thismask, self.slits_left, self.slits_right, inmask=inmask,
+                                                         nchunk=nchunk, n_proc=n_proc,
                                                          sigrej=sigrej, trim_edg=trim_edg,
                                                          bsp=self.par['reduce']['skysub']['bspline_spacing'],
                                                          no_poly=self.par['reduce']['skysub']['no_poly'],
@@ -1135,8 +1151,9 @@ class SlicerIFUFindObjects(MultiSlitFindObjects):
         self.apply_relative_scale(scaleImg)
 
         # Recalculate the joint sky using the original image
-        _global_sky[thismask] = skysub.global_skysub(self.sciImg.image, model_ivar, tilt_wave,
+        _global_sky[thismask] = skysub.global_skysub_chunked(self.sciImg.image, model_ivar, tilt_wave,
                                                      thismask, self.slits_left, self.slits_right, inmask=inmask,
+                                                     nchunk=nchunk, n_proc=n_proc,
                                                      sigrej=sigrej, trim_edg=trim_edg,
                                                      bsp=self.par['reduce']['skysub']['bspline_spacing'],
                                                      no_poly=self.par['reduce']['skysub']['no_poly'],
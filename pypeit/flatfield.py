@@ -17,7 +17,7 @@ from astropy.io import fits
 from matplotlib import pyplot as plt
 from matplotlib import gridspec
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 from pypeit import msgs
 from pypeit.pypmsgs import PypeItDataModelError
@@ -711,6 +711,31 @@ class FlatField:
             # Save to class attribute for inclusion in the Flat calibration frame
             self.waveimg = self.wv_calib.build_waveimg(tilts, self.slits, spat_flexure=flex)
 
+    def spectral_coordinate_image(self, slit_idx):
+        """
+        Generate an image with the spectral pixel coordinate of each pixel,
+        as defined by the wavelength tilts of a slit.
+
+        Args:
+            slit_idx (:obj:`int`):
+                Index of the slit.
+
+        Returns:
+            `numpy.ndarray`_: The spectral coordinate image, with the same
+            shape as the raw flat.
+        """
+        nspec, nspat = self.rawflatimg.image.shape
+        # Create the tilts image for this slit
+        if self.slitless:
+            tilts = np.tile(np.arange(nspec) / nspec, (nspat, 1)).T
+        else:
+            # TODO -- JFH Confirm the sign of this shift is correct!
+            _flexure = 0. if self.wavetilts.spat_flexure is None else self.wavetilts.spat_flexure
+            tilts = tracewave.fit2tilts((nspec, nspat), self.wavetilts['coeffs'][:,:,slit_idx],
+                                        self.wavetilts['func2d'], spat_shift=-1*_flexure)
+        # Convert the tilt image to an image with the spectral pixel index
+        return tilts * (nspec-1)
+
     def show(self, wcs_match=True):
         """
         Show all of the flat field products in ginga.
@@ -734,7 +759,10 @@ class FlatField:
 
         The method loops through all slits provided by the :attr:`slits`
         object, except those that have been masked (i.e., slits with
-        ``self.slits.mask == True`` are skipped).  For each slit:
+        ``self.slits.mask == True`` are skipped).  The spectral fits of
+        all slits (the first step below) are independent and performed
+        together using :func:`~pypeit.core.fitting.bspline_profile_batch`;
+        the remaining steps are performed slit by slit.  For each slit:
 
             - Collapse the flat-field data spatially using the
               wavelength coordinates provided by the fit to the arc-line
@@ -802,8 +830,8 @@ class FlatField:
         ``spec_samp_fine``, ``spec_samp_coarse``, ``spat_samp``,
         ``tweak_slits``, ``tweak_slits_thresh``,
         ``tweak_slits_maxfrac``, ``rej_sticky``, ``slit_trim``,
-        ``slit_illum_pad``, ``illum_iter``, ``illum_rej``, and
-        ``twod_fit_npoly``, ``saturated_slits``.
+        ``slit_illum_pad``, ``illum_iter``, ``illum_rej``,
+        ``twod_fit_npoly``, ``saturated_slits``, and ``n_proc``.
 
         **Revision History**:
 
@@ -905,7 +933,8 @@ class FlatField:
         twod_gpm_out = np.ones_like(rawflat, dtype=bool)
 
         # #################################################
-        # Model each slit independently
+        # Collect the data for the spectral fit of each slit
+        spec_data = {}
         for slit_idx, slit_spat in enumerate(self.slits.spat_id):
             # Is this a good slit??
             if self.slits.bitmask.flagged(self.slits.mask[slit_idx], flag=['SHORTSLIT', 'USERIGNORE', 'BADTILTCALIB']):
@@ -921,7 +950,7 @@ class FlatField:
                 self.slits.mask[slit_idx] = self.slits.bitmask.turn_on(self.slits.mask[slit_idx], 'BADFLATCALIB')
                 continue
 
-            msgs.info('Modeling the flat-field response for slit spat_id={}: {}/{}'.format(
+            msgs.info('Preparing the spectral flat-field fit for slit spat_id={}: {}/{}'.format(
                         slit_spat, slit_idx+1, self.slits.nslits))
 
             # Find the pixels on the initial slit
@@ -978,31 +1007,16 @@ class FlatField:
             #  user if npoly is provided but higher than the nominal
             #  calculation?
 
-            # Create an image with the spatial coordinates relative to the left edge of this slit
-            spat_coo_init = self.slits.spatial_coordinate_image(slitidx=slit_idx, full=True, initial=True)
-
-            # Find pixels on the padded and trimmed slit coordinates
-            onslit_padded = padded_slitid_img == slit_spat
-            onslit_trimmed = trimmed_slitid_img == slit_spat
-
             # ----------------------------------------------------------
-            # Collapse the slit spatially and fit the spectral function
-            # TODO: Put this stuff in a self.spectral_fit method?
+            # Collapse the slit spatially and collect the data for the
+            # spectral fit
 
-            # Create the tilts image for this slit
-            if self.slitless:
-                tilts = np.tile(np.arange(rawflat.shape[0]) / rawflat.shape[0], (rawflat.shape[1], 1)).T
-            else:
-                # TODO -- JFH Confirm the sign of this shift is correct!
-                _flexure = 0. if self.wavetilts.spat_flexure is None else self.wavetilts.spat_flexure
-                tilts = tracewave.fit2tilts(rawflat.shape, self.wavetilts['coeffs'][:,:,slit_idx],
-                                            self.wavetilts['func2d'], spat_shift=-1*_flexure)
-            # Convert the tilt image to an image with the spectral pixel index
-            spec_coo = tilts * (nspec-1)
+            # Create an image with the spectral pixel index
+            spec_coo = self.spectral_coordinate_image(slit_idx)
 
             # Only include the trimmed set of pixels in the flat-field
             # fit along the spectral direction.
-            spec_gpm = onslit_trimmed & gpm_log  # & (rawflat < nonlinear_counts)
+            spec_gpm = (trimmed_slitid_img == slit_spat) & gpm_log  # & (rawflat < nonlinear_counts)
             spec_nfit = np.sum(spec_gpm)
             spec_ntot = np.sum(onslit_init)
             msgs.info('Spectral fit of flatfield for {0}/{1} '.format(spec_nfit, spec_ntot)
@@ -1023,25 +1037,35 @@ class FlatField:
             # axis. Just to avoid the possibility (however unlikely) of
             # spec_coo[spec_gpm] returning an array, all the arrays are
             # explicitly flattened.
-            spec_ivar_data = ivar_log[spec_gpm].ravel()[spec_srt]
-            spec_gpm_data = gpm_log[spec_gpm].ravel()[spec_srt]
-
-            # Rejection threshold for spectral fit in log(image)
-            # TODO: Make this a parameter?
-            logrej = 0.5
-
-            # Fit the spectral direction of the blaze.
-            # TODO: Figure out how to deal with the fits going crazy at
-            #  the edges of the chip in spec direction
-            # TODO: Can we add defaults to bspline_profile so that we
-            #  don't have to instantiate invvar and profile_basis
-            spec_bspl, spec_gpm_fit, spec_flat_fit, _, exit_status \
-                    = fitting.bspline_profile(spec_coo_data, spec_flat_data, spec_ivar_data,
-                                            np.ones_like(spec_coo_data), ingpm=spec_gpm_data,
-                                            nord=4, upper=logrej, lower=logrej,
-                                            kwargs_bspline={'bkspace': spec_samp_fine},
-                                            kwargs_reject={'groupbadpix': True, 'maxrej': 5})
+            spec_data[slit_idx] = dict(srt=spec_srt, coo=spec_coo_data, flat=spec_flat_data,
+                                       ivar=ivar_log[spec_gpm].ravel()[spec_srt],
+                                       gpm=gpm_log[spec_gpm].ravel()[spec_srt])
+
+        # Rejection threshold for spectral fit in log(image)
+        # TODO: Make this a parameter?
+        logrej = 0.5
+
+        # Fit the spectral direction of the blaze.  The fits of all slits
+        # are independent, so they are performed together.
+        # TODO: Figure out how to deal with the fits going crazy at
+        #  the edges of the chip in spec direction
+        # TODO: Can we add defaults to bspline_profile so that we
+        #  don't have to instantiate invvar and profile_basis
+        spec_fits = fitting.bspline_profile_batch([d['coo'] for d in spec_data.values()],
+                                                  [d['flat'] for d in spec_data.values()],
+                                                  [d['ivar'] for d in spec_data.values()],
+                                                  [np.ones_like(d['coo']) for d in spec_data.values()],
+                                                  ingpm=[d['gpm'] for d in spec_data.values()],
+                                                  nord=4, upper=logrej, lower=logrej,
+                                                  kwargs_bspline={'bkspace': spec_samp_fine},
+                                                  kwargs_reject={'groupbadpix': True, 'maxrej': 5},
+                                                  n_proc=self.flatpar['n_proc'])
 
+        # #################################################
+        # Model the spatial and 2D response of each slit independently
+        for slit_idx, (spec_bspl, spec_gpm_fit, spec_flat_fit, _, exit_status) \
+                in zip(spec_data.keys(), spec_fits):
+            slit_spat = self.slits.spat_id[slit_idx]
             if exit_status > 1:
                 # TODO -- MAKE A FUNCTION
                 msgs.warn('Flat-field spectral response bspline fit failed!  Not flat-fielding '
@@ -1049,6 +1073,25 @@ class FlatField:
                 self.slits.mask[slit_idx] = self.slits.bitmask.turn_on(self.slits.mask[slit_idx], 'BADFLATCALIB')
                 continue
 
+            msgs.info('Modeling the flat-field response for slit spat_id={}: {}/{}'.format(
+                        slit_spat, slit_idx+1, self.slits.nslits))
+
+            # Find the pixels on the initial, padded, and trimmed slit
+            onslit_init = slitid_img_init == slit_spat
+            onslit_padded = padded_slitid_img == slit_spat
+            spec_gpm = (trimmed_slitid_img == slit_spat) & gpm_log
+
+            # Create an image with the spatial coordinates relative to the left edge of this slit
+            spat_coo_init = self.slits.spatial_coordinate_image(slitidx=slit_idx, full=True, initial=True)
+
+            # Recreate the image with the spectral pixel index, and
+            # recover the sorted spectral data
+            spec_coo = self.spectral_coordinate_image(slit_idx)
+            spec_srt = spec_data[slit_idx]['srt']
+            spec_coo_data = spec_data[slit_idx]['coo']
+            spec_flat_data = spec_data[slit_idx]['flat']
+            spec_gpm_data = spec_data[slit_idx]['gpm']
+
             # Debugging/checking spectral fit
             if debug:
                 fitting.bspline_qa(spec_coo_data, spec_flat_data, spec_bspl, spec_gpm_fit,
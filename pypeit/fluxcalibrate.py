@@ -5,18 +5,24 @@ import matplotlib.pyplot as plt
 from astropy.io import fits
 
 from pypeit import msgs
+from pypeit import cache
+from pypeit import utils
 from pypeit.spectrographs.util import load_spectrograph
 from pypeit import specobjs
 from pypeit import sensfunc
 from pypeit.history import History
 from astropy import table
-from IPython import embed
+from pypeit.lazyimport import embed
 
 
 def flux_calibrate(spec1dfiles, sensfiles, par=None, outfiles=None, chk_version=True):
     """
     Function for flux calibrating spectra.
 
+    The files are flux calibrated in parallel if ``par['n_proc'] > 1``; see
+    :func:`~pypeit.utils.parallel_map`.  Each process reads each sensitivity
+    function only once; see :func:`load_sensfunc`.
+
     Args:
         spec1dfiles (list):
             List of PypeIt spec1d files that you want to flux calibrate
@@ -40,14 +46,63 @@ def flux_calibrate(spec1dfiles, sensfiles, par=None, outfiles=None, chk_version=
     spectrograph = load_spectrograph(header['PYP_SPEC'])
     par = spectrograph.default_pypeit_par()['fluxcalib'] if par is None else par
 
-    sensf_last = None
-    for spec1, sensf, outfile in zip(spec1dfiles, sensfiles, outfiles):
-        # Read in the data
-        sobjs = specobjs.SpecObjs.from_fitsfile(spec1, chk_version=chk_version)
-        history = History(sobjs.header)
-        if sensf != sensf_last:
-            sens = sensfunc.SensFunc.from_file(sensf, chk_version=chk_version)
-            sensf_last = sensf
-            history.append(f'PypeIt Flux calibration "{sensf}"')
-        sobjs.apply_flux_calib(par, spectrograph, sens)
-        sobjs.write_to_fits(sobjs.header, outfile, history=history, overwrite=True)
+    shared = dict(par=par, spectrograph=spectrograph, chk_version=chk_version)
+    for outfile in utils.parallel_map(flux_calibrate_file,
+                                      zip(spec1dfiles, sensfiles, outfiles),
+                                      n_proc=par['n_proc'], shared=shared):
+        msgs.info(f'Wrote flux-calibrated spectra to {outfile}')
+
+
+def load_sensfunc(sensfile, chk_version=True):
+    """
+    Load a sensitivity function, reading each file only once per process.
+
+    The sensitivity functions are kept in the process-wide cache of
+    :func:`~pypeit.cache.cached_product`, such that each worker process of
+    :func:`flux_calibrate` reads each file once, and the file is read again
+    if it changes.
+
+    Args:
+        sensfile (str):
+            Name of the sensitivity function file.
+        chk_version (bool, optional):
+            Whether to check the data model version of the file.
+
+    Returns:
+        :class:`~pypeit.sensfunc.SensFunc`: The sensitivity function.
+    """
+    return cache.cached_product(
+            cache.file_key(sensfile) + ('sensfunc', chk_version),
+            lambda: sensfunc.SensFunc.from_file(sensfile, chk_version=chk_version))
+
+
+def flux_calibrate_file(files, par=None, spectrograph=None, chk_version=True):
+    """
+    Flux calibrate the spectra in a single spec1d file.
+
+    Args:
+        files (tuple):
+            The names of the spec1d file to flux calibrate, of the
+            sensitivity function file to use, and of the output file.  The
+            sensitivity function is read using :func:`load_sensfunc` and
+            recorded in the history of the output file.
+        par (:class:`~pypeit.par.pypeitpar.FluxCalibratePar`):
+            Parset object containing parameters governing the flux calibration.
+        spectrograph (:class:`~pypeit.spectrographs.spectrograph.Spectrograph`):
+            Spectrograph used to collect the data.
+        chk_version (bool, optional):
+            Whether to check of the data model versions of the spec1d and
+            sensitivity function files.
+
+    Returns:
+        str: The name of the output file.
+    """
+    spec1, sensfile, outfile = files
+    sens = load_sensfunc(sensfile, chk_version=chk_version)
+    # Read in the data
+    sobjs = specobjs.SpecObjs.from_fitsfile(spec1, chk_version=chk_version)
+    history = History(sobjs.header)
+    history.append(f'PypeIt Flux calibration "{sensfile}"')
+    sobjs.apply_flux_calib(par, spectrograph, sens)
+    sobjs.write_to_fits(sobjs.header, outfile, history=history, overwrite=True)
+    return outfile
@@ -7,7 +7,7 @@ Module for managing the history of PypeIt output files.
 
 import os.path
 import numpy as np
-from IPython import embed
+from pypeit.lazyimport import embed
 
 from astropy.time import Time
 from astropy.io import fits
@@ -9,7 +9,7 @@ Class usage examples
 .. include common links, assuming primary doc root is up one directory
 .. include:: ../include/links.rst
 """
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
@@ -109,6 +109,11 @@ class BitMaskArray(DataContainer):
             item (object):
                 The attribute being accessed.
         """
+        # NOTE: The keys are not yet defined when the object is being
+        # reconstructed without calling __init__, e.g., when it is unpickled
+        # after being returned by a worker process.
+        if 'lower_keys' not in self.__dict__:
+            raise AttributeError(f'{item} is not an attribute of {self.__class__.__name__}!')
         try:
             i = self.lower_keys.index(item.lower())
         except ValueError:
@@ -4,11 +4,13 @@
 .. include:: ../include/links.rst
 """
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
 from pypeit import msgs
+from pypeit import utils
+from pypeit import perf
 from pypeit.par import pypeitpar
 from pypeit.images import rawimage
 from pypeit.images import combineimage
@@ -158,6 +160,33 @@ All of these **must** subclass from
 """
 
 
+def process_raw_file(ifile, spectrograph=None, det=None, par=None, **kwargs):
+    """
+    Read and process a single raw frame.
+
+    This is a thin wrapper used by :func:`buildimage_fromlist` so that the
+    frames can be processed by a pool of worker processes; see
+    :func:`~pypeit.utils.parallel_map`.
+
+    Args:
+        ifile (:obj:`str`, `Path`_):
+            Raw file to process.
+        spectrograph (:class:`~pypeit.spectrographs.spectrograph.Spectrograph`):
+            Spectrograph used to take the data.
+        det (:obj:`int`, :obj:`tuple`):
+            The 1-indexed detector number(s) to process.
+        par (:class:`~pypeit.par.pypeitpar.ProcessImagesPar`):
+            Parameters that dictate the processing of the image.
+        **kwargs:
+            Passed directly to :func:`~pypeit.images.rawimage.RawImage.process`.
+
+    Returns:
+        :class:`~pypeit.images.pypeitimage.PypeItImage`: The processed image.
+    """
+    with perf.step('process_raw'):
+        return rawimage.RawImage(ifile, spectrograph, det).process(par, **kwargs)
+
+
 def buildimage_fromlist(spectrograph, det, frame_par, file_list, bias=None, bpm=None, dark=None,
                         scattlight=None, flatimages=None, maxiters=5, ignore_saturation=True,
                         slits=None, mosaic=None, calib_dir=None, setup=None, calib_id=None):
@@ -167,6 +196,12 @@ def buildimage_fromlist(spectrograph, det, frame_par, file_list, bias=None, bpm=
     image combination is handled by :class:`~pypeit.images.combineimage.CombineImage`.
     This function can be used to process both single images, lists of images, and detector mosaics.
 
+    The images can be processed concurrently by setting the ``n_proc``
+    parameter in ``frame_par['process']``.  The processed images are streamed
+    to :class:`~pypeit.images.combineimage.CombineImage` in the order of
+    ``file_list`` as they are completed, such that the result is identical to
+    processing the images serially.
+
     .. warning::
 
         For image mosaics (when ``det`` is a tuple) the processing behavior is
@@ -252,19 +287,23 @@ def buildimage_fromlist(spectrograph, det, frame_par, file_list, bias=None, bpm=
     if mosaic is None:
         mosaic = isinstance(det, tuple) and frame_par['frametype'] not in ['bias', 'dark']
 
-    rawImage_list = []
-    # Loop on the files
-    for ifile in file_list:
-        # Load raw image
-        rawImage = rawimage.RawImage(ifile, spectrograph, det)
-        # Process
-        rawImage_list.append(rawImage.process(
-            frame_par['process'], scattlight=scattlight, bias=bias,
-            bpm=bpm, dark=dark, flatimages=flatimages, slits=slits, mosaic=mosaic))
-
-    # Do it
-    combineImage = combineimage.CombineImage(rawImage_list, frame_par['process'])
-    pypeitImage = combineImage.run(maxiters=maxiters, ignore_saturation=ignore_saturation)
+    # Process the files, either serially or using a pool of workers.  The
+    # processed images are yielded in order as they are completed.
+    n_proc = min(frame_par['process']['n_proc'], len(file_list))
+    if n_proc > 1:
+        msgs.info(f'Processing {len(file_list)} {frame_par["frametype"]} frames using {n_proc} '
+                  'processes.')
+    shared = dict(spectrograph=spectrograph, det=det, par=frame_par['process'],
+                  scattlight=scattlight, bias=bias, bpm=bpm, dark=dark, flatimages=flatimages,
+                  slits=slits, mosaic=mosaic)
+    with perf.step(f'build_{frame_par["frametype"]}'):
+        processed_images = utils.parallel_map(process_raw_file, file_list, n_proc=n_proc,
+                                              shared=shared)
+
+        # Do it
+        combineImage = combineimage.CombineImage(processed_images, frame_par['process'],
+                                                 nimgs=len(file_list))
+        pypeitImage = combineImage.run(maxiters=maxiters, ignore_saturation=ignore_saturation)
     # Return class type, if returning any of the frame_image_classes
     cls = frame_image_classes[frame_par['frametype']] \
             if frame_par['frametype'] in frame_image_classes.keys() else None
@@ -4,7 +4,7 @@
 .. include:: ../include/links.rst
 """
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
@@ -22,29 +22,46 @@ class CombineImage:
     Process and combine detector images. 
 
     Args:
-        rawImages (:obj:`list`, :class:`~pypeit.images.pypeitimage.PypeItImage`):
+        rawImages (:obj:`list`, :class:`~pypeit.images.pypeitimage.PypeItImage`, iterator):
             Either a single :class:`~pypeit.images.pypeitimage.PypeItImage`
-            object or a list of one or more of these objects to be combined into
-            an image.
+            object, a list of one or more of these objects, or an iterator
+            (e.g., a generator) that yields these objects, to be combined into
+            an image.  If an iterator, ``nimgs`` must be provided; the images
+            are then consumed one at a time by :func:`run`, such that they
+            need not all be held in memory simultaneously.
         par (:class:`~pypeit.par.pypeitpar.ProcessImagesPar`):
             Parameters that dictate the processing of the images.
+        nimgs (:obj:`int`, optional):
+            The number of images yielded by ``rawImages``.  Required if
+            ``rawImages`` is an iterator, ignored otherwise.
 
     Attributes:
         det (:obj:`int`, :obj:`tuple`):
             The 1-indexed detector number(s) to process.
         par (:class:`~pypeit.par.pypeitpar.ProcessImagesPar`):
             Parameters that dictate the processing of the images.
-        rawImages (:obj:`list`):
-            A list of one or more :class:`~pypeit.images.rawimage.RawImage` objects 
-            to be combined.             
+        rawImages (:obj:`list`, iterator):
+            A list of (or an iterator over) one or more
+            :class:`~pypeit.images.rawimage.RawImage` objects to be combined.
     """
-    def __init__(self, rawImages, par):
+    def __init__(self, rawImages, par, nimgs=None):
         if not isinstance(par, pypeitpar.ProcessImagesPar):
             msgs.error('Provided ParSet for must be type ProcessImagesPar.')
-        self.rawImages = list(rawImages) if hasattr(rawImages, '__len__') else [rawImages]
+        if hasattr(rawImages, '__len__'):
+            self.rawImages = list(rawImages)
+            self._nimgs = len(self.rawImages)
+        elif hasattr(rawImages, '__next__'):
+            if nimgs is None:
+                msgs.error('Must provide the number of images when instantiating CombineImage '
+                           'with an iterator.')
+            self.rawImages = rawImages
+            self._nimgs = nimgs
+        else:
+            self.rawImages = [rawImages]
+            self._nimgs = 1
         self.par = par  # This musts be named this way as it is frequently a child
 
-        # NOTE: nimgs is a property method.  Defining rawImages above must come
+        # NOTE: nimgs is a property method.  Defining _nimgs above must come
         # before this check!
         if self.nimgs == 0:
             msgs.error('CombineImage requires a list of files to instantiate')
@@ -184,6 +201,10 @@ class CombineImage:
             gpm_stack[kk] = rawImage.select_flag(invert=True)
             file_list.append(rawImage.filename)
 
+        if len(file_list) != self.nimgs:
+            msgs.error(f'Expected {self.nimgs} images to combine, but only {len(file_list)} were '
+                       'provided.')
+
         # Check that all exposure times are consistent
         # TODO: JFH suggests that we move this to calibrations.check_calibrations
         if np.any(np.absolute(np.diff(exptime)) > 0):
@@ -297,8 +318,8 @@ class CombineImage:
     @property
     def nimgs(self):
         """
-        The number of files in :attr:`files`.
+        The number of images to combine.
         """
-        return len(self.rawImages) if isinstance(self.rawImages, (np.ndarray, list)) else 0
+        return self._nimgs
 
 
@@ -6,13 +6,13 @@
 """
 import inspect
 
-from IPython import embed
+from pypeit.lazyimport import embed, lazy_import
 
 import numpy as np
 
 from pypeit import datamodel
 from pypeit import msgs
-from pypeit.core import procimg
+procimg = lazy_import('pypeit.core.procimg')
 
 
 class DetectorContainer(datamodel.DataContainer):
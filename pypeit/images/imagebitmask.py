@@ -1,5 +1,5 @@
 """ Module for image mask related items """
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
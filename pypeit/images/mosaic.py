@@ -5,15 +5,17 @@
 .. include:: ../include/links.rst
 """
 import inspect
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
 from astropy import table
 from astropy.io import fits
 
+from pypeit import cache
 from pypeit import datamodel
 from pypeit import io
+from pypeit.core.mosaic import build_mosaic_map
 from pypeit.images.detector_container import DetectorContainer
 from pypeit import msgs
 
@@ -218,6 +220,29 @@ class Mosaic(datamodel.DataContainer):
         """
         return int(name[len(Mosaic.name_prefix):])
 
+    def resampling_map(self, shape=None):
+        """
+        Return the map used to resample the detector images onto the mosaic.
+
+        The map only depends on the shape of the detector images, the
+        transforms (which include the binning), and the interpolation order.
+        It is constructed once and then cached, both in memory and on disk; see
+        :func:`~pypeit.cache.cached_product`.
+
+        Args:
+            shape (:obj:`tuple`, optional):
+                Shape of each detector image.  If None, use :attr:`shape`.
+
+        Returns:
+            :obj:`dict`: The resampling map; see
+            :func:`~pypeit.core.mosaic.build_mosaic_map`.
+        """
+        _shape = tuple(int(s) for s in (self.shape if shape is None else shape))
+        order = 0 if self.msc_ord is None else self.msc_ord
+        key = ('mosaic_map', _shape, self.tform.shape, self.tform.tobytes(), order)
+        return cache.cached_product(
+                    key, lambda: build_mosaic_map(_shape, self.tform, order=order), persist=True)
+
     def copy(self):
         """
         Return a (deep) copy of the object.
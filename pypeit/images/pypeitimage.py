@@ -5,7 +5,7 @@
 """
 import inspect
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
@@ -8,7 +8,7 @@ import os
 import inspect
 from copy import deepcopy
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
@@ -20,7 +20,7 @@ from pypeit.core import procimg
 from pypeit.core import flat
 from pypeit.core import flexure
 from pypeit.core import scattlight
-from pypeit.core.mosaic import build_image_mosaic
+from pypeit.core.mosaic import apply_mosaic_map
 from pypeit.images import pypeitimage
 from pypeit import utils
 from pypeit.display import display
@@ -1325,9 +1325,10 @@ class RawImage:
         """
         When processing multiple detectors, this remaps the detector data to a mosaic.
 
-        This is largely a wrapper for multiple calls to
-        :func:`~pypeit.core.mosaic.build_image_mosaic`.  Resampling is currently
-        restricted to nearest grid-point interpolation (``order=0``).
+        The resampling map for the mosaic is constructed once for each mosaic
+        geometry (see :func:`~pypeit.images.mosaic.Mosaic.resampling_map`) and
+        then applied to each image using
+        :func:`~pypeit.core.mosaic.apply_mosaic_map`.
 
         Construction of the mosaic(s) must be done *after* the images have been
         trimmed and oriented to follow the ``PypeIt`` convention.
@@ -1355,59 +1356,46 @@ class RawImage:
         self.det_img = np.array([np.full(img.shape, d.det, dtype=int)
                                     for img,d in zip(self.image, self.detector)])
 
-        # Transform the image data to the mosaic frame.  This call determines
-        # the shape of the mosaic image and adjusts the relative transforms to
-        # the absolute mosaic frame.
-        self.image, _, _img_npix, _tforms = build_image_mosaic(self.image, self.mosaic.tform, order=self.mosaic.msc_ord)
-        shape = self.image.shape
-        # Maintain dimensionality
-        self.image = np.expand_dims(self.image, 0)
+        # Get the map used to resample the images.  This determines the shape
+        # of the mosaic image and adjusts the relative transforms to the
+        # absolute mosaic frame.
+        mosaic_map = self.mosaic.resampling_map(shape=self.image.shape[1:])
+        msgs.info(f'Constructing image mosaics with {self.nimg} images and output shape '
+                  f'{mosaic_map["mosaic_shape"]}.')
 
-        # For the remaining transforms, we can use the first call to skip over
-        # the need to determine the output mosaic shape and the adjusted
-        # transforms.
+        # Transform the image data to the mosaic frame, maintaining the
+        # dimensionality
+        self.image = np.expand_dims(apply_mosaic_map(mosaic_map, self.image), 0)
 
         # Transform the BPM and maintain its type
         bpm_type = self.bpm.dtype
-        self._bpm = build_image_mosaic(self.bpm.astype(float), _tforms, mosaic_shape=shape, order=self.mosaic.msc_ord)[0]
+        self._bpm = apply_mosaic_map(mosaic_map, self.bpm)
         # Include pixels that have no contribution from the original image in
         # the bad pixel mask of the mosaic.
-        self._bpm[_img_npix < 1] = 1
+        self._bpm[mosaic_map['npix'] < 1] = 1
         # np.round helps to deal with cases where the interpolation is performed
         # and values of adjacent pixels are combined
         self._bpm = np.expand_dims(np.round(self._bpm).astype(bpm_type), 0)
 
-        # NOTE: The bitmask is set by a combination of pixels without any
-        # contributions when creating the image mosaic and when mosaicing the
-        # detector bpms.  The `_img_npix` equivalent for the other mosaics
-        # (e.g., the rn2img mosaic) should be identical.
-
         # Get the pixels associated with each amplifier
-        self.datasec_img = build_image_mosaic(self.datasec_img.astype(float), _tforms,
-                                              mosaic_shape=shape, order=self.mosaic.msc_ord)[0]
+        self.datasec_img = apply_mosaic_map(mosaic_map, self.datasec_img)
         self.datasec_img = np.expand_dims(np.round(self.datasec_img).astype(int), 0)
 
         # Get the pixels associated with each detector
-        self.det_img = build_image_mosaic(self.det_img.astype(float), _tforms,
-                                          mosaic_shape=shape, order=self.mosaic.msc_ord)[0]
+        self.det_img = apply_mosaic_map(mosaic_map, self.det_img)
         self.det_img = np.expand_dims(np.round(self.det_img).astype(int), 0)
 
         # Transform all the variance arrays, as necessary
         if self.rn2img is not None:
-            self.rn2img = build_image_mosaic(self.rn2img, _tforms, mosaic_shape=shape, order=self.mosaic.msc_ord)[0]
-            self.rn2img = np.expand_dims(self.rn2img, 0)
+            self.rn2img = np.expand_dims(apply_mosaic_map(mosaic_map, self.rn2img), 0)
         if self.dark is not None:
-            self.dark = build_image_mosaic(self.dark, _tforms, mosaic_shape=shape, order=self.mosaic.msc_ord)[0]
-            self.dark = np.expand_dims(self.dark, 0)
+            self.dark = np.expand_dims(apply_mosaic_map(mosaic_map, self.dark), 0)
         if self.dark_var is not None:
-            self.dark_var = build_image_mosaic(self.dark_var, _tforms, mosaic_shape=shape, order=self.mosaic.msc_ord)[0]
-            self.dark_var = np.expand_dims(self.dark_var, 0)
+            self.dark_var = np.expand_dims(apply_mosaic_map(mosaic_map, self.dark_var), 0)
         if self.proc_var is not None:
-            self.proc_var = build_image_mosaic(self.proc_var, _tforms, mosaic_shape=shape, order=self.mosaic.msc_ord)[0]
-            self.proc_var = np.expand_dims(self.proc_var, 0)
+            self.proc_var = np.expand_dims(apply_mosaic_map(mosaic_map, self.proc_var), 0)
         if self.base_var is not None:
-            self.base_var = build_image_mosaic(self.base_var, _tforms, mosaic_shape=shape, order=self.mosaic.msc_ord)[0]
-            self.base_var = np.expand_dims(self.base_var, 0)
+            self.base_var = np.expand_dims(apply_mosaic_map(mosaic_map, self.base_var), 0)
 
         # TODO: Mosaicing means that many of the internals are no longer
         # valid/useful.  Specifically, I set ronoise, rawimage, rawdatsec_img,
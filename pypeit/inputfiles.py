@@ -30,7 +30,7 @@ from pypeit import msgs, __version__
 from pypeit.spectrographs.util import load_spectrograph
 from pypeit.par.pypeitpar import PypeItPar
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 
 class InputFile:
@@ -17,7 +17,7 @@ import gzip
 import shutil
 from packaging import version
 
-from IPython import embed
+from pypeit.lazyimport import embed, lazy_import
 
 import numpy
 
@@ -28,16 +28,17 @@ from astropy.table import Table
 # writing to the header. See `initialize_header`
 import scipy
 import astropy
-import sklearn
+sklearn = lazy_import('sklearn')
 import pypeit
 import time
 
 # TODO: Reminder that our aim is to eventually deprecate use of xspectrum1d in
 # favor of specutils.Spectrum1D (or whatever it is in specutils>2.0).
-from linetools.spectra import xspectrum1d
+xspectrum1d = lazy_import('linetools.spectra.xspectrum1d')
 
 from pypeit import msgs
 from pypeit import dataPaths
+from pypeit import cache
 from pypeit import __version__
 
 # TODO -- Move this module to core/
@@ -982,7 +983,7 @@ def load_thar_spec():
     return fits_open(dataPaths.arclines.get_file_path('thar_spec_MM201006.fits'))
 
 
-def load_sky_spectrum(sky_file: str) -> xspectrum1d.XSpectrum1D:
+def load_sky_spectrum(sky_file: str) -> 'xspectrum1d.XSpectrum1D':
     """
     Load a sky spectrum from the PypeIt data directory into an XSpectrum1D
     object.
@@ -999,6 +1000,7 @@ def load_sky_spectrum(sky_file: str) -> xspectrum1d.XSpectrum1D:
         `linetools.spectra.xspectrum1d.XSpectrum1D`_: Sky spectrum
     """
     path = dataPaths.sky_spec.get_file_path(sky_file)
-    return xspectrum1d.XSpectrum1D.from_file(str(path))
+    return cache.cached_product(cache.file_key(path) + ('sky_spectrum',),
+                                lambda: xspectrum1d.XSpectrum1D.from_file(str(path)))
 
 
@@ -0,0 +1,105 @@
+"""
+Utilities used to defer the import of heavy dependencies until they are needed.
+
+Importing ``PypeIt`` modules should be fast, particularly for the command-line
+scripts, which may be executed many times in succession.  Modules should
+therefore avoid importing large packages (e.g., `IPython`_, `matplotlib`_,
+`scipy.optimize`_, `ginga`_) at the module level unless they are needed by
+nearly every function in the module.  Instead, use :func:`lazy_import` or
+import the package within the function that uses it.
+
+.. note::
+
+    To avoid circular imports, this module must not import anything from
+    ``pypeit``.
+
+.. include common links, assuming primary doc root is up one directory
+.. include:: ../include/links.rst
+"""
+import sys
+import types
+import importlib
+import importlib.util
+
+
+class LazyModule(types.ModuleType):
+    """
+    Proxy for a module that is imported when one of its attributes is first
+    accessed.
+
+    The proxy is *not* added to ``sys.modules``; the module is imported using
+    the standard import system when needed, and all attribute access is
+    passed to the imported module.
+
+    Args:
+        name (:obj:`str`):
+            The full name of the module.
+    """
+    def __init__(self, name):
+        super().__init__(name)
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self.__dict__['_module'] is None:
+            self.__dict__['_module'] = importlib.import_module(self.__name__)
+        return getattr(self.__dict__['_module'], attr)
+
+    def __dir__(self):
+        return dir(importlib.import_module(self.__name__))
+
+
+def lazy_import(name):
+    """
+    Return a module that is only imported when one of its attributes is first
+    accessed.
+
+    If the module has already been imported, it is simply returned.
+
+    Args:
+        name (:obj:`str`):
+            The full name of the module.
+
+    Returns:
+        :obj:`module`: The module or a :class:`LazyModule` proxy.
+
+    Raises:
+        ModuleNotFoundError:
+            Raised if the module cannot be found.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    # NOTE: Finding the spec of a submodule imports its parent package(s), so
+    # only the top-level package is checked.
+    if importlib.util.find_spec(name.split('.')[0]) is None:
+        raise ModuleNotFoundError(f'No module named {name!r}', name=name)
+    return LazyModule(name)
+
+
+def embed(header='', **kwargs):
+    """
+    Start an embedded `IPython`_ session in the namespace of the caller.
+
+    This is a drop-in replacement for `IPython.embed`_ that only imports
+    `IPython`_ when it is called.  Use it for debugging in place of ``from
+    IPython import embed``, which can take a significant fraction of the
+    time needed to import a ``PypeIt`` module.
+
+    Args:
+        header (:obj:`str`, optional):
+            Header printed when the session starts.
+        **kwargs:
+            Passed directly to ``IPython.terminal.embed.InteractiveShellEmbed``.
+    """
+    from IPython.terminal.embed import InteractiveShellEmbed
+    from IPython.terminal.ipapp import load_default_config
+    if kwargs.get('config') is None:
+        kwargs['config'] = load_default_config()
+        kwargs['config'].InteractiveShellEmbed = kwargs['config'].TerminalInteractiveShell
+    frame = sys._getframe(1)
+    location = f'{frame.f_code.co_filename}:{frame.f_lineno}'
+    shell = InteractiveShellEmbed.instance(_init_location_id=location, **kwargs)
+    # NOTE: stack_depth=2 selects the namespace of the function that called
+    # this one.
+    shell(header=header, stack_depth=2, _call_location_id=location)
+    InteractiveShellEmbed.clear_instance()
+
@@ -5,7 +5,7 @@ Implements an object to handle manual object extraction.
 """
 import inspect
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
@@ -11,7 +11,7 @@ import string
 from copy import deepcopy
 import datetime
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
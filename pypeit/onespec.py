@@ -6,7 +6,7 @@ Provides a simple datamodel for a single spectrum.
 """
 import inspect
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
@@ -7,7 +7,7 @@ Module for the SpecObj classes
 """
 import inspect
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
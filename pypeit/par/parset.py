@@ -7,7 +7,7 @@ Define a utility base class used to hold parameters.
 import os
 import textwrap
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy
 
@@ -62,7 +62,7 @@ from pathlib import Path
 import os
 import warnings
 import inspect
-from IPython import embed
+from pypeit.lazyimport import embed
 from collections import OrderedDict
 
 import numpy as np
@@ -222,7 +222,7 @@ class ProcessImagesPar(ParSet):
                  empirical_rn=None, shot_noise=None, noise_floor=None,
                  use_pixelflat=None, use_illumflat=None, use_specillum=None,
                  use_pattern=None, subtract_scattlight=None, scattlight=None, subtract_continuum=None,
-                 spat_flexure_correct=None, spat_flexure_maxlag=None):
+                 spat_flexure_correct=None, spat_flexure_maxlag=None, n_proc=None):
 
         # Grab the parameter names and values from the function
         # arguments
@@ -444,6 +444,15 @@ class ProcessImagesPar(ParSet):
 #        descr['calib_setup_and_bit'] = 'Over-ride the calibration setup and bit, e.g. "A_7".  ' \
 #                                       'Only recommended for use with quicklook.'
 
+        defaults['n_proc'] = 1
+        dtypes['n_proc'] = int
+        descr['n_proc'] = 'Number of processes to use when processing multiple raw frames ' \
+                          'before they are combined.  Each frame is processed independently ' \
+                          'and the results are streamed into the combined stack as they ' \
+                          'finish, so at most roughly twice this number of processed ' \
+                          'frames are held in memory at once.  Use 1 to process the frames ' \
+                          'serially.'
+
         # Instantiate the parameter set
         super(ProcessImagesPar, self).__init__(list(pars.keys()),
                                                values=list(pars.values()),
@@ -465,7 +474,7 @@ class ProcessImagesPar(ParSet):
                    'empirical_rn', 'shot_noise', 'noise_floor', 'use_pixelflat', 'combine',
                    'scale_to_mean', 'correct_nonlinear', 'satpix', #'calib_setup_and_bit',
                    'n_lohi', 'mask_cr', 'lamaxiter', 'grow', 'clip', 'comb_sigrej', 'rmcompact',
-                   'sigclip', 'sigfrac', 'objlim']
+                   'sigclip', 'sigfrac', 'objlim', 'n_proc']
 
         badkeys = np.array([pk not in parkeys for pk in k])
         if np.any(badkeys):
@@ -515,6 +524,9 @@ class ProcessImagesPar(ParSet):
         if self.data['n_lohi'] is not None and len(self.data['n_lohi']) != 2:
             raise ValueError('n_lohi must be a list of two numbers.')
 
+        if self.data['n_proc'] is not None and self.data['n_proc'] < 1:
+            raise ValueError('n_proc must be at least 1.')
+
         if not self.data['use_overscan']:
             return
         if self.data['overscan_par'] is None:
@@ -597,7 +609,7 @@ class FlatFieldPar(ParSet):
                  illum_iter=None, illum_rej=None, twod_fit_npoly=None, saturated_slits=None,
                  slit_illum_relative=None, slit_illum_ref_idx=None, slit_illum_smooth_npix=None,
                  pixelflat_min_wave=None, pixelflat_max_wave=None, slit_illum_finecorr=None,
-                 fit_2d_det_response=None):
+                 fit_2d_det_response=None, n_proc=None):
 
         # Grab the parameter names and values from the function
         # arguments
@@ -770,6 +782,12 @@ class FlatFieldPar(ParSet):
                                        'that have a dedicated response correction implemented. Currently,' \
                                        'this correction is only implemented for Keck+KCWI.'
 
+        defaults['n_proc'] = 1
+        dtypes['n_proc'] = int
+        descr['n_proc'] = 'Number of threads used to fit the spectral response of the slits.  ' \
+                          'The spectral fits of all slits are independent and are solved ' \
+                          'together; this only affects how many are solved at the same time.'
+
         # Instantiate the parameter set
         super(FlatFieldPar, self).__init__(list(pars.keys()),
                                            values=list(pars.values()),
@@ -789,7 +807,8 @@ class FlatFieldPar(ParSet):
                    'tweak_slits', 'tweak_method', 'tweak_slits_thresh', 'tweak_slits_maxfrac',
                    'rej_sticky', 'slit_trim', 'slit_illum_pad', 'slit_illum_relative',
                    'illum_iter', 'illum_rej', 'twod_fit_npoly', 'saturated_slits',
-                   'slit_illum_ref_idx', 'slit_illum_smooth_npix', 'slit_illum_finecorr', 'fit_2d_det_response']
+                   'slit_illum_ref_idx', 'slit_illum_smooth_npix', 'slit_illum_finecorr', 'fit_2d_det_response',
+                   'n_proc']
 
         badkeys = np.array([pk not in parkeys for pk in k])
         if np.any(badkeys):
@@ -835,6 +854,9 @@ class FlatFieldPar(ParSet):
         #                     'pixels, number of repeats')
         #if self.data['method'] == 'bspline' and len(self.data['params']) != 1:
         #    raise ValueError('For bspline method, set params = spacing (integer).')
+        if self.data['n_proc'] is not None and self.data['n_proc'] < 1:
+            raise ValueError('n_proc must be at least 1.')
+
         if self.data['pixelflat_file'] is None:
             return
 
@@ -1465,7 +1487,8 @@ class Coadd2DPar(ParSet):
     see :ref:`parameters`.
     """
     def __init__(self, only_slits=None, exclude_slits=None, offsets=None, spat_toler=None, weights=None, user_obj=None,
-                 use_slits4wvgrid=None, manual=None, wave_method=None, spec_samp_fact=None, spat_samp_fact=None):
+                 use_slits4wvgrid=None, manual=None, wave_method=None, spec_samp_fact=None, spat_samp_fact=None,
+                 max_resident=None, n_proc=None):
 
         # Grab the parameter names and values from the function
         # arguments
@@ -1571,6 +1594,21 @@ class Coadd2DPar(ParSet):
                 "spatial pixel size by ``spat_samp_fact``, i.e. the units of" \
                 "``spat_samp_fact`` are pixels."
 
+        defaults['max_resident'] = 16
+        dtypes['max_resident'] = int
+        descr['max_resident'] = 'The images of the spec2d files are read from memory-mapped files ' \
+                                'only when needed, limited to the slit currently being coadded. ' \
+                                'This sets the maximum number of spec2d files that are kept open ' \
+                                'at any one time; the least recently used file is closed when ' \
+                                'this limit is reached.  All files are closed once the slits are ' \
+                                'coadded.  If None, all files are kept open until then.'
+
+        defaults['n_proc'] = 1
+        dtypes['n_proc'] = int
+        descr['n_proc'] = 'Number of processes used to coadd the slits/orders in parallel.  ' \
+                          'The coadd of each slit is independent of the others.  The images ' \
+                          'of each slit are read by the main process, which reads ahead ' \
+                          'by at most twice this many slits.'
 
         # Instantiate the parameter set
         super(Coadd2DPar, self).__init__(list(pars.keys()),
@@ -1586,7 +1624,8 @@ class Coadd2DPar(ParSet):
     def from_dict(cls, cfg):
         k = np.array([*cfg.keys()])
         parkeys = ['only_slits', 'exclude_slits', 'offsets', 'spat_toler', 'weights', 'user_obj', 'use_slits4wvgrid',
-                   'manual', 'wave_method', 'spec_samp_fact', 'spat_samp_fact']
+                   'manual', 'wave_method', 'spec_samp_fact', 'spat_samp_fact', 'max_resident',
+                   'n_proc']
 
         badkeys = np.array([pk not in parkeys for pk in k])
         if np.any(badkeys):
@@ -1605,6 +1644,10 @@ class Coadd2DPar(ParSet):
         allowed_wave_methods = ['iref', 'velocity', 'log10', 'linear']
         if self.data['wave_method'] is not None and self.data['wave_method'] not in allowed_wave_methods:
             raise ValueError("If 'wave_method' is not None it must be one of:\n"+", ".join(allowed_wave_methods))
+        if self.data['max_resident'] is not None and self.data['max_resident'] < 1:
+            raise ValueError('Coadd2DPar max_resident must be None or at least 1.')
+        if self.data['n_proc'] is not None and self.data['n_proc'] < 1:
+            raise ValueError('n_proc must be at least 1.')
 
 
 
@@ -1883,7 +1926,8 @@ class FluxCalibratePar(ParSet):
     For a table with the current keywords, defaults, and descriptions,
     see :ref:`parameters`.
     """
-    def __init__(self, extinct_correct=None, extinct_file=None, extrap_sens=None, use_archived_sens = False):
+    def __init__(self, extinct_correct=None, extinct_file=None, extrap_sens=None, use_archived_sens = False,
+                 n_proc=None):
 
         # Grab the parameter names and values from the function
         # arguments
@@ -1929,6 +1973,13 @@ class FluxCalibratePar(ParSet):
         dtypes['use_archived_sens'] = bool
         descr['use_archived_sens'] = 'Use an archived sensfunc to flux calibration'
 
+        defaults['n_proc'] = 1
+        dtypes['n_proc'] = int
+        descr['n_proc'] = 'Number of processes used to flux calibrate the spec1d files in ' \
+                          'parallel.  Each process reads each sensitivity function only ' \
+                          'once.  At most twice this many ' \
+                          'files are processed at any one time.'
+
         # Instantiate the parameter set
         super(FluxCalibratePar, self).__init__(list(pars.keys()),
                                                  values=list(pars.values()),
@@ -1940,7 +1991,7 @@ class FluxCalibratePar(ParSet):
     @classmethod
     def from_dict(cls, cfg):
         k = np.array([*cfg.keys()])
-        parkeys = ['extinct_correct', 'extinct_file', 'extrap_sens', 'use_archived_sens']
+        parkeys = ['extinct_correct', 'extinct_file', 'extrap_sens', 'use_archived_sens', 'n_proc']
 
         badkeys = np.array([pk not in parkeys for pk in k])
         if np.any(badkeys):
@@ -1955,7 +2006,8 @@ class FluxCalibratePar(ParSet):
         """
         Check the parameters are valid for the provided method.
         """
-        pass
+        if self.data['n_proc'] is not None and self.data['n_proc'] < 1:
+            raise ValueError('n_proc must be at least 1.')
 
 
 class SensFuncPar(ParSet):
@@ -3269,7 +3321,8 @@ class EdgeTracePar(ParSet):
                  order_gap_poly=None, order_fitrej=None, order_outlier=None, order_spat_range=None,
                  overlap=None, max_overlap=None, use_maskdesign=None, maskdesign_maxsep=None,
                  maskdesign_step=None, maskdesign_sigrej=None, pad=None, add_slits=None,
-                 add_predict=None, rm_slits=None, maskdesign_filename=None):
+                 add_predict=None, rm_slits=None, maskdesign_filename=None, n_proc=None,
+                 sobel_memmap=None):
 
         # Grab the parameter names and values from the function
         # arguments
@@ -3799,6 +3852,20 @@ class EdgeTracePar(ParSet):
                             'that contains pixel (spat,spec)=(2000,2121) and on detector 3 ' \
                             'that contains pixel (2000,2121).'
 
+        defaults['n_proc'] = 1
+        dtypes['n_proc'] = int
+        descr['n_proc'] = 'Number of processes used to trace the slit edges of multiple ' \
+                          'detectors (or mosaics) in parallel.  The edges of each detector are ' \
+                          'traced independently; this only affects how many are traced at the ' \
+                          'same time.'
+
+        defaults['sobel_memmap'] = False
+        dtypes['sobel_memmap'] = bool
+        descr['sobel_memmap'] = 'Keep the Sobel-filtered images used to follow the left and right ' \
+                                'edges in memory-mapped temporary files instead of in memory.  ' \
+                                'This reduces the memory used when tracing very large detectors ' \
+                                'or mosaics, at the cost of some disk I/O.'
+
         # Instantiate the parameter set
         super(EdgeTracePar, self).__init__(list(pars.keys()), values=list(pars.values()),
                                            defaults=list(defaults.values()),
@@ -3826,7 +3893,7 @@ class EdgeTracePar(ParSet):
                    'order_gap_poly', 'order_fitrej', 'order_outlier', 'order_spat_range','overlap',
                    'max_overlap', 'use_maskdesign', 'maskdesign_maxsep', 'maskdesign_step',
                    'maskdesign_sigrej', 'maskdesign_filename', 'pad', 'add_slits', 'add_predict',
-                   'rm_slits']
+                   'rm_slits', 'n_proc', 'sobel_memmap']
 
         badkeys = np.array([pk not in parkeys for pk in k])
         if np.any(badkeys):
@@ -3868,6 +3935,8 @@ class EdgeTracePar(ParSet):
             msgs.error('If defined, max_overlap must be in the range [0,1].')
         if self['order_outlier'] is not None and self['order_outlier'] < self['order_fitrej']:
             msgs.warn('Order outlier threshold should not be less than the rejection threshold.')
+        if self.data['n_proc'] is not None and self.data['n_proc'] < 1:
+            raise ValueError('n_proc must be at least 1.')
 
 
 class WaveTiltsPar(ParSet):
@@ -4337,7 +4406,8 @@ class SkySubPar(ParSet):
 
     def __init__(self, bspline_spacing=None, sky_sigrej=None, global_sky_std=None, no_poly=None,
                  user_regions=None, joint_fit=None, mask_by_boxcar=None,
-                 no_local_sky=None, max_mask_frac=None, local_maskwidth=None):
+                 no_local_sky=None, max_mask_frac=None, local_maskwidth=None,
+                 joint_fit_nchunk=None, n_proc=None):
         # Grab the parameter names and values from the function
         # arguments
         args, _, _, values = inspect.getargvalues(inspect.currentframe())
@@ -4400,6 +4470,17 @@ class SkySubPar(ParSet):
                              'current implementation does not account for variations in the instrument FWHM ' \
                              'in different slits. This will be addressed by Issue #1660.'
 
+        defaults['joint_fit_nchunk'] = 1
+        dtypes['joint_fit_nchunk'] = int
+        descr['joint_fit_nchunk'] = 'Number of spectral chunks used for the joint sky fit (see ' \
+                                    '``joint_fit``).  If larger than 1, the sky model is fit ' \
+                                    'separately in each chunk (with a margin of overlapping ' \
+                                    'pixels), which reduces the memory needed for IFU data with ' \
+                                    'many slits.  The chunks are fit in parallel if ``n_proc`` ' \
+                                    'is larger than 1.  The result is nearly identical to a ' \
+                                    'single fit, but pixels are rejected independently in ' \
+                                    'each chunk.'
+
         defaults['max_mask_frac'] = 0.80
         dtypes['max_mask_frac'] = float
         descr['max_mask_frac'] = 'Maximum fraction of total pixels on a slit that can be masked by the input masks. ' \
@@ -4409,6 +4490,16 @@ class SkySubPar(ParSet):
         dtypes['local_maskwidth'] = float
         descr['local_maskwidth'] = 'Initial width of the region in units of FWHM that will be used for local sky subtraction'
 
+        defaults['n_proc'] = 1
+        dtypes['n_proc'] = int
+        descr['n_proc'] = 'Number of processes to use for the global sky subtraction.  The ' \
+                          'slits (or the spectral chunks of the joint fit; see ' \
+                          '``joint_fit_nchunk``) are independent and are distributed among ' \
+                          'the processes.  ' \
+                          'The images are passed to each process only once, when it starts, ' \
+                          'and only the sky model of each slit is returned.  Use 1 to fit the ' \
+                          'slits serially.'
+
 
         # Instantiate the parameter set
         super(SkySubPar, self).__init__(list(pars.keys()),
@@ -4426,7 +4517,8 @@ class SkySubPar(ParSet):
         # Basic keywords
         parkeys = ['bspline_spacing', 'sky_sigrej', 'global_sky_std', 'no_poly',
                    'user_regions', 'joint_fit', 'mask_by_boxcar',
-                   'no_local_sky', 'max_mask_frac', 'local_maskwidth']
+                   'no_local_sky', 'max_mask_frac', 'local_maskwidth', 'joint_fit_nchunk',
+                   'n_proc']
 
         badkeys = np.array([pk not in parkeys for pk in k])
         if np.any(badkeys):
@@ -4438,7 +4530,10 @@ class SkySubPar(ParSet):
         return cls(**kwargs)
 
     def validate(self):
-        pass
+        if self.data['joint_fit_nchunk'] is not None and self.data['joint_fit_nchunk'] < 1:
+            raise ValueError('joint_fit_nchunk must be at least 1.')
+        if self.data['n_proc'] is not None and self.data['n_proc'] < 1:
+            raise ValueError('n_proc must be at least 1.')
 
 
 class ExtractionPar(ParSet):
@@ -4452,7 +4547,8 @@ class ExtractionPar(ParSet):
 
     def __init__(self, boxcar_radius=None, std_prof_nsigma=None, sn_gauss=None,
                  model_full_slit=None, skip_extraction=None, skip_optimal=None,
-                 use_2dmodel_mask=None, use_user_fwhm=None, return_negative=None):
+                 use_2dmodel_mask=None, use_user_fwhm=None, return_negative=None,
+                 n_proc=None):
 
         # Grab the parameter names and values from the function
         # arguments
@@ -4514,6 +4610,16 @@ class ExtractionPar(ParSet):
         dtypes['return_negative'] = bool
         descr['return_negative'] = 'If ``True`` the negative traces will be extracted and saved to disk'
 
+        defaults['n_proc'] = 1
+        dtypes['n_proc'] = int
+        descr['n_proc'] = 'Number of processes to use for local sky subtraction and extraction. ' \
+                          'Slits (or, for echelle data, orders whose objects all have S/N ' \
+                          'above the threshold used to fit the FWHM across orders) are ' \
+                          'independent and are distributed among the processes.  The images ' \
+                          'are passed to each process only once, when it starts, and only ' \
+                          'the models of each slit are returned.  Use 1 to process the ' \
+                          'slits serially.'
+
         # Instantiate the parameter set
         super(ExtractionPar, self).__init__(list(pars.keys()),
                                         values=list(pars.values()),
@@ -4529,7 +4635,8 @@ class ExtractionPar(ParSet):
 
         # Basic keywords
         parkeys = ['boxcar_radius', 'std_prof_nsigma', 'sn_gauss', 'model_full_slit',
-                   'skip_extraction', 'skip_optimal', 'use_2dmodel_mask', 'use_user_fwhm', 'return_negative']
+                   'skip_extraction', 'skip_optimal', 'use_2dmodel_mask', 'use_user_fwhm', 'return_negative',
+                   'n_proc']
 
         badkeys = np.array([pk not in parkeys for pk in k])
         if np.any(badkeys):
@@ -4542,7 +4649,8 @@ class ExtractionPar(ParSet):
         return cls(**kwargs)
 
     def validate(self):
-        pass
+        if self.data['n_proc'] is not None and self.data['n_proc'] < 1:
+            raise ValueError('n_proc must be at least 1.')
 
 
 class CalibrationsPar(ParSet):
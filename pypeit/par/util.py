@@ -7,7 +7,7 @@ Utility functions for PypeIt parameter sets
 import os
 import time
 import glob
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
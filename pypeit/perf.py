@@ -0,0 +1,487 @@
+"""
+Module for recording the run-time performance of the reduction steps.
+
+The wall time, CPU time and memory use of each step are recorded by a
+:class:`PerfRecorder`.  Code that should be instrumented wraps the relevant
+block with :func:`step`, which does nothing unless a recorder has been
+activated using :func:`start`::
+
+    from pypeit import perf
+
+    with perf.step('get_arc', det='DET01'):
+        ...
+
+Steps can be nested; nested steps inherit the labels (exposure, detector,
+calibration group) of the step that encloses them.
+
+.. include common links, assuming primary doc root is up one directory
+.. include:: ../include/links.rst
+"""
+from contextlib import contextmanager
+import cProfile
+import csv
+import json
+import os
+from pathlib import Path
+import platform
+import time
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+from pypeit.lazyimport import embed
+
+import numpy as np
+
+from astropy.table import Table
+
+from pypeit import msgs
+
+# Columns of the performance records, in the order they are written
+record_columns = ['step', 'path', 'depth', 'exposure', 'det', 'calib_group', 'start',
+                  'wall_time', 'cpu_time', 'rss', 'peak_rss', 'status']
+
+# Labels inherited by nested steps
+record_labels = ['exposure', 'det', 'calib_group']
+
+
+def _proc_status(key):
+    """
+    Read a memory entry from ``/proc/self/status``.
+
+    Args:
+        key (:obj:`str`):
+            The entry to read; e.g., ``'VmRSS'``.
+
+    Returns:
+        :obj:`int`: The value in bytes, or None if the entry is not available
+        (e.g., the platform is not Linux).
+    """
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith(f'{key}:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def current_rss():
+    """
+    Return the current resident set size of this process in bytes, or None if
+    it cannot be determined.
+    """
+    return _proc_status('VmRSS')
+
+
+def peak_rss():
+    """
+    Return the peak resident set size of this process in bytes, or None if it
+    cannot be determined.
+
+    On Linux, this is the high-water mark since the last call to
+    :func:`reset_peak_rss`; otherwise, it is the peak over the lifetime of the
+    process.
+    """
+    hwm = _proc_status('VmHWM')
+    if hwm is not None or resource is None:
+        return hwm
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return maxrss if platform.system() == 'Darwin' else maxrss * 1024
+
+
+def reset_peak_rss():
+    """
+    Reset the peak resident set size of this process to its current value.
+
+    This is only possible with Linux kernels that support writing to
+    ``/proc/self/clear_refs``.
+
+    Returns:
+        :obj:`bool`: Flag that the peak was successfully reset.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        return False
+    return True
+
+
+def cpu_time():
+    """
+    Return the CPU time in seconds used by this process and its terminated
+    child processes (e.g., the workers of :func:`~pypeit.utils.parallel_map`).
+    """
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+class PerfRecorder:
+    """
+    Record the wall time, CPU time and memory use of a set of (nested)
+    reduction steps.
+
+    For each step, the recorded quantities are:
+
+        - ``wall_time``: The elapsed wall-clock time in seconds.
+        - ``cpu_time``: The CPU time in seconds, including the time used by any
+          worker processes that finished during the step.
+        - ``rss``: The resident set size in MB at the start of the step.
+        - ``peak_rss``: The peak resident set size in MB during the step.  If
+          the peak cannot be reset at the start of each step (see
+          :func:`reset_peak_rss`), this is the peak over the lifetime of the
+          process up to the end of the step; see :attr:`peak_per_step`.
+
+    Memory and time used by worker processes are *not* included in the memory
+    measurements, and steps executed inside worker processes are not recorded.
+
+    Args:
+        profile_step (:obj:`str`, optional):
+            Name of a step to profile using :mod:`cProfile`.  Each execution
+            of the step is written to a separate file that can be inspected
+            with, e.g., :mod:`pstats` or ``snakeviz``.
+        profile_root (:obj:`str`, `Path`_, optional):
+            Root name for the profile output files.  The step name, the labels
+            of the step and a counter are appended to this root.  If None, the
+            files are written to the current working directory.
+
+    Attributes:
+        records (:obj:`list`):
+            List of dictionaries with the recorded quantities of each completed
+            step; see :attr:`record_columns`.
+        meta (:obj:`dict`):
+            Information about the run.
+        peak_per_step (:obj:`bool`):
+            Flag that the peak memory is measured separately for each step.
+        profile_files (:obj:`list`):
+            List of the files written by the :mod:`cProfile` profiler.
+    """
+    def __init__(self, profile_step=None, profile_root=None):
+        self.profile_step = profile_step
+        self.profile_root = 'perf' if profile_root is None else str(profile_root)
+        self.profile_files = []
+        self.records = []
+        self._stack = []
+        self._profiling = False
+        self.peak_per_step = reset_peak_rss()
+        self.tstart = time.perf_counter()
+        self.meta = {'pypeit_version': self._pypeit_version(),
+                     'python_version': platform.python_version(),
+                     'platform': platform.platform(),
+                     'ncpu': os.cpu_count(),
+                     'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                     'peak_per_step': self.peak_per_step,
+                     'profile_step': profile_step}
+
+    @staticmethod
+    def _pypeit_version():
+        from pypeit import __version__
+        return __version__
+
+    @staticmethod
+    def _to_mb(nbytes):
+        return None if nbytes is None else round(nbytes / 1024**2, 2)
+
+    def _profile_file(self, name, labels):
+        """
+        Construct a unique name for the profile output file of a step.
+        """
+        root = '_'.join([self.profile_root, name]
+                        + [str(labels[k]) for k in record_labels if labels.get(k) is not None])
+        root = root.replace(' ', '')
+        ofile = Path(f'{root}.prof')
+        i = 1
+        while str(ofile) in self.profile_files:
+            ofile = Path(f'{root}_{i}.prof')
+            i += 1
+        return ofile
+
+    @contextmanager
+    def step(self, name, exposure=None, det=None, calib_group=None):
+        """
+        Record the performance of a block of code.
+
+        Args:
+            name (:obj:`str`):
+                Name of the step.
+            exposure (:obj:`str`, optional):
+                Name of the exposure being reduced.  If None, this is inherited
+                from the enclosing step.
+            det (:obj:`str`, optional):
+                Name of the detector or mosaic being reduced.  If None, this is
+                inherited from the enclosing step.
+            calib_group (:obj:`str`, optional):
+                Calibration group being reduced.  If None, this is inherited
+                from the enclosing step.
+        """
+        parent = self._stack[-1] if len(self._stack) > 0 else None
+        labels = {} if parent is None else parent['labels'].copy()
+        for key, value in zip(record_labels, [exposure, det, calib_group]):
+            if value is not None:
+                labels[key] = str(value)
+        frame = {'path': name if parent is None else f'{parent["path"]}/{name}',
+                 'labels': labels, 'peak': 0}
+
+        if self.peak_per_step:
+            # Keep the peak of the enclosing step up to this point before
+            # resetting it for this step
+            if parent is not None:
+                parent['peak'] = max(parent['peak'], peak_rss() or 0)
+            reset_peak_rss()
+        rss = current_rss()
+
+        profiler = None
+        if name == self.profile_step and not self._profiling:
+            profiler = cProfile.Profile()
+            self._profiling = True
+
+        self._stack.append(frame)
+        status = 'ok'
+        start = time.perf_counter()
+        cpu_start = cpu_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield
+        except BaseException:
+            status = 'failed'
+            raise
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            wall = time.perf_counter() - start
+            cpu = cpu_time() - cpu_start
+            self._stack.pop()
+            peak = max(frame['peak'], peak_rss() or 0)
+            if parent is not None:
+                parent['peak'] = max(parent['peak'], peak)
+            self.records += [{'step': name, 'path': frame['path'],
+                              'depth': frame['path'].count('/'),
+                              'exposure': labels.get('exposure', ''),
+                              'det': labels.get('det', ''),
+                              'calib_group': labels.get('calib_group', ''),
+                              'start': round(start - self.tstart, 4),
+                              'wall_time': round(wall, 4), 'cpu_time': round(cpu, 4),
+                              'rss': self._to_mb(rss), 'peak_rss': self._to_mb(peak or None),
+                              'status': status}]
+            if profiler is not None:
+                self._profiling = False
+                ofile = self._profile_file(name, labels)
+                ofile.parent.mkdir(parents=True, exist_ok=True)
+                profiler.dump_stats(str(ofile))
+                self.profile_files += [str(ofile)]
+                msgs.info(f'Profile of step {name} written to {ofile}')
+
+    def to_table(self):
+        """
+        Construct a table with the recorded steps, sorted by their start time.
+
+        Returns:
+            `astropy.table.Table`_: Table with the records.
+        """
+        return _records_to_table(sorted(self.records, key=lambda r: r['start']), self.meta)
+
+    def write(self, ofile):
+        """
+        Write the recorded steps to a file.
+
+        Args:
+            ofile (:obj:`str`, `Path`_):
+                Output file.  The format is set by the file extension and must
+                be either ``.json`` or ``.csv``.  The JSON file also includes
+                :attr:`meta`.
+        """
+        _ofile = Path(ofile)
+        if _ofile.suffix not in ['.json', '.csv']:
+            msgs.error(f'Performance report must be a .json or .csv file, not {_ofile.name}.')
+        _ofile.parent.mkdir(parents=True, exist_ok=True)
+        if _ofile.suffix == '.csv':
+            self.to_table().write(_ofile, format='ascii.csv', overwrite=True)
+        else:
+            rows = sorted(self.records, key=lambda r: r['start'])
+            with open(_ofile, 'w') as f:
+                json.dump({'meta': self.meta, 'steps': rows}, f, indent=1)
+        msgs.info(f'Performance report written to {_ofile}')
+
+
+def read_report(ifile):
+    """
+    Read a performance report written by :func:`PerfRecorder.write`.
+
+    Args:
+        ifile (:obj:`str`, `Path`_):
+            The ``.json`` or ``.csv`` file to read.
+
+    Returns:
+        `astropy.table.Table`_: Table with the recorded steps.  For JSON files,
+        the metadata of the run are provided in the table ``meta`` attribute.
+    """
+    _ifile = Path(ifile)
+    if not _ifile.is_file():
+        msgs.error(f'{_ifile} does not exist!')
+    if _ifile.suffix == '.csv':
+        with open(_ifile, 'r', newline='') as f:
+            return _records_to_table(list(csv.DictReader(f)), {})
+    if _ifile.suffix != '.json':
+        msgs.error(f'Performance report must be a .json or .csv file, not {_ifile.name}.')
+    with open(_ifile, 'r') as f:
+        report = json.load(f)
+    return _records_to_table(report['steps'], report['meta'])
+
+
+def _records_to_table(records, meta):
+    """
+    Construct a table from a list of performance records.
+
+    Args:
+        records (:obj:`list`):
+            List of dictionaries with the records; see :attr:`record_columns`.
+        meta (:obj:`dict`):
+            Metadata for the table.
+
+    Returns:
+        `astropy.table.Table`_: Table with the records.
+    """
+    float_columns = ['start', 'wall_time', 'cpu_time', 'rss', 'peak_rss']
+    data = {}
+    for c in record_columns:
+        values = [r.get(c) for r in records]
+        if c in float_columns:
+            data[c] = np.array([np.nan if v in [None, ''] else float(v) for v in values])
+        elif c == 'depth':
+            data[c] = np.array([int(v) for v in values], dtype=int)
+        else:
+            data[c] = np.array(['' if v is None else str(v) for v in values], dtype=str)
+    tbl = Table(data, names=record_columns)
+    tbl.meta.update(meta)
+    return tbl
+
+
+def summarize(tbl, by='path'):
+    """
+    Summarize the performance of the recorded steps.
+
+    Args:
+        tbl (`astropy.table.Table`_):
+            Table with the recorded steps; see :func:`read_report`.
+        by (:obj:`str`, optional):
+            How to group the steps.  Must be ``'path'`` (each step in the
+            hierarchy of nested steps), ``'step'`` (each step name, regardless
+            of where it was executed), ``'det'`` (each step in the hierarchy
+            for each detector), or ``'exposure'`` (each step in the hierarchy
+            for each exposure).
+
+    Returns:
+        `astropy.table.Table`_: Table with the number of executions, the total
+        wall time, the fraction of the total wall time of the run, the total
+        CPU time, the maximum peak memory, and the number of failures of each
+        group of steps.  The groups are ordered by their first execution.
+    """
+    groups = {'path': ['path'], 'step': ['step'], 'det': ['det', 'path'],
+              'exposure': ['exposure', 'path']}
+    if by not in groups:
+        msgs.error(f'Cannot group steps by {by}; options are: {list(groups.keys())}.')
+    keys = groups[by]
+    # Total wall time is the sum of the outermost steps
+    total = np.sum(tbl['wall_time'][tbl['depth'] == 0])
+
+    summary = {}
+    for row in tbl:
+        key = tuple(str(row[k]) for k in keys)
+        if key not in summary:
+            summary[key] = {'depth': int(row['depth']) if by != 'step' else 0, 'start': row['start'],
+                            'ncalls': 0, 'wall_time': 0., 'cpu_time': 0., 'peak_rss': np.nan,
+                            'nfailed': 0}
+        s = summary[key]
+        s['start'] = min(s['start'], row['start'])
+        s['ncalls'] += 1
+        s['wall_time'] += row['wall_time']
+        s['cpu_time'] += row['cpu_time']
+        s['peak_rss'] = np.fmax(s['peak_rss'], row['peak_rss'])
+        s['nfailed'] += int(row['status'] != 'ok')
+
+    if by == 'step':
+        order = sorted(summary.keys(), key=lambda k: summary[k]['start'])
+    else:
+        # Order the nested steps below the step that encloses them, and steps
+        # at the same depth by their first execution
+        def hierarchy(k):
+            levels = k[-1].split('/')
+            return k[:-1] + tuple(summary.get(k[:-1] + ('/'.join(levels[:i+1]),),
+                                              summary[k])['start'] for i in range(len(levels)))
+        order = sorted(summary.keys(), key=hierarchy)
+    out = Table()
+    for i, k in enumerate(keys):
+        out[k] = np.array([o[i] for o in order], dtype=str)
+    out['depth'] = np.array([summary[o]['depth'] for o in order], dtype=int)
+    for c in ['ncalls', 'wall_time', 'cpu_time', 'peak_rss', 'nfailed']:
+        out[c] = np.array([summary[o][c] for o in order])
+    out['wall_frac'] = out['wall_time'] / total if total > 0 else np.nan
+    return out
+
+
+# The active recorder
+_recorder = None
+
+
+def start(profile_step=None, profile_root=None):
+    """
+    Activate recording of the steps instrumented with :func:`step`.
+
+    Args:
+        profile_step (:obj:`str`, optional):
+            Name of a step to profile; see :class:`PerfRecorder`.
+        profile_root (:obj:`str`, `Path`_, optional):
+            Root name for the profile output files; see :class:`PerfRecorder`.
+
+    Returns:
+        :class:`PerfRecorder`: The active recorder.
+    """
+    global _recorder
+    if _recorder is not None:
+        msgs.warn('Performance recording already active; restarting.')
+    _recorder = PerfRecorder(profile_step=profile_step, profile_root=profile_root)
+    return _recorder
+
+
+def stop():
+    """
+    Deactivate the recording of the instrumented steps.
+
+    Returns:
+        :class:`PerfRecorder`: The recorder that was active, or None if
+        recording was not active.
+    """
+    global _recorder
+    recorder = _recorder
+    _recorder = None
+    return recorder
+
+
+def active():
+    """
+    Return the active recorder, or None if recording is not active.
+    """
+    return _recorder
+
+
+@contextmanager
+def step(name, exposure=None, det=None, calib_group=None):
+    """
+    Record the performance of a block of code using the active recorder.
+
+    If recording is not active, this does nothing.  See
+    :func:`PerfRecorder.step` for the argument descriptions.
+    """
+    if _recorder is None:
+        yield
+        return
+    with _recorder.step(name, exposure=exposure, det=det, calib_group=calib_group):
+        yield
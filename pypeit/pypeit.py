@@ -19,7 +19,7 @@ except AttributeError as e:
     from datetime import timezone
     __UTC__ = timezone.utc
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
@@ -31,6 +31,8 @@ from pypeit import inputfiles
 from pypeit.calibframe import CalibFrame
 from pypeit.core import parse, wave, qa
 from pypeit import msgs
+from pypeit import perf
+from pypeit import checkpoint
 from pypeit import calibrations
 from pypeit.images import buildimage
 from pypeit.display import display
@@ -83,6 +85,30 @@ class PypeIt:
             Over-ride reduction path in PypeIt file (e.g. Notebook usage)
         calib_only: (:obj:`bool`, optional):
             Only generate the calibration files that you can
+        perf_report (:obj:`bool`, optional):
+            Record the wall time, CPU time and peak memory of each calibration
+            and reduction step and write them to :attr:`perf_file`.  See
+            :mod:`~pypeit.perf`.
+        profile_step (:obj:`str`, optional):
+            Name of a single step (e.g., ``get_wv_calib`` or ``extraction``)
+            to profile with :mod:`cProfile`.  The profiles are written next to
+            :attr:`perf_file`.  Setting this also sets ``perf_report`` to True.
+        checkpoint (:obj:`bool`, optional):
+            Save the results of the object finding and extraction for each
+            exposure and detector to :attr:`checkpoint_path`, and restore them
+            instead of repeating these stages if the reduction is restarted.
+            See :mod:`~pypeit.checkpoint`.
+        par (:class:`~pypeit.par.pypeitpar.PypeItPar`, optional):
+            The parameters to use, instead of constructing them from the
+            configuration lines in the PypeIt file.  Used by long-lived
+            services that reduce many frames with the same parameters (e.g.,
+            ``pypeit_ql_watch``).
+        fitstbl (:class:`~pypeit.metadata.PypeItMetaData`, optional):
+            The metadata for the frames in the PypeIt file, instead of reading
+            it from the headers of the files.  The metadata must already
+            include the frame types and the configuration, calibration, and
+            combination groups; see
+            :func:`~pypeit.metadata.PypeItMetaData.finalize_usr_build`.
 
     Attributes:
         pypeit_file (:obj:`str`):
@@ -93,7 +119,8 @@ class PypeIt:
 
     """
     def __init__(self, pypeit_file, verbosity=2, overwrite=True, reuse_calibs=False, logname=None,
-                 show=False, redux_path=None, calib_only=False):
+                 show=False, redux_path=None, calib_only=False, perf_report=False,
+                 profile_step=None, checkpoint=False, par=None, fitstbl=None):
 
         # Set up logging
         self.logname = logname
@@ -107,10 +134,16 @@ class PypeIt:
         self.calib_only = calib_only
 
         # Build the spectrograph and the parameters
-        self.spectrograph, self.par, config_specific_file = self.pypeItFile.get_pypeitpar()
-        msgs.info(f'Loaded spectrograph {self.spectrograph.name}')
-        msgs.info('Setting configuration-specific parameters using '
-                  f'{os.path.split(config_specific_file)[1]}.')
+        if par is None:
+            self.spectrograph, self.par, config_specific_file = self.pypeItFile.get_pypeitpar()
+            msgs.info(f'Loaded spectrograph {self.spectrograph.name}')
+            msgs.info('Setting configuration-specific parameters using '
+                      f'{os.path.split(config_specific_file)[1]}.')
+        else:
+            self.spectrograph = self.pypeItFile.get_spectrograph()
+            self.par = par
+            msgs.info(f'Loaded spectrograph {self.spectrograph.name}')
+            msgs.info('Using the provided parameters.')
 
         # Check the output paths are ready
         if redux_path is not None:
@@ -125,16 +158,20 @@ class PypeIt:
         # --------------------------------------------------------------
         # Build the meta data
         #   - Re-initilize based on the file data
-        msgs.info('Compiling metadata')
-        self.fitstbl = PypeItMetaData(self.spectrograph, self.par, 
-                                      files=self.pypeItFile.filenames,
-                                      usrdata=self.pypeItFile.data, 
-                                      strict=True)
-        #   - Interpret automated or user-provided data from the PypeIt
-        #   file
-        self.fitstbl.finalize_usr_build(
-            self.pypeItFile.frametypes, 
-            self.pypeItFile.setup_name)
+        if fitstbl is None:
+            msgs.info('Compiling metadata')
+            self.fitstbl = PypeItMetaData(self.spectrograph, self.par, 
+                                          files=self.pypeItFile.filenames,
+                                          usrdata=self.pypeItFile.data, 
+                                          strict=True)
+            #   - Interpret automated or user-provided data from the PypeIt
+            #   file
+            self.fitstbl.finalize_usr_build(
+                self.pypeItFile.frametypes, 
+                self.pypeItFile.setup_name)
+        else:
+            self.fitstbl = fitstbl
+            self.fitstbl.par = self.par
 
         # Other Internals
         self.overwrite = overwrite
@@ -143,6 +180,9 @@ class PypeIt:
         # reusing calibrations
         self.reuse_calibs = reuse_calibs
         self.show = show
+        self.profile_step = profile_step
+        self.perf_report = perf_report or profile_step is not None
+        self.checkpoint = checkpoint
 
         # Set paths
         self.calibrations_path = os.path.join(self.par['rdx']['redux_path'],
@@ -176,6 +216,21 @@ class PypeIt:
         """Return the path to the science directory."""
         return os.path.join(self.par['rdx']['redux_path'], self.par['rdx']['scidir'])
 
+    @property
+    def perf_file(self):
+        """
+        The file with the performance report of the run.  This is written to
+        the science directory, or the calibrations directory if only the
+        calibrations are processed.
+        """
+        path = self.calibrations_path if self.calib_only else self.science_path
+        return os.path.join(path, f'{Path(self.pypeit_file).stem}_perf.json')
+
+    @property
+    def checkpoint_path(self):
+        """Return the path to the directory with the reduction checkpoints."""
+        return os.path.join(self.par['rdx']['redux_path'], 'Checkpoints')
+
     @property
     def qa_path(self):
         """Return the path to the top-level QA directory."""
@@ -274,6 +329,7 @@ class PypeIt:
         science/standard frames.
         """
         self.tstart = time.perf_counter()
+        self.start_perf_report()
 
         # Frame indices
         frame_indx = np.arange(len(self.fitstbl))
@@ -289,6 +345,9 @@ class PypeIt:
                                               slitspatnum=self.par['rdx']['slitspatnum'])
             msgs.info(f'Detectors to work on: {detectors}')
 
+            # Trace the slits of all detectors in parallel, if requested
+            traced_slits = self.trace_slits(grp_frames[0], detectors)
+
             # Loop on Detectors
             for self.det in detectors:
                 msgs.info(f'Working on detector {self.det}')
@@ -303,8 +362,11 @@ class PypeIt:
                 # Do it
                 # These need to be separate to accommodate COADD2D
                 self.caliBrate.set_config(grp_frames[0], self.det, self.par['calibrations'])
+                self.caliBrate.slits, reuse_files = traced_slits.pop(self.det, (None, []))
+                self.caliBrate.reuse_files = set(reuse_files)
 
-                self.caliBrate.run_the_steps()
+                with perf.step('calibrations', det=self.spectrograph.get_det_name(self.det)):
+                    self.caliBrate.run_the_steps()
                 if not self.caliBrate.success:
                     msgs.warn(f'Calibrations for detector {self.det} were unsuccessful!  The step '
                               f'that failed was {self.caliBrate.failed_step}.  Continuing to next '
@@ -312,6 +374,7 @@ class PypeIt:
 
         # Finish
         self.print_end_time()
+        self.write_perf_report(finish=True)
 
     def reduce_all(self):
         """
@@ -325,6 +388,7 @@ class PypeIt:
         self.par.validate_keys(required=['rdx', 'calibrations', 'scienceframe', 'reduce',
                                          'flexure'])
         self.tstart = time.perf_counter()
+        self.start_perf_report()
 
         # Find the standard frames
         is_standard = self.fitstbl.find_frames('standard')
@@ -377,7 +441,12 @@ class PypeIt:
                     history.add_reduce(calib_ID, self.fitstbl, frames, bg_frames)
                     std_spec2d, std_sobjs = self.reduce_exposure(frames, bg_frames=bg_frames)
                     # TODO come up with sensible naming convention for save_exposure for combined files
-                    self.save_exposure(frames[0], std_spec2d, std_sobjs, self.basename, history)
+                    with perf.step('save', exposure=self.basename):
+                        self.save_exposure(frames[0], std_spec2d, std_sobjs, self.basename,
+                                           history)
+                    self.write_perf_report()
+                    if self.checkpoint:
+                        checkpoint.remove_checkpoints(self.checkpoint_path, self.basename)
                 else:
                     msgs.info('Output file: {:s} already exists'.format(self.fitstbl.construct_basename(frames[0])) +
                               '. Set overwrite=True to recreate and overwrite.')
@@ -440,7 +509,12 @@ class PypeIt:
                     # TODO: come up with sensible naming convention for
                     # save_exposure for combined files
                     if len(sci_spec2d.detectors) > 0:
-                        self.save_exposure(frames[0], sci_spec2d, sci_sobjs, self.basename, history)
+                        with perf.step('save', exposure=self.basename):
+                            self.save_exposure(frames[0], sci_spec2d, sci_sobjs, self.basename,
+                                               history)
+                        self.write_perf_report()
+                        if self.checkpoint:
+                            checkpoint.remove_checkpoints(self.checkpoint_path, self.basename)
                     else:
                         msgs.warn('No spec2d and spec1d saved to file because the '
                                   'calibration/reduction was not successful for all the detectors')
@@ -452,6 +526,7 @@ class PypeIt:
 
         # Finish
         self.print_end_time()
+        self.write_perf_report(finish=True)
 
     @staticmethod
     def select_detectors(spectrograph, detnum, slitspatnum=None):
@@ -564,12 +639,24 @@ class PypeIt:
                                           slitspatnum=self.par['rdx']['slitspatnum'])
         msgs.info(f'Detectors to work on: {detectors}')
 
+        # Name of the exposure used to label the performance records and
+        # checkpoints
+        exposure = self.fitstbl.construct_basename(frames[0])
+        # Checkpoint keys for the object finding results of each detector
+        objfind_keys = []
+
+        # Trace the slits of all detectors in parallel, if requested
+        traced_slits = self.trace_slits(frames[0], detectors)
+
         # Loop on Detectors -- Calibrate, process image, find objects
         # TODO: Attempt to put in a multiprocessing call here?
         for self.det in detectors:
             msgs.info(f'Reducing detector {self.det}')
+            detname = self.spectrograph.get_det_name(self.det)
             # run calibration
-            self.caliBrate = self.calib_one(frames, self.det)
+            with perf.step('calibrations', exposure=exposure, det=detname):
+                self.caliBrate = self.calib_one(frames, self.det,
+                                                traced=traced_slits.pop(self.det, None))
             if not self.caliBrate.success:
                 msgs.warn(f'Calibrations for detector {self.det} were unsuccessful!  The step '
                           f'that failed was {self.caliBrate.failed_step}.  Continuing by '
@@ -583,8 +670,29 @@ class PypeIt:
             # in the slitmask stuff in between the two loops
             calib_slits.append(self.caliBrate.slits)
             # global_sky, skymask and sciImg are needed in the extract loop
-            initial_sky, sobjs_obj, sciImg, bkg_redux_sciimg, objFind = self.objfind_one(
-                frames, self.det, bg_frames=bg_frames, std_outfile=std_outfile)
+            with perf.step('objfind', exposure=exposure, det=detname):
+                objfind_key = self.objfind_checkpoint_key(frames, self.det, bg_frames=bg_frames,
+                                                          std_outfile=std_outfile) \
+                                if self.checkpoint else None
+                products = self.read_checkpoint('objfind', f'{exposure}_{detname}', objfind_key)
+                if products is None:
+                    initial_sky, sobjs_obj, sciImg, bkg_redux_sciimg, objFind = self.objfind_one(
+                        frames, self.det, bg_frames=bg_frames, std_outfile=std_outfile)
+                    self.write_checkpoint('objfind', f'{exposure}_{detname}', objfind_key,
+                                          initial_sky=initial_sky, sobjs_obj=sobjs_obj,
+                                          sciImg=sciImg, bkg_redux_sciimg=bkg_redux_sciimg,
+                                          objFind=objFind)
+                else:
+                    initial_sky, sobjs_obj, sciImg, bkg_redux_sciimg, objFind \
+                            = [products[k] for k in ['initial_sky', 'sobjs_obj', 'sciImg',
+                                                     'bkg_redux_sciimg', 'objFind']]
+                    # Set the metadata otherwise set by objfind_one
+                    self.objtype, self.setup, self.obstime, self.basename, self.binning \
+                            = self.get_sci_metadata(frames[0], self.det)
+                    self.std_redux = self.objtype == 'standard'
+                    # Use the slits as they were after the object finding
+                    self.caliBrate.slits = calib_slits[-1] = objFind.slits
+            objfind_keys.append(objfind_key)
             if len(sobjs_obj)>0:
                 all_specobjs_objfind.add_sobj(sobjs_obj)
             initial_sky_list.append(initial_sky)
@@ -619,12 +727,13 @@ class PypeIt:
 
         # Extract
         for i, self.det in enumerate(calibrated_det):
+            detname = sciImg_list[i].detector.name
+
             # re-run (i.e., load) calibrations
-            self.caliBrate = self.calib_one(frames, self.det)
+            with perf.step('calibrations', exposure=exposure, det=detname):
+                self.caliBrate = self.calib_one(frames, self.det)
             self.caliBrate.slits = calib_slits[i]
 
-            detname = sciImg_list[i].detector.name
-
             # TODO: pass back the background frame, pass in background
             # files as an argument. extract one takes a file list as an
             # argument and instantiates science within
@@ -634,9 +743,20 @@ class PypeIt:
                 all_specobjs_on_det = all_specobjs_objfind
 
             # Extract
-            all_spec2d[detname], tmp_sobjs \
-                    = self.extract_one(frames, self.det, sciImg_list[i], bkg_redux_sciimg_list[i], objFind_list[i],
-                                       initial_sky_list[i], all_specobjs_on_det)
+            with perf.step('extract', exposure=exposure, det=detname):
+                # The extraction depends on the objects found on all detectors
+                extract_key = checkpoint.checkpoint_key('extract', detname, objfind_keys) \
+                                if self.checkpoint else None
+                products = self.read_checkpoint('extract', f'{exposure}_{detname}', extract_key)
+                if products is None:
+                    all_spec2d[detname], tmp_sobjs \
+                            = self.extract_one(frames, self.det, sciImg_list[i],
+                                               bkg_redux_sciimg_list[i], objFind_list[i],
+                                               initial_sky_list[i], all_specobjs_on_det)
+                    self.write_checkpoint('extract', f'{exposure}_{detname}', extract_key,
+                                          spec2DObj=all_spec2d[detname], sobjs=tmp_sobjs)
+                else:
+                    all_spec2d[detname], tmp_sobjs = products['spec2DObj'], products['sobjs']
             # Hold em
             if tmp_sobjs.nobj > 0:
                 all_specobjs_extract.add_sobj(tmp_sobjs)
@@ -655,6 +775,97 @@ class PypeIt:
         # Return
         return all_spec2d, all_specobjs_extract
 
+    def objfind_checkpoint_key(self, frames, det, bg_frames=None, std_outfile=None):
+        """
+        Construct the key for the checkpoint with the object finding results
+        for a single exposure/detector pair.
+
+        The key depends on the raw science and background frames, the
+        processed calibration frames, the trace of the standard star on this
+        detector, the metadata of the frames, and the full parameter set.  The
+        standard is keyed by its trace, instead of its spec1d file, because
+        the file is rewritten whenever the standard is reduced, even if the
+        standard is restored from its own checkpoints.
+
+        Args:
+            frames (:obj:`list`):
+                List of frames to extract; stacked if more than one is
+                provided
+            det (:obj:`int`):
+                Detector number (1-indexed)
+            bg_frames (:obj:`list`, optional):
+                List of frames to use as the background. Can be empty.
+            std_outfile (:obj:`str`, optional):
+                Filename for the standard star spec1d file.
+
+        Returns:
+            :obj:`str`: The checkpoint key; see
+            :func:`~pypeit.checkpoint.checkpoint_key`.
+        """
+        _bg_frames = [] if bg_frames is None else list(bg_frames)
+        # Processed calibration frames
+        asn = calibrations.Calibrations.get_association(
+                    self.fitstbl, self.spectrograph, self.calibrations_path,
+                    self.fitstbl[frames[0]]['setup'],
+                    self.fitstbl.find_frame_calib_groups(frames[0])[0], det, must_exist=True)
+        calib_files = sorted([f for a in asn.values() for f in a['proc']])
+        detname = self.spectrograph.get_det_name(det)
+        std_trace = None if std_outfile is None \
+                        else specobjs.get_std_trace(detname, std_outfile)
+        metadata = [tuple(str(v) for v in self.fitstbl.table[i])
+                        for i in list(frames) + _bg_frames]
+        return checkpoint.checkpoint_key(
+                    'objfind', detname,
+                    checkpoint.files_key(self.fitstbl.frame_paths(frames)),
+                    checkpoint.files_key(self.fitstbl.frame_paths(_bg_frames)
+                                         if len(_bg_frames) > 0 else []),
+                    checkpoint.files_key(calib_files),
+                    checkpoint.data_key(std_trace),
+                    metadata, self.bkg_redux, self.find_negative,
+                    self.par.to_config(include_descr=False))
+
+    def read_checkpoint(self, stage, name, key):
+        """
+        Read the checkpoint for a reduction stage.
+
+        Args:
+            stage (:obj:`str`):
+                The reduction stage.
+            name (:obj:`str`):
+                The identifier of the checkpoint; e.g., the exposure and
+                detector names.
+            key (:obj:`str`):
+                The checkpoint key.  If None, no checkpoint is read.
+
+        Returns:
+            :obj:`dict`: The products saved in the checkpoint, or None if the
+            checkpoint does not exist.
+        """
+        if key is None:
+            return None
+        return checkpoint.read_checkpoint(
+                    checkpoint.checkpoint_file(self.checkpoint_path, stage, name, key))
+
+    def write_checkpoint(self, stage, name, key, **products):
+        """
+        Write the checkpoint for a reduction stage.
+
+        Args:
+            stage (:obj:`str`):
+                The reduction stage.
+            name (:obj:`str`):
+                The identifier of the checkpoint; e.g., the exposure and
+                detector names.
+            key (:obj:`str`):
+                The checkpoint key.  If None, no checkpoint is written.
+            **products:
+                The products to save.
+        """
+        if key is None:
+            return
+        checkpoint.write_checkpoint(
+                checkpoint.checkpoint_file(self.checkpoint_path, stage, name, key), **products)
+
     def get_sci_metadata(self, frame, det):
         """
         Grab the meta data for a given science frame and specific detector
@@ -690,7 +901,7 @@ class PypeIt:
                                                    self.spectrograph.get_det_name(det))
         return objtype_out, calib_key, obstime, basename, binning
 
-    def calib_one(self, frames, det):
+    def calib_one(self, frames, det, traced=None):
         """
         Run Calibration for a single exposure/detector pair
 
@@ -700,6 +911,11 @@ class PypeIt:
                 is provided
             det (:obj:`int`):
                 Detector number (1-indexed)
+            traced (:obj:`tuple`, optional):
+                The slits already traced for this detector and the processed
+                calibration files written while tracing them (see
+                :func:`trace_slits`).  If None, the slits are read or traced
+                as needed.
 
         Returns:
             caliBrate (:class:`pypeit.calibrations.Calibrations`)
@@ -717,10 +933,51 @@ class PypeIt:
             chk_version=self.par['rdx']['chk_version'])
         # These need to be separate to accomodate COADD2D
         caliBrate.set_config(frames[0], det, self.par['calibrations'])
+        if traced is not None:
+            caliBrate.slits = traced[0]
+            caliBrate.reuse_files = set(traced[1])
         caliBrate.run_the_steps()
 
         return caliBrate
 
+    def trace_slits(self, frame, detectors):
+        """
+        Trace the slits of multiple detectors in parallel, before performing
+        the full set of calibrations for each detector.
+
+        The slits are only traced in advance if more than one process is
+        requested (see the ``n_proc`` parameter in
+        :class:`~pypeit.par.pypeitpar.EdgeTracePar`) and there is more than
+        one detector to process; see :func:`~pypeit.calibrations.trace_slits`.
+
+        Args:
+            frame (:obj:`int`):
+                The row index in :attr:`fitstbl` with the frame to calibrate.
+            detectors (:obj:`list`):
+                The detectors or mosaics to process.
+
+        Returns:
+            :obj:`dict`: The :class:`~pypeit.slittrace.SlitTraceSet` and the
+            processed calibration files written while tracing them for each
+            detector traced in advance; see
+            :func:`~pypeit.calibrations.trace_slits`.
+        """
+        n_proc = self.par['calibrations']['slitedges']['n_proc']
+        if n_proc < 2 or len(detectors) < 2:
+            return {}
+        if self.show:
+            msgs.warn('Cannot show the slit tracing results of multiple processes.  Tracing the '
+                      'slits of each detector serially.')
+            return {}
+        user_slits = slittrace.merge_user_slit(self.par['rdx']['slitspatnum'],
+                                               self.par['rdx']['maskIDs'])
+        with perf.step('trace_slits'):
+            return calibrations.trace_slits(self.fitstbl, self.par['calibrations'],
+                                            self.spectrograph, self.calibrations_path, frame,
+                                            detectors, n_proc=n_proc, qadir=self.qa_path,
+                                            reuse_calibs=self.reuse_calibs, user_slits=user_slits,
+                                            chk_version=self.par['rdx']['chk_version'])
+
     def objfind_one(self, frames, det, bg_frames=None, std_outfile=None):
         """
         Reduce + Find Objects in a single exposure/detector pair
@@ -1001,16 +1258,20 @@ class PypeIt:
         else:
             # Update the skymask
             skymask = objFind.create_skymask(sobjs_obj)
-            final_global_sky = objFind.global_skysub(previous_sky=initial_sky,
-                                                     skymask=skymask, show=self.show,
-                                                     reinit_bpm=False)
+            with perf.step('global_sky'):
+                final_global_sky = objFind.global_skysub(previous_sky=initial_sky,
+                                                         skymask=skymask, show=self.show,
+                                                         reinit_bpm=False)
         # get the bkg_redux_global_sky
         bkg_redux_global_sky = None
         if self.bkg_redux:
             skymask = objFind.create_skymask(sobjs_obj) if skymask is None else skymask
             # DO NOT reinit_bpm, nor update_crmask
-            bkg_redux_global_sky = objFind.global_skysub(skymask=skymask, bkg_redux_sciimg=bkg_redux_sciimg,
-                                                     reinit_bpm=False, update_crmask=False, show=self.show)
+            with perf.step('global_sky'):
+                bkg_redux_global_sky = objFind.global_skysub(skymask=skymask,
+                                                             bkg_redux_sciimg=bkg_redux_sciimg,
+                                                             reinit_bpm=False, update_crmask=False,
+                                                             show=self.show)
 
         scaleImg = objFind.scaleimg
 
@@ -1066,8 +1327,10 @@ class PypeIt:
                 waveImg = self.caliBrate.wv_calib.build_waveimg(tilts, slits, spat_flexure=objFind.spat_flexure_shift)
 
         # Apply a reference frame correction to each object and the waveimg
-        vel_corr, waveImg = self.refframe_correct(slits, self.fitstbl["ra"][frames[0]], self.fitstbl["dec"][frames[0]],
-                                                  self.obstime, slitgpm=slitgpm, waveimg=waveImg, sobjs=sobjs)
+        with perf.step('refframe'):
+            vel_corr, waveImg = self.refframe_correct(slits, self.fitstbl["ra"][frames[0]],
+                                                      self.fitstbl["dec"][frames[0]], self.obstime,
+                                                      slitgpm=slitgpm, waveimg=waveImg, sobjs=sobjs)
 
         # TODO -- Do this upstream
         # Tack on wavelength RMS
@@ -1267,6 +1530,31 @@ class PypeIt:
         # Capture the end time and print it to user
         msgs.info(utils.get_time_string(time.perf_counter()-self.tstart))
 
+    def start_perf_report(self):
+        """
+        Start recording the performance of the reduction steps, if requested.
+        """
+        if self.perf_report:
+            perf.start(profile_step=self.profile_step,
+                       profile_root=os.path.splitext(self.perf_file)[0])
+
+    def write_perf_report(self, finish=False):
+        """
+        Write the performance of the reduction steps recorded so far to
+        :attr:`perf_file` and a csv file with the same root name.
+
+        Args:
+            finish (:obj:`bool`, optional):
+                Stop recording after writing the report.
+        """
+        if not self.perf_report:
+            return
+        recorder = perf.stop() if finish else perf.active()
+        if recorder is None:
+            return
+        recorder.write(self.perf_file)
+        recorder.write(os.path.splitext(self.perf_file)[0] + '.csv')
+
     # TODO: Move this to fitstbl?
     def show_science(self):
         """
@@ -57,7 +57,7 @@ from importlib import resources
 import pathlib
 import shutil
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 from pypeit import msgs
 from pypeit import cache
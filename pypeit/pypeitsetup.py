@@ -9,7 +9,7 @@ from pathlib import Path
 import time
 import os
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 from pypeit import msgs
 from pypeit.metadata import PypeItMetaData
@@ -78,6 +78,14 @@ class PypeItSetup:
                 
                 setup = PypeItSetup.from_pypeit_file('myfile.pypeit')
 
+        par (:class:`~pypeit.par.pypeitpar.PypeItPar`, optional):
+            The parameters to use, instead of constructing them from the
+            default parameters of the spectrograph and ``cfg_lines``.  This
+            avoids parsing the parameters again when many setup objects are
+            constructed for the same spectrograph (e.g., by
+            ``pypeit_ql_watch``).  The spectrograph must then be set by
+            ``spectrograph_name``.
+
     Attributes:
         file_list (list):
             See description of class argument.
@@ -99,7 +107,7 @@ class PypeItSetup:
             files to be reduced.
     """
     def __init__(self, file_list, frametype=None, usrdata=None, setups=None, cfg_lines=None,
-                 spectrograph_name=None, pypeit_file=None):
+                 spectrograph_name=None, pypeit_file=None, par=None):
 
         # The provided list of files cannot be None
         if file_list is None or len(file_list) == 0:
@@ -113,7 +121,7 @@ class PypeItSetup:
         self.user_cfg = cfg_lines
 
         # Determine the spectrograph name
-        _spectrograph_name = spectrograph_name if cfg_lines is None \
+        _spectrograph_name = spectrograph_name if cfg_lines is None or par is not None \
                     else PypeItPar.from_cfg_lines(merge_with=(cfg_lines,))['rdx']['spectrograph']
 
         # Cannot proceed without spectrograph name
@@ -127,14 +135,20 @@ class PypeItSetup:
         self.pypeit_file = self.spectrograph.name + '.pypeit' \
                                 if pypeit_file is None else pypeit_file
 
-        # Get the spectrograph specific configuration to be merged with
-        # the user modifications.
-        spectrograph_cfg_lines = self.spectrograph.default_pypeit_par().to_config()
-
-        # Instantiate the pypeit parameters.  The user input
-        # configuration (cfg_lines) can be None.
-        self.par = PypeItPar.from_cfg_lines(cfg_lines=spectrograph_cfg_lines, 
-                                            merge_with=(cfg_lines,))
+        if par is not None:
+            # Use the provided parameters
+            if not isinstance(par, PypeItPar):
+                msgs.error('Provided parameters must be a PypeItPar instance.')
+            self.par = par
+        else:
+            # Get the spectrograph specific configuration to be merged with
+            # the user modifications.
+            spectrograph_cfg_lines = self.spectrograph.default_pypeit_par().to_config()
+
+            # Instantiate the pypeit parameters.  The user input
+            # configuration (cfg_lines) can be None.
+            self.par = PypeItPar.from_cfg_lines(cfg_lines=spectrograph_cfg_lines, 
+                                                merge_with=(cfg_lines,))
 
         # Prepare internals for execution
         self.fitstbl = None
@@ -7,7 +7,7 @@ Implements the objects used to hold slit edge data.
 """
 import inspect
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
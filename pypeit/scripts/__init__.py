@@ -1,64 +1,90 @@
+"""
+Registry of the ``PypeIt`` command-line scripts.
 
-from pypeit.utils import all_subclasses
-from pypeit.scripts import scriptbase
+The script modules are *not* imported when this package is imported, which
+keeps the start-up time of each script to a minimum.  Each script module is
+available as an attribute of this package and is imported on first access.
 
-# The import of all the script modules here is what enables the dynamic
-# compiling of all the available scripts below
-from pypeit.scripts import cache_github_data
-from pypeit.scripts import clean_cache
-from pypeit.scripts import chk_alignments
-from pypeit.scripts import chk_edges
-from pypeit.scripts import chk_flats
-from pypeit.scripts import chk_flexure
-from pypeit.scripts import chk_tilts
-from pypeit.scripts import chk_for_calibs
-from pypeit.scripts import chk_noise_1dspec
-from pypeit.scripts import chk_noise_2dspec
-from pypeit.scripts import chk_scattlight
-from pypeit.scripts import chk_wavecalib
-from pypeit.scripts import coadd_1dspec
-from pypeit.scripts import coadd_2dspec
-from pypeit.scripts import coadd_datacube
-from pypeit.scripts import collate_1d
-from pypeit.scripts import compare_sky
-from pypeit.scripts import edge_inspector
-from pypeit.scripts import extract_datacube
-from pypeit.scripts import flux_calib
-from pypeit.scripts import flux_setup
-from pypeit.scripts import identify
-from pypeit.scripts import install_extinctfile
-from pypeit.scripts import install_linelist
-from pypeit.scripts import install_ql_calibs
-from pypeit.scripts import install_telluric
-from pypeit.scripts import install_wvarxiv
-from pypeit.scripts import lowrdx_skyspec
-from pypeit.scripts import multislit_flexure
-from pypeit.scripts import obslog
-from pypeit.scripts import parse_slits
-from pypeit.scripts import print_bpm
-from pypeit.scripts import qa_html
-from pypeit.scripts import ql
-#from pypeit.scripts import ql_multislit
-from pypeit.scripts import run_pypeit
-from pypeit.scripts import sensfunc
-from pypeit.scripts import setup
-from pypeit.scripts import setup_coadd2d
-from pypeit.scripts import show_1dspec
-from pypeit.scripts import show_2dspec
-from pypeit.scripts import show_arxiv
-from pypeit.scripts import show_wvcalib
-from pypeit.scripts import skysub_regions
-from pypeit.scripts import tellfit
-from pypeit.scripts import trace_edges
-from pypeit.scripts import view_fits
-from pypeit.scripts import compile_wvarxiv
-from pypeit.scripts import show_pixflat
+.. include common links, assuming primary doc root is up one directory
+.. include:: ../include/links.rst
+"""
+import importlib
+
+# NOTE: Any new script module *must* be added to this list.
+script_modules = ['cache_github_data',
+                  'clean_cache',
+                  'chk_alignments',
+                  'chk_edges',
+                  'chk_flats',
+                  'chk_flexure',
+                  'chk_tilts',
+                  'chk_for_calibs',
+                  'chk_noise_1dspec',
+                  'chk_noise_2dspec',
+                  'chk_scattlight',
+                  'chk_wavecalib',
+                  'coadd_1dspec',
+                  'coadd_2dspec',
+                  'coadd_datacube',
+                  'collate_1d',
+                  'compare_sky',
+                  'edge_inspector',
+                  'extract_datacube',
+                  'flux_calib',
+                  'flux_setup',
+                  'identify',
+                  'install_extinctfile',
+                  'install_linelist',
+                  'install_ql_calibs',
+                  'install_telluric',
+                  'install_wvarxiv',
+                  'lowrdx_skyspec',
+                  'multislit_flexure',
+                  'obslog',
+                  'parse_slits',
+                  'perf_report',
+                  'print_bpm',
+                  'qa_html',
+                  'ql',
+                  'ql_watch',
+#                  'ql_multislit',
+                  'run_pypeit',
+                  'sensfunc',
+                  'setup',
+                  'setup_coadd2d',
+                  'show_1dspec',
+                  'show_2dspec',
+                  'show_arxiv',
+                  'show_wvcalib',
+                  'skysub_regions',
+                  'tellfit',
+                  'trace_edges',
+                  'view_fits',
+                  'compile_wvarxiv',
+                  'show_pixflat']
+
+
+def __getattr__(name):
+    """
+    Import the script modules on first access.
+    """
+    if name in ['scriptbase'] + script_modules:
+        return importlib.import_module(f'{__name__}.{name}')
+    if name == 'pypeit_scripts':
+        return list(script_classes().keys())
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 
 # Build the list of script classes
 def script_classes():
     import numpy as np
+    from pypeit.utils import all_subclasses
+    from pypeit.scripts import scriptbase
 
+    # Import all the script modules, which is what enables the dynamic
+    # compiling of all the available scripts below
+    for module in script_modules:
+        importlib.import_module(f'{__name__}.{module}')
     # Recursively collect all subclasses
     scr_c = np.array(list(all_subclasses(scriptbase.ScriptBase)))
     scr_n = np.array([c.name() for c in scr_c])
@@ -66,4 +92,3 @@ def script_classes():
     srt = np.argsort(scr_n)
     return dict([ (n,c) for n,c in zip(scr_n[srt],scr_c[srt])])
 
-pypeit_scripts = list(script_classes().keys())
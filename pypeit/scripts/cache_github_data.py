@@ -45,7 +45,7 @@ class CacheGithubData(scriptbase.ScriptBase):
     def main(args):
         import os
         import pathlib
-        from IPython import embed
+        from pypeit.lazyimport import embed
 
         import numpy as np
 
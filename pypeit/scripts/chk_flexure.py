@@ -29,7 +29,7 @@ class ChkFlexure(scriptbase.ScriptBase):
     @staticmethod
     def main(args):
 
-        from IPython import embed
+        from pypeit.lazyimport import embed
         from astropy.io import fits
         from pypeit import msgs
         from pypeit import specobjs
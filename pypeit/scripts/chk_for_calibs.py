@@ -44,7 +44,7 @@ class ChkForCalibs(scriptbase.ScriptBase):
 
         import os
 
-        from IPython import embed
+        from pypeit.lazyimport import embed
 
         import numpy as np
 
@@ -9,18 +9,11 @@ for one of the outputs of PypeIt
 import numpy as np
 
 import os
-from matplotlib import pyplot as plt
-from astropy.stats import sigma_clip, mad_std
-from astropy.modeling.models import Gaussian1D
-from astropy.io import fits
 
 from pypeit.scripts import scriptbase
-from pypeit import utils
 from pypeit import msgs
-from pypeit import specobjs
-from pypeit.onespec import OneSpec
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 
 def plot(args, line_wav_z:np.ndarray, line_names:np.ndarray,
@@ -58,6 +51,10 @@ def plot(args, line_wav_z:np.ndarray, line_names:np.ndarray,
             wavelength range used in the analysis? Defaults to True.
     """
 
+    from matplotlib import pyplot as plt
+    from astropy.stats import sigma_clip, mad_std
+    from astropy.modeling.models import Gaussian1D
+
     _folder = 'chk_noise_1dspec' if folder is None else folder
 
     fig = plt.figure(figsize=(23, 6.))
@@ -176,6 +173,11 @@ class ChkNoise1D(scriptbase.ScriptBase):
     @staticmethod
     def main(args):
 
+        from astropy.io import fits
+        from pypeit import utils
+        from pypeit import specobjs
+        from pypeit.onespec import OneSpec
+
         chk_version = not args.try_old
 
         # Load em
@@ -10,20 +10,11 @@ for one of the outputs of PypeIt
 import numpy as np
 
 import os
-from matplotlib import pyplot as plt
-from astropy.stats import sigma_clip, mad_std
-from astropy.modeling.models import Gaussian1D
-from astropy.table import Table
 
-from pypeit import spec2dobj
 from pypeit import msgs
-from pypeit import io
-from pypeit import utils
 from pypeit.scripts import scriptbase
-from pypeit.images.detector_container import DetectorContainer
-from pypeit.utils import list_of_spectral_lines
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 
 def plot(image:np.ndarray, chi_select:np.ndarray, flux_select:np.ndarray,
@@ -55,6 +46,10 @@ def plot(image:np.ndarray, chi_select:np.ndarray, flux_select:np.ndarray,
         basename (:obj:`str`):
             Basename
     """
+    from matplotlib import pyplot as plt
+    from astropy.stats import sigma_clip, mad_std
+    from astropy.modeling.models import Gaussian1D
+
     fig = plt.figure(figsize=(23,4.))
     ax = plt.subplot2grid((1, 4), (0, 0), rowspan=1, colspan=3)
     ax.minorticks_on()
@@ -123,6 +118,8 @@ def get_flux_slit(spec2DObj, slitidx, pad=0):
         :obj:`tuple`: tuple of `numpy.ndarray`_ with flux and error of the 2D spectrum
 
     """
+    from pypeit import utils
+
     slit_select = spec2DObj.slits.slit_img(pad=pad, slitidx=slitidx)
 
     flux = spec2DObj.sciimg - spec2DObj.skymodel
@@ -180,6 +177,13 @@ class ChkNoise2D(scriptbase.ScriptBase):
     @staticmethod
     def main(args):
 
+        from matplotlib import pyplot as plt
+        from astropy.table import Table
+        from pypeit import spec2dobj
+        from pypeit import io
+        from pypeit.images.detector_container import DetectorContainer
+        from pypeit.utils import list_of_spectral_lines
+
         chk_version = not args.try_old
 
         # Parse the detector name
@@ -7,7 +7,7 @@ This script displays the Trace image and the traces in an RC Ginga window.
 
 import numpy as np
 from pypeit.scripts import scriptbase
-from IPython import embed
+from pypeit.lazyimport import embed
 
 
 class ChkTilts(scriptbase.ScriptBase):
@@ -25,7 +25,7 @@ class ChkWaveCalib(scriptbase.ScriptBase):
     @staticmethod
     def main(args):
 
-        from IPython import embed
+        from pypeit.lazyimport import embed
         from astropy.io import fits
         from pypeit import wavecalib, spec2dobj, msgs
 
@@ -37,7 +37,7 @@ class CleanCache(scriptbase.ScriptBase):
 
     @staticmethod
     def main(args):
-        from IPython import embed
+        from pypeit.lazyimport import embed
         import numpy as np
         import astropy.utils.data
 
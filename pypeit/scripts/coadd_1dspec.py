@@ -6,7 +6,7 @@ Script for coadding PypeIt 1d spectra
 """
 import os
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
@@ -15,8 +15,6 @@ from astropy.time import Time
 
 from pypeit import msgs
 from pypeit import inputfiles
-from pypeit import coadd1d
-from pypeit import inputfiles
 from pypeit.par import pypeitpar
 from pypeit.scripts import scriptbase
 from pypeit.spectrographs.util import load_spectrograph
@@ -150,6 +148,8 @@ class CoAdd1DSpec(scriptbase.ScriptBase):
     def main(args):
         """ Runs the 1d coadding steps
         """
+        from pypeit import coadd1d
+
         # Set the verbosity, and create a logfile if verbosity == 2
         msgs.set_logfile_and_verbosity('coadd_1dspec', args.verbosity)
 
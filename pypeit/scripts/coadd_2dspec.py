@@ -51,7 +51,7 @@ class CoAdd2DSpec(scriptbase.ScriptBase):
         import copy
         from collections import OrderedDict
 
-        from IPython import embed
+        from pypeit.lazyimport import embed
 
         import numpy as np
 
@@ -6,7 +6,7 @@ from SlicerIFU instruments into a 3D cube with a defined WCS.
 .. include:: ../include/links.rst
 """
 from pypeit.scripts import scriptbase
-from IPython import embed
+from pypeit.lazyimport import embed
 
 class CoAddDataCube(scriptbase.ScriptBase):
 
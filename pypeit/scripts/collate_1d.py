@@ -19,21 +19,25 @@ from astropy.time import Time
 from linetools import utils as ltu
 from pypeit.par import pypeitpar
 from pypeit.spectrographs.util import load_spectrograph
-from pypeit import coadd1d
 from pypeit import msgs
 from pypeit import par
 from pypeit.utils import is_float
 from pypeit.core import wave
 from pypeit.archive import ArchiveMetadata, ArchiveDir
-from pypeit.core.collate import collate_spectra_by_source, SourceObject
+from pypeit.lazyimport import lazy_import
 from pypeit.scripts import scriptbase
 from pypeit.slittrace import SlitTraceBitMask
 from pypeit.spec2dobj import AllSpec2DObj
 from pypeit.sensfilearchive import SensFileArchive
-from pypeit import fluxcalibrate
 from pypeit.specobjs import SpecObjs
 from pypeit import inputfiles
 
+# NOTE: The main reduction modules are imported lazily to limit the start-up
+# time of the script
+coadd1d = lazy_import('pypeit.coadd1d')
+collate = lazy_import('pypeit.core.collate')
+fluxcalibrate = lazy_import('pypeit.fluxcalibrate')
+
 
 
 def get_report_metadata(object_header_keys, spec_obj_keys, file_info):
@@ -74,7 +78,7 @@ def get_report_metadata(object_header_keys, spec_obj_keys, file_info):
 
     """
 
-    if not isinstance(file_info, SourceObject):
+    if not isinstance(file_info, collate.SourceObject):
         return (None, None)
 
     coaddfile = build_coadd_file_name(file_info)
@@ -795,14 +799,14 @@ class Collate1D(scriptbase.ScriptBase):
         specobjs_to_coadd, spec1d_files = read_spec1d_files(par, spec1d_files, spec1d_failure_msgs)
 
         # Build source objects from spec1d file, this list is not collated 
-        source_objects = SourceObject.build_source_objects(specobjs_to_coadd, spec1d_files,
-                                                           par['collate1d']['match_using'])
+        source_objects = collate.SourceObject.build_source_objects(specobjs_to_coadd, spec1d_files,
+                                                                   par['collate1d']['match_using'])
 
         # Filter out unwanted SpecObj objects based on parameters 
         (objects_to_coadd, excluded_obj_msgs) = exclude_source_objects(source_objects, exclude_map, par)
 
         # Collate the spectra
-        source_list = collate_spectra_by_source(objects_to_coadd, tolerance)
+        source_list = collate.collate_spectra_by_source(objects_to_coadd, tolerance)
 
         # Coadd the spectra
         successful_source_list = []
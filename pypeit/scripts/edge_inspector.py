@@ -4,7 +4,7 @@ Launch a matplotlib GUI to inspect and interact with the slit edge tracing.
 .. include common links, assuming primary doc root is up one directory
 .. include:: ../include/links.rst
 """
-from IPython import embed
+from pypeit.lazyimport import embed
 
 from pypeit.scripts import scriptbase
 
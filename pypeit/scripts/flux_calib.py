@@ -4,14 +4,13 @@ Script for fluxing PYPEIT 1d spectra
 .. include common links, assuming primary doc root is up one directory
 .. include:: ../include/links.rst
 """
-from IPython import embed
+from pypeit.lazyimport import embed
 
 from astropy.io import fits
 
 from pypeit import msgs
 from pypeit import inputfiles
 from pypeit.spectrographs.util import load_spectrograph
-from pypeit import fluxcalibrate
 from pypeit.par import pypeitpar
 from pypeit.scripts import scriptbase
 from pypeit.sensfilearchive import SensFileArchive
@@ -74,6 +73,7 @@ class FluxCalib(scriptbase.ScriptBase):
     def main(args):
         """ Runs fluxing steps
         """
+        from pypeit import fluxcalibrate
 
         chk_version = not args.try_old
 
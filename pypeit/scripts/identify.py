@@ -5,7 +5,7 @@ Launch the pypeit_identify GUI tool.
 .. include:: ../include/links.rst
 """
 import argparse
-from IPython import embed
+from pypeit.lazyimport import embed
 
 from pypeit.scripts import scriptbase
 
@@ -6,7 +6,7 @@ Script to measure and correct for flexure in multi-slit data.
 """
 import os
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
@@ -14,7 +14,6 @@ from pypeit import msgs
 from pypeit import inputfiles
 from pypeit.spectrographs.util import load_spectrograph
 from pypeit.par import pypeitpar
-from pypeit.core import flexure
 from pypeit.scripts import scriptbase
 
 
@@ -49,6 +48,7 @@ class MultiSlitFlexure(scriptbase.ScriptBase):
     def main(args):
 
         from astropy.io import fits
+        from pypeit.core import flexure
 
         # Load the file
         flexFile = inputfiles.FlexureFile.from_file(args.flex_file)
@@ -8,7 +8,7 @@ to be reduced by PypeIt.
 import time
 import os
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
@@ -4,7 +4,7 @@ This script parses info from one or more SlitTraceSet objects
 .. include:: ../include/links.rst
 """
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 from pypeit.scripts import scriptbase
 
@@ -0,0 +1,105 @@
+"""
+This script summarizes the performance report written by ``run_pypeit --perf``.
+
+.. include common links, assuming primary doc root is up one directory
+.. include:: ../include/links.rst
+"""
+from pypeit.scripts import scriptbase
+
+
+class PerfReport(scriptbase.ScriptBase):
+
+    @classmethod
+    def get_parser(cls, width=None):
+        parser = super().get_parser(description='Summarize the wall time, CPU time and peak '
+                                                'memory of the calibration and reduction steps '
+                                                'recorded by run_pypeit --perf.', width=width)
+        parser.add_argument('report', type=str,
+                            help='Performance report (the *_perf.json or *_perf.csv file) '
+                                 'written by run_pypeit')
+        parser.add_argument('--by', type=str, default='path',
+                            choices=['path', 'step', 'det', 'exposure'],
+                            help='How to group the recorded steps: by their location in the '
+                                 'hierarchy of nested steps (path), by step name regardless of '
+                                 'location (step), or by their location for each detector (det) '
+                                 'or exposure (exposure).')
+        parser.add_argument('--det', type=str, default=None,
+                            help='Only include steps for this detector (e.g., DET01 or MSC01).')
+        parser.add_argument('--exposure', type=str, default=None,
+                            help='Only include steps for this exposure (the root name of the '
+                                 'spec1d/spec2d files).')
+        parser.add_argument('--max_depth', type=int, default=None,
+                            help='Only include steps nested up to this depth; 0 only includes '
+                                 'the outermost steps.')
+        parser.add_argument('--sort', type=str, default=None,
+                            choices=['wall_time', 'cpu_time', 'peak_rss', 'ncalls'],
+                            help='Sort the summary by this column (in descending order) instead '
+                                 'of the order of execution.')
+        parser.add_argument('--all', default=False, action='store_true',
+                            help='List every recorded step instead of the summary.')
+        parser.add_argument('--csv', type=str, default=None,
+                            help='Write the (selected) recorded steps to this csv file.')
+        return parser
+
+    @staticmethod
+    def main(args):
+
+        import numpy as np
+
+        from pypeit import msgs
+        from pypeit import perf
+
+        tbl = perf.read_report(args.report)
+
+        # Select the steps
+        gpm = np.ones(len(tbl), dtype=bool)
+        if args.det is not None:
+            gpm &= tbl['det'] == args.det
+        if args.exposure is not None:
+            gpm &= tbl['exposure'] == args.exposure
+        if args.max_depth is not None:
+            gpm &= tbl['depth'] <= args.max_depth
+        if not np.any(gpm):
+            msgs.error('No recorded steps match the selection criteria.')
+        meta = tbl.meta
+        tbl = tbl[gpm]
+
+        if args.csv is not None:
+            tbl.write(args.csv, format='ascii.csv', overwrite=True)
+            msgs.info(f'Wrote {args.csv}')
+
+        if len(meta) > 0:
+            print(f'PypeIt version: {meta["pypeit_version"]}')
+            print(f'Date: {meta["date"]}')
+            print(f'Platform: {meta["platform"]} ({meta["ncpu"]} CPUs)')
+            if not meta['peak_per_step']:
+                print('NOTE: The peak memory could not be measured separately for each step; '
+                      'the values are the peak of the process up to the end of each step.')
+            print('')
+
+        if args.all:
+            tbl.remove_column('path')
+            tbl['step'] = [f'{"  "*d}{s}' for s, d in zip(tbl['step'], tbl['depth'])]
+            tbl.remove_column('depth')
+            for c in ['wall_time', 'cpu_time']:
+                tbl[c].format = '.2f'
+            for c in ['rss', 'peak_rss']:
+                tbl[c].format = '.1f'
+            tbl.pprint_all()
+            return 0
+
+        summary = perf.summarize(tbl, by=args.by)
+        if args.by != 'step':
+            # Indent the step names according to their depth
+            summary['path'] = [f'{"  "*d}{p.split("/")[-1]}'
+                               for p, d in zip(summary['path'], summary['depth'])]
+            summary.rename_column('path', 'step')
+        summary.remove_column('depth')
+        if args.sort is not None:
+            summary.sort(args.sort, reverse=True)
+        summary['wall_time'].format = '.2f'
+        summary['cpu_time'].format = '.2f'
+        summary['peak_rss'].format = '.1f'
+        summary['wall_frac'].format = '.3f'
+        summary.pprint_all()
+        return 0
@@ -5,7 +5,7 @@ based on a spec2d file.
 .. include common links, assuming primary doc root is up one directory
 .. include:: ../include/links.rst
 """
-from IPython import embed
+from pypeit.lazyimport import embed
 
 from astropy.io import fits
 
@@ -40,7 +40,7 @@ import datetime
 import shutil
 from copy import deepcopy
 
-from IPython import embed
+from pypeit.lazyimport import embed, lazy_import
 
 import numpy as np
 
@@ -54,8 +54,10 @@ from pypeit import pypeitsetup
 from pypeit import metadata
 from pypeit import io
 from pypeit import inputfiles 
-from pypeit import pypeit
-from pypeit import coadd2d
+# NOTE: The main reduction modules are imported lazily to limit the start-up
+# time of the script
+pypeit = lazy_import('pypeit.pypeit')
+coadd2d = lazy_import('pypeit.coadd2d')
 from pypeit.par.pypeitpar import PypeItPar
 from pypeit.calibframe import CalibFrame
 from pypeit.core.parse import parse_binning
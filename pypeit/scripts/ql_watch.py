@@ -0,0 +1,536 @@
+"""
+Script that runs a long-lived quick-look service, reducing new science frames
+as they are written to a raw-data directory.
+
+The service keeps the spectrograph, the metadata of the raw frames, the
+reduction parameters, the calibration manifest, and the processed calibration
+frames in memory, such that each new frame is reduced without the start-up
+overhead of a new ``pypeit_ql`` call.
+
+.. include:: ../include/links.rst
+"""
+from pathlib import Path
+import time
+import datetime
+from copy import deepcopy
+
+from pypeit.lazyimport import embed, lazy_import
+
+import numpy as np
+
+from astropy import table
+
+from pypeit import msgs
+from pypeit import inputfiles
+from pypeit import pypeitsetup
+from pypeit.metadata import PypeItMetaData
+from pypeit.par import PypeItPar
+from pypeit.spectrographs import available_spectrographs
+from pypeit.spectrographs.util import load_spectrograph
+from pypeit.scripts import scriptbase
+from pypeit.scripts import ql
+
+# NOTE: The main reduction modules are imported lazily to limit the start-up
+# time of the script
+pypeit = lazy_import('pypeit.pypeit')
+calibrations = lazy_import('pypeit.calibrations')
+
+
+def parse_command(line):
+    """
+    Parse a single command line read from a command file.
+
+    Command lines are case-insensitive in their keyword, but not in their
+    arguments (e.g., file names).  Empty lines and lines starting with ``#``
+    are ignored.  Allowed commands are:
+
+        - ``stack [file ...]``: Re-reduce a stack of science frames.  If no
+          files are listed, all science frames reduced so far for the target of
+          the most recently reduced frame are stacked.
+
+        - ``det [det ...]``: Change the detectors/mosaics to reduce for all
+          subsequent reductions; see the ``--det`` option.  If no detectors are
+          listed, all detectors are reduced.
+
+        - ``recalibrate``: Clear the in-memory calibrations and re-read the
+          calibration directories, e.g., after new calibrations have been
+          processed.
+
+        - ``stop``: Stop the service.
+
+    Args:
+        line (:obj:`str`):
+            The line to parse.
+
+    Returns:
+        :obj:`tuple`: The command keyword and the list of its arguments.  If
+        the line is empty or a comment, both are None.
+    """
+    _line = line.split('#')[0].strip()
+    if len(_line) == 0:
+        return None, None
+    cmd, *cmd_args = _line.split()
+    cmd = cmd.lower()
+    if cmd not in QLWatcher.valid_commands:
+        msgs.error(f'Unknown quick-look command: {cmd}.  Options are: '
+                   f'{", ".join(QLWatcher.valid_commands)}')
+    return cmd, cmd_args
+
+
+class QLWatcher:
+    """
+    Long-lived quick-look service that reduces science frames as they land in
+    a raw-data directory.
+
+    Calibrations *must* already exist, either in ``setup_calib_dir`` or in a
+    setup-specific subdirectory of ``parent_calib_dir`` (e.g., as produced by
+    ``pypeit_ql`` with the ``--calibs_only`` option).  The processed
+    calibration frames are cached in memory after they are first read; see
+    :attr:`~pypeit.calibrations.Calibrations.calib_cache`.  The headers of
+    each raw frame are only read once (see :attr:`metadata`), and the
+    reduction parameters are only constructed once for each set of
+    calibrations and reduction options (see :attr:`reduce_par`).
+
+    Args:
+        spectrograph (:obj:`str`):
+            The PypeIt name of the spectrograph.
+        raw_path (:obj:`str`, `Path`_):
+            Directory to watch for new raw frames.
+        redux_path (:obj:`str`, `Path`_):
+            Path for the quick-look reduction outputs.
+        parent_calib_dir (:obj:`str`, `Path`_, optional):
+            Parent directory with the calibrations for *all* instrument
+            setups; see :func:`~pypeit.scripts.ql.calib_manifest`.
+        setup_calib_dir (:obj:`str`, `Path`_, optional):
+            Directory with the calibrations for the setup of the observed
+            frames.  Takes precedence over ``parent_calib_dir``.
+        det (:obj:`list`, optional):
+            Detectors/mosaics to reduce; see the ``--det`` option of
+            ``pypeit_ql``.  If None, all detectors are reduced.
+        command_dir (:obj:`str`, `Path`_, optional):
+            Directory monitored for command files; see :func:`parse_command`.
+            Any file in this directory with a ``.cmd`` extension is executed
+            and then renamed with a ``.done`` extension.  If None, commands
+            are not accepted.
+        include_existing (:obj:`bool`, optional):
+            Reduce science frames that already exist in ``raw_path`` when the
+            service starts.  If False, these are ignored.
+        reduce_kwargs (:obj:`dict`, optional):
+            Additional keyword arguments passed to
+            :func:`~pypeit.scripts.ql.generate_sci_pypeitfile`.
+    """
+
+    valid_commands = ['stack', 'det', 'recalibrate', 'stop']
+    """
+    Commands accepted by the service; see :func:`parse_command`.
+    """
+
+    def __init__(self, spectrograph, raw_path, redux_path, parent_calib_dir=None,
+                 setup_calib_dir=None, det=None, command_dir=None, include_existing=False,
+                 reduce_kwargs=None):
+        if parent_calib_dir is None and setup_calib_dir is None:
+            msgs.error('Quick-look service requires existing calibrations; provide either the '
+                       'parent or setup calibration directory.')
+        self.spectrograph = load_spectrograph(spectrograph)
+        self.raw_path = Path(raw_path).absolute()
+        if not self.raw_path.is_dir():
+            msgs.error(f'Raw data directory does not exist: {self.raw_path}')
+        self.redux_path = Path(redux_path).absolute()
+        self.parent_calib_dir = None if parent_calib_dir is None \
+                                    else Path(parent_calib_dir).absolute()
+        self.setup_calib_dir = None if setup_calib_dir is None \
+                                    else Path(setup_calib_dir).absolute()
+        self.det = det
+        self.command_dir = None if command_dir is None else Path(command_dir).absolute()
+        if self.command_dir is not None and not self.command_dir.exists():
+            self.command_dir.mkdir(parents=True)
+        self.reduce_kwargs = {} if reduce_kwargs is None else reduce_kwargs
+
+        # Keep the processed calibration frames in memory
+        calibrations.Calibrations.enable_calib_cache()
+        # Calibration manifest; see reset_calibs()
+        self.calibrated_setups = None
+
+        # Parameters used to type and group the raw frames
+        self.setup_par = PypeItPar.from_cfg_lines(
+                            cfg_lines=self.spectrograph.default_pypeit_par().to_config())
+        self.metadata = {}
+        """
+        Metadata read from the headers of each raw frame, keyed by its path;
+        see :func:`setup_frames`.
+        """
+        self.reduce_par = {}
+        """
+        Reduction parameters for each set of calibrations and reduction
+        options; see :func:`reducer`.
+        """
+
+        # Bookkeeping for raw files: sizes of files that may not have
+        # finished landing, all files that have been handled, and the
+        # science frames that have been reduced (in order).
+        self.pending = {}
+        self.handled = set() if include_existing \
+                            else set(self.spectrograph.find_raw_files(self.raw_path))
+        self.science = []
+        self.targets = []
+        self.last_spec2d = None
+        self.stopped = False
+
+    def reset_calibs(self):
+        """
+        Clear the in-memory calibrations and the calibration manifest, forcing
+        them to be read again for the next reduction.
+        """
+        calibrations.Calibrations.enable_calib_cache()
+        self.calibrated_setups = None
+        self.reduce_par = {}
+        msgs.info('In-memory calibrations cleared.')
+
+    def landed_files(self):
+        """
+        Find new raw files that have finished landing in :attr:`raw_path`.
+
+        A new file is considered to have landed once its size is non-zero and
+        unchanged between two consecutive calls to this function.
+
+        Returns:
+            :obj:`list`: The list of `Path`_ objects with the new files, sorted
+            by name.
+        """
+        landed = []
+        for f in self.spectrograph.find_raw_files(self.raw_path):
+            if f in self.handled:
+                continue
+            size = f.stat().st_size
+            if size > 0 and self.pending.get(f) == size:
+                landed += [f]
+                del self.pending[f]
+                self.handled.add(f)
+            else:
+                self.pending[f] = size
+        return sorted(landed)
+
+    def calib_dir_for(self, ps_sci):
+        """
+        Find the directory with the calibrations for a set of science frames.
+
+        Args:
+            ps_sci (:class:`~pypeit.pypeitsetup.PypeItSetup`):
+                Setup object for the science frame(s) only.  The frames must
+                all have the same setup.
+
+        Returns:
+            `Path`_: The calibration directory, or None if no matching
+            calibrations exist.
+        """
+        if self.setup_calib_dir is not None:
+            return self.setup_calib_dir
+        if self.calibrated_setups is None:
+            self.calibrated_setups = ql.calib_manifest(self.parent_calib_dir,
+                                                       self.spectrograph.name)
+        match = ql.match_to_calibs(ps_sci, self.parent_calib_dir,
+                                   calibrated_setups=self.calibrated_setups)
+        setup = ps_sci.fitstbl['setup'][0]
+        return None if match.get(setup) is None else match[setup]['calib_dir']
+
+    def setup_frames(self, files, frametype=None):
+        """
+        Construct the setup object for a set of raw frames.
+
+        The headers of each frame are only read the first time the frame is
+        setup; the metadata are kept in :attr:`metadata`.
+
+        Args:
+            files (:obj:`list`):
+                Raw files to setup.
+            frametype (:obj:`dict`, optional):
+                The frame type of each file; see
+                :class:`~pypeit.pypeitsetup.PypeItSetup`.  If None, the frame
+                types are determined automatically.
+
+        Returns:
+            :class:`~pypeit.pypeitsetup.PypeItSetup`: Setup object with the
+            typed and grouped frames.
+        """
+        _files = [Path(f).absolute() for f in files]
+        new_files = [f for f in _files if f not in self.metadata]
+        if len(new_files) > 0:
+            meta = PypeItMetaData(self.spectrograph, self.setup_par, files=new_files,
+                                  strict=False)
+            for i, f in enumerate(new_files):
+                self.metadata[f] = meta.table[[i]]
+        ps = pypeitsetup.PypeItSetup([str(f) for f in _files], frametype=frametype,
+                                     spectrograph_name=self.spectrograph.name,
+                                     par=self.setup_par)
+        ps.fitstbl = PypeItMetaData(self.spectrograph, ps.par,
+                                    data=table.vstack([self.metadata[f] for f in _files]))
+        ps.run(setup_only=True)
+        return ps
+
+    def science_frames(self, files):
+        """
+        Select the science (and standard) frames from a set of raw files.
+
+        Args:
+            files (:obj:`list`):
+                Raw files to type.
+
+        Returns:
+            :obj:`list`: The subset of the files that are science or standard
+            frames.
+        """
+        ps = self.setup_frames(files)
+        is_sci = ps.fitstbl.find_frames('science') | ps.fitstbl.find_frames('standard')
+        for f, t in zip(ps.fitstbl['filename'][np.logical_not(is_sci)],
+                        ps.fitstbl['frametype'][np.logical_not(is_sci)]):
+            msgs.info(f'Ignoring {f} with frame type {t}.')
+        return ps.fitstbl.frame_paths(is_sci)
+
+    def reducer(self, sci_pypeit_file, ps_sci, calib_dir):
+        """
+        Construct the object used to reduce a set of science frames.
+
+        The reduction parameters are only constructed from the pypeit file for
+        the first reduction with each set of calibrations and reduction
+        options; they are kept in :attr:`reduce_par` and reused (with an
+        updated reduction path) for later reductions.  The metadata are taken
+        from ``ps_sci`` instead of reading the headers of the frames again.
+
+        Args:
+            sci_pypeit_file (:obj:`str`):
+                The pypeit file for the reduction; see
+                :func:`~pypeit.scripts.ql.generate_sci_pypeitfile`.
+            ps_sci (:class:`~pypeit.pypeitsetup.PypeItSetup`):
+                Setup object for the science frame(s), as used to write
+                ``sci_pypeit_file``.
+            calib_dir (`Path`_):
+                The directory with the calibrations.
+
+        Returns:
+            :class:`~pypeit.pypeit.PypeIt`: The object used to reduce the
+            frames.
+        """
+        pypeItFile = inputfiles.PypeItFile.from_file(sci_pypeit_file)
+        redux_path = pypeItFile.config['rdx']['redux_path']
+        # The reduction path is the only parameter that changes for each set
+        # of science frames
+        key = (str(calib_dir),) + tuple(line for line in pypeItFile.cfg_lines
+                                            if 'redux_path' not in line)
+        par = self.reduce_par.get(key)
+        pypeIt = pypeit.PypeIt(sci_pypeit_file, reuse_calibs=True, redux_path=redux_path,
+                               par=None if par is None else deepcopy(par),
+                               fitstbl=ps_sci.fitstbl)
+        if par is None:
+            self.reduce_par[key] = deepcopy(pypeIt.par)
+        return pypeIt
+
+    def reduce(self, sci_files):
+        """
+        Reduce a set of science frames, stacking them if more than one is
+        provided.
+
+        Args:
+            sci_files (:obj:`list`):
+                Science frames to reduce.
+
+        Returns:
+            :obj:`str`: The spec2d file produced by the reduction, or None if
+            the reduction failed.
+        """
+        tstart = time.perf_counter()
+        ps_sci = self.setup_frames(sci_files,
+                                   frametype={Path(f).name: 'science' for f in sci_files})
+        if len(ps_sci.fitstbl.configs.keys()) > 1:
+            msgs.warn('Cannot stack science frames from more than one setup.  Skipping.')
+            return None
+        ql.quicklook_regroup(ps_sci.fitstbl)
+        ps_sci.fitstbl['calib'] = ps_sci.fitstbl['calib'][0]
+
+        calib_dir = self.calib_dir_for(ps_sci)
+        if calib_dir is None:
+            msgs.warn('No calibrations match the setup of '
+                      f'{", ".join([Path(f).name for f in sci_files])}.  Skipping.')
+            return None
+
+        sci_pypeit_file = ql.generate_sci_pypeitfile(str(self.redux_path), calib_dir, ps_sci,
+                                                     det=self.det, **self.reduce_kwargs)
+        pypeIt = self.reducer(sci_pypeit_file, ps_sci, calib_dir)
+        pypeIt.reduce_all()
+        pypeIt.build_qa()
+
+        frame = pypeIt.fitstbl.find_frames('science', index=True)[0]
+        self.last_spec2d = pypeIt.spec_output_file(frame, twod=True)
+        exec_s = np.around(time.perf_counter()-tstart, decimals=1)
+        msgs.info(f'Quick-look reduction of {len(sci_files)} frame(s) completed in '
+                  f'{datetime.timedelta(seconds=exec_s)}: {self.last_spec2d}')
+        return self.last_spec2d
+
+    def execute(self, cmd, cmd_args):
+        """
+        Execute a service command; see :func:`parse_command`.
+
+        Args:
+            cmd (:obj:`str`):
+                Command keyword.
+            cmd_args (:obj:`list`):
+                Command arguments.
+        """
+        if cmd == 'stop':
+            self.stopped = True
+        elif cmd == 'det':
+            self.det = None if len(cmd_args) == 0 else cmd_args
+            msgs.info(f'Quick-look detectors set to: {"all" if self.det is None else self.det}')
+        elif cmd == 'recalibrate':
+            self.reset_calibs()
+        elif cmd == 'stack':
+            if len(cmd_args) > 0:
+                files = [self.raw_path / f for f in cmd_args]
+                missing = [f.name for f in files if not f.exists()]
+                if len(missing) > 0:
+                    msgs.warn(f'Cannot stack missing files: {", ".join(missing)}')
+                    return
+            elif len(self.science) == 0:
+                msgs.warn('No science frames have been reduced; nothing to stack.')
+                return
+            else:
+                files = [f for f, t in zip(self.science, self.targets)
+                            if t == self.targets[-1]]
+            self.reduce(files)
+
+    def read_commands(self):
+        """
+        Execute the commands in any new command file in :attr:`command_dir`.
+        """
+        if self.command_dir is None:
+            return
+        for cmd_file in sorted(self.command_dir.glob('*.cmd')):
+            msgs.info(f'Executing commands in {cmd_file.name}')
+            with open(cmd_file, 'r') as f:
+                lines = f.readlines()
+            cmd_file.rename(cmd_file.with_suffix('.done'))
+            for line in lines:
+                try:
+                    cmd, cmd_args = parse_command(line)
+                    if cmd is not None:
+                        self.execute(cmd, cmd_args)
+                except Exception as e:
+                    msgs.warn(f'Command failed: {line.strip()}\n{type(e).__name__}: {e}')
+                if self.stopped:
+                    return
+
+    def poll(self):
+        """
+        Execute any new commands and reduce any newly landed science frames.
+        """
+        self.read_commands()
+        if self.stopped:
+            return
+        landed = self.landed_files()
+        if len(landed) == 0:
+            return
+        try:
+            sci_files = self.science_frames(landed)
+        except Exception as e:
+            msgs.warn(f'Could not setup {", ".join([f.name for f in landed])}.  Continuing.\n'
+                      f'{type(e).__name__}: {e}')
+            return
+        for sci_file in sci_files:
+            try:
+                self.reduce([sci_file])
+            except Exception as e:
+                msgs.warn(f'Quick-look reduction failed for {Path(sci_file).name}.  '
+                          f'Continuing.\n{type(e).__name__}: {e}')
+                continue
+            self.science += [Path(sci_file)]
+            self.targets += [self.spectrograph.get_meta_value(str(sci_file), 'target',
+                                                              required=False)]
+
+    def run(self, interval=5.):
+        """
+        Poll for new frames and commands until stopped.
+
+        Args:
+            interval (:obj:`float`, optional):
+                Number of seconds to wait between polls.
+        """
+        msgs.info(f'Quick-look service watching {self.raw_path}.')
+        if self.command_dir is not None:
+            msgs.info(f'Send commands by writing *.cmd files to {self.command_dir}.')
+        try:
+            while not self.stopped:
+                self.poll()
+                if not self.stopped:
+                    time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+        msgs.info('Quick-look service stopped.')
+
+
+class QLWatch(scriptbase.ScriptBase):
+
+    @classmethod
+    def get_parser(cls, width=None):
+        parser = super().get_parser(description='Run a quick-look service that reduces new '
+                                                'science frames as they are written to a '
+                                                'directory, keeping the calibrations in memory',
+                                    width=width, formatter=scriptbase.SmartFormatter)
+        parser.add_argument('spectrograph', type=str,
+                            help='A valid spectrograph identifier: {0}'.format(
+                                 ', '.join(available_spectrographs)))
+        parser.add_argument('--raw_path', type=str, default='current working directory',
+                            help='Directory to watch for new raw files.')
+        parser.add_argument('--redux_path', type=str, default='current working directory',
+                            help='Path for the QL reduction outputs.')
+        parser.add_argument('--parent_calib_dir', type=str,
+                            help='Directory with calibrations for *all* instrument '
+                                 'configurations/setups; see pypeit_ql.  If None, the '
+                                 'redux_path is used.')
+        parser.add_argument('--setup_calib_dir', type=str,
+                            help='Directory with calibrations specific to your instrument '
+                                 'configuration/setup; see pypeit_ql.')
+        parser.add_argument('--command_dir', type=str, default=None,
+                            help='R|Directory monitored for command files.  Each file with a '
+                                 '.cmd extension is executed (and then renamed with a .done '
+                                 'extension).  Each line of the file must be one of:\n'
+                                 '\n'
+                                 'F|    stack [file ...]\n'
+                                 'F|    det [det ...]\n'
+                                 'F|    recalibrate\n'
+                                 'F|    stop\n'
+                                 '\n'
+                                 'where "stack" re-reduces the listed science files (or all '
+                                 'science files of the last target, if none are listed) as a '
+                                 'stack, "det" changes the detectors to reduce, "recalibrate" '
+                                 'clears the in-memory calibrations, and "stop" stops the '
+                                 'service.')
+        parser.add_argument('--det', type=str, nargs='+',
+                            help='A space-separated set of detectors or detector mosaics to '
+                                 'reduce; see pypeit_ql.  By default, *all* detectors or default '
+                                 'mosaics for this instrument will be reduced.')
+        parser.add_argument('--interval', type=float, default=5.,
+                            help='Number of seconds between checks for new files.')
+        parser.add_argument('--include_existing', default=False, action='store_true',
+                            help='Reduce the science frames that already exist in the raw '
+                                 'directory when the service is started.')
+        parser.add_argument('--boxcar_radius', type=float,
+                            help='Set the radius for the boxcar extraction in arcseconds')
+        parser.add_argument('--snr_thresh', default=None, type=float,
+                            help='Change the default S/N threshold used during source detection')
+        parser.add_argument('--try_old', default=False, action='store_true',
+                            help='Attempt to load old datamodel versions.  A crash may ensue..')
+        return parser
+
+    @staticmethod
+    def main(args):
+        parent_calib_dir = args.parent_calib_dir
+        if parent_calib_dir is None and args.setup_calib_dir is None:
+            parent_calib_dir = args.redux_path
+        watcher = QLWatcher(args.spectrograph, args.raw_path, args.redux_path,
+                            parent_calib_dir=parent_calib_dir,
+                            setup_calib_dir=args.setup_calib_dir, det=args.det,
+                            command_dir=args.command_dir,
+                            include_existing=args.include_existing,
+                            reduce_kwargs=dict(boxcar_radius=args.boxcar_radius,
+                                               snr_thresh=args.snr_thresh,
+                                               chk_version=not args.try_old))
+        watcher.run(interval=args.interval)
@@ -75,6 +75,25 @@ class RunPypeIt(scriptbase.ScriptBase):
                             help='Overwrite any existing files/directories')
         parser.add_argument('-c', '--calib_only', default=False, action='store_true',
                             help='Only run on calibrations')
+        parser.add_argument('--checkpoint', default=False, action='store_true',
+                            help='Save the results of the object finding and extraction for '
+                                 'each exposure and detector in a Checkpoints directory, and '
+                                 'restore them when the reduction is restarted.  A checkpoint '
+                                 'is only used if the raw frames, processed calibrations, and '
+                                 'parameters are unchanged.  The checkpoints of an exposure '
+                                 'are removed once its spec1d and spec2d files are written.')
+        parser.add_argument('--perf', default=False, action='store_true',
+                            help='Record the wall time, CPU time and peak memory of each '
+                                 'calibration and reduction step.  The report is written to '
+                                 '<pypeit file root>_perf.json (and .csv) in the Science '
+                                 'directory (or the Calibrations directory if using -c) and can '
+                                 'be viewed with pypeit_perf_report.')
+        parser.add_argument('--profile', default=None, type=str, metavar='STEP',
+                            help='Profile all executions of a single step (e.g., get_wv_calib, '
+                                 'global_sky, extraction) using cProfile; see pypeit_perf_report '
+                                 'for the list of recorded steps.  The profiles are written next '
+                                 'to the performance report, which is written even if --perf is '
+                                 'not set.')
 
         return parser
 
@@ -82,7 +101,7 @@ class RunPypeIt(scriptbase.ScriptBase):
     def main(args):
 
         import os
-        from IPython import embed
+        from pypeit.lazyimport import embed
 
         from pypeit import pypeit
         from pypeit import msgs
@@ -97,7 +116,8 @@ class RunPypeIt(scriptbase.ScriptBase):
         pypeIt = pypeit.PypeIt(args.pypeit_file, verbosity=args.verbosity,
                                reuse_calibs=args.reuse_calibs, overwrite=args.overwrite,
                                redux_path=args.redux_path, calib_only=args.calib_only,
-                               logname=logname, show=args.show)
+                               logname=logname, show=args.show, perf_report=args.perf,
+                               profile_step=args.profile, checkpoint=args.checkpoint)
 
         if args.calib_only:
             calib_dict = pypeIt.calib_all()
@@ -5,7 +5,7 @@ Implements base classes for use with ``PypeIt`` scripts.
 .. include:: ../include/links.rst
 
 """
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import os
 from pathlib import Path
@@ -4,7 +4,7 @@ Script to determine the sensitivity function for a PypeIt 1D spectrum.
 .. include common links, assuming primary doc root is up one directory
 .. include:: ../include/links.rst
 """
-from IPython import embed
+from pypeit.lazyimport import embed
 
 from pypeit.scripts import scriptbase
 from pathlib import Path
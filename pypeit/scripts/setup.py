@@ -5,7 +5,7 @@ This script generates files to setup a PypeIt run
 .. include:: ../include/links.rst
 """
 import argparse
-from IPython import embed
+from pypeit.lazyimport import embed
 
 from pypeit.scripts import scriptbase
 from pypeit.spectrographs import available_spectrographs
@@ -86,7 +86,7 @@ class SetupCoAdd2D(scriptbase.ScriptBase):
 
         from pathlib import Path
 
-        from IPython import embed
+        from pypeit.lazyimport import embed
 
         import numpy as np
 
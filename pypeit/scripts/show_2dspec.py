@@ -9,7 +9,7 @@ import os
 
 import numpy as np
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 from astropy.io import fits
 from astropy.stats import sigma_clipped_stats
@@ -6,7 +6,7 @@ Show on a ginga window the archived pixel flat field image
 """
 
 from pypeit.scripts import scriptbase
-from IPython import embed
+from pypeit.lazyimport import embed
 
 
 class ShowPixFlat(scriptbase.ScriptBase):
@@ -6,14 +6,10 @@ Wrapper to matplotlib to show an arc spectrum
 """
 
 import numpy as np
-from matplotlib import pyplot as plt
 
 from pypeit.scripts import scriptbase
 
-from pypeit import wavecalib
-from pypeit import slittrace
-
-from IPython import embed
+from pypeit.lazyimport import embed
 
 class ShowWvCalib(scriptbase.ScriptBase):
 
@@ -36,6 +32,8 @@ class ShowWvCalib(scriptbase.ScriptBase):
         """
 
         from matplotlib import pyplot as plt
+        from pypeit import wavecalib
+        from pypeit import slittrace
 
         chk_version = not args.try_old
 
@@ -37,7 +37,7 @@ class SkySubRegions(scriptbase.ScriptBase):
 
     @staticmethod
     def main(args):
-        from IPython import embed
+        from pypeit.lazyimport import embed
         from pypeit import spec2dobj
         import os
         import astropy.io.fits as fits
@@ -8,6 +8,101 @@ Trace slit edges for a set of images.
 from pypeit.scripts import scriptbase
 
 
+def trace_detector(det, spec=None, files=None, proc_par=None, trace_par=None, bias_files=None,
+                   bias_par=None, dark_files=None, dark_par=None, setup=None, calib_id=None,
+                   calib_dir=None, qa_path=None, debug=False, show=False, profile=False):
+    """
+    Trace the slit edges for a single detector and write the results.
+
+    Args:
+        det (:obj:`int`, :obj:`tuple`):
+            The detector or mosaic to trace.
+        spec (:class:`~pypeit.spectrographs.spectrograph.Spectrograph`):
+            Spectrograph used to collect the data.
+        files (:obj:`list`):
+            The trace files to combine.
+        proc_par (:class:`~pypeit.par.pypeitpar.FrameGroupPar`):
+            Processing parameters for the trace frames.
+        trace_par (:class:`~pypeit.par.pypeitpar.EdgeTracePar`):
+            Slit tracing parameters.
+        bias_files (:obj:`list`):
+            The bias files to combine.  Can be None.
+        bias_par (:class:`~pypeit.par.pypeitpar.FrameGroupPar`):
+            Processing parameters for the bias frames.
+        dark_files (:obj:`list`):
+            The dark files to combine.  Can be None.
+        dark_par (:class:`~pypeit.par.pypeitpar.FrameGroupPar`):
+            Processing parameters for the dark frames.
+        setup (:obj:`str`):
+            The setup/configuration identifier.
+        calib_id (:obj:`str`):
+            The calibration group.
+        calib_dir (`Path`_):
+            Directory for the processed calibration files.
+        qa_path (`Path`_):
+            Directory for the QA output.
+        debug (:obj:`bool`, optional):
+            Run in debug mode.
+        show (:obj:`bool`, optional):
+            Show the stages of trace refinements.
+        profile (:obj:`bool`, optional):
+            Record the performance of each stage of the edge tracing; see
+            :mod:`~pypeit.perf`.
+
+    Returns:
+        :obj:`dict`: A summary of the results, with the name of the detector,
+        the number of left and right edges and slits, the tracing time, and
+        the file with the edge traces.  If ``profile`` is True, the
+        performance records are also included (``perf``).
+    """
+    import time
+    from pypeit import msgs
+    from pypeit import perf
+    from pypeit import edgetrace
+    from pypeit.images import buildimage
+
+    detname = spec.get_det_name(det)
+    # Record the performance in the process that traces the detector
+    recorder = perf.start() if profile else None
+    try:
+        with perf.step('trace_edges', det=detname):
+            # Get the bias frame if requested
+            msbias = None if bias_files is None \
+                        else buildimage.buildimage_fromlist(spec, det, bias_par, bias_files)
+
+            # Get the dark frame if requested
+            msdark = None if dark_files is None \
+                        else buildimage.buildimage_fromlist(spec, det, dark_par, dark_files)
+
+            msbpm = spec.bpm(files[0], det)
+
+            # Build the trace image
+            traceImage = buildimage.buildimage_fromlist(spec, det, proc_par, files, bias=msbias,
+                                                        bpm=msbpm, dark=msdark, setup=setup,
+                                                        calib_id=calib_id, calib_dir=calib_dir)
+            # Trace the slit edges
+            t = time.perf_counter()
+            with perf.step('auto_trace'):
+                edges = edgetrace.EdgeTraceSet(traceImage, spec, trace_par, auto=True,
+                                               debug=debug, show_stages=show, qa_path=qa_path)
+            trace_time = time.perf_counter()-t
+            msgs.info(f'Tracing for detector {detname} finished in {trace_time:.1f} s.')
+            # Write the two calibration frames
+            with perf.step('write'):
+                edges.to_file()
+                slits = edges.get_slits()
+                slits.to_file()
+    finally:
+        if recorder is not None:
+            perf.stop()
+    result = dict(det=detname, nleft=int(edges.is_left.sum()), nright=int(edges.is_right.sum()),
+                  nslits=slits.nslits, trace_time=trace_time, success=edges.success,
+                  file=edges.get_path().name)
+    if recorder is not None:
+        result['perf'] = recorder.records
+    return result
+
+
 class TraceEdges(scriptbase.ScriptBase):
 
     @classmethod
@@ -43,11 +138,20 @@ class TraceEdges(scriptbase.ScriptBase):
                                  'relative to the top-level directory.')
         parser.add_argument('-o', '--overwrite', default=False, action='store_true',
                             help='Overwrite any existing files/directories')
+        parser.add_argument('-n', '--n_proc', type=int, default=None,
+                            help='Number of processes used to trace the detectors in parallel.  '
+                                 'If not provided, use the n_proc parameter of the slit tracing '
+                                 'parameters (1 by default).')
 
         parser.add_argument('--debug', default=False, action='store_true',
                             help='Run in debug mode.')
         parser.add_argument('--show', default=False, action='store_true',
                             help='Show the stages of trace refinements (only for the new code).')
+        parser.add_argument('--profile', default=False, action='store_true',
+                            help='Record the wall time, CPU time and peak memory of each stage '
+                                 'of the edge tracing for each detector.  A summary is printed '
+                                 'and the full report is written to the QA directory; view it '
+                                 'with pypeit_perf_report.')
         parser.add_argument('-v', '--verbosity', type=int, default=1,
                             help='Verbosity level between 0 [none] and 2 [all]. Default: 1. '
                                  'Level 2 writes a log with filename trace_edges_YYYYMMDD-HHMM.log')
@@ -57,16 +161,16 @@ class TraceEdges(scriptbase.ScriptBase):
     @staticmethod
     def main(args):
 
-        import time
         from pathlib import Path
         import numpy as np
+        from astropy.table import Table
         from pypeit import msgs
+        from pypeit import utils
+        from pypeit import perf
         from pypeit.spectrographs.util import load_spectrograph
-        from pypeit import edgetrace
         from pypeit.pypeit import PypeIt
-        from pypeit.images import buildimage
 
-        from IPython import embed
+        from pypeit.lazyimport import embed
 
         # Set the verbosity, and create a logfile if verbosity == 2
         msgs.set_logfile_and_verbosity('trace_edges', args.verbosity)
@@ -147,38 +251,63 @@ class TraceEdges(scriptbase.ScriptBase):
         elif any([isinstance(d,str) for d in detectors]):
             detectors = [eval(d) for d in detectors]
 
-        calib_dir = redux_path / args.calib_dir
-        for det in detectors:
-            # Get the bias frame if requested
-            if bias_files is None:
-                proc_par['process']['use_biasimage'] = False
-                msbias = None
-            else:
-                msbias = buildimage.buildimage_fromlist(spec, det, bias_par, bias_files)
+        if bias_files is None:
+            proc_par['process']['use_biasimage'] = False
+        if dark_files is None:
+            proc_par['process']['use_darkimage'] = False
 
-            # Get the dark frame if requested
-            if dark_files is None:
-                proc_par['process']['use_darkimage'] = False
-                msdark = None
-            else:
-                msdark = buildimage.buildimage_fromlist(spec, det, dark_par, dark_files)
+        n_proc = trace_par['n_proc'] if args.n_proc is None else args.n_proc
+        if n_proc > 1 and (args.debug or args.show):
+            msgs.warn('Cannot debug or show the results of multiple processes.  Tracing the '
+                      'detectors serially.')
+            n_proc = 1
+        n_proc = min(n_proc, len(detectors))
+        if n_proc > 1:
+            msgs.info(f'Tracing {len(detectors)} detectors using {n_proc} processes.')
 
-            msbpm = spec.bpm(files[0], det)
+        # Trace the detectors; the results are written as each detector is
+        # finished
+        calib_dir = redux_path / args.calib_dir
+        shared = dict(spec=spec, files=files, proc_par=proc_par, trace_par=trace_par,
+                      bias_files=bias_files, bias_par=bias_par, dark_files=dark_files,
+                      dark_par=dark_par, setup=setup, calib_id=calib_id, calib_dir=calib_dir,
+                      qa_path=qa_path, debug=args.debug, show=args.show, profile=args.profile)
+        # The performance is recorded by each process; this only collects the
+        # records
+        recorder = perf.PerfRecorder() if args.profile else None
+        summary = []
+        for result in utils.parallel_map(trace_detector, detectors, n_proc=n_proc,
+                                         shared=shared):
+            msgs.info(f'Wrote edge traces for detector {result["det"]} to {result["file"]}')
+            if recorder is not None:
+                recorder.records += result.pop('perf')
+            summary += [result]
 
-            # Build the trace image
-            traceImage = buildimage.buildimage_fromlist(spec, det, proc_par, files, bias=msbias,
-                                                        bpm=msbpm, dark=msdark, setup=setup,
-                                                        calib_id=calib_id, calib_dir=calib_dir)
-            # Trace the slit edges
-            t = time.perf_counter()
-            edges = edgetrace.EdgeTraceSet(traceImage, spec, trace_par, auto=True,
-                                           debug=args.debug, show_stages=args.show,
-                                           qa_path=qa_path)
+        # Summarize the results for all detectors
+        summary = Table(rows=summary)
+        summary['trace_time'].format = '.1f'
+        print('')
+        summary.pprint_all()
+        ofile = Path(qa_path) / f'Edges_{setup}_{calib_id}_summary.txt'
+        ofile.parent.mkdir(parents=True, exist_ok=True)
+        summary.write(ofile, format='ascii.fixed_width_two_line', overwrite=True)
+        msgs.info(f'Wrote summary of the edge tracing to {ofile}')
 
-            msgs.info(f'Tracing for detector {det} finished in { time.perf_counter()-t:.1f} s.')
-            # Write the two calibration frames
-            edges.to_file()
-            edges.get_slits().to_file()
+        if recorder is None:
+            return 0
+
+        # Summarize the performance of each stage for each detector
+        perf_summary = perf.summarize(recorder.to_table(), by='det')
+        perf_summary['path'] = [f'{"  "*d}{p.split("/")[-1]}'
+                                for p, d in zip(perf_summary['path'], perf_summary['depth'])]
+        perf_summary.rename_column('path', 'step')
+        perf_summary.remove_columns(['depth', 'wall_frac'])
+        perf_summary['wall_time'].format = '.2f'
+        perf_summary['cpu_time'].format = '.2f'
+        perf_summary['peak_rss'].format = '.1f'
+        print('')
+        perf_summary.pprint_all()
+        recorder.write(Path(qa_path) / f'Edges_{setup}_{calib_id}_perf.json')
 
         return 0
 
@@ -5,7 +5,7 @@ This script enables the viewing of a raw FITS file
 .. include:: ../include/links.rst
 """
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 from pypeit.scripts import scriptbase
 from pypeit import utils
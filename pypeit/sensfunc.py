@@ -5,7 +5,7 @@ Implements the objects used to construct sensitivity functions.
 """
 import inspect
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 import scipy.interpolate
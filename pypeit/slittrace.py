@@ -6,8 +6,9 @@ Implements the objects used to hold slit edge data.
 
 """
 import inspect
+import zlib
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
@@ -73,7 +74,7 @@ class SlitTraceBitMask(BitMask):
 
 
 
-class SlitTraceSet(calibframe.CalibFrame):
+class SlitTraceSet(calibframe.CalibFrame, calibframe.ImageCache):
     """
     Defines a generic class for holding and manipulating image traces
     organized into left-right slit pairs.
@@ -87,6 +88,9 @@ class SlitTraceSet(calibframe.CalibFrame):
             Convenient spot to hold flexure corrected left
         right_flexure (`numpy.ndarray`_):
             Convenient spot to hold flexure corrected right
+        _img_cache (:obj:`dict`):
+            Cache of the slit ID images constructed by :func:`slit_img`; see
+            :attr:`img_cache_size`.
     """
     calib_type = 'Slits'
     """Name for type of calibration frame."""
@@ -102,11 +106,18 @@ class SlitTraceSet(calibframe.CalibFrame):
     Bit interpreter for slit masks.
     """
 
-    internals = calibframe.CalibFrame.internals + ['left_flexure', 'right_flexure']
+    internals = calibframe.CalibFrame.internals + ['left_flexure', 'right_flexure', '_img_cache']
     """
     Attributes kept separate from the datamodel.
     """
 
+    img_cache_size = 8
+    """
+    Maximum number of slit ID images kept in memory by :func:`slit_img`.  The
+    images are stored as 16-bit integers (if possible), such that each image
+    takes a quarter of the memory of the returned image.
+    """
+
     # Define the data model
     datamodel = {'PYP_SPEC': dict(otype=str, descr='PypeIt spectrograph name'),
                  'pypeline': dict(otype=str, descr='PypeIt pypeline name'),
@@ -602,7 +613,7 @@ class SlitTraceSet(calibframe.CalibFrame):
         return left.copy(), right.copy(), self.mask.copy()
 
     def slit_img(self, pad=None, slitidx=None, initial=False, flexure=None, exclude_flag=None,
-                 use_spatial=True):
+                 use_spatial=True, bbox=None):
         r"""
         Construct an image identifying each pixel with its associated
         slit.
@@ -626,6 +637,12 @@ class SlitTraceSet(calibframe.CalibFrame):
             - All slits are identified in the image, even if they are
               masked with :attr:`mask`.
 
+        Images constructed without specifying ``slitidx`` or ``bbox`` are
+        cached (see :attr:`img_cache_size`), such that repeated calls with the
+        same arguments do not reconstruct the image.  The cache is automatically
+        emptied when the slit edges or :attr:`mask` change.  A new array is
+        always returned, such that the caller is free to alter it.
+
         Args:
             pad (:obj:`float`, :obj:`int`, :obj:`tuple`, optional):
                 The number of pixels used to pad (extend) the edge of
@@ -654,6 +671,11 @@ class SlitTraceSet(calibframe.CalibFrame):
             flexure (:obj:`float`, optional):
                 If provided, offset each slit by this amount
                 Done in select_edges()
+            bbox (:obj:`tuple`, optional):
+                A 2-tuple of slices selecting the (spectral, spatial) region
+                of the image to construct (see :func:`slit_bboxes`).  If
+                provided, the returned image only covers this region and is
+                identical to the same region of the full image.
 
         Returns:
             `numpy.ndarray`_: The image with the slit index
@@ -663,15 +685,17 @@ class SlitTraceSet(calibframe.CalibFrame):
         if slitidx is not None and exclude_flag is not None:
             msgs.error("Cannot pass in both slitidx and exclude_flag!")
         # Check the input
-        if pad is None:
-            pad = self.pad
-        _pad = pad if isinstance(pad, tuple) else (pad,pad)
-        if len(_pad) != 2:
-            msgs.error('Padding for both left and right edges should be provided as a 2-tuple!')
-
-        # Pixel coordinates
-        spat = np.arange(self.nspat)
-        spec = np.arange(self.nspec)
+        _pad = self._parse_pad(pad)
+
+        # Images that include all unmasked slits are cached
+        cache_key = None
+        if slitidx is None and bbox is None:
+            flags = None if exclude_flag is None else tuple(np.atleast_1d(exclude_flag))
+            cache_key = (_pad, initial, flexure if flexure else None, flags, use_spatial)
+            images = self._get_img_cache()
+            if cache_key in images:
+                # Always return a new array
+                return images[cache_key].astype(int)
 
         left, right, _ = self.select_edges(initial=initial, flexure=flexure)
 
@@ -689,17 +713,137 @@ class SlitTraceSet(calibframe.CalibFrame):
         # padding doesn't lead to slit overlap.
 
         # Find the pixels in each slit, limited by the minimum and
-        # maximum spectral position.
-        slitid_img = np.full((self.nspec,self.nspat), -1, dtype=int)
-        for i in slitidx:
+        # maximum spectral position.  Only the pixels within the bounding box
+        # of each slit are considered.
+        spec_s, spec_e = (0, self.nspec) if bbox is None else bbox[0].indices(self.nspec)[:2]
+        spat_s, spat_e = (0, self.nspat) if bbox is None else bbox[1].indices(self.nspat)[:2]
+        slitid_img = np.full((max(spec_e-spec_s,0), max(spat_e-spat_s,0)), -1, dtype=int)
+        for i, _bbox in zip(slitidx, self._bboxes(left, right, _pad, slitidx)):
             slit_id = self.spat_id[i] if use_spatial else i
-            indx = (spat[None,:] > left[:,i,None] - _pad[0]) \
-                        & (spat[None,:] < right[:,i,None] + _pad[1]) \
+            # Limit the slit bounding box to the requested region
+            _bbox = tuple(slice(max(b.start, s), max(min(b.stop, e), s))
+                          for b, s, e in zip(_bbox, [spec_s, spat_s], [spec_e, spat_e]))
+            spec = np.arange(self.nspec)[_bbox[0]]
+            spat = np.arange(self.nspat)[_bbox[1]]
+            indx = (spat[None,:] > left[_bbox[0],i,None] - _pad[0]) \
+                        & (spat[None,:] < right[_bbox[0],i,None] + _pad[1]) \
                         & (spec > self.specmin[i])[:,None] & (spec < self.specmax[i])[:,None]
-            slitid_img[indx] = slit_id
+            slitid_img[_bbox[0].start-spec_s:_bbox[0].stop-spec_s,
+                       _bbox[1].start-spat_s:_bbox[1].stop-spat_s][indx] = slit_id
+
+        if cache_key is not None:
+            # Store the image using the smallest integer type that can hold
+            # the slit IDs
+            dtype = np.int16 if self.nslits == 0 \
+                        or np.amax(self.spat_id) < np.iinfo(np.int16).max else np.int32
+            self._cache_img(cache_key, slitid_img.astype(dtype))
         # Return
         return slitid_img
 
+    def _parse_pad(self, pad):
+        """
+        Parse the padding applied to the slit edges.
+
+        Args:
+            pad (:obj:`float`, :obj:`int`, :obj:`tuple`):
+                The number of pixels used to pad the slit edges; see
+                :func:`slit_img`.  If None, use :attr:`pad`.
+
+        Returns:
+            :obj:`tuple`: The padding for the left and right edges.
+        """
+        if pad is None:
+            pad = self.pad
+        _pad = pad if isinstance(pad, tuple) else (pad,pad)
+        if len(_pad) != 2:
+            msgs.error('Padding for both left and right edges should be provided as a 2-tuple!')
+        return _pad
+
+    def _bboxes(self, left, right, pad, slitidx):
+        """
+        Construct the bounding boxes of a set of slits.
+
+        Args:
+            left (`numpy.ndarray`_):
+                Left edges of all the slits.
+            right (`numpy.ndarray`_):
+                Right edges of all the slits.
+            pad (:obj:`tuple`):
+                Padding for the left and right edges.
+            slitidx (array-like):
+                Indices of the slits to include.
+
+        Returns:
+            :obj:`list`: List of 2-tuples of slices selecting the (spectral,
+            spatial) region of the image that encompasses each slit.
+        """
+        def _limit(value, default, maxval):
+            # NOTE: Limits can be infinite (e.g., specmin, specmax)
+            return default if np.isnan(value) else int(np.clip(value, 0, maxval))
+
+        bboxes = []
+        for i in slitidx:
+            # Limit to the pixels with specmin < spec < specmax
+            spec_s = _limit(np.floor(self.specmin[i]) + 1, 0, self.nspec)
+            spec_e = max(_limit(np.ceil(self.specmax[i]), self.nspec, self.nspec), spec_s)
+            # Limit to the pixels with left - pad < spat < right + pad
+            spat_s = _limit(np.floor(np.amin(left[:,i]) - pad[0]), 0, self.nspat)
+            spat_e = max(_limit(np.ceil(np.amax(right[:,i]) + pad[1]) + 1, self.nspat,
+                                self.nspat), spat_s)
+            bboxes += [np.s_[spec_s:spec_e, spat_s:spat_e]]
+        return bboxes
+
+    def slit_bboxes(self, pad=None, slitidx=None, initial=False, flexure=None):
+        """
+        Construct the bounding box of each slit.
+
+        The bounding box is the rectangular region of the image that includes
+        all pixels identified with a given slit by :func:`slit_img`.  Use these
+        to limit image operations to the region around each slit instead of
+        the full image; e.g., ``img[bboxes[i]]`` selects the pixels around the
+        slit with index ``i``.
+
+        Args:
+            pad (:obj:`float`, :obj:`int`, :obj:`tuple`, optional):
+                The number of pixels used to pad the edges of each slit.  See
+                :func:`slit_img`.
+            slitidx (:obj:`int`, array_like, optional):
+                List of indexes (zero-based) of the slits to include.  If None,
+                all slits are included, even if they are masked.
+            initial (:obj:`bool`, optional):
+                Use the initial edges regardless of the presence of the
+                tweaked edges.  See :func:`select_edges`.
+            flexure (:obj:`float`, optional):
+                If provided, offset each slit by this amount.
+
+        Returns:
+            :obj:`list`: List of 2-tuples of slices selecting the (spectral,
+            spatial) region of the image that encompasses each slit.
+        """
+        _slitidx = np.arange(self.nslits) if slitidx is None else np.atleast_1d(slitidx).ravel()
+        left, right, _ = self.select_edges(initial=initial, flexure=flexure)
+        return self._bboxes(left, right, self._parse_pad(pad), _slitidx)
+
+    def cache_checksum(self):
+        """
+        Compute the checksum of the attributes used to construct the slit
+        images.
+
+        The checksum changes whenever the slit edges, mask, spectral limits,
+        or IDs change (including changes made in place), such that it can be
+        used as a key for images constructed from the slits; see, e.g.,
+        :func:`~pypeit.wavecalib.WaveCalib.build_waveimg`.
+
+        Returns:
+            :obj:`tuple`: The image shape and a CRC-32 checksum of the slit
+            edges, slit mask, spectral limits, and slit IDs.
+        """
+        crc = 0
+        for arr in [self.left_init, self.right_init, self.left_tweak, self.right_tweak,
+                    self.mask, self.specmin, self.specmax, self.spat_id]:
+            crc = zlib.crc32(b'' if arr is None else np.ascontiguousarray(arr), crc)
+        return (self.nspec, self.nspat, crc)
+
     def spatial_coordinate_image(self, slitidx=None, full=False, slitid_img=None,
                                  pad=None, initial=False, flexure_shift=None):
         r"""
@@ -775,14 +919,20 @@ class SlitTraceSet(calibframe.CalibFrame):
 
         # Output image
         coo_img = np.zeros((self.nspec,self.nspat), dtype=float)
-        spat = np.arange(self.nspat)
-        for i in _slitidx:
-            coo = (spat[None,:] - left[:,i,None])/slitwidth[:,i,None]
-            if not full:
-                indx = slitid_img == self.spat_id[i]
-                coo_img[indx] = coo[indx]
-            else:
-                coo_img = coo
+        if full:
+            spat = np.arange(self.nspat)
+            for i in _slitidx:
+                coo_img = (spat[None,:] - left[:,i,None])/slitwidth[:,i,None]
+            return coo_img
+
+        # Only compute the coordinates for the pixels in the selected slits
+        slit_ids = self.spat_id[_slitidx]
+        spec, spat = np.where(np.isin(slitid_img, slit_ids))
+        if spec.size == 0:
+            return coo_img
+        srt = np.argsort(slit_ids)
+        i = _slitidx[srt[np.searchsorted(slit_ids, slitid_img[spec,spat], sorter=srt)]]
+        coo_img[spec,spat] = (spat - left[spec,i])/slitwidth[spec,i]
         return coo_img
 
     def spatial_coordinates(self, initial=False, flexure=None):
@@ -27,7 +27,7 @@ from pypeit.images import imagebitmask
 from pypeit.images.detector_container import DetectorContainer
 from pypeit.images.mosaic import Mosaic
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 
 class Spec2DObj(datamodel.DataContainer):
@@ -112,7 +112,7 @@ class Spec2DObj(datamodel.DataContainer):
                 ]
 
     @classmethod
-    def from_file(cls, ifile, detname, chk_version=True):
+    def from_file(cls, ifile, detname, chk_version=True, load_images=True):
         """
         Instantiate the object from an extension in the specified fits file.
 
@@ -127,16 +127,18 @@ class Spec2DObj(datamodel.DataContainer):
                 the data that is read.
             chk_version (:obj:`bool`, optional):
                 Passed to :func:`from_hdu`.
+            load_images (:obj:`bool`, optional):
+                Passed to :func:`from_hdu`.
         """
         with io.fits_open(ifile) as hdu:
             # Check detname is valid
             detnames = np.unique([h.name.split('-')[0] for h in hdu[1:]])
             if detname not in detnames:
                 msgs.error(f'Your --det={detname} is not available. \n   Choose from: {detnames}')
-            return cls.from_hdu(hdu, detname, chk_version=chk_version)
+            return cls.from_hdu(hdu, detname, chk_version=chk_version, load_images=load_images)
 
     @classmethod
-    def from_hdu(cls, hdu, detname, chk_version=True):
+    def from_hdu(cls, hdu, detname, chk_version=True, load_images=True):
         """
         Override base-class :func:`~pypeit.datamodel.DataContainer.from_hdu` to
         specify detector to read.
@@ -149,6 +151,12 @@ class Spec2DObj(datamodel.DataContainer):
                 the data that is read.
             chk_version (:obj:`bool`, optional):
                 If False, allow a mismatch in datamodel to proceed
+            load_images (:obj:`bool`, optional):
+                If False, the 2D images (including the bad-pixel mask) are not
+                read, and the relevant attributes are None.  This is useful
+                when only the slits, detector, and other metadata are needed,
+                and the images are read separately (e.g., as memory-mapped
+                cutouts; see :func:`image_hdu_name`).
 
         Returns:
             :class:`~pypeit.spec2dobj.Spec2DObj`: 2D spectra object.
@@ -162,10 +170,17 @@ class Spec2DObj(datamodel.DataContainer):
             msgs.error(f'{detname} not available in any extension of the input HDUList.')
 
         mask_ext = f'{detname}-BPMMASK'
-        has_mask = mask_ext in ext
-        if has_mask:
+        has_mask = mask_ext in ext and load_images
+        if mask_ext in ext:
             ext.remove(mask_ext)
 
+        if not load_images:
+            # Replace the 2D images with header-only HDUs.  The headers are
+            # kept because they hold the scalar elements of the datamodel.
+            hdu = fits.HDUList([fits.ImageHDU(header=h.header, name=h.name)
+                                if isinstance(h, fits.ImageHDU) and h.name in ext
+                                    and h.header.get('NAXIS', 0) == 2 else h for h in hdu])
+
         self = super().from_hdu(hdu, ext=ext, hdu_prefix=f'{detname}-', chk_version=chk_version)
         if has_mask:
             self.bpmmask = imagebitmask.ImageBitMaskArray.from_hdu(hdu[mask_ext], ext_pseudo='MASK',
@@ -187,6 +202,23 @@ class Spec2DObj(datamodel.DataContainer):
         self.head0 = hdu[0].header
         return self
 
+    @staticmethod
+    def image_hdu_name(detname, key):
+        """
+        Return the name of the extension with a 2D image of the datamodel.
+
+        Args:
+            detname (:obj:`str`):
+                The string identifier for the detector or mosaic.
+            key (:obj:`str`):
+                The datamodel element; e.g., ``'sciimg'``.  Use ``'bpmmask'``
+                for the bad-pixel mask.
+
+        Returns:
+            :obj:`str`: The extension name.
+        """
+        return f'{detname}-{key.upper()}'
+
     def __init__(self, sciimg, ivarraw, skymodel, bkg_redux_skymodel, objmodel, ivarmodel,
                  scaleimg, waveimg, bpmmask, detector, sci_spat_flexure, sci_spec_flexure,
                  vel_type, vel_corr, slits, wavesol, tilts, maskdef_designtab):
@@ -7,17 +7,17 @@ Module for the SpecObj classes
 """
 import copy
 import inspect
-from IPython import embed
+from pypeit.lazyimport import embed, lazy_import
 
 import numpy as np
 
 from astropy import units
 
-from linetools.spectra import xspectrum1d
+xspectrum1d = lazy_import('linetools.spectra.xspectrum1d')
 
 from pypeit import msgs
-from pypeit.core import flexure
-from pypeit.core import flux_calib
+flexure = lazy_import('pypeit.core.flexure')
+flux_calib = lazy_import('pypeit.core.flux_calib')
 from pypeit.core import parse
 from pypeit import utils
 from pypeit import datamodel
@@ -541,25 +541,41 @@ class SpecObj(datamodel.DataContainer):
             sens_factor = flux_calib.get_sensfunc_factor(
                 wave, wave_zp, zeropoint, exptime, tellmodel=tellmodel, extinct_correct=extinct_correct, airmass=airmass,
                 longitude=longitude, latitude=latitude, extinctfilepar=extinctfilepar, extrap_sens=extrap_sens)
-            flam = self[attr+'_COUNTS']*sens_factor
-            flam_sig = sens_factor/np.sqrt(self[attr+'_COUNTS_IVAR'])
-            flam_ivar = self[attr+'_COUNTS_IVAR']/sens_factor**2
-
-            # Mask bad pixels
-            msgs.info(" Masking bad pixels")
-            msk = np.zeros_like(sens_factor).astype(bool)
-            msk[sens_factor <= 0.] = True
-            msk[self[attr+'_COUNTS_IVAR'] <= 0.] = True
-            flam[msk] = 0.
-            flam_sig[msk] = 0.
-            flam_ivar[msk] = 0.
-            # TODO JFH We need to update the mask here. I think we need a mask for the counts and a mask for the flam,
-            # since they can in principle be different. We are masking bad sensfunc locations.
-
-            # Finish
-            self[attr+'_FLAM'] = flam
-            self[attr+'_FLAM_SIG'] = flam_sig
-            self[attr+'_FLAM_IVAR'] = flam_ivar
+            self.apply_sensfunc_factor(attr, sens_factor)
+
+    def apply_sensfunc_factor(self, attr, sens_factor):
+        """
+        Use the sensitivity function factor to construct the flux-calibrated
+        spectrum for one extraction.
+
+        FLAM, FLAM_SIG, and FLAM_IVAR are generated
+
+        Args:
+            attr (:obj:`str`):
+                The extraction mode; ``'BOX'`` or ``'OPT'``.
+            sens_factor (`numpy.ndarray`_):
+                The factor that converts the extracted counts to flux; see
+                :func:`~pypeit.core.flux_calib.get_sensfunc_factor`.
+        """
+        flam = self[attr+'_COUNTS']*sens_factor
+        flam_sig = sens_factor/np.sqrt(self[attr+'_COUNTS_IVAR'])
+        flam_ivar = self[attr+'_COUNTS_IVAR']/sens_factor**2
+
+        # Mask bad pixels
+        msgs.info(" Masking bad pixels")
+        msk = np.zeros_like(sens_factor).astype(bool)
+        msk[sens_factor <= 0.] = True
+        msk[self[attr+'_COUNTS_IVAR'] <= 0.] = True
+        flam[msk] = 0.
+        flam_sig[msk] = 0.
+        flam_ivar[msk] = 0.
+        # TODO JFH We need to update the mask here. I think we need a mask for the counts and a mask for the flam,
+        # since they can in principle be different. We are masking bad sensfunc locations.
+
+        # Finish
+        self[attr+'_FLAM'] = flam
+        self[attr+'_FLAM_SIG'] = flam_sig
+        self[attr+'_FLAM_IVAR'] = flam_ivar
 
 
     def apply_helio(self, vel_corr, refframe):
@@ -9,7 +9,7 @@ from pathlib import Path
 import re
 from typing import List
 
-from IPython import embed
+from pypeit.lazyimport import embed, lazy_import
 
 import numpy as np
 
@@ -20,6 +20,7 @@ from astropy.time import Time
 
 from pypeit import msgs
 from pypeit import specobj
+flux_calib = lazy_import('pypeit.core.flux_calib')
 from pypeit import io
 from pypeit.spectrographs.util import load_spectrograph
 from pypeit.core import parse
@@ -119,6 +120,9 @@ class SpecObjs:
             for hdu in hdul[1:]:
                 if 'DETECTOR' in hdu.name:
                     continue
+                # Skip spectra from other detectors without parsing them
+                if det is not None and hdu.header.get('DET', det) != det:
+                    continue
                 sobj = specobj.SpecObj.from_hdu(hdu, chk_version=chk_version)
                 # Restrict on det?
                 if det is not None and sobj.DET != det:
@@ -601,6 +605,11 @@ class SpecObjs:
         Flux calibrate the  object spectra (``sobjs``) using the provided
         sensitivity function (``sens``).
 
+        The spectra are grouped by the sensitivity function used to calibrate
+        them (i.e., by detector or order), and the sensitivity function is
+        evaluated for all the spectra in each group at once; see
+        :func:`~pypeit.core.flux_calib.get_sensfunc_factors`.
+
         Args:
             par (:class:`~pypeit.par.pypeitpar.FluxCalibratePar`):
                 Parset object containing parameters governing the flux calibration.
@@ -613,34 +622,21 @@ class SpecObjs:
         _extinct_correct = (True if sens.algorithm == 'UVIS' else False) \
             if par['extinct_correct'] is None else par['extinct_correct']
 
+        # Find the sensitivity function (column in sens.wave and
+        # sens.zeropoint) for each object
+        sens_indx = np.full(self.nobj, -1, dtype=int)
         # TODO enbaling this for now in case someone wants to treat the IFU as a slit spectrograph
         #  (not recommnneded but useful for quick reductions where you don't want to construct cubes and don't care about DAR).
         if spectrograph.pypeline in ['MultiSlit','SlicerIFU']:
-            for ii, sci_obj in enumerate(self.specobjs):
-                if sens.wave.shape[1] == 1:
-                    sci_obj.apply_flux_calib(sens.wave[:, 0], sens.zeropoint[:, 0],
-                                             self.header['EXPTIME'],
-                                             extinct_correct=_extinct_correct,
-                                             longitude=spectrograph.telescope['longitude'],
-                                             latitude=spectrograph.telescope['latitude'],
-                                             extinctfilepar=par['extinct_file'],
-                                             extrap_sens=par['extrap_sens'],
-                                             airmass=float(self.header['AIRMASS']))
-                elif sens.wave.shape[1] > 1 and sens.splice_multi_det:
-                    # This deals with the multi detector case where the sensitivity function is spliced. Note that
-                    # the final sensitivity function written to disk is  the spliced one. This functionality is only
-                    # used internal to sensfunc.py for fluxing the standard for the QA plot.
-                    sci_obj.apply_flux_calib(sens.wave[:, ii], sens.zeropoint[:, ii],
-                                             self.header['EXPTIME'],
-                                             extinct_correct=_extinct_correct,
-                                             longitude=spectrograph.telescope['longitude'],
-                                             latitude=spectrograph.telescope['latitude'],
-                                             extinctfilepar=par['extinct_file'],
-                                             extrap_sens=par['extrap_sens'],
-                                             airmass=float(self.header['AIRMASS']))
-                else:
-                    msgs.error('This should not happen, there is a problem with your sensitivity function.')
-
+            if sens.wave.shape[1] == 1:
+                sens_indx[:] = 0
+            elif sens.wave.shape[1] > 1 and sens.splice_multi_det:
+                # This deals with the multi detector case where the sensitivity function is spliced. Note that
+                # the final sensitivity function written to disk is  the spliced one. This functionality is only
+                # used internal to sensfunc.py for fluxing the standard for the QA plot.
+                sens_indx = np.arange(self.nobj)
+            elif self.nobj > 0:
+                msgs.error('This should not happen, there is a problem with your sensitivity function.')
 
         elif spectrograph.pypeline == 'Echelle':
             # Flux calibrate the orders that are mutually in the meta_table and in
@@ -648,18 +644,10 @@ class SpecObjs:
             # where not all orders are present in the data as in the sensfunc, etc.,
             # i.e. X-shooter with the K-band blocking filter.
             ech_orders = np.array(sens.sens['ECH_ORDERS']).flatten()
-            for sci_obj in self.specobjs:
-                # JFH Is there a more elegant pythonic way to do this without looping over both orders and sci_obj?
+            for ii, sci_obj in enumerate(self.specobjs):
                 indx = np.where(ech_orders == sci_obj.ECH_ORDER)[0]
                 if indx.size == 1:
-                    sci_obj.apply_flux_calib(sens.wave[:, indx[0]], sens.zeropoint[:, indx[0]],
-                                             self.header['EXPTIME'],
-                                             extinct_correct=_extinct_correct,
-                                             extrap_sens=par['extrap_sens'],
-                                             longitude=spectrograph.telescope['longitude'],
-                                             latitude=spectrograph.telescope['latitude'],
-                                             extinctfilepar=par['extinct_file'],
-                                             airmass=float(self.header['AIRMASS']))
+                    sens_indx[ii] = indx[0]
                 elif indx.size == 0:
                     msgs.info('Unable to flux calibrate order = {:} as it is not in your sensitivity function. '
                               'Something is probably wrong with your sensitivity function.'.format(sci_obj.ECH_ORDER))
@@ -669,6 +657,27 @@ class SpecObjs:
         else:
             msgs.error('Unrecognized pypeline: {0}'.format(spectrograph.pypeline))
 
+        # Load the extinction curve once for all objects
+        extinct = flux_calib.load_extinction_data(spectrograph.telescope['longitude'],
+                                                  spectrograph.telescope['latitude'],
+                                                  par['extinct_file']) \
+                    if _extinct_correct and np.any(sens_indx >= 0) else None
+
+        for isens in np.unique(sens_indx[sens_indx >= 0]):
+            # Collect all the extracted spectra calibrated by this sensitivity
+            # function
+            spectra = [(self.specobjs[ii], attr) for ii in np.where(sens_indx == isens)[0]
+                            for attr in ['BOX', 'OPT'] if self.specobjs[ii][attr+'_WAVE'] is not None]
+            msgs.info(f'Fluxing {len(spectra)} extracted spectra of '
+                      f'{np.sum(sens_indx == isens)} objects.')
+            sens_factors = flux_calib.get_sensfunc_factors(
+                                [sci_obj[attr+'_WAVE'] for sci_obj, attr in spectra],
+                                sens.wave[:,isens], sens.zeropoint[:,isens],
+                                self.header['EXPTIME'], extinct_correct=_extinct_correct,
+                                airmass=float(self.header['AIRMASS']), extinct=extinct,
+                                extrap_sens=par['extrap_sens'])
+            for (sci_obj, attr), sens_factor in zip(spectra, sens_factors):
+                sci_obj.apply_sensfunc_factor(attr, sens_factor)
 
     def copy(self):
         """
@@ -717,6 +726,9 @@ class SpecObjs:
 
         First attempts to grab data from the Summary table, then the list
         """
+        if 'specobjs' not in self.__dict__:
+            # The object is not yet initialized; e.g., while it is unpickled
+            raise AttributeError(f'{attr} is not an attribute of SpecObjs.')
         if len(self.specobjs) == 0:
             raise ValueError('SpecObjs is empty!')
         if attr in self.__dict__:  # any normal attributes are handled normally
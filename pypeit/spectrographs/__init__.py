@@ -1,53 +1,156 @@
-from pypeit.utils import all_subclasses
-from pypeit.spectrographs import spectrograph
-
-# The import of all the spectrograph modules here is what enables the dynamic
-# compiling of all the available spectrographs below
-from pypeit.spectrographs import aat_uhrf
-from pypeit.spectrographs import bok_bc
-from pypeit.spectrographs import gemini_flamingos
-from pypeit.spectrographs import gemini_gmos
-from pypeit.spectrographs import gemini_gnirs
-from pypeit.spectrographs import gtc_osiris
-from pypeit.spectrographs import keck_esi
-from pypeit.spectrographs import keck_deimos
-from pypeit.spectrographs import keck_hires
-from pypeit.spectrographs import keck_kcwi
-from pypeit.spectrographs import keck_lris
-from pypeit.spectrographs import keck_mosfire
-from pypeit.spectrographs import keck_nires
-from pypeit.spectrographs import keck_nirspec
-from pypeit.spectrographs import lbt_luci
-from pypeit.spectrographs import lbt_mods
-from pypeit.spectrographs import ldt_deveny
-from pypeit.spectrographs import magellan_fire
-from pypeit.spectrographs import magellan_mage
-from pypeit.spectrographs import mdm_modspec
-from pypeit.spectrographs import mdm_osmos
-from pypeit.spectrographs import mmt_binospec
-from pypeit.spectrographs import mmt_bluechannel
-from pypeit.spectrographs import mmt_mmirs
-from pypeit.spectrographs import not_alfosc
-from pypeit.spectrographs import p200_dbsp
-from pypeit.spectrographs import p200_tspec
-from pypeit.spectrographs import shane_kast
-from pypeit.spectrographs import soar_goodman
-from pypeit.spectrographs import tng_dolores
-from pypeit.spectrographs import vlt_fors
-from pypeit.spectrographs import vlt_xshooter
-from pypeit.spectrographs import vlt_sinfoni
-from pypeit.spectrographs import wht_isis
-from pypeit.spectrographs import ntt_efosc2
-from pypeit.spectrographs import jwst_nirspec
-from pypeit.spectrographs import jwst_nircam
-
-
-# Build the list of names for the available spectrographs
+"""
+Registry of the available spectrographs.
+
+The instrument modules are *not* imported when this package is imported.
+Instead, the :attr:`spectrograph_modules` registry maps the ``PYP_SPEC`` name
+of each supported spectrograph to the module that defines it, such that only
+the requested instrument module is imported by
+:func:`~pypeit.spectrographs.util.load_spectrograph`.  The instrument modules
+(and the :mod:`~pypeit.spectrographs.spectrograph` base-class module) are
+still available as attributes of this package; they are imported on first
+access.
+
+.. include common links, assuming primary doc root is up one directory
+.. include:: ../include/links.rst
+"""
+import importlib
+
+# NOTE: Any new spectrograph *must* be added to this registry.  The keys are the
+# spectrograph names (i.e., the ``name`` attribute of the spectrograph class)
+# and the values are the names of the modules in this package that define them.
+# pypeit/tests/test_spectrographs.py checks that this registry is consistent
+# with the classes defined by the modules.
+spectrograph_modules = {
+    'aat_uhrf': 'aat_uhrf',
+    'bok_bc': 'bok_bc',
+    'gemini_flamingos1': 'gemini_flamingos',
+    'gemini_flamingos2': 'gemini_flamingos',
+    'gemini_gmos_north_e2v': 'gemini_gmos',
+    'gemini_gmos_north_ham': 'gemini_gmos',
+    'gemini_gmos_north_ham_ns': 'gemini_gmos',
+    'gemini_gmos_south_ham': 'gemini_gmos',
+    'gemini_gnirs_echelle': 'gemini_gnirs',
+    'gemini_gnirs_ifu': 'gemini_gnirs',
+    'gtc_maat': 'gtc_osiris',
+    'gtc_osiris': 'gtc_osiris',
+    'gtc_osiris_plus': 'gtc_osiris',
+    'jwst_nircam': 'jwst_nircam',
+    'jwst_nirspec': 'jwst_nirspec',
+    'keck_deimos': 'keck_deimos',
+    'keck_esi': 'keck_esi',
+    'keck_hires': 'keck_hires',
+    'keck_kcrm': 'keck_kcwi',
+    'keck_kcwi': 'keck_kcwi',
+    'keck_lris_blue': 'keck_lris',
+    'keck_lris_blue_orig': 'keck_lris',
+    'keck_lris_red': 'keck_lris',
+    'keck_lris_red_mark4': 'keck_lris',
+    'keck_lris_red_orig': 'keck_lris',
+    'keck_mosfire': 'keck_mosfire',
+    'keck_nires': 'keck_nires',
+    'keck_nirspec_high': 'keck_nirspec',
+    'keck_nirspec_high_old': 'keck_nirspec',
+    'keck_nirspec_low': 'keck_nirspec',
+    'lbt_luci1': 'lbt_luci',
+    'lbt_luci2': 'lbt_luci',
+    'lbt_mods1b': 'lbt_mods',
+    'lbt_mods1r': 'lbt_mods',
+    'lbt_mods2b': 'lbt_mods',
+    'lbt_mods2r': 'lbt_mods',
+    'ldt_deveny': 'ldt_deveny',
+    'magellan_fire': 'magellan_fire',
+    'magellan_fire_long': 'magellan_fire',
+    'magellan_mage': 'magellan_mage',
+    'mdm_modspec': 'mdm_modspec',
+    'mdm_osmos_mdm4k': 'mdm_osmos',
+    'mdm_osmos_r4k': 'mdm_osmos',
+    'mmt_binospec': 'mmt_binospec',
+    'mmt_bluechannel': 'mmt_bluechannel',
+    'mmt_mmirs': 'mmt_mmirs',
+    'not_alfosc': 'not_alfosc',
+    'not_alfosc_vert': 'not_alfosc',
+    'ntt_efosc2': 'ntt_efosc2',
+    'p200_dbsp_blue': 'p200_dbsp',
+    'p200_dbsp_red': 'p200_dbsp',
+    'p200_tspec': 'p200_tspec',
+    'shane_kast_blue': 'shane_kast',
+    'shane_kast_red': 'shane_kast',
+    'shane_kast_red_ret': 'shane_kast',
+    'soar_goodman_blue': 'soar_goodman',
+    'soar_goodman_red': 'soar_goodman',
+    'tng_dolores': 'tng_dolores',
+    'vlt_fors2': 'vlt_fors',
+    'vlt_sinfoni': 'vlt_sinfoni',
+    'vlt_xshooter_nir': 'vlt_xshooter',
+    'vlt_xshooter_uvb': 'vlt_xshooter',
+    'vlt_xshooter_vis': 'vlt_xshooter',
+    'wht_isis_blue': 'wht_isis',
+    'wht_isis_red': 'wht_isis',
+}
+
+available_spectrographs = sorted(spectrograph_modules.keys())
+
+
+def __getattr__(name):
+    """
+    Import the spectrograph modules on first access.
+
+    This allows, e.g., ``spectrographs.shane_kast`` to be used after
+    ``from pypeit import spectrographs`` without requiring that all of the
+    instrument modules are imported with the package.
+    """
+    if name in ['spectrograph', 'opticalmodel', 'slitmask'] \
+            or name in spectrograph_modules.values():
+        return importlib.import_module(f'{__name__}.{name}')
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def spectrograph_class(name):
+    """
+    Return the class for a single spectrograph.
+
+    Only the module that defines the requested spectrograph is imported.
+
+    Args:
+        name (:obj:`str`):
+            The spectrograph name; must be one of the keys in
+            :attr:`spectrograph_modules`.
+
+    Returns:
+        :obj:`type`: The spectrograph class, or None if the name is not
+        registered.
+    """
+    if name not in spectrograph_modules:
+        return None
+    from pypeit.spectrographs.spectrograph import Spectrograph
+    module = importlib.import_module(f'{__name__}.{spectrograph_modules[name]}')
+    for obj in vars(module).values():
+        if isinstance(obj, type) and issubclass(obj, Spectrograph) \
+                and obj.__module__ == module.__name__ and obj.name == name:
+            return obj
+    return None
+
 
 def spectrograph_classes():
+    """
+    Return the classes for all of the available spectrographs.
+
+    This imports *all* of the instrument modules, which can be slow.  Use
+    :func:`spectrograph_class` to access an individual spectrograph.
+
+    Returns:
+        :obj:`dict`: Dictionary with the spectrograph classes, sorted by (and
+        keyed by) the spectrograph name.
+    """
     import numpy as np
+    from pypeit.utils import all_subclasses
+    from pypeit.spectrographs.spectrograph import Spectrograph
+    # Import all the spectrograph modules, which is what enables the dynamic
+    # compiling of all the available spectrographs below
+    for module in np.unique(list(spectrograph_modules.values())):
+        importlib.import_module(f'{__name__}.{module}')
     # Recursively collect all subclasses
-    spec_c = np.array(list(all_subclasses(spectrograph.Spectrograph)))
+    spec_c = np.array(list(all_subclasses(Spectrograph)))
     # Select spectrograph classes with a defined name; spectrographs without a
     # name are either undefined or a base class.
     spec_c = spec_c[[c.name is not None for c in spec_c]]
@@ -55,4 +158,3 @@ def spectrograph_classes():
     srt = np.argsort(np.array([c.name for c in spec_c]))
     return dict([ (c.name,c) for c in spec_c[srt]])
 
-available_spectrographs = list(spectrograph_classes().keys())
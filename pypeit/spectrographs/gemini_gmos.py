@@ -24,7 +24,7 @@ from pypeit.images.mosaic import Mosaic
 from pypeit.core.mosaic import build_image_mosaic_transform
 from pypeit.spectrographs.slitmask import SlitMask
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 class GeminiGMOSMosaicLookUp:
     """
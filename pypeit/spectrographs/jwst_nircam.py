@@ -15,7 +15,7 @@ from pypeit.par import pypeitpar
 from pypeit.spectrographs import spectrograph
 from pypeit.core import parse
 from pypeit.images import detector_container
-from IPython import embed
+from pypeit.lazyimport import embed
 
 class JWSTNIRCamSpectrograph(spectrograph.Spectrograph):
     """
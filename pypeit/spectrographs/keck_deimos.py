@@ -9,7 +9,7 @@ import pathlib
 import re
 import warnings
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
@@ -1353,7 +1353,7 @@ class KeckDEIMOSSpectrograph(spectrograph.Spectrograph):
 
         # Compute the detector image plane coordinates (in pixels)
         x_img, y_img = self.optical_model.mask_to_imaging_coordinates(_x, _y, self.amap, self.bmap,
-                                                                      nslits=self.slitmask.nslits,
+                                                                      nslits=_x.size,
                                                                       wave=wave, order=order)
         # Reshape if computing the corner positions
         if corners:
@@ -1413,14 +1413,15 @@ class KeckDEIMOSSpectrograph(spectrograph.Spectrograph):
         # Sort slits in mm from the slit-mask design
         sortindx = np.argsort(self.slitmask.center[:, 0])
 
-        # Left (bottom) and right (top) traces in pixels from optical model (image plane and detector)
+        # Left (bottom) and right (top) traces in pixels from optical model (image plane and detector).
+        # Both edges of all the slits are traced at once.
+        nslits = self.slitmask.nslits
+        edges = np.concatenate((self.slitmask.bottom, self.slitmask.top), axis=0)
+        edge_img, _, ccd, edge_pix, _ = self.mask_to_pixel_coordinates(x=edges[:, 0], y=edges[:, 1])
         # bottom
-        omodel_bcoo = self.mask_to_pixel_coordinates(x=self.slitmask.bottom[:, 0], y=self.slitmask.bottom[:, 1])
-        bedge_img, ccd_b, bedge_pix = omodel_bcoo[0], omodel_bcoo[2], omodel_bcoo[3]
-
+        bedge_img, ccd_b, bedge_pix = edge_img[:nslits], ccd[:nslits], edge_pix[:nslits]
         # top
-        omodel_tcoo = self.mask_to_pixel_coordinates(x=self.slitmask.top[:, 0], y=self.slitmask.top[:, 1])
-        tedge_img, ccd_t, tedge_pix = omodel_tcoo[0], omodel_tcoo[2], omodel_tcoo[3]
+        tedge_img, ccd_t, tedge_pix = edge_img[nslits:], ccd[nslits:], edge_pix[nslits:]
 
         # Per each slit we take the median value of the traces over the wavelength direction. These medians will be used
         # for the cross-correlation with the traces found in the images.
@@ -5,7 +5,7 @@ Module for Keck/HIRES
 """
 import os
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 
 
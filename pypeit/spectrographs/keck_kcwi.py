@@ -5,7 +5,7 @@ Implements KCWI-specific functions.
 .. include:: ../include/links.rst
 """
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
@@ -5,7 +5,7 @@ Module for LRIS specific methods.
 """
 import os
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
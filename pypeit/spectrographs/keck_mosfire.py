@@ -20,7 +20,7 @@ from pypeit.spectrographs.slitmask import SlitMask
 
 from pypeit.utils import index_of_x_eq_y
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 class KeckMOSFIRESpectrograph(spectrograph.Spectrograph):
     """
@@ -11,7 +11,7 @@ from pypeit.core import framematch
 from pypeit.spectrographs import spectrograph
 from pypeit.images import detector_container
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 
 class KeckNIRESSpectrograph(spectrograph.Spectrograph):
@@ -3,7 +3,7 @@ Module for NOT ALFOSC spectrograph
 
 .. include:: ../include/links.rst
 """
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
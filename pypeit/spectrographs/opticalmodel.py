@@ -5,6 +5,9 @@ Module to generate an optical model for a spectrograph.
 
 """
 import warnings
+import zlib
+from collections import OrderedDict
+
 from pypeit import msgs
 import numpy
 import scipy
@@ -245,7 +248,11 @@ class OpticalModel:
             Camera optical axis center (x,y) in mm
 
     Attributes:
+        map_cache_size (int):
+            Maximum number of interpolators of the pre- and post-grating
+            maps kept in memory; see :func:`map_interpolator`.
     """
+    map_cache_size = 4
     def __init__(self, pupil_distance, focal_r_surface, focal_r_curvature, mask_r_curvature,
                  mask_tilt_angle, mask_y_zeropoint, mask_z_zeropoint, collimator_d, collimator_r,
                  collimator_k, coll_tilt_err, coll_tilt_phi, grating, camera_tilt, camera_phi,
@@ -288,6 +295,45 @@ class OpticalModel:
         self.imaging_rotation = imaging_rotation    # Image coordinate system rotation in radians
         self.optical_axis = optical_axis            # Camera optical axis center (x,y) in mm
 
+        # Interpolators of the pre- and post-grating maps
+        self._map_interpolators = OrderedDict()
+
+    def map_interpolator(self, in_coo, values):
+        """
+        Return the interpolator of a pre- or post-grating map.
+
+        Constructing the interpolator (a Delaunay triangulation of the map
+        grid and the estimate of the gradients at each grid point) is
+        expensive, and the maps are the same for all the slits, detectors,
+        and exposures taken with the same grating slider.  The interpolators
+        are therefore kept in memory, identified by the content of the maps
+        so that they are reused even if the maps are read again.  At most
+        :attr:`map_cache_size` interpolators are kept.
+
+        Args:
+            in_coo (`numpy.ndarray`_):
+                Coordinates of the map grid points, with shape
+                :math:`(N_{\rm grid},2)`.
+            values (`numpy.ndarray`_):
+                Values of the map at each grid point, with shape
+                :math:`(N_{\rm grid},N_{\rm val})`.  All the values are
+                interpolated simultaneously.
+
+        Returns:
+            `scipy.interpolate.CloughTocher2DInterpolator`_: The
+            interpolator, which returns ``-1e10`` outside the map grid.
+        """
+        key = (in_coo.shape, values.shape, zlib.crc32(numpy.ascontiguousarray(in_coo)),
+               zlib.crc32(numpy.ascontiguousarray(values)))
+        if key in self._map_interpolators:
+            self._map_interpolators.move_to_end(key)
+            return self._map_interpolators[key]
+        interp = scipy.interpolate.CloughTocher2DInterpolator(in_coo, values, fill_value=-1e10)
+        self._map_interpolators[key] = interp
+        if len(self._map_interpolators) > self.map_cache_size:
+            self._map_interpolators.popitem(last=False)
+        return interp
+
     def _collimator_transform(self):
         """
         tilt and tilt_error are in radians
@@ -613,12 +659,13 @@ class OpticalModel:
                 Size of the spectral direction
 
         Returns:
-            `numpy.ndarray`_: Rays propagated from mask plane to grating.
+            `numpy.ndarray`_: Rays propagated from mask plane to grating,
+            with shape :math:`(N_{\rm slits} N_{\rm points}, 3)`.  The
+            rays for each slit are repeated ``npoints`` times.
 
         """
-
-        xmm = numpy.tile(x, (npoints, 1))
-        ymm = numpy.tile(y, (npoints, 1))
+        xmm = numpy.atleast_1d(x).ravel()
+        ymm = numpy.atleast_1d(y).ravel()
 
         sx = amap['tanx'].squeeze().T.shape[0]
         sy = amap['tanx'].squeeze().T.shape[1]
@@ -629,25 +676,23 @@ class OpticalModel:
 
         # preparing input and output coordinates for interpolation
         _x, _y = numpy.meshgrid(amap['xarr'].squeeze(), amap['yarr'].squeeze())
-        out_coo = numpy.column_stack((xmm.ravel(), ymm.ravel()))
+        out_coo = numpy.column_stack((xmm, ymm))
         in_coo = numpy.column_stack((_x.ravel(), _y.ravel()))
 
-        interp = scipy.interpolate.CloughTocher2DInterpolator(in_coo, amap['tanx'].ravel(),
-                                                              fill_value=-1e10)
-        tanxx = interp(out_coo).reshape(xindx.shape)
-
-        interp = scipy.interpolate.CloughTocher2DInterpolator(in_coo, amap['tany'].ravel(),
-                                                              fill_value=-1e10)
-        tanyy = interp(out_coo).reshape(xindx.shape)
+        # The rays do not depend on wavelength, so the map only needs to be
+        # interpolated once for each slit position
+        interp = self.map_interpolator(in_coo, numpy.column_stack((amap['tanx'].ravel(),
+                                                                   amap['tany'].ravel())))
+        tanxx, tanyy = interp(out_coo).T
 
         whbad = (xindx < 4) | (xindx > (sx - 4)) | (yindx < 4) | (yindx > (sy - 4))
         tanxx[whbad] = -1e10
         tanyy[whbad] = -1e10
 
-        rr_2 = (-1. / numpy.sqrt(1. + numpy.square(tanxx).T + numpy.square(tanyy).T)).ravel()
-        rr = numpy.array([rr_2 * tanxx.T.ravel(), rr_2 * tanyy.T.ravel(), rr_2]).T
+        rr_2 = -1. / numpy.sqrt(1. + numpy.square(tanxx) + numpy.square(tanyy))
+        rr = numpy.column_stack((rr_2 * tanxx, rr_2 * tanyy, rr_2))
 
-        return rr
+        return numpy.repeat(rr, npoints, axis=0)
 
     def post_grating_vectors_to_ics_coo(self, r, bmap, nslits, npoints):
         """
@@ -689,13 +734,10 @@ class OpticalModel:
         out_coo = numpy.column_stack((xindx.ravel(), yindx.ravel()))
         in_coo = numpy.column_stack((_x.ravel()[indx.ravel()], _y.ravel()[indx.ravel()]))
 
-        interp = scipy.interpolate.CloughTocher2DInterpolator(in_coo, bmap['gridx'].ravel()[indx.ravel()],
-                                                              fill_value=-1e10)
-        xics = interp(out_coo)
-
-        interp = scipy.interpolate.CloughTocher2DInterpolator(in_coo, bmap['gridy'].ravel()[indx.ravel()],
-                                                              fill_value=-1e10)
-        yics = interp(out_coo)
+        interp = self.map_interpolator(in_coo,
+                                       numpy.column_stack((bmap['gridx'].ravel()[indx.ravel()],
+                                                           bmap['gridy'].ravel()[indx.ravel()])))
+        xics, yics = interp(out_coo).T
 
         whbad = (xindx < 4) | (xindx > (sx - 4)) | (yindx < 4) | (yindx > (sy - 4))
         xics[whbad] = -1e10
@@ -906,8 +948,7 @@ class DetectorMap:
         coo = numpy.array([_x, _y]).T - self.npix[None,:]/2
 
         # Rotate and offset by the CCD center
-        coo = numpy.array([numpy.matmul(self.rot_matrix[d], c) for d,c in zip(_d,coo)]) \
-                    + self.ccd_center[_d,:]
+        coo = numpy.matmul(self.rot_matrix[_d], coo[...,None])[...,0] + self.ccd_center[_d,:]
 
         x_img = coo[0,0] if inp_shape is None else coo[:,0].reshape(inp_shape)
         y_img = coo[0,1] if inp_shape is None else coo[:,1].reshape(inp_shape)
@@ -958,8 +999,8 @@ class DetectorMap:
         coo = numpy.array([_x, _y]).T[None,:,:] - self.ccd_center[:,None,:]
 
         # Apply the rotation matrix and offset by the chip center
-        coo = numpy.array([[numpy.matmul(r.T, _c) for _c in c] \
-                                for r,c in zip(self.rot_matrix, coo)]) + self.npix[None,None,:]/2
+        coo = numpy.matmul(numpy.transpose(self.rot_matrix, (0,2,1))[:,None,:,:],
+                           coo[...,None])[...,0] + self.npix[None,None,:]/2
 
         # Determine the associated detector (1-indexed)
         indx = numpy.all((coo > 0) & (coo <= self.npix[None,None,:]), axis=2)
@@ -972,8 +1013,8 @@ class DetectorMap:
         d[numpy.sum(indx, axis=0) == 0] = -1
 
         # Pull out the coordinates for the correct detector
-        coo = numpy.array([coo[_d-1,i,:] if _d > 0 else numpy.full(coo.shape[2:],-1.) 
-                                for i,_d in enumerate(d)])
+        coo = numpy.where((d > 0)[:,None], coo[numpy.clip(d-1, 0, None), numpy.arange(d.size),:],
+                          -1.)
 
         # Return the coordinates
         return d if inp_shape is None else d.reshape(inp_shape), \
@@ -16,7 +16,7 @@ from pypeit.bitmask import BitMask
 from pypeit.utils import index_of_x_eq_y
 from pypeit import io
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 class SlitMaskBitMask(BitMask):
     """
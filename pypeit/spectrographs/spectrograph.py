@@ -29,7 +29,7 @@ provide instrument-specific:
 from abc import ABCMeta
 from pathlib import Path
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 from astropy.io import fits
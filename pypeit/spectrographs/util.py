@@ -1,7 +1,7 @@
 """
 Spectrograph utility methods.
 """
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import os.path
 
@@ -38,17 +38,17 @@ def load_spectrograph(spec):
     if spec is None or isinstance(spec, spectrographs.spectrograph.Spectrograph):
         return spec
 
-    classes = spectrographs.spectrograph_classes()
-    if spec in classes.keys():
-        return classes[spec]()
+    # Only import the module that defines the requested spectrograph
+    if spec in spectrographs.spectrograph_modules:
+        return spectrographs.spectrograph_class(spec)()
 
     # Check if we were given a file, and if so try to read the spectrograph type from its header
     if os.path.isfile(spec):
         header = fits.getheader(spec)
         if 'PYP_SPEC' in header:
             pyp_spec = header['PYP_SPEC']
-            if pyp_spec in classes.keys():
-                spectrograph = classes[pyp_spec]()
+            if pyp_spec in spectrographs.spectrograph_modules:
+                spectrograph = spectrographs.spectrograph_class(pyp_spec)()
                 if 'DISPNAME' in header:
                     spectrograph.dispname = header['DISPNAME']
                 return spectrograph
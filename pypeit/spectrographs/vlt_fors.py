@@ -14,7 +14,7 @@ from pypeit.images import detector_container
 from astropy.coordinates import SkyCoord
 from astropy import units
 from astropy.io import fits
-from IPython import embed
+from pypeit.lazyimport import embed
 
 class VLTFORSSpectrograph(spectrograph.Spectrograph):
     """
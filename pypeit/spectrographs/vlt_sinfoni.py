@@ -4,7 +4,7 @@ Module for VLT/SINFONI specific methods.
 .. include:: ../include/links.rst
 """
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 from astropy.io import fits
@@ -17,7 +17,7 @@ from pypeit.spectrographs import spectrograph
 from pypeit.images import detector_container
 from pypeit import dataPaths
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 class VLTXShooterSpectrograph(spectrograph.Spectrograph):
     """
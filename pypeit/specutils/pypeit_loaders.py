@@ -15,7 +15,7 @@ Version History
 
 """
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
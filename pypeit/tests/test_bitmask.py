@@ -1,6 +1,6 @@
 import pytest
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy
 
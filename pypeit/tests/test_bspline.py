@@ -3,7 +3,7 @@ import time
 import os
 import timeit
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
@@ -181,6 +181,80 @@ def test_cholesky_solve_versions():
     assert np.allclose(b, _b), 'Differences in cholesky_solve'
 
 
+@bspline_ext_required
+def test_reject_badness_versions():
+    # Import only when the test is performed
+    from pypeit.bspline.utilpy import reject_badness as reject_badness_py
+    from pypeit.bspline.utilc import reject_badness as reject_badness_c
+
+    rng = np.random.default_rng(42)
+    data = rng.normal(size=1000)
+    model = np.zeros_like(data)
+    invvar = rng.uniform(0, 4, size=data.size)
+    inmask = rng.random(data.size) > 0.1
+    outmask = rng.random(data.size) > 0.1
+
+    for _invvar in [invvar, 2.]:
+        badness, nbad = reject_badness_py(data, model, _invvar, lower=1., upper=2.,
+                                          inmask=inmask, outmask=outmask)
+        _badness, _nbad = reject_badness_c(data, model, _invvar, lower=1., upper=2.,
+                                           inmask=inmask, outmask=outmask)
+        assert np.array_equal(badness, _badness), 'Differences in reject_badness'
+        assert nbad == _nbad and nbad == np.sum(badness > 0), 'Bad number of rejected points'
+
+    # Non-finite values are handled by the python version
+    data[10] = np.nan
+    data[20] = np.inf
+    badness, nbad = reject_badness_py(data, model, invvar, upper=2.)
+    _badness, _nbad = reject_badness_c(data, model, invvar, upper=2.)
+    assert np.array_equal(badness, _badness, equal_nan=True), 'Differences in reject_badness'
+    assert nbad == _nbad, 'Bad number of rejected points'
+
+
+@bspline_ext_required
+def test_solve_batch_versions():
+    # Import only when the test is performed
+    from pypeit.bspline.utilpy import solve_batch as solve_batch_py
+    from pypeit.bspline.utilc import solve_batch as solve_batch_c
+    from pypeit.bspline.utilc import solution_arrays as solution_arrays_c
+    from pypeit.bspline.utilc import cholesky_band as cholesky_band_c
+    from pypeit.bspline.utilc import cholesky_solve as cholesky_solve_c
+
+    # Set up the systems for a set of fits with different sizes
+    rng = np.random.default_rng(42)
+    nn, ydata, action, ivar, upper, lower = [], [], [], [], [], []
+    for n in [100, 250, 50]:
+        x = np.sort(rng.uniform(size=n))
+        sset = bspline.bspline(x, nord=4, bkspace=0.05)
+        a, l, u = sset.action(x)
+        nn += [sset.mask[sset.nord:].sum()]
+        ydata += [np.sin(10*x) + rng.normal(scale=0.1, size=n)]
+        action += [a]
+        ivar += [np.full(n, 100.)]
+        upper += [u]
+        lower += [l]
+    # Mask all the data in the last fit to force a failure
+    ivar[-1][:] = 0.
+    mininf = [1e-10*np.sum(iv)/(n*sset.npoly) for iv, n in zip(ivar, nn)]
+
+    result = solve_batch_py(nn, sset.npoly, sset.nord, ydata, action, ivar, upper, lower, mininf)
+    _result = solve_batch_c(nn, sset.npoly, sset.nord, ydata, action, ivar, upper, lower, mininf)
+    for (err, a, sol), (_err, _a, _sol) in zip(result[:-1], _result[:-1]):
+        assert err == -1 and _err == -1, 'Fits should be successful'
+        assert np.allclose(a, _a) and np.allclose(sol, _sol), 'Differences in solve_batch'
+    assert np.array_equal(result[-1][0], _result[-1][0]), 'Differences in failed fit'
+    assert result[-1][1] is None and _result[-1][1] is None, 'Failed fit should return None'
+
+    # Same as solving each fit separately
+    for i in range(len(nn)-1):
+        alpha, beta = solution_arrays_c(nn[i], sset.npoly, sset.nord, ydata[i], action[i], ivar[i],
+                                        upper[i], lower[i])
+        err, a = cholesky_band_c(alpha, mininf=mininf[i])
+        sol = cholesky_solve_c(a, beta)[1]
+        assert np.array_equal(a, _result[i][1]) and np.array_equal(sol, _result[i][2]), \
+                'Batch differs from individual solution'
+
+
 # NOTE: Used to be in test_pydl.py.
 # TODO: Where is the to/from dict functionality used?
 def test_bsplinetodict():
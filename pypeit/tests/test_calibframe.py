@@ -3,14 +3,14 @@ Module to run tests on calibration frames
 """
 from pathlib import Path
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
 import pytest
 
 from pypeit.pypmsgs import PypeItError
-from pypeit.calibframe import CalibFrame
+from pypeit.calibframe import CalibFrame, ImageCache
 from pypeit import io
 from pypeit.tests.tstutils import data_output_path
 
@@ -32,6 +32,16 @@ class MinimalCalibFrame(CalibFrame):
     calib_type = 'Minimal'
 
 
+class CachedCalibFrame(CalibFrame, ImageCache):
+    version = '1.0.0'
+    calib_type = 'Cached'
+    datamodel = {**CalibFrame.datamodel, 'data': dict(otype=np.ndarray, atype=np.floating)}
+    internals = CalibFrame.internals + ['_img_cache']
+
+    def cache_checksum(self):
+        return self.data.tobytes()
+
+
 def test_implementation_faults():
     # CalibFrame cannot be instantiated by itself because a version of the
     # datamodel does not exist.
@@ -61,6 +71,22 @@ def test_init():
     assert ofile == 'Minimal_A_1+2_DET01.fits', 'Wrong file name'
 
 
+def test_image_cache():
+    calib = CachedCalibFrame(d={'data': np.arange(3.)})
+    images = calib._get_img_cache()
+    assert len(images) == 0, 'Cache should start empty'
+    for i in range(3):
+        calib._cache_img(i, np.full(2, i))
+    assert list(calib._get_img_cache().keys()) == [1, 2], 'Oldest image should be removed'
+    # Changing the data (in place) empties the cache
+    calib.data[0] = 10.
+    assert len(calib._get_img_cache()) == 0, 'Cache should be emptied'
+    # The checksum must be defined by the derived class
+    with pytest.raises(NotImplementedError):
+        type('NoChecksum', (MinimalCalibFrame, ImageCache),
+             {'internals': CalibFrame.internals + ['_img_cache']})()._get_img_cache()
+
+
 def test_io():
     calib = MinimalCalibFrame()
     odir = Path(data_output_path('')).absolute()
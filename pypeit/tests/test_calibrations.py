@@ -3,7 +3,7 @@ import yaml
 import pytest
 import shutil
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
@@ -122,10 +122,70 @@ def test_bpm(multi_caliBrate):
     assert bpm.shape == (2048,350)
     assert np.sum(bpm) == 0.
 
+
+def test_trace_slits(multi_caliBrate):
+    caldir = multi_caliBrate.calib_dir
+    frame = multi_caliBrate.frame
+    traced = calibrations.trace_slits(multi_caliBrate.fitstbl, multi_caliBrate.par,
+                                      multi_caliBrate.spectrograph, caldir, frame, [1], n_proc=2)
+    assert list(traced.keys()) == [1], 'Bad detectors'
+    slits, calib_files = traced[1]
+    assert slits.nslits == 1, 'Should find one slit'
+    assert len(list(caldir.glob('Slits_A_*_DET01.fits.gz'))) == 1, 'Slits file not written'
+    assert [f.name.split('_')[0] for f in calib_files] == ['Bias'], \
+            'Should return the processed bias'
+
+    # The slits are not traced again when reusing the existing files
+    assert calibrations.trace_slits(multi_caliBrate.fitstbl, multi_caliBrate.par,
+                                    multi_caliBrate.spectrograph, caldir, frame, [1], n_proc=2,
+                                    reuse_calibs=True) == {}, 'Slits should not be traced'
+
+    # ... the files written while tracing them are read instead of reprocessed
+    assert not multi_caliBrate.reuse_calibs, 'Should not reuse calibrations by default'
+    multi_caliBrate.reuse_files = set(calib_files)
+    mtime = calib_files[0].stat().st_mtime_ns
+    bias = multi_caliBrate.get_bias()
+    assert calib_files[0].stat().st_mtime_ns == mtime, 'Bias should not be reprocessed'
+    assert bias.calib_key == slits.calib_key, 'Bad bias'
+
+    # ... and the calibrations use the traced slits directly
+    shutil.rmtree(caldir)
+    multi_caliBrate.msbpm = multi_caliBrate.get_bpm()
+    multi_caliBrate.slits = slits
+    assert multi_caliBrate.get_slits() is slits, 'Should use the traced slits'
+    assert not caldir.exists(), 'Slits should not be traced'
+
+def test_calib_cache(multi_caliBrate):
+    bias = multi_caliBrate.get_bias()
+    bias_file = Path(bias.get_path())
+    other_file = bias_file.with_name('Bias_Z_0_DET01.fits.gz')
+    shutil.copy(bias_file, other_file)
+    try:
+        calibrations.Calibrations.enable_calib_cache()
+        calibrations.Calibrations.calib_cache_size = 1
+        _bias = multi_caliBrate._read_calib(buildimage.BiasImage, bias_file)
+        assert np.array_equal(_bias.image, bias.image), 'Bad read'
+        cached = calibrations.Calibrations.calib_cache[str(bias_file)][1]
+        multi_caliBrate._read_calib(buildimage.BiasImage, bias_file)
+        assert calibrations.Calibrations.calib_cache[str(bias_file)][1] is cached, \
+                'Should use the cached frame'
+        # Stale entries are replaced
+        bias.image += 1
+        bias.to_file()
+        _bias = multi_caliBrate._read_calib(buildimage.BiasImage, bias_file)
+        assert np.array_equal(_bias.image, bias.image), 'Should read the modified file'
+        # The least recently used entries are removed
+        multi_caliBrate._read_calib(buildimage.BiasImage, other_file)
+        assert list(calibrations.Calibrations.calib_cache.keys()) == [str(other_file)], \
+                'Cache should be bounded'
+    finally:
+        calibrations.Calibrations.calib_cache_size = 32
+        calibrations.Calibrations.enable_calib_cache(False)
+        other_file.unlink()
+
 # TODO: Add tests for:
 #   - get_dark
 #   - get_flats
-#   - get_slits
 #   - get_wv_calib
 #   - get_tilts
 
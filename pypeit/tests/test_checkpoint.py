@@ -0,0 +1,116 @@
+"""
+Module to test the checkpoints used to resume a reduction.
+"""
+from pypeit.lazyimport import embed
+
+import numpy as np
+
+from astropy.table import Table
+
+from pypeit import dataPaths
+from pypeit import checkpoint
+from pypeit import pypeitsetup
+from pypeit.pypeit import PypeIt
+
+
+def test_key(tmp_path):
+    ifile = tmp_path / 'test.fits'
+    ifile.write_bytes(b'0'*10)
+    key = checkpoint.checkpoint_key('objfind', checkpoint.files_key([ifile]), [1, 2])
+    assert key == checkpoint.checkpoint_key('objfind', checkpoint.files_key([ifile]), [1, 2]), \
+            'Key should be deterministic'
+    assert key != checkpoint.checkpoint_key('objfind', checkpoint.files_key([ifile]), [1, 3]), \
+            'Key should depend on all the items'
+    ifile.write_bytes(b'0'*11)
+    assert key != checkpoint.checkpoint_key('objfind', checkpoint.files_key([ifile]), [1, 2]), \
+            'Key should change when the file changes'
+    assert checkpoint.files_key([tmp_path / 'missing.fits']) \
+                == ((str(tmp_path / 'missing.fits'),),), 'Bad key for a missing file'
+
+
+def test_data_key():
+    tbl = Table({'TRACE_SPAT': np.arange(10.)})
+    key = checkpoint.data_key(tbl)
+    assert key == checkpoint.data_key(Table({'TRACE_SPAT': np.arange(10.)})), \
+            'Key should only depend on the data'
+    tbl['TRACE_SPAT'][0] = 0.1
+    assert key != checkpoint.data_key(tbl), 'Key should change when the data change'
+    assert key != checkpoint.data_key(Table({'ECH_ORDER': np.arange(10.)})), \
+            'Key should depend on the column names'
+    assert checkpoint.data_key(np.arange(10.)) != checkpoint.data_key(np.arange(10)), \
+            'Key should depend on the data type'
+    assert checkpoint.data_key(None) is None, 'Bad key for no data'
+
+
+def test_write_read(tmp_path):
+    path = tmp_path / 'Checkpoints'
+    arr = np.arange(10.)
+    ofile = checkpoint.checkpoint_file(path, 'objfind', 'b1_DET01', checkpoint.checkpoint_key(1))
+    assert checkpoint.read_checkpoint(ofile) is None, 'Checkpoint should not exist'
+    checkpoint.write_checkpoint(ofile, arr=arr, view=arr[2:])
+    products = checkpoint.read_checkpoint(ofile)
+    assert np.array_equal(products['arr'], arr), 'Bad read'
+    assert np.array_equal(products['view'], arr[2:]), 'Bad read'
+
+    # Writing a checkpoint with a different key replaces the outdated one
+    _ofile = checkpoint.checkpoint_file(path, 'objfind', 'b1_DET01', checkpoint.checkpoint_key(2))
+    checkpoint.write_checkpoint(_ofile, arr=arr)
+    assert not ofile.exists(), 'Outdated checkpoint not removed'
+    # ... but not those for other detectors or stages
+    det2_file = checkpoint.checkpoint_file(path, 'objfind', 'b1_DET02', checkpoint.checkpoint_key(2))
+    checkpoint.write_checkpoint(det2_file, arr=arr)
+    ext_file = checkpoint.checkpoint_file(path, 'extract', 'b1_DET01', checkpoint.checkpoint_key(2))
+    checkpoint.write_checkpoint(ext_file, arr=arr)
+    assert _ofile.exists() and det2_file.exists() and ext_file.exists(), 'Checkpoint removed'
+
+    # Corrupt checkpoints are ignored
+    ext_file.write_bytes(b'corrupt')
+    assert checkpoint.read_checkpoint(ext_file) is None, 'Corrupt checkpoint should be ignored'
+
+    # Remove all the checkpoints for the exposure
+    checkpoint.write_checkpoint(checkpoint.checkpoint_file(path, 'objfind', 'b2_DET01',
+                                                           checkpoint.checkpoint_key(1)), arr=arr)
+    checkpoint.remove_checkpoints(path, 'b1')
+    assert len(list(path.glob('*.pkl'))) == 1, 'Checkpoints not removed'
+    checkpoint.remove_checkpoints(path, 'b2')
+    assert not path.exists(), 'Empty checkpoint directory not removed'
+
+
+def test_resume(tmp_path, monkeypatch):
+    # Reduce a standard and a science frame that uses the standard trace
+    files = [dataPaths.tests.get_file_path(f, to_pkg='symlink')
+                for f in ['b1.fits.gz', 'b11.fits.gz', 'b21.fits.gz', 'b24.fits.gz',
+                          'b27.fits.gz']]
+    setup = pypeitsetup.PypeItSetup(files, spectrograph_name='shane_kast_blue')
+    setup.run(setup_only=False)
+    pypeit_file = setup.fitstbl.write_pypeit(tmp_path, cfg_lines=setup.user_cfg)[0]
+    redux_path = str(tmp_path / 'shane_kast_blue_A')
+
+    # Keep the checkpoints after the outputs are written, as if the reduction
+    # was interrupted just afterwards, and record the reduced exposures
+    monkeypatch.setattr(checkpoint, 'remove_checkpoints', lambda *args: None)
+    reduced = []
+    objfind_one, extract_one = PypeIt.objfind_one, PypeIt.extract_one
+    def _objfind_one(self, frames, det, **kwargs):
+        reduced.append(('objfind', self.fitstbl['filename'][frames[0]]))
+        return objfind_one(self, frames, det, **kwargs)
+    def _extract_one(self, frames, det, *args):
+        reduced.append(('extract', self.fitstbl['filename'][frames[0]]))
+        return extract_one(self, frames, det, *args)
+    monkeypatch.setattr(PypeIt, 'objfind_one', _objfind_one)
+    monkeypatch.setattr(PypeIt, 'extract_one', _extract_one)
+
+    PypeIt(pypeit_file, redux_path=redux_path, reuse_calibs=True, overwrite=True,
+           checkpoint=True).reduce_all()
+    assert reduced == [('objfind', 'b24.fits.gz'), ('extract', 'b24.fits.gz'),
+                       ('objfind', 'b27.fits.gz'), ('extract', 'b27.fits.gz')], \
+            'Both frames should be reduced'
+    assert len(list((tmp_path / 'shane_kast_blue_A' / 'Checkpoints').glob('*.pkl'))) == 4, \
+            'Should write the objfind and extract checkpoints of both frames'
+
+    # Rewriting the spec1d file of the standard does not change the key of the
+    # science frame, such that both frames are restored
+    reduced.clear()
+    PypeIt(pypeit_file, redux_path=redux_path, reuse_calibs=True, overwrite=True,
+           checkpoint=True).reduce_all()
+    assert len(reduced) == 0, 'Both frames should be restored from their checkpoints'
@@ -0,0 +1,171 @@
+"""
+Module to run tests on the 2D coadding routines
+"""
+import numpy as np
+
+from astropy.io import fits
+
+from pypeit import coadd2d
+from pypeit import slittrace
+from pypeit import spec2dobj
+from pypeit import utils
+from pypeit.core import coadd
+from pypeit.images import imagebitmask
+from pypeit.spectrographs.util import load_spectrograph
+from pypeit.tests import tstutils
+
+
+def mock_stack(nimgs=4, nspec=150, nspat=40, seed=2):
+    rng = np.random.default_rng(seed)
+    waveimg_stack = [np.outer(np.linspace(4000., 5000., nspec), np.ones(nspat))
+                     + rng.uniform(-1, 1, size=(nspec, nspat)) for _ in range(nimgs)]
+    spatimg_stack = [np.outer(np.ones(nspec), np.arange(nspat)) - nspat/2 + rng.uniform(-3, 3)
+                     for _ in range(nimgs)]
+    thismask_stack = [np.absolute(spatimg) < nspat/2 - 5 for spatimg in spatimg_stack]
+    inmask_stack = [rng.uniform(size=(nspec, nspat)) > 0.05 for _ in range(nimgs)]
+    sci_list = [[rng.normal(size=(nspec, nspat)) for _ in range(nimgs)] for _ in range(2)]
+    var_list = [[rng.uniform(size=(nspec, nspat)) for _ in range(nimgs)]]
+    spec_bins = np.linspace(4001.5, 4998.5, nspec+1)
+    spat_bins = np.arange(-nspat/2 + 5, nspat/2 - 4.5)
+    # Place samples exactly on the upper edges and one at an undefined position
+    waveimg_stack[0][5,20] = spec_bins[-1]
+    spatimg_stack[0][10,20] = spat_bins[-1]
+    waveimg_stack[1][3,20] = np.nan
+    return spec_bins, spat_bins, waveimg_stack, spatimg_stack, thismask_stack, inmask_stack, \
+                sci_list, var_list
+
+
+def test_rebin2d():
+    spec_bins, spat_bins, waveimg_stack, spatimg_stack, thismask_stack, inmask_stack, \
+            sci_list, var_list = mock_stack()
+    sci_list_out, var_list_out, norm_stack, nsmp_stack \
+            = coadd.rebin2d(spec_bins, spat_bins, waveimg_stack, spatimg_stack, thismask_stack,
+                            inmask_stack, sci_list, var_list)
+
+    # Compare against a brute-force rebinning of each image
+    bins = [spec_bins, spat_bins]
+    for i, (waveimg, spatimg, thismask, inmask) \
+            in enumerate(zip(waveimg_stack, spatimg_stack, thismask_stack, inmask_stack)):
+        nsmp = np.histogram2d(waveimg[thismask], spatimg[thismask], bins=bins)[0]
+        assert np.array_equal(nsmp_stack[i], nsmp), 'Bad sampling image'
+        gpm = thismask & inmask
+        norm = np.histogram2d(waveimg[gpm], spatimg[gpm], bins=bins)[0]
+        assert np.array_equal(norm_stack[i], norm), 'Bad normalization image'
+        denom = norm + (norm == 0)
+        for sci, sci_out in zip(sci_list, sci_list_out):
+            weigh = np.histogram2d(waveimg[gpm], spatimg[gpm], bins=bins, weights=sci[i][gpm])[0]
+            assert np.array_equal(sci_out[i], (norm > 0)*weigh/denom), 'Bad rebinned image'
+        weigh = np.histogram2d(waveimg[gpm], spatimg[gpm], bins=bins,
+                               weights=var_list[0][i][gpm])[0]
+        assert np.array_equal(var_list_out[0][i], (norm > 0)*weigh/denom**2), \
+                'Bad rebinned variance'
+
+
+def mock_spec2d(tmp_path, nexp=2, nspec=100, nspat=80, seed=3):
+    rng = np.random.default_rng(seed)
+    spec = np.arange(nspec)
+    left = np.column_stack([5.2 + 0.02*spec, 30.7 + 0.01*spec, 55.1 - 0.03*spec])
+    files, objs = [], []
+    for i in range(nexp):
+        slits = slittrace.SlitTraceSet(left + i, left + i + 18.4, 'MultiSlit', nspat=nspat,
+                                       PYP_SPEC='shane_kast_blue')
+        img = rng.normal(size=(nspec, nspat)).astype(np.float32)
+        bpmmask = imagebitmask.ImageBitMaskArray(img.shape)
+        bpmmask.mask[...] = rng.integers(0, 2, size=img.shape)
+        objs += [spec2dobj.Spec2DObj(sciimg=img, ivarraw=None, skymodel=0.5*img,
+                                     bkg_redux_skymodel=None, objmodel=None,
+                                     ivarmodel=np.ones_like(img), scaleimg=None,
+                                     waveimg=np.outer(4000. + spec, np.ones(nspat)),
+                                     bpmmask=bpmmask, detector=tstutils.get_kastb_detector(),
+                                     sci_spat_flexure=0.5*i, sci_spec_flexure=None,
+                                     vel_type=None, vel_corr=None, slits=slits, wavesol=None,
+                                     tilts=None, maskdef_designtab=None)]
+        files += [str(tmp_path / f'spec2d_{i}.fits')]
+        objs[-1].to_file(files[-1], primary_hdr=fits.Header({'EXPTIME': 600.}))
+    return files, objs
+
+
+def test_spec2d_image_stack(tmp_path):
+    files, objs = mock_spec2d(tmp_path)
+    slits_list = [obj.slits for obj in objs]
+    flexure = [obj.sci_spat_flexure for obj in objs]
+    exp_scale = [None, 2.]
+    for spec2d in [objs, files]:
+        images = coadd2d.Spec2DImageStack(spec2d, 'DET01', slits_list, flexure,
+                                          exp_scale=exp_scale, max_resident=1)
+        spat_id = slits_list[0].spat_id[1]
+        cutouts = images.slit_cutouts(spat_id, 5)
+        for i, obj in enumerate(objs):
+            # The cutouts match the same selection in the full images
+            thismask = np.abs(obj.slits.slit_img(flexure=flexure[i]) - spat_id) <= 5
+            spat = slice(cutouts['spat_start'][i],
+                         cutouts['spat_start'][i] + cutouts['thismask_stack'][i].shape[1])
+            assert np.array_equal(cutouts['thismask_stack'][i], thismask[:,spat]), \
+                    'Bad slit selection'
+            assert np.sum(cutouts['thismask_stack'][i]) == np.sum(thismask), \
+                    'Cutout does not include the full slit'
+            scale = 1. if exp_scale[i] is None else exp_scale[i]
+            assert np.array_equal(cutouts['sciimg_stack'][i], obj.sciimg[:,spat]*scale), \
+                    'Bad science image'
+            assert np.array_equal(cutouts['sciivar_stack'][i], obj.ivarmodel[:,spat]/scale**2), \
+                    'Bad inverse variance'
+            assert np.array_equal(cutouts['mask_stack'][i], obj.bpmmask.mask[:,spat]), 'Bad mask'
+            assert np.array_equal(images.image(i, 'waveimg'), obj.waveimg), 'Bad full image'
+        # At most one file is open
+        assert len(images._hdul) == (0 if spec2d is objs else 1), 'Too many open files'
+        images.close()
+        assert len(images._hdul) == 0, 'Files should be closed'
+        # Files are reopened as needed, and closed on exiting the context
+        with images:
+            assert np.array_equal(images.image(0, 'waveimg'), objs[0].waveimg), 'Bad image'
+        assert len(images._hdul) == 0, 'Files should be closed'
+        # Slits that are not found in all exposures are flagged
+        assert images.slit_cutouts(1000, 5) is None, 'Slit should not be found'
+
+
+def test_coadd_slit_parallel():
+    nspec, nspat = 150, 40
+    spec_bins, spat_bins, waveimg_stack, spatimg_stack, thismask_stack, inmask_stack, \
+            sci_list, var_list = mock_stack(nimgs=2, nspec=nspec, nspat=nspat)
+    wave_grid = np.linspace(4000., 5000., nspec)
+    items = []
+    for i in range(3):
+        items += [dict(ref_trace_stack=[np.full(nspec, nspat/2 + 0.3*i)]*2,
+                       sciimg_stack=[s + i for s in sci_list[0]],
+                       sciivar_stack=[1/v for v in var_list[0]], skymodel_stack=sci_list[1],
+                       inmask_stack=inmask_stack, thismask_stack=thismask_stack,
+                       waveimg_stack=waveimg_stack, maskdef_dict=None, weights=[1., 1.],
+                       spat_start=None)]
+    shared = dict(wave_grid=wave_grid, spat_samp_fact=1.0, interp_dspat=True)
+    serial = [coadd2d._coadd_slit(item, **shared) for item in items]
+    parallel = list(utils.parallel_map(coadd2d._coadd_slit, iter(items), n_proc=2,
+                                       shared=shared))
+    assert len(parallel) == len(serial), 'Slits were lost'
+    for s, p in zip(serial, parallel):
+        assert s.keys() == p.keys(), 'Different coadd keys'
+        for key in s.keys():
+            if isinstance(s[key], np.ndarray):
+                assert np.array_equal(s[key], p[key], equal_nan=True), f'Different {key}'
+
+
+def test_coadd_parallel(tmp_path):
+    files, _ = mock_spec2d(tmp_path, nexp=3)
+    spectrograph = load_spectrograph('shane_kast_blue')
+    par = spectrograph.default_pypeit_par()
+    coadd_list = {}
+    for n_proc in [1, 2]:
+        par['coadd2d']['n_proc'] = n_proc
+        coadd = coadd2d.CoAdd2D.get_instance(files, spectrograph, par, det=1,
+                                             offsets=[0, 1, 2], weights='uniform')
+        coadd_list[n_proc] = coadd.coadd()
+        assert len(coadd.stack_dict['images']._hdul) == 0, 'Files should be closed'
+
+    assert len(coadd_list[1]) == 3, 'Slits were lost'
+    assert len(coadd_list[2]) == len(coadd_list[1]), 'Slits were lost'
+    for s, p in zip(coadd_list[1], coadd_list[2]):
+        assert s.keys() == p.keys(), 'Different coadd keys'
+        for key in s.keys():
+            if isinstance(s[key], np.ndarray):
+                assert np.array_equal(s[key], p[key], equal_nan=True), f'Different {key}'
+            else:
+                assert s[key] == p[key], f'Different {key}'
@@ -6,7 +6,7 @@ import io
 import os
 import inspect
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import pytest
 
@@ -1,7 +1,7 @@
 """
 Module to run tests on arcoadd
 """
-from IPython import embed
+from pypeit.lazyimport import embed
 
 from pypeit.display import plugins_available
 
@@ -0,0 +1,57 @@
+"""
+Module to run tests on EdgeTraceSet
+"""
+from pypeit.lazyimport import embed
+
+import numpy as np
+
+from pypeit import edgetrace
+from pypeit.core import trace
+from pypeit.images.buildimage import TraceImage
+from pypeit.spectrographs.util import load_spectrograph
+
+
+def synthetic_traceimg(spectrograph, nspec=400, nspat=200, nslits=3):
+    spec = np.arange(nspec)[:,None]
+    spat = np.arange(nspat)[None,:]
+    width = nspat / nslits
+    img = np.full((nspec, nspat), 5.)
+    for i in range(nslits):
+        left = 8 + i*width + 0.01*spec
+        right = left + width - 16
+        img += 1000 / (1 + np.exp(left - spat)) / (1 + np.exp(spat - right))
+    img += np.random.default_rng(5).normal(size=img.shape) * np.sqrt(img)
+    traceimg = TraceImage(img, ivar=1/img, detector=spectrograph.get_detector_par(1),
+                          PYP_SPEC=spectrograph.name)
+    traceimg.build_mask()
+    return traceimg
+
+
+def test_sobel_cache():
+    spectrograph = load_spectrograph('shane_kast_blue')
+    par = spectrograph.default_pypeit_par()['calibrations']['slitedges']
+    edges = edgetrace.EdgeTraceSet(synthetic_traceimg(spectrograph), spectrograph, par)
+    assert edges.ntrace == 6, 'Should find 3 left and 3 right edges'
+
+    left = edges._side_dependent_sobel('left')
+    assert left.dtype == edges.sobel_dtype, 'Bad type'
+    assert np.allclose(left, trace.prepare_sobel_for_trace(edges.sobelsig, bpm=edges.tracebpm,
+                                                           side='left')), 'Bad left image'
+    # The images for all sides are constructed at once and reused
+    both = edges._side_dependent_sobel(None)
+    assert edges._side_dependent_sobel('left') is left, 'Image should be reused'
+    assert edges._side_dependent_sobel(None) is both, 'Image should be reused'
+
+    # Changing the mask (even in place) rebuilds the images
+    edges.tracebpm[:,:10] = True
+    _left = edges._side_dependent_sobel('left')
+    assert _left is not left, 'Image should be rebuilt'
+    assert np.all(_left[:,:8] == 0), 'Masked pixels should be 0'
+
+    # Memory-mapped images are identical
+    par['sobel_memmap'] = True
+    _edges = edgetrace.EdgeTraceSet(synthetic_traceimg(spectrograph), spectrograph, par)
+    _left = _edges._side_dependent_sobel('left')
+    assert isinstance(_left, np.memmap), 'Image should be memory mapped'
+    assert np.array_equal(_left, left), 'Memory mapping should not change the image'
+
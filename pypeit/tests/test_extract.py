@@ -0,0 +1,60 @@
+"""
+Module to run tests on the boxcar and optimal extraction routines
+"""
+from pypeit.lazyimport import embed
+
+import numpy as np
+
+from pypeit.core import extract
+from pypeit.specobj import SpecObj
+
+
+def mock_image(nspec=200, nspat=80, seed=1):
+    rng = np.random.default_rng(seed)
+    trace = 40.3 + 5*np.sin(np.arange(nspec)/50)
+    spat = np.arange(nspat)[None,:]
+    prof = np.exp(-0.5*(spat - trace[:,None])**2/4.)
+    sky = np.full((nspec, nspat), 10.)
+    img = 100*prof + rng.normal(size=(nspec, nspat))
+    ivar = np.ones((nspec, nspat))
+    gpm = rng.uniform(size=(nspec, nspat)) > 0.05
+    waveimg = np.outer(np.linspace(4000., 5000., nspec), np.ones(nspat))
+    return trace, prof, img, ivar, gpm, waveimg, sky
+
+
+def test_aperture_mask():
+    trace, _, img, _, gpm, _, _ = mock_image()
+    spat = np.arange(img.shape[1])[None,:]
+    for radius in [0.5, 3., 200.]:
+        mask = (spat >= trace[:,None] - radius) & (spat <= trace[:,None] + radius)
+        assert np.array_equal(extract.aperture_mask(gpm, trace, radius), gpm & mask), \
+                'Bad aperture mask'
+
+    spat_s, spat_e = extract.aperture_columns(trace, 3., img.shape[1])
+    assert spat_s < np.floor(trace.min() - 3.) and spat_e > np.ceil(trace.max() + 3.), \
+            'Columns do not include the full aperture'
+    assert extract.aperture_columns(trace, 200., img.shape[1]) == (0, img.shape[1]), \
+            'Columns should be limited to the image'
+
+
+def test_optimal_cutout():
+    trace, prof, img, ivar, gpm, waveimg, sky = mock_image()
+    prof[prof < 1e-3] = 0.
+
+    # Extract using the full image of the object profile
+    spec = SpecObj('MultiSlit', 'DET01', SLITID=0)
+    spec.TRACE_SPAT = trace
+    spec.BOX_RADIUS = 3.
+    extract.extract_optimal(img, ivar, gpm, waveimg, sky, np.ones_like(gpm), prof, spec,
+                            base_var=np.ones_like(img), noise_floor=0.01)
+
+    # Extract using a cutout of the object profile
+    _spec = SpecObj('MultiSlit', 'DET01', SLITID=0)
+    _spec.TRACE_SPAT = trace
+    _spec.BOX_RADIUS = 3.
+    extract.extract_optimal(img, ivar, gpm, waveimg, sky, np.ones_like(gpm), prof[:,20:65], _spec,
+                            base_var=np.ones_like(img), noise_floor=0.01, spat_start=20)
+
+    for key in ['OPT_WAVE', 'OPT_COUNTS', 'OPT_COUNTS_IVAR', 'OPT_COUNTS_NIVAR', 'OPT_MASK',
+                'OPT_COUNTS_SKY', 'OPT_FRAC_USE', 'OPT_CHI2']:
+        assert np.array_equal(spec[key], _spec[key]), f'{key} changed when using a cutout'
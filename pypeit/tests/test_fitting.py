@@ -3,7 +3,7 @@ Module to run tests on fitting
 """
 import os
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import pytest
 
@@ -54,3 +54,74 @@ def test_legendre():
 def test_robust_fit():
     # NEED A TEST!!
     pass
+
+
+def test_bspline_profile_batch():
+    rng = np.random.default_rng(42)
+    xdata, ydata, invvar, profile_basis = [], [], [], []
+    for n in [500, 1000, 300]:
+        x = np.sort(rng.uniform(0, 100, n))
+        y = np.sin(x/5.) + rng.normal(scale=0.1, size=n)
+        # Add some outliers
+        y[rng.integers(0, n, 5)] += 5.
+        xdata += [x]
+        ydata += [y]
+        invvar += [np.full(n, 100.)]
+        profile_basis += [np.ones(n)]
+
+    batch = fitting.bspline_profile_batch(xdata, ydata, invvar, profile_basis,
+                                          kwargs_bspline={'bkspace': 2.}, quiet=True)
+    assert len(batch) == len(xdata), 'Wrong number of fits'
+    for i in range(len(xdata)):
+        sset, gpm, yfit, chi, exit_status \
+                = fitting.bspline_profile(xdata[i], ydata[i], invvar[i], profile_basis[i],
+                                          kwargs_bspline={'bkspace': 2.}, quiet=True)
+        assert exit_status == 0 and batch[i][4] == 0, 'Fits should be successful'
+        assert np.sum(np.logical_not(gpm)) >= 5, 'Outliers should be rejected'
+        assert np.array_equal(sset.coeff, batch[i][0].coeff), 'Batch result is different'
+        assert np.array_equal(gpm, batch[i][1]), 'Batch result is different'
+        assert np.array_equal(yfit, batch[i][2]), 'Batch result is different'
+
+
+@pytest.mark.parametrize('width', [1., 0.01, 0.001])
+def test_robust_fit_2d(width):
+    rng = np.random.default_rng(3)
+    n = 2000
+    x = rng.uniform(0, 1, n)
+    x2 = 0.5 + width * rng.uniform(-0.5, 0.5, n)
+    y = np.sin(3*x) + 0.1*x*x2 + rng.normal(scale=0.01, size=n)
+    # Add some outliers
+    y[rng.integers(0, n, 50)] += 1.
+    invvar = np.full(n, 1e4)
+    in_gpm = rng.random(n) > 0.05
+    pypeitFit = fitting.robust_fit(x, y, (4, 3), x2=x2, function='legendre2d', minx=0., maxx=1.,
+                                   minx2=0., maxx2=1., in_gpm=in_gpm, invvar=invvar, lower=3.,
+                                   upper=3., maxdev=0.5, use_mad=False, sticky=False)
+    gpm = pypeitFit.bool_gpm
+    assert np.sum(in_gpm & np.logical_not(gpm)) >= 45, 'Outliers should be rejected'
+    assert not np.any(gpm & np.logical_not(in_gpm)), 'Masked points should remain masked'
+    # Compare to a direct fit using the same points
+    _pypeitFit = fitting.PypeItFit(xval=x, yval=y, order=np.array([4, 3]), x2=x2,
+                                   weights=invvar, gpm=gpm.astype(int), func='legendre2d',
+                                   minx=0., maxx=1., minx2=0., maxx2=1.)
+    _pypeitFit.fit()
+    assert np.allclose(pypeitFit.eval(x, x2=x2), _pypeitFit.eval(x, x2=x2), rtol=0., atol=1e-8), \
+            'Bad fit'
+    if width == 1.:
+        assert np.allclose(pypeitFit.fitc, _pypeitFit.fitc, rtol=0., atol=1e-10), \
+                'Bad coefficients'
+
+
+def test_evaluate_fit_grid():
+    rng = np.random.default_rng(4)
+    x = np.linspace(-0.1, 1.1, 50)
+    x2 = np.linspace(0., 1., 30)
+    x2_img, x_img = np.meshgrid(x2, x)
+    fitc = rng.normal(size=(5, 3))
+    for func in ['polynomial2d', 'legendre2d', 'chebyshev2d']:
+        grid = fitting.evaluate_fit_grid(fitc, func, x, x2, minx=0., maxx=1., minx2=0.2,
+                                         maxx2=0.8)
+        assert grid.shape == (x.size, x2.size), 'Bad shape'
+        assert np.allclose(grid, fitting.evaluate_fit(fitc, func, x_img, x2=x2_img, minx=0.,
+                                                      maxx=1., minx2=0.2, maxx2=0.8)), \
+                'Grid evaluation is different'
@@ -3,12 +3,15 @@ Module to run tests on FlatField class
 """
 from pathlib import Path
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
 from pypeit import flatfield
 from pypeit import bspline
+from pypeit import slittrace
+from pypeit import wavetilts
+from pypeit.images.pypeitimage import PypeItImage
 from pypeit.spectrographs.util import load_spectrograph
 from pypeit.tests.tstutils import data_output_path
 
@@ -77,3 +80,48 @@ def test_fit_det_response():
     assert np.allclose(img, model, atol=0.001), 'structure fitting failed.'
 
 
+def synthetic_flat(spectrograph, nspec=400, nspat=160, nslits=3):
+    spec = np.arange(nspec)
+    width = nspat / nslits
+    left = np.column_stack([6 + i*width + 0.01*spec for i in range(nslits)])
+    right = left + width - 12
+    slits = slittrace.SlitTraceSet(left, right, 'MultiSlit', nspat=nspat,
+                                   PYP_SPEC=spectrograph.name)
+    # Tilts that are nearly aligned with the detector rows
+    coeffs = np.zeros((4, 3, nslits))
+    coeffs[:2,0] = 0.5
+    coeffs[0,1] = 0.001*np.arange(nslits)
+    tilts = wavetilts.WaveTilts(coeffs=coeffs, nslit=nslits, spat_id=slits.spat_id,
+                                spat_order=np.full(nslits, 1), spec_order=np.full(nslits, 3),
+                                func2d='legendre2d')
+    spat = np.arange(nspat)[None,:]
+    img = np.full((nspec, nspat), 5.)
+    for i in range(nslits):
+        img += 2e4 * np.exp(-0.5*((spec[:,None] - nspec/2)/(nspec/3))**2) \
+                / (1 + np.exp(left[:,i,None] - spat)) / (1 + np.exp(spat - right[:,i,None]))
+    img *= 1 + 0.01*np.random.default_rng(4).normal(size=img.shape)
+    flatimg = PypeItImage(img, ivar=1/img, detector=spectrograph.get_detector_par(1),
+                          PYP_SPEC=spectrograph.name)
+    flatimg.build_mask()
+    return flatimg, slits, tilts
+
+
+def test_fit_spectral_batch():
+    spectrograph = load_spectrograph('shane_kast_blue')
+    par = spectrograph.default_pypeit_par()['calibrations']['flatfield']
+    par['slit_illum_finecorr'] = False
+    flats = {}
+    for n_proc in [1, 2]:
+        par['n_proc'] = n_proc
+        flatimg, slits, tilts = synthetic_flat(spectrograph)
+        flats[n_proc] = flatfield.FlatField(flatimg, spectrograph, par, slits, wavetilts=tilts)
+        flats[n_proc].fit(doqa=False)
+        assert not np.any(slits.bitmask.flagged(slits.mask, flag='BADFLATCALIB')), \
+                'All slits should be fit'
+    for attr in ['mspixelflat', 'msillumflat', 'flat_model']:
+        assert np.array_equal(getattr(flats[1], attr), getattr(flats[2], attr)), \
+                f'{attr} should not depend on the number of threads'
+
+    # The model reproduces the flat to within the noise
+    onslit = flats[1].slits.slit_img(pad=-par['slit_trim']) > -1
+    assert np.std(flats[1].mspixelflat[onslit]) < 0.02, 'Bad flat-field model'
@@ -10,7 +10,7 @@ from pypeit.core import flexure
 from pypeit import dataPaths
 from pypeit.core.wavecal import autoid
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 
 def test_flex_shift():
@@ -10,6 +10,7 @@ from astropy import units
 from astropy.coordinates import SkyCoord
 
 from pypeit.core import flux_calib
+from pypeit.core.wavecal import wvutils
 from pypeit import telescopes
 from pypeit.par.pypeitpar import Coadd1DPar
 
@@ -76,6 +77,39 @@ def test_extinction_correction():
     np.testing.assert_allclose(flux_corr[0], 4.47095192)
 
 
+@pytest.mark.parametrize('extinct_correct', [False, True])
+def test_sensfunc_factors(extinct_correct):
+    # Sensitivity function
+    wave_zp = np.linspace(3000., 10000., 500)
+    zeropoint = 20. - ((wave_zp - 6000.)/3000.)**2
+    # Spectra with different lengths, including masked wavelengths
+    rng = np.random.default_rng(7)
+    waves = [np.sort(rng.uniform(3500., 9500., n)) for n in [100, 250, 400]]
+    waves[1][:10] = 0.
+    kwargs = dict(extinct_correct=extinct_correct, airmass=1.3,
+                  longitude=telescopes.ShaneTelescopePar()['longitude'],
+                  latitude=telescopes.ShaneTelescopePar()['latitude'],
+                  extinctfilepar='mthamextinct.dat')
+    factors = flux_calib.get_sensfunc_factors(waves, wave_zp, zeropoint, 300., **kwargs)
+    assert len(factors) == len(waves), 'Wrong number of spectra'
+    for wave, factor in zip(waves, factors):
+        assert np.array_equal(factor, flux_calib.get_sensfunc_factor(wave, wave_zp, zeropoint,
+                                                                     300., **kwargs),
+                              equal_nan=True), \
+                'Batched factors should be identical to the factors for each spectrum'
+
+    # Input wavelength sampling
+    delta_wave = wvutils.get_delta_wave(waves[0], waves[0] > 1.0)
+    assert np.allclose(flux_calib.get_sensfunc_factor(waves[0], wave_zp, zeropoint, 300.,
+                                                      delta_wave=2., **kwargs),
+                       factors[0]*delta_wave/2.), 'Bad scaling by the wavelength sampling'
+
+    # Data outside the sensitivity function
+    with pytest.raises(PypeItError):
+        flux_calib.get_sensfunc_factors(waves + [np.linspace(2000., 4000., 10)], wave_zp,
+                                        zeropoint, 300., **kwargs)
+
+
 def test_filter_scale():
     # Test scale_in_filter() method which is called in coadding
     wave = np.arange(3000.,10000.)
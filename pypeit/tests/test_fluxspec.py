@@ -3,10 +3,11 @@ Module to run tests on SensFunc and FluxCalibrate classes
 Requires files in PypeIt/pypeit/data
 """
 import os
+from pathlib import Path
 
 import pytest
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 import configobj
@@ -14,6 +15,7 @@ import configobj
 from astropy.table import Table
 from astropy.io import fits
 
+from pypeit import cache
 from pypeit import dataPaths
 from pypeit import fluxcalibrate
 from pypeit import sensfunc
@@ -231,3 +233,64 @@ def extinction_correction_tester(algorithm):
     os.remove(sens_file)
 
 
+
+
+def test_flux_calibrate_parallel(tmp_path, monkeypatch):
+    par = pypeitpar.PypeItPar()
+    par['sensfunc']['algorithm'] = 'IR'
+    par['sensfunc']['star_ra'] = 159.9042
+    par['sensfunc']['star_dec'] = 43.1025
+
+    # Bogus spectra
+    wave = np.linspace(4000, 6000)
+    spec1d_files = []
+    for i in range(5):
+        sobj = specobj.SpecObj.from_arrays('MultiSlit', wave, np.full_like(wave, i+1.),
+                                           np.ones_like(wave), np.ones_like(wave))
+        spec1d_files += [str(tmp_path / f'spec1d_test{i}.fits')]
+        specobjs.SpecObjs([sobj]).write_to_fits({'PYP_SPEC': 'p200_dbsp_blue',
+                                                 'DISPNAME': '600/4000', 'EXPTIME': 1.0,
+                                                 'AIRMASS': 1.1}, spec1d_files[-1])
+    # Two flat sensitivity functions with different zeropoints
+    sens_files = []
+    for i in range(2):
+        sens_files += [str(tmp_path / f'sens_test{i}.fits')]
+        sensobj = sensfunc.SensFunc.get_instance(spec1d_files[0], sens_files[-1],
+                                                 par['sensfunc'])
+        sensobj.wave = np.linspace(3000, 6000, 300).reshape((300, 1))
+        sensobj.sens = sensobj.empty_sensfunc_table(*sensobj.wave.T.shape, 0)
+        sensobj.zeropoint = 30 + i - np.log10(sensobj.wave ** 2) / 0.4
+        sensobj.to_file(sens_files[-1])
+    # Interleave the sensitivity functions
+    _sens_files = [sens_files[i % 2] for i in range(len(spec1d_files))]
+
+    # Each sensitivity function is only read once
+    cache.clear_product_cache()
+    nread = []
+    from_file = sensfunc.SensFunc.from_file
+    def counted_from_file(*args, **kwargs):
+        nread.append(args[0])
+        return from_file(*args, **kwargs)
+    monkeypatch.setattr(sensfunc.SensFunc, 'from_file', counted_from_file)
+    serial_files = [f.replace('.fits', '_serial.fits') for f in spec1d_files]
+    fluxcalibrate.flux_calibrate(spec1d_files, _sens_files, par=par['fluxcalib'],
+                                 outfiles=serial_files)
+    assert sorted(nread) == sens_files, 'Sensitivity functions should be read once'
+    monkeypatch.undo()
+    par['fluxcalib']['n_proc'] = 2
+    parallel_files = [f.replace('.fits', '_parallel.fits') for f in spec1d_files]
+    fluxcalibrate.flux_calibrate(spec1d_files, _sens_files, par=par['fluxcalib'],
+                                 outfiles=parallel_files)
+
+    for i, (serial_file, parallel_file) in enumerate(zip(serial_files, parallel_files)):
+        sobjs = specobjs.SpecObjs.from_fitsfile(serial_file)
+        _sobjs = specobjs.SpecObjs.from_fitsfile(parallel_file)
+        assert np.array_equal(sobjs[0].OPT_FLAM, _sobjs[0].OPT_FLAM), \
+                'Parallel flux calibration should be identical to serial'
+        # The flux scales with the counts and the zeropoint
+        assert np.allclose(sobjs[0].OPT_FLAM / (i+1) * 10**(0.4*(i % 2)),
+                           specobjs.SpecObjs.from_fitsfile(serial_files[0])[0].OPT_FLAM), \
+                'Wrong sensitivity function applied'
+        assert Path(_sens_files[i]).name \
+                    in ''.join(fits.getheader(parallel_file)['HISTORY']), \
+                'Sensitivity function missing from history'
@@ -0,0 +1,66 @@
+"""
+Module to test the start-up time of the PypeIt scripts.
+"""
+import re
+import sys
+import subprocess
+
+from pypeit.lazyimport import embed
+
+import pytest
+
+from pypeit import scripts
+
+# Modules that are slow to import and should only be imported by the scripts
+# when they are executed.
+deferred_modules = ['IPython', 'matplotlib.pyplot', 'scipy.optimize', 'scipy.signal',
+                    'sklearn', 'pypeit.core.wavecal', 'pypeit.pypeit']
+
+# Nominal budget in seconds for importing a script and constructing its
+# argument parser.  This is generous to allow for slow test machines; most
+# scripts currently take less than half of this.
+import_budget = 2.
+
+
+def import_time(code):
+    """
+    Execute code in a new python process and measure the time spent importing
+    modules using ``python -X importtime``.
+
+    Args:
+        code (:obj:`str`):
+            The code to execute.
+
+    Returns:
+        :obj:`tuple`: The total import time in seconds and the list of
+        imported modules.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            capture_output=True, text=True, check=True)
+    total = 0
+    modules = []
+    for line in result.stderr.splitlines():
+        match = re.match(r'import time:\s+\d+\s+\|\s+(\d+)\s+\|( +)(\S+)$', line)
+        if match is None:
+            continue
+        modules += [match.group(3)]
+        # Only add the cumulative time of the top-level imports
+        if len(match.group(2)) == 1:
+            total += int(match.group(1))
+    return total/1e6, modules
+
+
+@pytest.mark.parametrize('script', scripts.script_modules)
+def test_script_import(script):
+    code = 'import inspect\n' \
+           f'from pypeit.scripts import scriptbase, {script}\n' \
+           f'cls = [c for c in vars({script}).values() if inspect.isclass(c) ' \
+           f'and issubclass(c, scriptbase.ScriptBase) and c.__module__ == {script}.__name__][0]\n' \
+           'cls.get_parser()'
+    total, modules = import_time(code)
+    imported = [m for m in deferred_modules if m in modules]
+    assert len(imported) == 0, \
+            f'pypeit_{script} should not import {", ".join(imported)} on start-up'
+    assert total < import_budget, \
+            f'Importing pypeit_{script} took {total:.2f}s; budget is {import_budget:.1f}s'
+
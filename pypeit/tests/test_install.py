@@ -1,7 +1,7 @@
 
 from pathlib import Path
 import shutil
-from IPython import embed
+from pypeit.lazyimport import embed
 
 from astropy.config import set_temp_cache
 
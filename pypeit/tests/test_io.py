@@ -3,7 +3,7 @@ Tests on io module
 """
 from pathlib import Path
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 from astropy.table import Table
 
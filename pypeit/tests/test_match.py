@@ -1,7 +1,7 @@
 """
 Module to run tests on sort and arsetup
 """
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import pytest
 
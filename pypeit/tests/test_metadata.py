@@ -2,7 +2,7 @@ from pathlib import Path
 import shutil
 import os
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import pytest
 
@@ -1,11 +1,14 @@
 from pathlib import Path
-from IPython import embed
+from pypeit.lazyimport import embed
 
+import numpy as np
 import pytest
 
 from astropy.io import fits
 
-from pypeit.pypmsgs import PypeItDataModelError
+from pypeit.pypmsgs import PypeItDataModelError, PypeItError
+from pypeit.core.mosaic import build_image_mosaic_transform, build_image_mosaic
+from pypeit.core.mosaic import build_mosaic_map, apply_mosaic_map
 from pypeit.tests.tstutils import data_output_path
 from pypeit.images.mosaic import Mosaic
 from pypeit.spectrographs.util import load_spectrograph
@@ -39,3 +42,37 @@ def test_io():
     # Remove files
     Path(ofile).unlink()
     Path(_ofile).unlink()
+
+
+@pytest.mark.parametrize('order', [0, 1, 3])
+def test_mosaic_map(order):
+    # Three overlapping, rotated images
+    shape = (60, 40)
+    tforms = [build_image_mosaic_transform(shape, (0., -35.), 0.),
+              build_image_mosaic_transform(shape, (0., 0.), 2.),
+              build_image_mosaic_transform(shape, (3., 36.), -1.)]
+    rng = np.random.default_rng(99)
+    imgs = rng.normal(size=(len(tforms),)+shape)
+
+    mosaic, _, npix, _ = build_image_mosaic(imgs, tforms, order=order, cval=-1.)
+    mosaic_map = build_mosaic_map(shape, tforms, order=order)
+    assert np.any(mosaic_map['npix'] > 1), 'Test mosaic should include overlapping images'
+    assert np.array_equal(mosaic_map['npix'], npix), 'Bad number of pixels'
+    assert np.allclose(apply_mosaic_map(mosaic_map, imgs, cval=-1.), mosaic), 'Bad mosaic'
+    # Integer images
+    assert np.allclose(apply_mosaic_map(mosaic_map, imgs.astype(int)),
+                       build_image_mosaic(imgs.astype(int), tforms, order=order)[0]), \
+            'Bad mosaic'
+
+    with pytest.raises(PypeItError):
+        apply_mosaic_map(mosaic_map, imgs[:2])
+
+
+def test_resampling_map():
+    mpar = load_spectrograph('keck_deimos').get_mosaic_par((1,5), msc_ord=0)
+    shape = tuple(s//8 for s in mpar.shape)
+    mosaic_map = mpar.resampling_map(shape=shape)
+    assert mosaic_map['shape'] == shape, 'Bad shape'
+    assert mosaic_map['order'] == 0, 'Bad order'
+    assert np.array_equal(mpar.resampling_map(shape=shape)['npix'], mosaic_map['npix']), \
+            'Cached map should be identical'
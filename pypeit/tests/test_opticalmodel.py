@@ -0,0 +1,67 @@
+"""
+Module to test the optical model used to predict the slit positions from the
+slit-mask design.
+"""
+from pypeit.lazyimport import embed
+
+import numpy as np
+
+from astropy.io import fits
+
+from pypeit import dataPaths
+from pypeit.spectrographs.keck_deimos import KeckDEIMOSSpectrograph, DEIMOSOpticalModel, \
+    DEIMOSDetectorMap
+from pypeit.spectrographs.opticalmodel import ReflectionGrating
+
+
+def test_detector_map():
+    dmap = DEIMOSDetectorMap()
+    rng = np.random.default_rng(99)
+    x_pix = rng.uniform(1, dmap.npix[0], (10,20))
+    y_pix = rng.uniform(1, dmap.npix[1], (10,20))
+    det = rng.integers(1, dmap.nccd+1, (10,20))
+
+    x_img, y_img = dmap.image_coordinates(x_pix, y_pix, detector=det, in_mm=False)
+    assert x_img.shape == x_pix.shape, 'Shape changed'
+    # Compare to the transformation of the individual coordinates
+    for i in [0, 57, 199]:
+        c = np.matmul(dmap.rot_matrix[det.flat[i]-1],
+                      np.array([x_pix.flat[i], y_pix.flat[i]]) - dmap.npix/2) \
+                + dmap.ccd_center[det.flat[i]-1]
+        assert np.array_equal(c, [x_img.flat[i], y_img.flat[i]]), 'Bad image coordinates'
+
+    # Go back to the pixel coordinates
+    _det, _x_pix, _y_pix = dmap.ccd_coordinates(x_img, y_img, in_mm=False)
+    assert np.array_equal(_det, det), 'Bad detector'
+    assert np.allclose(_x_pix, x_pix) and np.allclose(_y_pix, y_pix), 'Bad pixel coordinates'
+
+    # Coordinates off all the detectors
+    _det, _x_pix, _y_pix = dmap.ccd_coordinates(np.array([1e6]), np.array([1e6]), in_mm=False)
+    assert _det[0] == -1 and _x_pix[0] == -1. and _y_pix[0] == -1., 'Should be off the detectors'
+
+
+def test_map_interpolators():
+    amap = fits.getdata(dataPaths.static_calibs.get_file_path('keck_deimos/amap.s3.2003mar04.fits'))
+    bmap = fits.getdata(dataPaths.static_calibs.get_file_path('keck_deimos/bmap.s3.2003mar04.fits'))
+    roll, yaw, tilt = KeckDEIMOSSpectrograph._grating_orientation(3, 1200.06, 32.)
+    model = DEIMOSOpticalModel(ReflectionGrating(1200.06, tilt, roll, yaw, central_wave=7000.))
+
+    x = np.array([-300., 0., 250.])
+    y = np.array([30., 80., 120.])
+    wave = np.arange(50) * 120. + 4000.
+    x_img, y_img = model.mask_to_imaging_coordinates(x, y, amap, bmap, x.size, wave, 1)
+    assert x_img.shape == (x.size, wave.size), 'Bad shape'
+    assert len(model._map_interpolators) == 2, 'Map interpolators should be cached'
+
+    # Reading the maps again reuses the interpolators
+    amap = fits.getdata(dataPaths.static_calibs.get_file_path('keck_deimos/amap.s3.2003mar04.fits'))
+    _x_img, _y_img = model.mask_to_imaging_coordinates(x, y, amap, bmap, x.size, wave, 1)
+    assert len(model._map_interpolators) == 2, 'Map interpolators should be reused'
+    assert np.array_equal(x_img, _x_img) and np.array_equal(y_img, _y_img), 'Bad cached result'
+
+    # Tracing the slits one at a time gives the same result
+    for i in range(x.size):
+        _x_img, _y_img = model.mask_to_imaging_coordinates(x[i:i+1], y[i:i+1], amap, bmap, 1,
+                                                           wave, 1)
+        assert np.array_equal(x_img[i], _x_img[0]) and np.array_equal(y_img[i], _y_img[0]), \
+                'Slits should be traced independently'
@@ -2,7 +2,7 @@
 Module to test TracePCA object.
 """
 import os
-from IPython import embed
+from pypeit.lazyimport import embed
 import numpy as np
 import pytest
 
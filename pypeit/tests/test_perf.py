@@ -0,0 +1,105 @@
+"""
+Module to test the recording of the performance of the reduction steps.
+"""
+from pypeit.lazyimport import embed
+
+import numpy as np
+import pytest
+
+from pypeit import perf
+from pypeit.pypmsgs import PypeItError
+from pypeit.scripts.perf_report import PerfReport
+
+
+def record_steps(profile_step=None, profile_root=None):
+    recorder = perf.start(profile_step=profile_step, profile_root=profile_root)
+    try:
+        for det in ['DET01', 'DET02']:
+            with perf.step('calibrations', exposure='b1', det=det, calib_group='0'):
+                with perf.step('get_arc'):
+                    arr = np.ones((1000, 1000))
+                with perf.step('get_tilts'):
+                    pass
+        with pytest.raises(ValueError):
+            with perf.step('save', exposure='b1'):
+                raise ValueError('Failed')
+    finally:
+        perf.stop()
+    return recorder
+
+
+def test_inactive():
+    assert perf.active() is None
+    with perf.step('get_bias', det='DET01'):
+        pass
+    assert perf.active() is None
+
+
+def test_records():
+    recorder = record_steps()
+    assert perf.active() is None
+    tbl = recorder.to_table()
+    assert len(tbl) == 7, 'Wrong number of records'
+    assert list(tbl['path'][:3]) == ['calibrations', 'calibrations/get_arc',
+                                     'calibrations/get_tilts'], 'Records not in execution order'
+    assert np.all(tbl['det'][:6] == ['DET01']*3 + ['DET02']*3), 'Labels not inherited'
+    assert np.all(tbl['calib_group'][:6] == '0'), 'Labels not inherited'
+    assert list(tbl['status']) == ['ok']*6 + ['failed'], 'Failed step not flagged'
+    assert np.all(tbl['wall_time'] >= 0) and np.all(tbl['cpu_time'] >= 0)
+    # The outer step must take at least as long as the nested steps
+    assert tbl['wall_time'][0] >= tbl['wall_time'][1] + tbl['wall_time'][2]
+    if recorder.peak_per_step:
+        # The peak memory of a step includes the peak of its nested steps
+        assert tbl['peak_rss'][0] >= tbl['peak_rss'][1]
+
+
+def test_write_read(tmp_path):
+    recorder = record_steps()
+    tbl = recorder.to_table()
+    for ext in ['.json', '.csv']:
+        ofile = tmp_path / f'test_perf{ext}'
+        recorder.write(ofile)
+        _tbl = perf.read_report(ofile)
+        assert _tbl.colnames == perf.record_columns, 'Bad columns'
+        assert np.array_equal(_tbl['path'], tbl['path']), 'Bad read'
+        assert np.allclose(_tbl['wall_time'], tbl['wall_time']), 'Bad read'
+    assert _tbl.meta == {}, 'CSV file should not include the metadata'
+    assert perf.read_report(tmp_path / 'test_perf.json').meta['ncpu'] > 0, 'Bad metadata'
+
+    with pytest.raises(PypeItError):
+        recorder.write(tmp_path / 'test_perf.txt')
+
+
+def test_summarize():
+    tbl = record_steps().to_table()
+    summary = perf.summarize(tbl)
+    assert list(summary['path']) == ['calibrations', 'calibrations/get_arc',
+                                     'calibrations/get_tilts', 'save'], 'Bad grouping'
+    assert np.all(summary['ncalls'] == [2, 2, 2, 1]), 'Bad number of calls'
+    assert np.all(summary['nfailed'] == [0, 0, 0, 1]), 'Bad number of failures'
+    assert np.isclose(np.sum(summary['wall_frac'][summary['depth'] == 0]), 1.), \
+            'Fractions of the outermost steps should sum to 1'
+
+    summary = perf.summarize(tbl, by='det')
+    assert len(summary) == 7, 'Bad grouping'
+    assert np.all(summary['det'][1:4] == 'DET01'), 'Bad order'
+
+    with pytest.raises(PypeItError):
+        perf.summarize(tbl, by='frame')
+
+
+def test_profile(tmp_path):
+    recorder = record_steps(profile_step='get_arc', profile_root=tmp_path / 'test')
+    assert len(recorder.profile_files) == 2, 'Should profile each execution of the step'
+    assert (tmp_path / 'test_get_arc_b1_DET01_0.prof').is_file(), 'Profile not written'
+    assert (tmp_path / 'test_get_arc_b1_DET02_0.prof').is_file(), 'Profile not written'
+
+
+def test_perf_report(tmp_path):
+    ofile = tmp_path / 'test_perf.json'
+    record_steps().write(ofile)
+    assert PerfReport.main(PerfReport.parse_args([str(ofile)])) == 0
+    csv_file = tmp_path / 'selected.csv'
+    assert PerfReport.main(PerfReport.parse_args([str(ofile), '--det', 'DET02', '--all',
+                                                  '--csv', str(csv_file)])) == 0
+    assert np.all(perf.read_report(csv_file)['det'] == 'DET02'), 'Bad selection'
@@ -6,7 +6,7 @@ import os
 import requests
 from pathlib import Path
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import pytest
 
@@ -141,6 +141,56 @@ def test_waveio_load_reid_arxiv():
     waveio.load_reid_arxiv("vlt_xshooter_vis1x1.json")
 
 
+def test_cached_product(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, 'product_cache_dir', lambda: tmp_path)
+    cache.clear_product_cache()
+
+    ncalls = []
+    def product():
+        ncalls.append(1)
+        return {'value': [1, 2, 3]}
+
+    test_file = tmp_path / 'test.txt'
+    test_file.write_text('test')
+    key = cache.file_key(test_file) + ('test',)
+    p = cache.cached_product(key, product, persist=True)
+    p['value'].append(4)
+    assert cache.cached_product(key, product, persist=True) == {'value': [1, 2, 3]}, \
+            'Cached product should not be affected by changes to the returned copy'
+    assert len(ncalls) == 1, 'Product should only be computed once'
+
+    # Product should be read from its companion file
+    cache.clear_product_cache()
+    assert cache.cached_product(key, product, persist=True) == {'value': [1, 2, 3]}, \
+            'Bad product read from companion file'
+    assert len(ncalls) == 1, 'Product should have been read from its companion file'
+
+    # The key changes when the file is modified
+    test_file.write_text('modified')
+    assert cache.file_key(test_file) != key[:-1], 'Key should change with the file'
+
+    # The cache size is limited
+    monkeypatch.setattr(cache, 'product_cache_size', 2)
+    cache.clear_product_cache()
+    for i in range(3):
+        cache.cached_product(('test', i), product)
+    assert len(ncalls) == 4, 'Products should have been computed'
+    cache.cached_product(('test', 0), product)
+    assert len(ncalls) == 5, 'Oldest product should have been removed from the cache'
+    cache.clear_product_cache()
+
+
+def test_load_line_list_cached(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache, 'product_cache_dir', lambda: tmp_path)
+    cache.clear_product_cache()
+    line_list = waveio.load_line_list('ArI', use_ion=True)
+    line_list['wave'][0] = -1.
+    assert waveio.load_line_list('ArI', use_ion=True)['wave'][0] > 0, \
+            'Cached line list was altered'
+    assert len(list(tmp_path.glob('*.pkl'))) == 1, 'Line list should have been written to disk'
+    cache.clear_product_cache()
+
+
 def test_datapath():
     # NOTE: Because dataPaths is created every time pypeit is imported, the
     # first part of this test is basically guaranteed to pass, if pypeit is
@@ -3,7 +3,7 @@ Module to run tests on core.procimg functions.
 """
 import os
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
@@ -1,12 +1,82 @@
 """
 Module to run tests on pyidl functions
 """
+import numpy as np
 
 from pypeit.core import pydl
 import pytest
 
-# TODO: JFH -- any suggestions??
 
-def test_pydl():
-    assert True
+def test_djs_reject_maxrej():
+    data = np.zeros(20)
+    data[[2, 3, 5, 12, 13, 14]] = [5., 4., 6., 3., 3., 7.]
+    model = np.zeros_like(data)
+    invvar = np.ones_like(data)
+    outmask = np.ones(data.size, dtype=bool)
 
+    mask, qdone = pydl.djs_reject(data, model, outmask=outmask, invvar=invvar, upper=2.)
+    assert np.array_equal(np.where(np.logical_not(mask))[0], [2, 3, 5, 12, 13, 14]), \
+            'Bad rejection'
+    assert not qdone, 'Rejection changed the mask'
+
+    # Only reject the worst points
+    mask, _ = pydl.djs_reject(data, model, outmask=outmask, invvar=invvar, upper=2., maxrej=2)
+    assert np.array_equal(np.where(np.logical_not(mask))[0], [5, 14]), 'Bad maxrej'
+
+    # ... in each group
+    mask, _ = pydl.djs_reject(data, model, outmask=outmask, invvar=invvar, upper=2., maxrej=1,
+                              groupsize=10)
+    assert np.array_equal(np.where(np.logical_not(mask))[0], [5, 14]), 'Bad groupsize'
+    mask, _ = pydl.djs_reject(data, model, outmask=outmask, invvar=invvar, upper=2., maxrej=2,
+                              groupsize=13)
+    assert np.array_equal(np.where(np.logical_not(mask))[0], [2, 5, 13, 14]), 'Bad groupsize'
+
+    # Points masked on input are never rejected
+    inmask = np.ones(data.size, dtype=bool)
+    inmask[5] = False
+    mask, _ = pydl.djs_reject(data, model, outmask=outmask, inmask=inmask, invvar=invvar,
+                              upper=2., maxrej=2)
+    assert np.array_equal(np.where(np.logical_not(mask))[0], [2, 5, 14]), 'Bad inmask'
+
+    # groupbadpix disables maxrej
+    mask, _ = pydl.djs_reject(data, model, outmask=outmask, invvar=invvar, upper=2., maxrej=2,
+                              groupbadpix=True)
+    assert np.array_equal(np.where(np.logical_not(mask))[0], [2, 3, 5, 12, 13, 14]), \
+            'Bad groupbadpix'
+
+
+def test_djs_reject_grow():
+    data = np.zeros(20)
+    data[[0, 10]] = 5.
+    model = np.zeros_like(data)
+    outmask = np.ones(data.size, dtype=bool)
+
+    mask, _ = pydl.djs_reject(data, model, outmask=outmask, invvar=np.ones_like(data),
+                              upper=2., grow=2)
+    assert np.array_equal(np.where(np.logical_not(mask))[0], [0, 1, 2, 8, 9, 10, 11, 12]), \
+            'Bad grow'
+
+    # For 2D data, entire rows are rejected
+    data = np.zeros((10, 3))
+    data[5,1] = 5.
+    mask, _ = pydl.djs_reject(data, np.zeros_like(data), outmask=np.ones(data.shape, dtype=bool),
+                              invvar=np.ones_like(data), upper=2., grow=1)
+    assert np.array_equal(np.where(np.logical_not(mask)), ([4, 4, 4, 5, 6, 6, 6],
+                                                           [0, 1, 2, 1, 0, 1, 2])), 'Bad grow'
+
+
+def test_djs_reject_sticky():
+    data = np.zeros(10)
+    data[3] = 5.
+    model = np.zeros_like(data)
+    invvar = np.ones_like(data)
+    outmask = np.ones(data.size, dtype=bool)
+    outmask[7] = False
+
+    mask, qdone = pydl.djs_reject(data, model, outmask=outmask, invvar=invvar, upper=2.)
+    assert np.array_equal(np.where(np.logical_not(mask))[0], [3]), 'Rejection should not be sticky'
+    mask, qdone = pydl.djs_reject(data, model, outmask=outmask, invvar=invvar, upper=2.,
+                                  sticky=True)
+    assert np.array_equal(np.where(np.logical_not(mask))[0], [3, 7]), 'Rejection should be sticky'
+    _, qdone = pydl.djs_reject(data, model, outmask=mask, invvar=invvar, upper=2., sticky=True)
+    assert qdone, 'Rejection should have converged'
@@ -2,8 +2,9 @@
 Module to run tests on PypeItImage class
 """
 from pathlib import Path
+import pickle
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import pytest
 
@@ -73,6 +74,16 @@ def test_sub():
                 'Bad CR propagation'
 
 
+def test_pickle():
+    shape = (10,10)
+    img = pypeitimage.PypeItImage(np.ones(shape), ivar=np.ones(shape))
+    img.update_mask('CR', indx=(np.array([1,2]), np.array([3,4])))
+    _img = pickle.loads(pickle.dumps(img))
+    assert np.array_equal(_img.image, img.image), 'image array changed'
+    assert np.array_equal(_img.fullmask.mask, img.fullmask.mask), 'mask array changed'
+    assert np.array_equal(_img.fullmask.cr, img.fullmask.cr), 'bad flag access'
+
+
 def test_bitmask():
     bm = imagebitmask.ImageBitMask()
 
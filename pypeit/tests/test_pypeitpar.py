@@ -3,7 +3,7 @@ Module to run tests on PypeItPar classes
 """
 import os
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import pytest
 
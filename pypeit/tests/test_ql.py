@@ -1,8 +1,15 @@
 
-from IPython import embed
+from pathlib import Path
 
+from pypeit.lazyimport import embed
+
+import pytest
+
+from pypeit import dataPaths
 from pypeit.metadata import PypeItMetaData
+from pypeit.pypmsgs import PypeItError
 from pypeit.scripts import ql
+from pypeit.scripts import ql_watch
 
 def test_merge():
 
@@ -57,3 +64,73 @@ def test_merge():
 
 
 
+
+
+def test_parse_command():
+    cmd, cmd_args = ql_watch.parse_command('STACK b27.fits.gz b28.fits.gz  # restack')
+    assert cmd == 'stack', 'Bad command'
+    assert cmd_args == ['b27.fits.gz', 'b28.fits.gz'], 'Bad command arguments'
+    cmd, cmd_args = ql_watch.parse_command('# Just a comment')
+    assert cmd is None and cmd_args is None, 'Comments should be ignored'
+    with pytest.raises(PypeItError):
+        ql_watch.parse_command('reduce b27.fits.gz')
+
+
+def test_poll(tmp_path, monkeypatch):
+    raw_path = tmp_path / 'raw'
+    raw_path.mkdir()
+    watcher = ql_watch.QLWatcher('shane_kast_blue', raw_path, tmp_path / 'redux',
+                                 setup_calib_dir=tmp_path / 'calib',
+                                 command_dir=tmp_path / 'cmd')
+
+    reduced = []
+    def reduce(sci_files):
+        reduced.extend([Path(f).name for f in sci_files])
+        if Path(sci_files[0]).name == 'b24.fits.gz':
+            raise ValueError('Reduction failed')
+    monkeypatch.setattr(watcher, 'reduce', reduce)
+
+    # Arc, standard, and science frames land in the directory
+    for f in ['b1.fits.gz', 'b24.fits.gz', 'b27.fits.gz']:
+        (raw_path / f).symlink_to(dataPaths.tests.get_file_path(f, to_pkg='symlink'))
+    watcher.poll()
+    assert len(reduced) == 0, 'Frames have not finished landing'
+    watcher.poll()
+    # The arc is ignored, and the failed reduction of the standard does not
+    # stop the service
+    assert reduced == ['b24.fits.gz', 'b27.fits.gz'], 'Bad reductions'
+    assert [f.name for f in watcher.science] == ['b27.fits.gz'], 'Bad reduced frames'
+    assert len(watcher.metadata) == 3, 'Metadata should be kept'
+    watcher.poll()
+    assert len(reduced) == 2, 'Frames should only be reduced once'
+
+    # Stack the frames of the last target
+    (tmp_path / 'cmd' / 'a.cmd').write_text('stack\nstop\n')
+    watcher.poll()
+    assert reduced[2:] == ['b27.fits.gz'], 'Bad stack'
+    assert watcher.stopped, 'Service should be stopped'
+    assert (tmp_path / 'cmd' / 'a.done').exists(), 'Command file should be renamed'
+
+
+def test_reducer(tmp_path):
+    # Fake calibrations
+    calib_dir = tmp_path / 'calib' / 'Calibrations'
+    calib_dir.mkdir(parents=True)
+    (calib_dir / 'Slits_A_0_DET01.fits.gz').touch()
+    raw_path = tmp_path / 'raw'
+    raw_path.mkdir()
+    watcher = ql_watch.QLWatcher('shane_kast_blue', raw_path, tmp_path / 'redux',
+                                 setup_calib_dir=calib_dir)
+    for i, f in enumerate(['b24.fits.gz', 'b27.fits.gz']):
+        ps_sci = watcher.setup_frames([dataPaths.tests.get_file_path(f, to_pkg='symlink')],
+                                      frametype={f: 'science'})
+        ql.quicklook_regroup(ps_sci.fitstbl)
+        sci_pypeit_file = ql.generate_sci_pypeitfile(str(watcher.redux_path), calib_dir, ps_sci)
+        pypeIt = watcher.reducer(sci_pypeit_file, ps_sci, calib_dir)
+        # The parameters are only constructed once
+        assert len(watcher.reduce_par) == 1, 'Parameters should be reused'
+        assert pypeIt.par['rdx']['redux_path'] == str(Path(sci_pypeit_file).parent), \
+                'Bad reduction path'
+        assert list(pypeIt.fitstbl['filename']) == [f], 'Bad metadata'
+        assert pypeIt.fitstbl.find_frames('science', index=True).tolist() == [0], \
+                'Bad frame type'
@@ -15,6 +15,7 @@ from pypeit.scripts.run_pypeit import RunPypeIt
 from pypeit.scripts.sensfunc import SensFunc
 from pypeit.scripts.flux_calib import FluxCalib
 from pypeit import specobjs, sensfunc
+from pypeit import perf
 from pypeit.par import pypeitpar 
 from pypeit.tests import tstutils
 
@@ -58,10 +59,20 @@ def test_run_pypeit():
     par = pypeitpar.PypeItPar.from_cfg_file(par_file)
     assert isinstance(par, pypeitpar.PypeItPar)
                                
-    # Now re-use those calibration files
-    pargs = RunPypeIt.parse_args([str(pyp_file), '-o', '-r', str(configdir)])
+    # Now re-use those calibration files and record the performance
+    pargs = RunPypeIt.parse_args([str(pyp_file), '-o', '-r', str(configdir), '--perf'])
     RunPypeIt.main(pargs)
 
+    # Performance report was written and includes the main steps
+    perf_file = configdir / 'Science' / 'shane_kast_blue_A_perf.json'
+    assert perf_file.exists(), 'performance report missing'
+    assert perf_file.with_suffix('.csv').exists(), 'performance report missing'
+    report = perf.read_report(perf_file)
+    for step in ['get_wv_calib', 'build_science', 'global_sky', 'find_objects', 'extraction',
+                 'save']:
+        assert step in report['step'], f'{step} missing from performance report'
+    assert np.all(report['status'] == 'ok'), 'performance report has failed steps'
+
     # Generate a sensitivity function from the standard star spec1d
     std_file = configdir / 'Science' / 'spec1d_b24-Feige66_KASTb_20150520T041246.960.fits'
     assert std_file.exists(), 'std spec1d file missing'
@@ -5,7 +5,7 @@ from pathlib import Path
 import os
 import shutil
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import pytest
 
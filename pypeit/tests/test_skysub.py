@@ -2,11 +2,12 @@
 Module to run tests on skysub routines (mainly for IFU)
 """
 from pathlib import Path
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
 from pypeit.core import skysub
+from pypeit import specobj, specobjs
 from pypeit.images.buildimage import SkyRegions
 from pypeit.slittrace import SlitTraceSet
 from pypeit.tests.tstutils import data_output_path
@@ -72,3 +73,103 @@ def test_skyregions_io():
     ofile.unlink()
 
 
+
+
+def mock_slits(nspec=200, nspat=120, seed=3):
+    rng = np.random.default_rng(seed)
+    spec = np.arange(nspec)
+    spat = np.arange(nspat)[None,:]
+    left = np.column_stack([5 + 0.01*spec, 65 + 0.01*spec])
+    right = left + 50
+    slitmask = np.full((nspec, nspat), -1, dtype=int)
+    for i in range(2):
+        slitmask[(spat > left[:,i,None]) & (spat < right[:,i,None])] = i+1
+    tilts = (spec[:,None] + 0.02*(spat - nspat/2))/(nspec-1)
+    waveimg = 3500 + 2000*tilts
+    sky = 100 + 500*np.exp(-0.5*((tilts*(nspec-1) % 50 - 25)/1.5)**2)
+    sobjs = specobjs.SpecObjs()
+    img = sky.copy()
+    for i, x in enumerate([30.2, 91.7]):
+        s = specobj.SpecObj('MultiSlit', 'DET01', SLITID=i+1)
+        s.TRACE_SPAT = x + 0.005*spec
+        s.SPAT_PIXPOS = x
+        s.maskwidth = 12.
+        s.BOX_RADIUS = 4.
+        s.FWHM = 5.
+        s.OBJID = 1
+        s.trace_spec = spec
+        sobjs.add_sobj(s)
+        img += 200*np.exp(-0.5*((spat - s.TRACE_SPAT[:,None])/2.)**2)
+    base_var = np.full(img.shape, 25.)
+    var = base_var + img
+    img += rng.normal(size=img.shape)*np.sqrt(var)
+    return img, 1/var, tilts, waveimg, sky, slitmask, left, right, sobjs, base_var
+
+
+def test_parallel_local_skysub():
+    img, ivar, tilts, waveimg, sky, slitmask, left, right, sobjs, base_var = mock_slits()
+    gpm = slitmask > 0
+    results = []
+    for n_proc in [1, 2]:
+        _sobjs = sobjs.copy()
+        _results = list(skysub.local_skysub_extract_slits(img, ivar, tilts, waveimg, sky,
+                                                          slitmask, gpm, [1, 2], left, right,
+                                                          _sobjs, n_proc=n_proc,
+                                                          base_var=base_var, niter=2))
+        results += [_results]
+
+    for serial, parallel in zip(*results):
+        for s, p in zip(serial[:-1], parallel[:-1]):
+            assert s is None and p is None or np.array_equal(s, p), \
+                    'Parallel models are different'
+        assert serial[-1][0] is not parallel[-1][0], 'Parallel objects should be copies'
+        for key in ['OPT_COUNTS', 'OPT_COUNTS_IVAR', 'BOX_COUNTS', 'FWHMFIT']:
+            assert np.array_equal(serial[-1][0][key], parallel[-1][0][key]), \
+                    f'Parallel extraction changed {key}'
+        assert serial[-1][0].OPT_COUNTS is not None, 'Objects not extracted'
+
+
+def test_parallel_global_skysub():
+    img, ivar, tilts, _, sky, slitmask, left, right, _, _ = mock_slits()
+    gpm = slitmask > 0
+    serial = list(skysub.global_skysub_slits(img, ivar, tilts, slitmask, gpm, [1, 2], left,
+                                             right, pos_mask=False))
+    parallel = list(skysub.global_skysub_slits(img, ivar, tilts, slitmask, gpm, [1, 2], left,
+                                               right, n_proc=2, pos_mask=False))
+    for i, (s, p) in enumerate(zip(serial, parallel)):
+        thismask = slitmask == i+1
+        assert np.array_equal(s, p), 'Parallel sky model is different'
+        assert np.array_equal(s, skysub.global_skysub(img, ivar, tilts, thismask, left[:,i],
+                                                      right[:,i], inmask=gpm & thismask,
+                                                      pos_mask=False)), \
+                'Sky model is different from a direct fit'
+
+    # Slits without good pixels are skipped
+    assert list(skysub.global_skysub_slits(img, ivar, tilts, slitmask, gpm, [3], left, right)) \
+                == [None], 'Slit without pixels should not be fit'
+
+
+def test_chunked_global_skysub():
+    img, ivar, tilts, _, sky, slitmask, left, right, _, _ = mock_slits(nspec=1000)
+    rng = np.random.default_rng(2)
+    # Fit only sky
+    var = 25. + sky
+    img = sky + rng.normal(size=sky.shape)*np.sqrt(var)
+    thismask = slitmask > 0
+    model = skysub.global_skysub(img, 1/var, tilts, thismask, left, right, inmask=thismask,
+                                 pos_mask=False)
+    assert np.array_equal(model, skysub.global_skysub_chunked(img, 1/var, tilts, thismask, left,
+                                                              right, inmask=thismask,
+                                                              pos_mask=False)), \
+            'A single chunk should be identical to a direct fit'
+
+    chunked = skysub.global_skysub_chunked(img, 1/var, tilts, thismask, left, right, nchunk=3,
+                                           inmask=thismask, pos_mask=False)
+    assert np.array_equal(chunked, skysub.global_skysub_chunked(img, 1/var, tilts, thismask,
+                                                                left, right, nchunk=3, n_proc=2,
+                                                                inmask=thismask,
+                                                                pos_mask=False)), \
+            'Parallel chunked fit is different'
+    diff = np.absolute(chunked - model)*np.sqrt(1/var[thismask])
+    assert np.mean(diff) < 0.1 and np.max(diff) < 2., \
+            'Chunked fit is significantly different from a single fit'
@@ -1,5 +1,5 @@
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 from pypeit.core import slitdesign_matching
@@ -3,7 +3,7 @@ Module to run tests on SlitTraceSet
 """
 from pathlib import Path
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
@@ -82,3 +82,64 @@ def test_io_single():
     ofile.unlink()
 
 
+
+
+def full_frame_slit_img(slits, pad, slitidx):
+    # Brute-force construction of the slit ID image over the full frame
+    left, right, _ = slits.select_edges()
+    spat = np.arange(slits.nspat)
+    spec = np.arange(slits.nspec)
+    img = np.full((slits.nspec, slits.nspat), -1, dtype=int)
+    for i in slitidx:
+        indx = (spat[None,:] > left[:,i,None] - pad) & (spat[None,:] < right[:,i,None] + pad) \
+                    & (spec > slits.specmin[i])[:,None] & (spec < slits.specmax[i])[:,None]
+        img[indx] = slits.spat_id[i]
+    return img
+
+
+def test_slit_img():
+    nspec = 200
+    spec = np.arange(nspec)
+    left = np.column_stack([10.3 + 0.02*spec, 40.7 + 0.01*spec, 70.1 - 0.03*spec])
+    slits = SlitTraceSet(left, left + 18.4, 'MultiSlit', nspat=100, PYP_SPEC='dummy',
+                         specmin=np.array([-np.inf, 20.5, 10.]),
+                         specmax=np.array([np.inf, 150.5, 180.]))
+
+    # Bounding boxes include all the slit pixels
+    img = slits.slit_img(pad=2)
+    assert np.array_equal(img, full_frame_slit_img(slits, 2, np.arange(slits.nslits))), \
+            'Bad slit image'
+    for i, bbox in enumerate(slits.slit_bboxes(pad=2)):
+        assert np.sum(img[bbox] == slits.spat_id[i]) == np.sum(img == slits.spat_id[i]), \
+                'Bounding box does not include all slit pixels'
+    # Regions of the image can be constructed directly
+    for bbox in [np.s_[:,35:65], np.s_[15:120,:50], np.s_[:,95:]]:
+        assert np.array_equal(slits.slit_img(pad=2, bbox=bbox), img[bbox]), 'Bad image region'
+
+    # Images are cached
+    assert len(slits._img_cache['images']) == 1, 'Image should be cached'
+    _img = slits.slit_img(pad=2)
+    assert _img.dtype == img.dtype and np.array_equal(_img, img), 'Bad cached image'
+    # Altering the returned image does not alter the cache
+    _img[...] = 0
+    assert np.array_equal(slits.slit_img(pad=2), img), 'Cached image altered'
+
+    # The cache is reset when the mask changes
+    slits.mask[1] = slits.bitmask.turn_on(slits.mask[1], 'BADWVCALIB')
+    assert np.array_equal(slits.slit_img(pad=2), full_frame_slit_img(slits, 2, [0,2])), \
+            'Cache not reset after mask change'
+    assert len(slits._img_cache['images']) == 1, 'Cache not reset'
+
+    # ... or when the edges change
+    slits.init_tweaked()
+    slits.left_tweak += 1.
+    assert np.array_equal(slits.slit_img(pad=2), full_frame_slit_img(slits, 2, [0,2])), \
+            'Cache not reset after edge change'
+
+    # Coordinates are only computed within the selected slits
+    coo = slits.spatial_coordinate_image(slitidx=[0, 2])
+    left, right, _ = slits.select_edges()
+    indx = slits.slit_img(slitidx=[0, 2]) == slits.spat_id[2]
+    _coo = (np.arange(slits.nspat)[None,:] - left[:,2,None])/(right-left)[:,2,None]
+    assert np.array_equal(coo[indx], _coo[indx]), 'Bad coordinates'
+    assert np.all(coo[slits.slit_img(slitidx=[0, 2]) == -1] == 0), 'Bad coordinates'
@@ -7,7 +7,7 @@ import os
 from copy import deepcopy
 import pytest
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 from astropy.table import Table
 from astropy.io import fits
@@ -58,7 +58,7 @@ def init_dict():
                 vel_corr=1.0+1.0e-5)
 
 '''
-from IPython import embed
+from pypeit.lazyimport import embed
 
 dpath = '/home/xavier/Projects/PypeIt-development-suite/REDUX_OUT/keck_lris_blue/multi_300_5000_d680'
 new_spec2dfile = os.path.join(dpath, 'Science', 'spec2d_b170816_0076-E570_LRISb_2017Aug16T071652.378.fits')
@@ -89,7 +89,13 @@ def test_spec2dobj_io(init_dict):
     spec2DObj.to_file(ofile)
     # Read
     _spec2DObj = spec2dobj.Spec2DObj.from_file(ofile, spec2DObj.detname)
+    # Read without the images
+    __spec2DObj = spec2dobj.Spec2DObj.from_file(ofile, spec2DObj.detname, load_images=False)
     os.remove(ofile)
+    assert __spec2DObj.sciimg is None and __spec2DObj.bpmmask is None, 'Images should not be read'
+    assert __spec2DObj.sci_spat_flexure == _spec2DObj.sci_spat_flexure, 'Bad header data'
+    assert __spec2DObj.vel_corr == _spec2DObj.vel_corr, 'Bad header data'
+    assert np.array_equal(__spec2DObj.slits.left_init, _spec2DObj.slits.left_init), 'Bad slits'
 
 
 def test_spec2dobj_update_slit(init_dict):
@@ -4,7 +4,7 @@ Module to run tests on SpecObj
 import sys
 import os
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import pytest
 
@@ -2,8 +2,9 @@
 Module to run tests on SpecObjs
 """
 import os
+from types import SimpleNamespace
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import pytest
 
@@ -14,6 +15,8 @@ from astropy.io import fits
 from pypeit import specobjs
 from pypeit import specobj
 from pypeit import io
+from pypeit.par.pypeitpar import FluxCalibratePar
+from pypeit.spectrographs.util import load_spectrograph
 from pypeit.tests import tstutils
 
 
@@ -132,3 +135,50 @@ def test_io(sobj1, sobj2, sobj3, sobj4):
 
 
 
+
+
+@pytest.mark.parametrize('spec_name', ['shane_kast_blue', 'vlt_xshooter_vis'])
+def test_apply_flux_calib(spec_name):
+    spectrograph = load_spectrograph(spec_name)
+    par = FluxCalibratePar(extinct_file='paranalextinct.dat')
+    # Sensitivity functions for two orders/detectors
+    wave_zp = np.linspace(3000., 10000., 500)
+    sens = SimpleNamespace(algorithm='UVIS', splice_multi_det=False,
+                           wave=np.tile(wave_zp, (2,1)).T,
+                           zeropoint=np.vstack([20. - ((wave_zp - c)/3000.)**2
+                                                for c in [5000., 7000.]]).T,
+                           sens={'ECH_ORDERS': np.array([[20], [21]])})
+    if spectrograph.pypeline != 'Echelle':
+        sens.wave, sens.zeropoint = sens.wave[:,:1], sens.zeropoint[:,:1]
+
+    rng = np.random.default_rng(3)
+    sobjs = specobjs.SpecObjs(header={'EXPTIME': 600., 'AIRMASS': 1.2})
+    for i in range(6):
+        sobj = specobj.SpecObj(spectrograph.pypeline, 'DET01', SLITID=i, ECH_ORDER=20 + i % 3)
+        nspec = 100 + 10*i
+        for attr in ['BOX', 'OPT'][:1 + i % 2]:
+            sobj[attr+'_WAVE'] = np.sort(rng.uniform(3500., 9500., nspec))
+            sobj[attr+'_COUNTS'] = rng.normal(100., 10., nspec)
+            sobj[attr+'_COUNTS_IVAR'] = np.full(nspec, 0.01)
+        sobjs.add_sobj(sobj)
+    _sobjs = sobjs.copy()
+
+    sobjs.apply_flux_calib(par, spectrograph, sens)
+    # Flux calibrate each object separately
+    for sobj in _sobjs:
+        if spectrograph.pypeline == 'Echelle' and sobj.ECH_ORDER not in [20, 21]:
+            continue
+        indx = 0 if spectrograph.pypeline != 'Echelle' else sobj.ECH_ORDER - 20
+        sobj.apply_flux_calib(sens.wave[:,indx], sens.zeropoint[:,indx], 600.,
+                              extinct_correct=True, airmass=1.2,
+                              longitude=spectrograph.telescope['longitude'],
+                              latitude=spectrograph.telescope['latitude'],
+                              extinctfilepar=par['extinct_file'])
+    for sobj, _sobj in zip(sobjs, _sobjs):
+        for attr in ['BOX', 'OPT']:
+            for key in ['_FLAM', '_FLAM_SIG', '_FLAM_IVAR']:
+                if _sobj[attr+key] is None:
+                    assert sobj[attr+key] is None, 'Object should not be flux calibrated'
+                    continue
+                assert np.array_equal(sobj[attr+key], _sobj[attr+key]), 'Bad flux calibration'
+    assert sobjs[0].BOX_FLAM is not None, 'Object not flux calibrated'
@@ -2,9 +2,11 @@
 Module to test spectrograph read functions
 """
 import os
+import sys
+import subprocess
 from copy import deepcopy
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import pytest
 
@@ -134,3 +136,30 @@ def test_configs():
         'Configurations should not be the same within tolerance'
 
 
+
+
+def test_registry():
+    # The registry must select the module that defines each spectrograph
+    classes = spectrographs.spectrograph_classes()
+    assert list(classes.keys()) == spectrographs.available_spectrographs, \
+        'Spectrograph registry is out of date'
+    for name, cls in classes.items():
+        assert cls.__module__.split('.')[-1] == spectrographs.spectrograph_modules[name], \
+            f'Incorrect module registered for {name}'
+        assert spectrographs.spectrograph_class(name) is cls, f'Could not load {name}'
+    assert spectrographs.spectrograph_class('junk') is None, 'Unknown spectrographs should be None'
+    with pytest.raises(PypeItError):
+        load_spectrograph('junk')
+
+
+def test_lazy_load():
+    # Loading a spectrograph should only import the module that defines it
+    code = 'import sys; from pypeit.spectrographs.util import load_spectrograph; ' \
+           'load_spectrograph("shane_kast_blue"); ' \
+           'print(",".join(m for m in sys.modules if m.startswith("pypeit.spectrographs.")))'
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                            check=True)
+    modules = result.stdout.strip().split('\n')[-1].split(',')
+    instruments = set(spectrographs.spectrograph_modules.values())
+    assert [m.split('.')[-1] for m in modules if m.split('.')[-1] in instruments] \
+                == ['shane_kast'], 'Loading a spectrograph should only import its module'
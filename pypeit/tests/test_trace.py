@@ -1,4 +1,4 @@
-from IPython import embed
+from pypeit.lazyimport import embed
 import numpy as np
 
 from pypeit.core.fitting import robust_fit
@@ -77,3 +77,18 @@ def test_extrapolate_orders():
 
 
 
+
+
+def test_prepare_sobel_for_trace():
+    rng = np.random.default_rng(1)
+    sobel_sig = rng.normal(size=(200,100))
+    bpm = rng.random(sobel_sig.shape) > 0.9
+    bpm[:,5:8] = True
+
+    sides = ['left', 'right', None]
+    images = trace.prepare_sobel_for_trace(sobel_sig, bpm=bpm, side=sides)
+    assert len(images) == 3, 'Should return an image for each side'
+    for side, img in zip(sides, images):
+        assert np.array_equal(img, trace.prepare_sobel_for_trace(sobel_sig, bpm=bpm, side=side)), \
+                'Constructing the images together should not change them'
+    assert np.all(images[0][:,8:] > 0.0999) and np.all(images[0][:,5:8] == 0.), 'Bad left image'
@@ -1,7 +1,7 @@
 """
 Module to run tests on affine transform
 """
-from IPython import embed
+from pypeit.lazyimport import embed
 import numpy as np
 
 from pypeit.core import transform
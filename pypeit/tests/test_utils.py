@@ -3,7 +3,7 @@ Module to run tests on methods in utils.py
 """
 import os
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import yaml
 
@@ -144,3 +144,16 @@ def test_occurrences():
     tstarr = np.array([2, 2, 1,  1, 3, 1, 3, 3, 1, 1])
     outarr = utils.occurrences(inparr)
     assert np.array_equal(outarr, tstarr), 'Occurrences has failed'
+
+
+def _scaled_sum(x, scale=1.):
+    return scale*np.sum(x)
+
+
+def test_parallel_map():
+    items = [np.arange(n) for n in range(1,8)]
+    serial = list(utils.parallel_map(_scaled_sum, items, shared=dict(scale=2.)))
+    assert serial == [2.*np.sum(x) for x in items], 'Bad serial result'
+    pool = list(utils.parallel_map(_scaled_sum, items, n_proc=2, shared=dict(scale=2.),
+                                   max_pending=1))
+    assert pool == serial, 'Pool results should be identical and in order'
@@ -40,3 +40,37 @@ def test_wavetilts():
     # Clean-up
     ofile.unlink()
 
+
+
+def test_fit2tiltimg():
+    nspec, nspat = 200, 120
+    spat_id = np.array([20, 60, 100])
+    rng = np.random.default_rng(1)
+    coeffs = np.zeros((4,3,3))
+    coeffs[:,:2] = rng.normal(scale=0.1, size=(4,2,3))
+    wvtilts = wavetilts.WaveTilts(coeffs=coeffs, nslit=3, spat_id=spat_id,
+                                  spat_order=np.array([1,1,1]), spec_order=np.array([3,3,3]),
+                                  func2d='legendre2d')
+    slitmask = np.full((nspec, nspat), -1, dtype=int)
+    for s in spat_id:
+        slitmask[10:-10,s-15:s+15] = s
+    tilts = wvtilts.fit2tiltimg(slitmask, flexure=0.5)
+    for i, s in enumerate(spat_id):
+        thismask = slitmask == s
+        _tilts = wavetilts.tracewave.fit2tilts(slitmask.shape, coeffs[:,:2,i], 'legendre2d',
+                                               spat_shift=-0.5)
+        assert np.array_equal(tilts[thismask], _tilts[thismask]), 'Bad tilts'
+    assert np.all(tilts[slitmask == -1] == 0), 'Tilts should be zero off the slits'
+
+    # The image is cached
+    _tilts = wvtilts.fit2tiltimg(slitmask, flexure=0.5)
+    assert np.array_equal(tilts, _tilts), 'Cached image is different'
+    _tilts[...] = 0.
+    assert np.array_equal(tilts, wvtilts.fit2tiltimg(slitmask, flexure=0.5)), \
+            'Altering the returned image should not alter the cache'
+    assert not np.array_equal(tilts, wvtilts.fit2tiltimg(slitmask)), \
+            'Image should depend on the flexure'
+    # ... and the cache is reset when the fit changes
+    wvtilts.coeffs[0,0,0] += 1.
+    assert not np.array_equal(tilts, wvtilts.fit2tiltimg(slitmask, flexure=0.5)), \
+            'Cache should be reset when the coefficients change'
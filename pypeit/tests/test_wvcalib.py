@@ -4,7 +4,7 @@ Module to run tests on WaveCalib and WaveFit
 from pathlib import Path
 import os
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import pytest
 
@@ -151,3 +151,38 @@ def test_wvcalib_no2d():
     # Finish
     ofile.unlink()
 
+
+
+def test_build_waveimg():
+    nspec, nspat = 300, 100
+    spat_ids = np.asarray([25, 75])
+    wv_fits = [wv_fitting.WaveFit(s, pypeitfit=fitting.PypeItFit(fitc=np.array([4000., 2000., 10.]),
+                                                                func='legendre', minx=0., maxx=1.))
+               for s in spat_ids]
+    wv_fits[1].pypeitfit.fitc[0] = 6000.
+    waveCalib = wavecalib.WaveCalib(wv_fits=np.asarray(wv_fits), nslits=2, spat_ids=spat_ids,
+                                    strpar='{"echelle": false, "ech_separate_2d": false}')
+    slits = slittrace.SlitTraceSet(left_init=np.tile(spat_ids - 20., (nspec, 1)),
+                                   right_init=np.tile(spat_ids + 20., (nspec, 1)),
+                                   pypeline='MultiSlit', spat_id=spat_ids, nspat=nspat,
+                                   PYP_SPEC='dummy')
+    tilts = np.tile(np.linspace(0, 1, nspec), (nspat, 1)).T
+    waveimg = waveCalib.build_waveimg(tilts, slits, spec_flexure=np.array([0., 3.]))
+    slitmask = slits.slit_img()
+    for i, s in enumerate(spat_ids):
+        thismask = slitmask == s
+        shift = 0. if i == 0 else 3./(nspec-1)
+        assert np.array_equal(waveimg[thismask],
+                              wv_fits[i].pypeitfit.eval(tilts[thismask] + shift)), 'Bad waveimg'
+    assert np.all(waveimg[slitmask == -1] == 0), 'Wavelengths should be zero off the slits'
+
+    # The image is cached
+    assert np.array_equal(waveimg, waveCalib.build_waveimg(tilts, slits,
+                                                           spec_flexure=np.array([0., 3.])))
+    assert not np.array_equal(waveimg, waveCalib.build_waveimg(tilts, slits)), \
+            'Image should depend on the flexure'
+    # ... and the cache is reset when the wavelength solutions change
+    wv_fits[0].pypeitfit.fitc[0] += 1.
+    assert not np.array_equal(waveimg, waveCalib.build_waveimg(tilts, slits,
+                                                               spec_flexure=np.array([0., 3.]))), \
+            'Cache should be reset when the wavelength solutions change'
@@ -4,7 +4,7 @@ Odds and ends in support of tests
 import os
 import pytest
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 from astropy import time
@@ -7,7 +7,7 @@ traces using principle-component analysis.
 
 """
 import warnings
-from IPython import embed
+from pypeit.lazyimport import embed
 
 import numpy as np
 
@@ -7,26 +7,30 @@ General utility functions.
 """
 import os
 import inspect
+import functools
 import pickle
 import pathlib
 import itertools
 import glob
 import colorsys
 import collections.abc
+from concurrent import futures
 
-from IPython import embed
+from pypeit.lazyimport import embed, lazy_import
 
 import numpy as np
 from numpy.lib.stride_tricks import as_strided
 
-import scipy.ndimage
-from scipy import signal
+# NOTE: This module is imported by nearly every other pypeit module.  Packages
+# that are slow to import and only used by a few functions are imported lazily.
+import scipy
+signal = lazy_import('scipy.signal')
 
-import matplotlib
-import matplotlib.pyplot as plt
+matplotlib = lazy_import('matplotlib')
+plt = lazy_import('matplotlib.pyplot')
 
 from astropy import units
-from astropy import stats
+stats = lazy_import('astropy.stats')
 
 from pypeit import msgs
 from pypeit.move_median import move_median
@@ -424,7 +428,7 @@ def embed_header():
 
         To include the returned string::
 
-            from IPython import embed
+            from pypeit.lazyimport import embed
             from pypeit.utils import embed_header
 
             embed(header=embed_header())
@@ -1662,6 +1666,83 @@ def load_pickle(fname):
         return pickle.load(f)
 
 
+_pool_worker_func = None
+"""
+Function (with any shared keyword arguments bound) executed by each worker
+process started by :func:`parallel_map`.
+"""
+
+
+def _init_pool_worker(func, shared):
+    """
+    Initialize a worker process used by :func:`parallel_map`.
+
+    The shared arguments are bound to the function once per worker, instead of
+    being serialized for every task.
+    """
+    global _pool_worker_func
+    _pool_worker_func = func if shared is None else functools.partial(func, **shared)
+
+
+def _run_pool_worker(item):
+    """
+    Execute the function bound by :func:`_init_pool_worker` for one item.
+    """
+    return _pool_worker_func(item)
+
+
+def parallel_map(func, items, n_proc=1, shared=None, max_pending=None):
+    """
+    Apply a function to a sequence of items, optionally using a pool of worker
+    processes, and yield the results in the same order as the input items.
+
+    The results are yielded as they become available (in order), so the caller
+    can consume and discard each result before all items are processed.  When
+    using a pool, at most ``max_pending`` items are submitted to the workers at
+    any given time, which bounds the number of results held in memory.
+
+    .. warning::
+
+        When ``n_proc > 1``, ``func``, the items, the shared arguments, and the
+        returned values must all be serializable (picklable).
+
+    Args:
+        func (callable):
+            The function to apply.  The call signature must be
+            ``func(item, **shared)``.
+        items (iterable):
+            The items to process.
+        n_proc (:obj:`int`, optional):
+            Number of worker processes.  If None or less than 2, the items are
+            processed serially in the calling process.
+        shared (:obj:`dict`, optional):
+            Keyword arguments passed to every call of ``func``.  When using a
+            pool, these are sent to each worker only once, when it is started.
+        max_pending (:obj:`int`, optional):
+            Maximum number of items submitted to the pool but whose results
+            have not yet been yielded.  If None, set to ``2*n_proc``.
+
+    Yields:
+        object: The result of ``func`` for each item, in input order.
+    """
+    _shared = {} if shared is None else shared
+    if n_proc is None or n_proc < 2:
+        for item in items:
+            yield func(item, **_shared)
+        return
+
+    _max_pending = 2*n_proc if max_pending is None else max(max_pending, 1)
+    pending = collections.deque()
+    with futures.ProcessPoolExecutor(max_workers=n_proc, initializer=_init_pool_worker,
+                                     initargs=(func, shared)) as pool:
+        for item in items:
+            if len(pending) == _max_pending:
+                yield pending.popleft().result()
+            pending.append(pool.submit(_run_pool_worker, item))
+        while len(pending) > 0:
+            yield pending.popleft().result()
+
+
 ##
 ##This code was originally published by the following individuals for use with
 ##Scilab:
@@ -6,6 +6,7 @@ Module for guiding 1D Wavelength Calibration
 """
 import inspect
 import json
+import zlib
 
 import numpy as np
 from matplotlib import pyplot as plt
@@ -25,9 +26,9 @@ from pypeit import calibframe
 from pypeit.core.wavecal import echelle
 
 
-from IPython import embed
+from pypeit.lazyimport import embed
 
-class WaveCalib(calibframe.CalibFrame):
+class WaveCalib(calibframe.CalibFrame, calibframe.ImageCache):
     """
     Calibration frame containing the wavelength calibration.
 
@@ -46,10 +47,22 @@ class WaveCalib(calibframe.CalibFrame):
     calib_file_format = 'fits'
 
     # NOTE:
-    #   - Internals are identical to the base class
     #   - Datamodel already contains CalibFrame base elements, so no need to
     #     include it here.
 
+    internals = calibframe.CalibFrame.internals + ['_img_cache']
+    """
+    Attributes kept separate from the datamodel.  ``_img_cache`` holds the
+    wavelength images constructed by :func:`build_waveimg`; see
+    :attr:`img_cache_size`.
+    """
+
+    img_cache_size = 2
+    """
+    Maximum number of wavelength images kept in memory by
+    :func:`build_waveimg`.
+    """
+
     datamodel = {'PYP_SPEC': dict(otype=str, descr='PypeIt spectrograph name'),
                  'wv_fits': dict(otype=np.ndarray, atype=wv_fitting.WaveFit,
                                  descr='WaveFit to each 1D wavelength solution'),
@@ -303,6 +316,13 @@ class WaveCalib(calibframe.CalibFrame):
         Only applied to good slits, which means any non-flagged or flagged
          in the exclude_for_reducing list
 
+        The wavelengths are only computed within the bounding box of each
+        slit, and the images are cached (see :attr:`img_cache_size`), such that
+        repeated calls for the same tilts, slits, and flexure do not
+        reconstruct the image.  The cache is automatically emptied when the
+        wavelength solutions change.  A new array is always returned, such
+        that the caller is free to alter it.
+
         Args:
             tilts (`numpy.ndarray`_):
                 Image holding tilts
@@ -332,13 +352,22 @@ class WaveCalib(calibframe.CalibFrame):
             assert(spec_flexure.size == slits.nslits)
         spec_flex /= (slits.nspec - 1)
 
+        _tilts = np.ascontiguousarray(tilts)
+        cache_key = (_tilts.shape, _tilts.dtype.str, zlib.crc32(_tilts), slits.cache_checksum(),
+                     slits.pad, None if slits.ech_order is None else slits.ech_order.tobytes(),
+                     spat_flexure, spec_flex.tobytes())
+        images = self._get_img_cache()
+        if cache_key in images:
+            return images[cache_key].copy()
+
         # Setup
         bpm = slits.bitmask.flagged(slits.mask, and_not=slits.bitmask.exclude_for_reducing)
         ok_slits = np.logical_not(bpm)
         #
         image = np.zeros_like(tilts)
-        # Grab slit_img
+        # Grab slit_img and the bounding box of each slit
         slitmask = slits.slit_img(flexure=spat_flexure, exclude_flag=slits.bitmask.exclude_for_reducing)
+        bboxes = slits.slit_bboxes(flexure=spat_flexure)
 
         # Separate detectors for the 2D solutions?
         if self.par['ech_separate_2d']:
@@ -349,7 +378,8 @@ class WaveCalib(calibframe.CalibFrame):
         # Unpack some 2-d fit parameters if this is echelle
         for islit in np.where(ok_slits)[0]:
             slit_spat = slits.spat_id[islit]
-            thismask = (slitmask == slit_spat)
+            bbox = bboxes[islit]
+            thismask = (slitmask[bbox] == slit_spat)
             if not np.any(thismask):
                 msgs.error("Something failed in wavelengths or masking..")
             if self.par['echelle'] and self.par['ech_2dfit']:
@@ -364,17 +394,41 @@ class WaveCalib(calibframe.CalibFrame):
                     idx_fit2d = ordr_det-1  
                 else:
                     idx_fit2d = 0
-                image[thismask] = self.wv_fit2d[idx_fit2d].eval(
-                    tilts[thismask] + spec_flex[islit], 
-                    x2=np.full_like(tilts[thismask], 
-                                    slits.ech_order[islit]))
-                image[thismask] /= slits.ech_order[islit]
+                slit_tilts = tilts[bbox][thismask]
+                image[bbox][thismask] = self.wv_fit2d[idx_fit2d].eval(
+                    slit_tilts + spec_flex[islit],
+                    x2=np.full_like(slit_tilts, slits.ech_order[islit])) \
+                        / slits.ech_order[islit]
             else:
                 iwv_fits = self.wv_fits[islit]
-                image[thismask] = iwv_fits.pypeitfit.eval(
-                    tilts[thismask] + spec_flex[islit])
+                image[bbox][thismask] = iwv_fits.pypeitfit.eval(
+                    tilts[bbox][thismask] + spec_flex[islit])
+        self._cache_img(cache_key, image)
         # Return
-        return image
+        return image.copy()
+
+    def cache_checksum(self):
+        """
+        Compute the checksum of the attributes used to construct the
+        wavelength images.
+
+        Returns:
+            :obj:`int`: A CRC-32 checksum of the parameters and wavelength
+            solutions.
+        """
+        crc = zlib.crc32(b'' if self.strpar is None else self.strpar.encode())
+        fits = [] if self.wv_fits is None else [None if f is None else f.pypeitfit
+                                                for f in self.wv_fits]
+        if self.wv_fit2d is not None:
+            fits += list(self.wv_fit2d)
+        for f in fits:
+            if f is None or f.fitc is None:
+                crc = zlib.crc32(b'None', crc)
+                continue
+            crc = zlib.crc32(np.ascontiguousarray(f.fitc), crc)
+            crc = zlib.crc32(repr((f.func, f.minx, f.maxx, f.minx2, f.maxx2)).encode(), crc)
+        return zlib.crc32(b'' if self.det_img is None else np.ascontiguousarray(self.det_img),
+                          crc)
 
     def wave_diagnostics(self, print_diag=False):
         """
@@ -8,11 +8,13 @@ Module for guiding Arc/Sky line tracing
 import os
 import copy
 import inspect
+import zlib
 
-from IPython import embed
+from pypeit.lazyimport import embed
 from pathlib import Path
 
 import numpy as np
+from scipy import ndimage
 from matplotlib import pyplot as plt
 from matplotlib.lines import Line2D
 
@@ -29,7 +31,7 @@ from pypeit.core.wavecal import autoid
 from pypeit.images import buildimage
 
 
-class WaveTilts(calibframe.CalibFrame):
+class WaveTilts(calibframe.CalibFrame, calibframe.ImageCache):
     """
     Calibration frame containing the wavelength tilt calibration.
 
@@ -53,10 +55,21 @@ class WaveTilts(calibframe.CalibFrame):
     calib_file_format = 'fits'
 
     # NOTE:
-    #   - Internals are identical to the base class
     #   - Datamodel already contains CalibFrame base elements, so no need to
     #     include it here.
 
+    internals = calibframe.CalibFrame.internals + ['_img_cache']
+    """
+    Attributes kept separate from the datamodel.  ``_img_cache`` holds the
+    tilt images constructed by :func:`fit2tiltimg`; see
+    :attr:`img_cache_size`.
+    """
+
+    img_cache_size = 2
+    """
+    Maximum number of tilt images kept in memory by :func:`fit2tiltimg`.
+    """
+
     datamodel = {'PYP_SPEC': dict(otype=str, descr='PypeIt spectrograph name'),
                  'coeffs': dict(otype=np.ndarray, atype=np.floating,
                                 descr='2D coefficents for the fit on the initial slits.  One '
@@ -130,9 +143,18 @@ class WaveTilts(calibframe.CalibFrame):
 
         Mainly to allow for flexure
 
+        The tilts are only evaluated within the bounding box of each slit, and
+        the images are cached (see :attr:`img_cache_size`), such that repeated
+        calls with the same slit image and flexure do not reconstruct the
+        image.  The cache is automatically emptied when the fit parameters
+        change.  A new array is always returned, such that the caller is free to
+        alter it.
+
         Args:
             slitmask (`numpy.ndarray`_):
-                ??
+                Image with the spatial ID of the slit associated with each
+                pixel (-1 for pixels not in any slit); see
+                :func:`~pypeit.slittrace.SlitTraceSet.slit_img`.
             flexure (float, optional):
                 Spatial shift of the tilt image onto the desired frame
                 (typically a science image)
@@ -141,23 +163,48 @@ class WaveTilts(calibframe.CalibFrame):
             `numpy.ndarray`_:  New tilt image
 
         """
-        msgs.info("Generating a tilts image from the fit parameters")
-
         _flexure = 0. if flexure is None else flexure
 
-        final_tilts = np.zeros_like(slitmask).astype(float)
-        gdslit_spat = np.unique(slitmask[slitmask >= 0]).astype(int)
+        _slitmask = np.ascontiguousarray(slitmask)
+        cache_key = (_slitmask.shape, _slitmask.dtype.str, zlib.crc32(_slitmask), _flexure)
+        images = self._get_img_cache()
+        if cache_key in images:
+            return images[cache_key].copy()
+
+        msgs.info("Generating a tilts image from the fit parameters")
+        final_tilts = np.zeros(slitmask.shape, dtype=float)
+        # Bounding box of each slit; the index is the slit spat_id
+        bboxes = ndimage.find_objects(np.clip(slitmask, -1, None).astype(int) + 1)
         # Loop
-        for slit_spat in gdslit_spat:
+        for slit_spat, bbox in enumerate(bboxes):
+            if bbox is None:
+                continue
             slit_idx = self.spatid_to_zero(slit_spat)
             # Calculate
             coeff_out = self.coeffs[:self.spec_order[slit_idx]+1,:self.spat_order[slit_idx]+1,slit_idx]
-            _tilts = tracewave.fit2tilts(final_tilts.shape, coeff_out, self.func2d, spat_shift=-1*_flexure)
+            _tilts = tracewave.fit2tilts(final_tilts.shape, coeff_out, self.func2d,
+                                         spat_shift=-1*_flexure, bbox=bbox)
             # Fill
-            thismask_science = slitmask == slit_spat
-            final_tilts[thismask_science] = _tilts[thismask_science]
+            thismask_science = slitmask[bbox] == slit_spat
+            final_tilts[bbox][thismask_science] = _tilts[thismask_science]
+
+        self._cache_img(cache_key, final_tilts)
         # Return
-        return final_tilts
+        return final_tilts.copy()
+
+    def cache_checksum(self):
+        """
+        Compute the checksum of the attributes used to construct the tilt
+        images.
+
+        Returns:
+            :obj:`tuple`: The fit function and a CRC-32 checksum of the fit
+            coefficients, orders, and slit IDs.
+        """
+        crc = 0
+        for arr in [self.coeffs, self.spat_order, self.spec_order, self.spat_id]:
+            crc = zlib.crc32(b'' if arr is None else np.ascontiguousarray(arr), crc)
+        return (self.func2d, crc)
 
     def spatid_to_zero(self, spat_id):
         """